@@ -1,10 +1,13 @@
 import frappe
 from frappe import _
 from frappe.email import sendmail_to_system_managers
+from frappe.query_builder.functions import Max, Sum
 from frappe.utils import (
 	add_days,
 	add_months,
 	cint,
+	create_batch,
+	cstr,
 	date_diff,
 	flt,
 	get_first_day,
@@ -20,6 +23,9 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 )
 from erpnext.accounts.utils import get_account_currency
 
+# invoices booked per chunk by `book_deferred_entries_in_bulk`
+DEFERRED_BOOKING_BATCH_SIZE = 1000
+
 
 def validate_service_stop_date(doc):
 	"""Validates service_stop_date for Purchase Invoice and Sales Invoice"""
@@ -87,9 +93,12 @@ def convert_deferred_expense_to_expense(deferred_process, start_date=None, end_d
 	)  # nosec
 
 	# For each invoice, book deferred expense
-	for invoice in invoices:
-		doc = frappe.get_doc("Purchase Invoice", invoice)
-		book_deferred_income_or_expense(doc, deferred_process, end_date)
+	if is_bulk_deferred_booking_enabled():
+		book_deferred_entries_in_bulk("Purchase Invoice", invoices, deferred_process, end_date)
+	else:
+		for invoice in invoices:
+			doc = frappe.get_doc("Purchase Invoice", invoice)
+			book_deferred_income_or_expense(doc, deferred_process, end_date)
 
 	if frappe.flags.deferred_accounting_error:
 		send_mail(deferred_process)
@@ -116,20 +125,313 @@ def convert_deferred_revenue_to_income(deferred_process, start_date=None, end_da
 		(end_date, start_date),
 	)  # nosec
 
-	for invoice in invoices:
-		doc = frappe.get_doc("Sales Invoice", invoice)
-		book_deferred_income_or_expense(doc, deferred_process, end_date)
+	if is_bulk_deferred_booking_enabled():
+		book_deferred_entries_in_bulk("Sales Invoice", invoices, deferred_process, end_date)
+	else:
+		for invoice in invoices:
+			doc = frappe.get_doc("Sales Invoice", invoice)
+			book_deferred_income_or_expense(doc, deferred_process, end_date)
 
 	if frappe.flags.deferred_accounting_error:
 		send_mail(deferred_process)
 
 
+def is_bulk_deferred_booking_enabled():
+	"""Deferred entries booked as GL Entries can be booked from item rows in bulk, entries booked
+	via Journal Entry are always booked per invoice."""
+	return cint(
+		frappe.db.get_single_value("Accounts Settings", "book_deferred_entries_in_bulk")
+	) and not cint(frappe.db.get_single_value("Accounts Settings", "book_deferred_entries_via_journal_entry"))
+
+
+def book_deferred_entries_in_bulk(doctype, invoices, deferred_process, posting_date):
+	"""Book the deferred items of invoices like `book_deferred_income_or_expense` does, from their
+	item rows instead of the invoice documents.
+
+	Invoices are booked in chunks and their GL Entries are posted together per company, posting date
+	and accounting dimensions, each committed on its own. Booked amounts are read from the ledger, so
+	running it again after an interruption continues where it stopped.
+	"""
+	settings = frappe._dict(
+		book_deferred_entries_based_on=frappe.db.get_singles_value(
+			"Accounts Settings", "book_deferred_entries_based_on"
+		),
+		accounts_frozen_upto=frappe.db.get_single_value("Accounts Settings", "acc_frozen_upto"),
+		precision={},
+	)
+
+	for invoice_names in create_batch(invoices, DEFERRED_BOOKING_BATCH_SIZE):
+		book_deferred_entries_for_invoices(doctype, invoice_names, deferred_process, posting_date, settings)
+
+
+def book_deferred_entries_for_invoices(doctype, invoice_names, deferred_process, posting_date, settings):
+	invoices = get_deferred_invoices(doctype, invoice_names)
+	booked_amounts = get_booked_deferred_amounts(doctype, invoice_names)
+	dimensions = get_accounting_dimensions()
+	deferred_account = (
+		"deferred_revenue_account" if doctype == "Sales Invoice" else "deferred_expense_account"
+	)
+
+	groups = {}
+	for item in get_deferred_items(doctype, invoice_names, dimensions):
+		doc = invoices[item.parent]
+		booked = booked_amounts.get((item.name, item.get(deferred_account), doc.company), (0.0, 0.0, None))
+
+		bookings_per_date = {}
+		for gl_posting_date, gl_entries in get_deferred_bookings(
+			doc, item, booked, deferred_process, posting_date, settings
+		):
+			# bookings of an item frozen into the same date stay separate GL Entries
+			seq = bookings_per_date[gl_posting_date] = bookings_per_date.get(gl_posting_date, -1) + 1
+			key = (
+				cstr(gl_posting_date),
+				seq,
+				doc.company,
+				*[cstr(gl_entries[0].get(dimension)) for dimension in dimensions],
+			)
+			groups.setdefault(key, []).append((doc, item.name, gl_entries))
+
+	failed_items = set()
+	for key in sorted(groups):
+		bookings = [booking for booking in groups[key] if booking[1] not in failed_items]
+		if not bookings or post_deferred_gl_entries_in_bulk(bookings):
+			continue
+
+		# post per item, so a failing invoice doesn't hold back the others
+		for doc, item_name, gl_entries in bookings:
+			if not post_deferred_gl_entries(doc, gl_entries):
+				# later bookings of the item have to wait for this one
+				failed_items.add(item_name)
+
+
+def get_deferred_invoices(doctype, invoice_names):
+	"""Invoices without their child tables, enough to build their GL Entries."""
+	party_field = "customer" if doctype == "Sales Invoice" else "supplier"
+	fields = [
+		"name",
+		"docstatus",
+		"company",
+		"posting_date",
+		"currency",
+		"conversion_rate",
+		"is_return",
+		"is_opening",
+		"remarks",
+		"project",
+		party_field,
+		*get_accounting_dimensions(),
+	]
+
+	return {
+		d.name: frappe.get_doc({"doctype": doctype, **d})
+		for d in frappe.get_all(doctype, filters={"name": ("in", invoice_names)}, fields=fields)
+	}
+
+
+def get_deferred_items(doctype, invoice_names, dimensions):
+	item = frappe.qb.DocType(f"{doctype} Item")
+	if doctype == "Sales Invoice":
+		enable_check = item.enable_deferred_revenue
+		accounts = [item.income_account, item.expense_account, item.deferred_revenue_account]
+	else:
+		enable_check = item.enable_deferred_expense
+		accounts = [item.expense_account, item.deferred_expense_account]
+
+	return (
+		frappe.qb.from_(item)
+		.select(
+			item.name,
+			item.parent,
+			item.service_start_date,
+			item.service_end_date,
+			item.service_stop_date,
+			item.base_net_amount,
+			item.net_amount,
+			item.cost_center,
+			item.project,
+			*accounts,
+			*[item[dimension] for dimension in dimensions],
+		)
+		.where((item.parenttype == doctype) & item.parent.isin(invoice_names) & (enable_check == 1))
+		.orderby(item.parent)
+		.orderby(item.idx)
+	).run(as_dict=True)
+
+
+def get_booked_deferred_amounts(doctype, invoice_names):
+	"""Amounts booked so far from the deferred account of the items of invoices and the last date
+	they were booked on, by item row, account and company, like `get_already_booked_amount` and
+	`get_booking_dates` read them per item."""
+	dr_or_cr = "debit" if doctype == "Sales Invoice" else "credit"
+
+	gle = frappe.qb.DocType("GL Entry")
+	gl_entries = (
+		frappe.qb.from_(gle)
+		.select(
+			gle.voucher_detail_no.as_("detail_no"),
+			gle.account,
+			gle.company,
+			Sum(gle[dr_or_cr]).as_("amount"),
+			Sum(gle[f"{dr_or_cr}_in_account_currency"]).as_("amount_in_account_currency"),
+			Max(gle.posting_date).as_("posting_date"),
+		)
+		.where((gle.voucher_type == doctype) & gle.voucher_no.isin(invoice_names) & (gle.is_cancelled == 0))
+		.groupby(gle.voucher_detail_no, gle.account, gle.company)
+	).run(as_dict=True)
+
+	je = frappe.qb.DocType("Journal Entry")
+	jea = frappe.qb.DocType("Journal Entry Account")
+	journal_entries = (
+		frappe.qb.from_(je)
+		.inner_join(jea)
+		.on(je.name == jea.parent)
+		.select(
+			jea.reference_detail_no.as_("detail_no"),
+			jea.account,
+			je.company,
+			Sum(jea[dr_or_cr]).as_("amount"),
+			Sum(jea[f"{dr_or_cr}_in_account_currency"]).as_("amount_in_account_currency"),
+			Max(je.posting_date).as_("posting_date"),
+		)
+		.where((jea.reference_type == doctype) & jea.reference_name.isin(invoice_names) & (je.docstatus < 2))
+		.groupby(jea.reference_detail_no, jea.account, je.company)
+	).run(as_dict=True)
+
+	booked_amounts = {}
+	for d in gl_entries + journal_entries:
+		key = (d.detail_no, d.account, d.company)
+		amount, amount_in_account_currency, posting_date = booked_amounts.get(key, (0.0, 0.0, None))
+		booked_amounts[key] = (
+			amount + flt(d.amount),
+			amount_in_account_currency + flt(d.amount_in_account_currency),
+			max(getdate(d.posting_date), posting_date) if posting_date else getdate(d.posting_date),
+		)
+
+	return booked_amounts
+
+
+def get_deferred_item_precision(doc, settings):
+	"""Precisions of base_net_amount and net_amount of the items of an invoice."""
+	if doc.currency not in settings.precision:
+		item = frappe.new_doc(f"{doc.doctype} Item")
+		item.currency = doc.currency
+		settings.precision[doc.currency] = (item.precision("base_net_amount"), item.precision("net_amount"))
+
+	return settings.precision[doc.currency]
+
+
+def get_deferred_bookings(doc, item, booked, deferred_process, posting_date, settings):
+	"""Yield the posting date and GL Entries of every booking of an item up to `posting_date`, the
+	bookings `book_deferred_income_or_expense` makes one after another."""
+	already_booked_amount, already_booked_amount_in_account_currency, last_posting_date = booked
+	if doc.currency == doc.company_currency:
+		already_booked_amount_in_account_currency = already_booked_amount
+
+	account_currency = get_account_currency(item.expense_account or item.income_account)
+	if doc.doctype == "Sales Invoice":
+		against, project = doc.customer, doc.project
+		credit_account, debit_account = item.income_account, item.deferred_revenue_account
+	else:
+		against, project = doc.supplier, item.project
+		credit_account, debit_account = item.deferred_expense_account, item.expense_account
+
+	precision = get_deferred_item_precision(doc, settings)
+	in_company_currency = account_currency == doc.company_currency
+	total_days = date_diff(item.service_end_date, item.service_start_date) + 1
+	accounts_frozen_upto = settings.accounts_frozen_upto
+
+	prev_posting_date = last_posting_date
+	while True:
+		start_date = getdate(add_days(prev_posting_date, 1)) if prev_posting_date else item.service_start_date
+		start_date, end_date, last_gl_entry = get_booking_period(item, start_date, posting_date)
+		if not (start_date and end_date):
+			return
+
+		total_booking_days = date_diff(end_date, start_date) + 1
+		already_booked = (already_booked_amount, already_booked_amount_in_account_currency)
+
+		if settings.book_deferred_entries_based_on == "Months":
+			amount, base_amount = get_monthly_amount(
+				item, last_gl_entry, start_date, end_date, already_booked, in_company_currency, precision
+			)
+		else:
+			amount, base_amount = get_daily_amount(
+				item,
+				last_gl_entry,
+				total_days,
+				total_booking_days,
+				already_booked,
+				in_company_currency,
+				precision,
+			)
+
+		if not amount:
+			prev_posting_date = end_date
+		else:
+			gl_posting_date = end_date
+			prev_posting_date = None
+			# check if books nor frozen till endate:
+			if accounts_frozen_upto and getdate(end_date) <= getdate(accounts_frozen_upto):
+				gl_posting_date = get_last_day(add_days(accounts_frozen_upto, 1))
+				prev_posting_date = end_date
+
+			yield (
+				gl_posting_date,
+				get_deferred_gl_entries(
+					doc,
+					credit_account,
+					debit_account,
+					against,
+					amount,
+					base_amount,
+					gl_posting_date,
+					project,
+					account_currency,
+					item.cost_center,
+					item,
+					deferred_process,
+				),
+			)
+
+			# as read back from the ledger for the next booking
+			already_booked_amount += flt(base_amount, precision[0])
+			if doc.currency == doc.company_currency:
+				already_booked_amount_in_account_currency = already_booked_amount
+			else:
+				already_booked_amount_in_account_currency += flt(amount)
+
+			gl_posting_date = getdate(gl_posting_date)
+			last_posting_date = (
+				max(last_posting_date, gl_posting_date) if last_posting_date else gl_posting_date
+			)
+			if not prev_posting_date:
+				prev_posting_date = last_posting_date
+
+		if not (getdate(end_date) < getdate(posting_date) and not last_gl_entry):
+			return
+
+
+def post_deferred_gl_entries_in_bulk(bookings):
+	"""Post the GL Entries of bookings of several invoices at once, False if that failed."""
+	from erpnext.accounts.general_ledger import make_gl_entries
+
+	try:
+		make_gl_entries(
+			[gl_entry for _doc, _item_name, gl_entries in bookings for gl_entry in gl_entries],
+			merge_entries=False,
+		)
+		frappe.db.commit()
+	except Exception:
+		frappe.db.rollback()
+		return False
+
+	return True
+
+
 def get_booking_dates(doc, item, posting_date=None, prev_posting_date=None):
 	if not posting_date:
 		posting_date = add_days(today(), -1)
 
-	last_gl_entry = False
-
 	deferred_account = (
 		"deferred_revenue_account" if doc.doctype == "Sales Invoice" else "deferred_expense_account"
 	)
@@ -170,6 +472,15 @@ def get_booking_dates(doc, item, posting_date=None, prev_posting_date=None):
 
 	else:
 		start_date = getdate(add_days(prev_posting_date, 1))
+
+	return get_booking_period(item, start_date, posting_date)
+
+
+def get_booking_period(item, start_date, posting_date):
+	"""Dates of the next booking of an item starting on `start_date`, up to its month end, the end
+	or stop of its service or `posting_date`, and whether it is the last booking of the item."""
+	last_gl_entry = False
+
 	end_date = get_last_day(start_date)
 	if end_date >= item.service_end_date:
 		end_date = item.service_end_date
@@ -190,7 +501,27 @@ def get_booking_dates(doc, item, posting_date=None, prev_posting_date=None):
 def calculate_monthly_amount(
 	doc, item, last_gl_entry, start_date, end_date, total_days, total_booking_days, account_currency
 ):
+	return get_monthly_amount(
+		item,
+		last_gl_entry,
+		start_date,
+		end_date,
+		get_already_booked_amount(doc, item),
+		account_currency == doc.company_currency,
+		(item.precision("base_net_amount"), item.precision("net_amount")),
+	)
+
+
+def get_monthly_amount(
+	item, last_gl_entry, start_date, end_date, already_booked, in_company_currency, precision
+):
+	"""Amount to book for an item when deferred entries are booked based on months.
+
+	`already_booked` are the amounts booked so far in company and account currency and `precision`
+	the precisions of base_net_amount and net_amount."""
 	amount, base_amount = 0, 0
+	already_booked_amount, already_booked_amount_in_account_currency = already_booked
+	base_net_amount_precision, net_amount_precision = precision
 
 	if not last_gl_entry:
 		total_months = (
@@ -205,18 +536,15 @@ def calculate_monthly_amount(
 
 		actual_months = rounded(total_months * prorate_factor, 1)
 
-		already_booked_amount, already_booked_amount_in_account_currency = get_already_booked_amount(
-			doc, item
-		)
-		base_amount = flt(item.base_net_amount / actual_months, item.precision("base_net_amount"))
+		base_amount = flt(item.base_net_amount / actual_months, base_net_amount_precision)
 
 		if base_amount + already_booked_amount > item.base_net_amount:
 			base_amount = item.base_net_amount - already_booked_amount
 
-		if account_currency == doc.company_currency:
+		if in_company_currency:
 			amount = base_amount
 		else:
-			amount = flt(item.net_amount / actual_months, item.precision("net_amount"))
+			amount = flt(item.net_amount / actual_months, net_amount_precision)
 			if amount + already_booked_amount_in_account_currency > item.net_amount:
 				amount = item.net_amount - already_booked_amount_in_account_currency
 
@@ -228,42 +556,51 @@ def calculate_monthly_amount(
 			base_amount = rounded(partial_month, 1) * base_amount
 			amount = rounded(partial_month, 1) * amount
 	else:
-		already_booked_amount, already_booked_amount_in_account_currency = get_already_booked_amount(
-			doc, item
-		)
-		base_amount = flt(item.base_net_amount - already_booked_amount, item.precision("base_net_amount"))
-		if account_currency == doc.company_currency:
+		base_amount = flt(item.base_net_amount - already_booked_amount, base_net_amount_precision)
+		if in_company_currency:
 			amount = base_amount
 		else:
-			amount = flt(
-				item.net_amount - already_booked_amount_in_account_currency, item.precision("net_amount")
-			)
+			amount = flt(item.net_amount - already_booked_amount_in_account_currency, net_amount_precision)
 
 	return amount, base_amount
 
 
 def calculate_amount(doc, item, last_gl_entry, total_days, total_booking_days, account_currency):
+	return get_daily_amount(
+		item,
+		last_gl_entry,
+		total_days,
+		total_booking_days,
+		get_already_booked_amount(doc, item) if last_gl_entry else (0, 0),
+		account_currency == doc.company_currency,
+		(item.precision("base_net_amount"), item.precision("net_amount")),
+	)
+
+
+def get_daily_amount(
+	item, last_gl_entry, total_days, total_booking_days, already_booked, in_company_currency, precision
+):
+	"""Amount to book for an item when deferred entries are booked based on days, `already_booked`
+	is only used for the last booking."""
 	amount, base_amount = 0, 0
+	base_net_amount_precision, net_amount_precision = precision
+
 	if not last_gl_entry:
 		base_amount = flt(
-			item.base_net_amount * total_booking_days / flt(total_days), item.precision("base_net_amount")
+			item.base_net_amount * total_booking_days / flt(total_days), base_net_amount_precision
 		)
-		if account_currency == doc.company_currency:
+		if in_company_currency:
 			amount = base_amount
 		else:
-			amount = flt(item.net_amount * total_booking_days / flt(total_days), item.precision("net_amount"))
+			amount = flt(item.net_amount * total_booking_days / flt(total_days), net_amount_precision)
 	else:
-		already_booked_amount, already_booked_amount_in_account_currency = get_already_booked_amount(
-			doc, item
-		)
+		already_booked_amount, already_booked_amount_in_account_currency = already_booked
 
-		base_amount = flt(item.base_net_amount - already_booked_amount, item.precision("base_net_amount"))
-		if account_currency == doc.company_currency:
+		base_amount = flt(item.base_net_amount - already_booked_amount, base_net_amount_precision)
+		if in_company_currency:
 			amount = base_amount
 		else:
-			amount = flt(
-				item.net_amount - already_booked_amount_in_account_currency, item.precision("net_amount")
-			)
+			amount = flt(item.net_amount - already_booked_amount_in_account_currency, net_amount_precision)
 
 	return amount, base_amount
 
@@ -476,12 +813,63 @@ def make_gl_entries(
 	item,
 	deferred_process=None,
 ):
-	# GL Entry for crediting the amount in the deferred expense
-	from erpnext.accounts.general_ledger import make_gl_entries
-
 	if amount == 0:
 		return
 
+	gl_entries = get_deferred_gl_entries(
+		doc,
+		credit_account,
+		debit_account,
+		against,
+		amount,
+		base_amount,
+		posting_date,
+		project,
+		account_currency,
+		cost_center,
+		item,
+		deferred_process,
+	)
+
+	if gl_entries:
+		post_deferred_gl_entries(doc, gl_entries)
+
+
+def post_deferred_gl_entries(doc, gl_entries):
+	"""Post and commit the GL Entries of a booking, False if that failed."""
+	from erpnext.accounts.general_ledger import make_gl_entries
+
+	try:
+		make_gl_entries(gl_entries, cancel=(doc.docstatus == 2), merge_entries=True)
+		frappe.db.commit()
+	except Exception as e:
+		if frappe.flags.in_test:
+			doc.log_error(f"Error while processing deferred accounting for Invoice {doc.name}")
+			raise e
+		else:
+			frappe.db.rollback()
+			doc.log_error(f"Error while processing deferred accounting for Invoice {doc.name}")
+			frappe.flags.deferred_accounting_error = True
+			return False
+
+	return True
+
+
+def get_deferred_gl_entries(
+	doc,
+	credit_account,
+	debit_account,
+	against,
+	amount,
+	base_amount,
+	posting_date,
+	project,
+	account_currency,
+	cost_center,
+	item,
+	deferred_process=None,
+):
+	# GL Entry for crediting the amount in the deferred expense
 	gl_entries = []
 	gl_entries.append(
 		doc.get_gl_dict(
@@ -521,18 +909,7 @@ def make_gl_entries(
 		)
 	)
 
-	if gl_entries:
-		try:
-			make_gl_entries(gl_entries, cancel=(doc.docstatus == 2), merge_entries=True)
-			frappe.db.commit()
-		except Exception as e:
-			if frappe.flags.in_test:
-				doc.log_error(f"Error while processing deferred accounting for Invoice {doc.name}")
-				raise e
-			else:
-				frappe.db.rollback()
-				doc.log_error(f"Error while processing deferred accounting for Invoice {doc.name}")
-				frappe.flags.deferred_accounting_error = True
+	return gl_entries
 
 
 def send_mail(deferred_process):
@@ -0,0 +1,279 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Sum
+from frappe.utils import cint, cstr, flt, getdate, now
+
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
+	get_accounting_dimensions,
+)
+
+# fields identifying a row, together with the accounting dimensions
+KEY_FIELDS = (
+	"company",
+	"account",
+	"posting_date",
+	"fiscal_year",
+	"is_opening",
+	"is_period_closing_voucher_entry",
+	"cost_center",
+	"project",
+	"finance_book",
+	"account_currency",
+)
+
+VALUE_FIELDS = ("debit", "credit", "debit_in_account_currency", "credit_in_account_currency")
+
+# rows written per statement by `rebuild_account_daily_balances`
+REBUILD_BATCH_SIZE = 5000
+
+
+class AccountDailyBalance(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		account: DF.Link | None
+		account_currency: DF.Link | None
+		company: DF.Link | None
+		cost_center: DF.Link | None
+		credit: DF.Currency
+		credit_in_account_currency: DF.Currency
+		debit: DF.Currency
+		debit_in_account_currency: DF.Currency
+		finance_book: DF.Link | None
+		fiscal_year: DF.Link | None
+		is_opening: DF.Literal["No", "Yes"]
+		is_period_closing_voucher_entry: DF.Check
+		posting_date: DF.Date | None
+		project: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Account Daily Balance", ["company", "account", "posting_date"])
+
+
+def is_account_daily_balance_enabled() -> bool:
+	return bool(
+		cint(frappe.db.get_single_value("Accounts Settings", "use_account_daily_balance", cache=True))
+	)
+
+
+def is_account_daily_balance_ready() -> bool:
+	"""Whether daily balances are maintained and were built from the GL."""
+	return is_account_daily_balance_enabled() and bool(
+		cint(frappe.db.get_single_value("Accounts Settings", "account_daily_balance_ready", cache=True))
+	)
+
+
+def get_gl_balance_doctype() -> str:
+	"""Doctype balances are read from, daily balances once they are built, the GL otherwise."""
+	return "Account Daily Balance" if is_account_daily_balance_ready() else "GL Entry"
+
+
+def update_account_daily_balances(gl_entries, reverse=False):
+	"""Add GL entries to the daily balances of their accounts, or subtract them if `reverse` is set."""
+	if not gl_entries or not is_account_daily_balance_enabled():
+		return
+
+	balances = aggregate_daily_balances(gl_entries, get_accounting_dimensions(), sign=-1 if reverse else 1)
+
+	existing = set(
+		frappe.get_all("Account Daily Balance", filters={"name": ("in", list(balances))}, pluck="name")
+	)
+	for name, balance in balances.items():
+		if name in existing:
+			add_to_daily_balance(name, balance)
+		else:
+			insert_daily_balance(name, balance)
+
+
+def remove_voucher_from_account_daily_balances(voucher_type, voucher_no):
+	"""Subtract the GL entries of a voucher that are about to be deleted without being cancelled."""
+	if not is_account_daily_balance_enabled():
+		return
+
+	gl_entries = frappe.get_all(
+		"GL Entry",
+		filters={"voucher_type": voucher_type, "voucher_no": voucher_no, "is_cancelled": 0},
+		fields=["*"],
+	)
+	update_account_daily_balances(gl_entries, reverse=True)
+
+
+def aggregate_daily_balances(gl_entries, accounting_dimensions, sign=1):
+	balances = {}
+	for entry in gl_entries:
+		key_values = get_key_values(entry, accounting_dimensions)
+		name = get_daily_balance_name(key_values, accounting_dimensions)
+
+		if name not in balances:
+			balances[name] = frappe._dict(key_values)
+			balances[name].update({field: 0.0 for field in VALUE_FIELDS})
+
+		for field in VALUE_FIELDS:
+			balances[name][field] += sign * flt(entry.get(field))
+
+	return balances
+
+
+def get_key_values(entry, accounting_dimensions):
+	is_period_closing_voucher_entry = entry.get("is_period_closing_voucher_entry")
+	if is_period_closing_voucher_entry is None:
+		is_period_closing_voucher_entry = entry.get("voucher_type") == "Period Closing Voucher"
+
+	key_values = {
+		"company": entry.get("company"),
+		"account": entry.get("account"),
+		"posting_date": getdate(entry.get("posting_date")),
+		"fiscal_year": entry.get("fiscal_year"),
+		"is_opening": entry.get("is_opening") or "No",
+		"is_period_closing_voucher_entry": cint(is_period_closing_voucher_entry),
+		"cost_center": entry.get("cost_center"),
+		"project": entry.get("project"),
+		"finance_book": entry.get("finance_book"),
+		"account_currency": entry.get("account_currency"),
+	}
+	for dimension in accounting_dimensions:
+		key_values[dimension] = entry.get(dimension)
+
+	return key_values
+
+
+def get_daily_balance_name(key_values, accounting_dimensions):
+	key = [cstr(key_values[field]) for field in KEY_FIELDS]
+	key.extend(cstr(key_values[dimension]) for dimension in accounting_dimensions)
+
+	return hashlib.sha256("\x1f".join(key).encode()).hexdigest()
+
+
+def add_to_daily_balance(name, balance):
+	daily_balance = frappe.qb.DocType("Account Daily Balance")
+	query = (
+		frappe.qb.update(daily_balance).set(daily_balance.modified, now()).where(daily_balance.name == name)
+	)
+
+	for field in VALUE_FIELDS:
+		query = query.set(daily_balance[field], daily_balance[field] + flt(balance[field]))
+
+	query.run()
+
+
+def insert_daily_balance(name, balance):
+	"""Insert a new daily balance and take care of concurrent inserts of the same one."""
+	savepoint = "insert_daily_balance"
+	try:
+		frappe.db.savepoint(savepoint)
+		frappe.get_doc({"doctype": "Account Daily Balance", "name": name, **balance}).db_insert()
+	except frappe.DuplicateEntryError:
+		frappe.db.rollback(save_point=savepoint)  # preserve transaction in postgres
+		add_to_daily_balance(name, balance)
+
+
+def rebuild_account_daily_balances(company=None):
+	"""Recompute daily balances from the GL, one transaction per company.
+
+	Enabling daily balances runs it in the background, balances are read from
+	them once all companies are done. To repair them run
+
+		bench --site <site> execute erpnext.accounts.doctype.account_daily_balance.account_daily_balance.rebuild_account_daily_balances
+
+	GL Entries of a company are read with a lock before its daily balances are
+	deleted, so GL postings of the company wait until they are rebuilt and are
+	neither missed nor counted twice.
+	"""
+	companies = [company] if company else frappe.get_all("Company", pluck="name")
+	accounting_dimensions = get_accounting_dimensions()
+
+	for name in companies:
+		fiscal_years = frappe.get_all(
+			"GL Entry", filters={"company": name}, fields=["fiscal_year"], distinct=True, pluck="fiscal_year"
+		)
+
+		lock_gl_entries(name)
+		balances = {}
+		for fiscal_year in fiscal_years:
+			balances.update(
+				aggregate_daily_balances(
+					get_daily_gl_totals(name, fiscal_year, accounting_dimensions),
+					accounting_dimensions,
+				)
+			)
+
+		frappe.db.delete("Account Daily Balance", {"company": name})
+		insert_daily_balances(balances)
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+	if not company:
+		frappe.db.set_single_value("Accounts Settings", "account_daily_balance_ready", 1)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+
+def lock_gl_entries(company):
+	gl_entry = frappe.qb.DocType("GL Entry")
+	(
+		frappe.qb.from_(gl_entry)
+		.select(gl_entry.name)
+		.where((gl_entry.company == company) & (gl_entry.is_cancelled == 0))
+		.for_update()
+	).run()
+
+
+def get_daily_gl_totals(company, fiscal_year, accounting_dimensions):
+	"""GL totals of a fiscal year grouped by everything daily balances are keyed on."""
+	gl_entry = frappe.qb.DocType("GL Entry")
+	group_by = [
+		gl_entry.company,
+		gl_entry.account,
+		gl_entry.posting_date,
+		gl_entry.fiscal_year,
+		gl_entry.is_opening,
+		gl_entry.voucher_type,
+		gl_entry.cost_center,
+		gl_entry.project,
+		gl_entry.finance_book,
+		gl_entry.account_currency,
+		*[gl_entry[dimension] for dimension in accounting_dimensions],
+	]
+
+	return (
+		frappe.qb.from_(gl_entry)
+		.select(*group_by, *[Sum(gl_entry[field]).as_(field) for field in VALUE_FIELDS])
+		.where(
+			(gl_entry.company == company)
+			& (gl_entry.fiscal_year == fiscal_year)
+			& (gl_entry.is_cancelled == 0)
+		)
+		.groupby(*group_by)
+	).run(as_dict=True)
+
+
+def insert_daily_balances(balances):
+	if not balances:
+		return
+
+	fields = ["name", "creation", "modified", "owner", "modified_by", *next(iter(balances.values())).keys()]
+	timestamp, user = now(), frappe.session.user
+
+	frappe.db.bulk_insert(
+		"Account Daily Balance",
+		fields=fields,
+		values=(
+			[name, timestamp, timestamp, user, user, *balance.values()] for name, balance in balances.items()
+		),
+		chunk_size=REBUILD_BATCH_SIZE,
+	)
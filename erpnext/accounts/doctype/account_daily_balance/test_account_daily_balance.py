@@ -0,0 +1,74 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.query_builder.functions import Sum
+from frappe.tests.utils import FrappeTestCase, change_settings
+from frappe.utils import add_days, today
+
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+	get_gl_balance_doctype,
+	rebuild_account_daily_balances,
+)
+from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.utils import get_balance_on
+
+
+class TestAccountDailyBalance(FrappeTestCase):
+	def setUp(self):
+		self.company = "_Test Company"
+		self.account = "_Test Bank - _TC"
+		rebuild_account_daily_balances(self.company)
+
+	def get_balances(self, doctype):
+		table = frappe.qb.DocType(doctype)
+		query = (
+			frappe.qb.from_(table)
+			.select(table.account, table.posting_date, Sum(table.debit - table.credit).as_("balance"))
+			.where(table.company == self.company)
+			.groupby(table.account, table.posting_date)
+			.having(Sum(table.debit - table.credit) != 0)
+		)
+		if doctype == "GL Entry":
+			query = query.where(table.is_cancelled == 0)
+
+		return {(d.account, d.posting_date): d.balance for d in query.run(as_dict=True)}
+
+	@change_settings("Accounts Settings", {"use_account_daily_balance": 1})
+	def test_daily_balances_follow_gl(self):
+		balance = get_balance_on(self.account, company=self.company)
+
+		jv = make_journal_entry(self.account, "_Test Cash - _TC", 100, submit=True)
+		make_journal_entry(
+			self.account, "_Test Cash - _TC", 50, posting_date=add_days(today(), -1), submit=True
+		)
+
+		self.assertEqual(self.get_balances("Account Daily Balance"), self.get_balances("GL Entry"))
+		self.assertEqual(get_balance_on(self.account, company=self.company), balance + 150)
+
+		jv.cancel()
+
+		self.assertEqual(self.get_balances("Account Daily Balance"), self.get_balances("GL Entry"))
+		self.assertEqual(get_balance_on(self.account, company=self.company), balance + 50)
+
+	@change_settings("Accounts Settings", {"use_account_daily_balance": 1})
+	def test_rebuild_matches_incremental_updates(self):
+		make_journal_entry(self.account, "_Test Cash - _TC", 100, submit=True)
+		make_journal_entry(self.account, "_Test Cash - _TC", 30, submit=True).cancel()
+
+		incremental = self.get_balances("Account Daily Balance")
+		rebuild_account_daily_balances(self.company)
+
+		self.assertEqual(self.get_balances("Account Daily Balance"), incremental)
+		self.assertEqual(incremental, self.get_balances("GL Entry"))
+
+	@change_settings("Accounts Settings", {"use_account_daily_balance": 1})
+	def test_balances_are_read_once_built(self):
+		self.assertEqual(get_gl_balance_doctype(), "Account Daily Balance")
+
+		# a rebuild in progress
+		frappe.db.set_single_value("Accounts Settings", "account_daily_balance_ready", 0)
+		self.assertEqual(get_gl_balance_doctype(), "GL Entry")
+
+		rebuild_account_daily_balances()
+		self.assertEqual(get_gl_balance_doctype(), "Account Daily Balance")
@@ -23,20 +23,24 @@ class AccountsSettings(Document):
 		from frappe.types import DF
 
 		acc_frozen_upto: DF.Date | None
+		account_daily_balance_ready: DF.Check
 		add_taxes_from_item_tax_template: DF.Check
 		allow_multi_currency_invoices_against_single_party_account: DF.Check
 		allow_stale: DF.Check
 		auto_reconcile_payments: DF.Check
 		automatically_fetch_payment_terms: DF.Check
 		automatically_process_deferred_accounting_entry: DF.Check
+		book_asset_depreciation_entries_in_batches: DF.Check
 		book_asset_depreciation_entry_automatically: DF.Check
 		book_deferred_entries_based_on: DF.Literal["Days", "Months"]
+		book_deferred_entries_in_bulk: DF.Check
 		book_deferred_entries_via_journal_entry: DF.Check
 		book_tax_discount_loss: DF.Check
 		calculate_depr_using_total_days: DF.Check
 		check_supplier_invoice_uniqueness: DF.Check
 		create_pr_in_draft_status: DF.Check
 		credit_controller: DF.Link | None
+		customer_exposure_ready: DF.Check
 		delete_linked_ledger_entries: DF.Check
 		determine_address_tax_category_from: DF.Literal["Billing Address", "Shipping Address"]
 		enable_common_party_accounting: DF.Check
@@ -51,6 +55,7 @@ class AccountsSettings(Document):
 		over_billing_allowance: DF.Currency
 		post_change_gl_entries: DF.Check
 		receivable_payable_remarks_length: DF.Int
+		reconciliation_chunk_size: DF.Int
 		role_allowed_to_over_bill: DF.Link | None
 		round_row_wise_tax: DF.Check
 		show_balance_in_coa: DF.Check
@@ -61,6 +66,8 @@ class AccountsSettings(Document):
 		submit_journal_entries: DF.Check
 		unlink_advance_payment_on_cancelation_of_order: DF.Check
 		unlink_payment_on_cancellation_of_invoice: DF.Check
+		use_account_daily_balance: DF.Check
+		use_customer_exposure: DF.Check
 	# end: auto-generated types
 
 	def validate(self):
@@ -87,9 +94,30 @@ class AccountsSettings(Document):
 		if old_doc.acc_frozen_upto != self.acc_frozen_upto:
 			self.validate_pending_reposts()
 
+		if cint(self.use_account_daily_balance) != cint(old_doc.use_account_daily_balance):
+			# balances are read from GL Entries until the rebuild is done
+			self.account_daily_balance_ready = 0
+			self.flags.rebuild_account_daily_balances = cint(self.use_account_daily_balance)
+		else:
+			self.account_daily_balance_ready = old_doc.account_daily_balance_ready
+
+		if cint(self.use_customer_exposure) != cint(old_doc.use_customer_exposure):
+			# credit limits are checked against transactions until the rebuild is done
+			self.customer_exposure_ready = 0
+			self.flags.rebuild_customer_exposures = cint(self.use_customer_exposure)
+		else:
+			self.customer_exposure_ready = old_doc.customer_exposure_ready
+
 		if clear_cache:
 			frappe.clear_cache()
 
+	def on_update(self):
+		if self.flags.rebuild_account_daily_balances:
+			self.rebuild_account_daily_balances()
+
+		if self.flags.rebuild_customer_exposures:
+			self.rebuild_customer_exposures()
+
 	def validate_stale_days(self):
 		if not self.allow_stale and cint(self.stale_days) <= 0:
 			frappe.msgprint(
@@ -111,6 +139,26 @@ class AccountsSettings(Document):
 				validate_fields_for_doctype=False,
 			)
 
+	def rebuild_account_daily_balances(self):
+		frappe.enqueue(
+			"erpnext.accounts.doctype.account_daily_balance.account_daily_balance.rebuild_account_daily_balances",
+			queue="long",
+			timeout=7200,
+			enqueue_after_commit=True,
+			now=frappe.flags.in_test,
+		)
+		frappe.msgprint(_("Account Daily Balances will be built from the General Ledger in the background"))
+
+	def rebuild_customer_exposures(self):
+		frappe.enqueue(
+			"erpnext.selling.doctype.customer_exposure.customer_exposure.rebuild_customer_exposures",
+			queue="long",
+			timeout=7200,
+			enqueue_after_commit=True,
+			now=frappe.flags.in_test,
+		)
+		frappe.msgprint(_("Customer Exposures will be built from existing transactions in the background"))
+
 	def validate_pending_reposts(self):
 		if self.acc_frozen_upto:
 			check_pending_reposting(self.acc_frozen_upto)
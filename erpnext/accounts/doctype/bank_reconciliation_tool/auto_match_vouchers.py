@@ -0,0 +1,242 @@
+import frappe
+from frappe.query_builder.functions import Sum
+from frappe.utils import cint, cstr, flt
+
+
+class AutoMatchVouchers:
+	"""
+	Matches unreconciled Bank Transactions of a Bank Account against Payment Entries and
+	Journal Entries, like `get_linked_payments` does during auto reconciliation: vouchers
+	must carry the reference number of the transaction and are ranked by reference, amount
+	and party.
+
+	Candidate vouchers for the bank account and date window are loaded once and indexed by
+	direction (deposit/withdrawal) and reference number, so matching a transaction runs no query.
+	"""
+
+	def __init__(
+		self,
+		bank_account,
+		from_date=None,
+		to_date=None,
+		filter_by_reference_date=None,
+		from_reference_date=None,
+		to_reference_date=None,
+	) -> None:
+		self.bank_account = bank_account
+		self.gl_account = frappe.db.get_value("Bank Account", bank_account, "account")
+		self.from_date = from_date
+		self.to_date = to_date
+		self.filter_by_reference_date = cint(filter_by_reference_date)
+		self.from_reference_date = from_reference_date
+		self.to_reference_date = to_reference_date
+
+		# {(direction, reference key): [voucher, ...]}
+		self.index = {}
+		# {(doctype, name): amount allocated to Bank Transactions on this bank account}
+		self.allocated = {}
+		self.cleared = set()
+
+	def load(self, transactions):
+		"""Load and index the candidate vouchers of the given transactions"""
+		reference_numbers = {t.reference_number for t in transactions if t.reference_number is not None}
+		if not reference_numbers:
+			return
+
+		for voucher in self.get_payment_entries(reference_numbers) + self.get_journal_entries(
+			reference_numbers
+		):
+			key = (voucher.direction, get_reference_key(voucher.reference_no))
+			self.index.setdefault(key, []).append(voucher)
+
+		self.allocated = self.get_allocated_amounts()
+
+	def get_payment_entries(self, reference_numbers):
+		pe = frappe.qb.DocType("Payment Entry")
+
+		filter_by_date = pe.posting_date.between(self.from_date, self.to_date)
+		if self.filter_by_reference_date:
+			filter_by_date = pe.reference_date.between(self.from_reference_date, self.to_reference_date)
+
+		payment_entries = (
+			frappe.qb.from_(pe)
+			.select(
+				pe.name,
+				pe.payment_type,
+				pe.paid_from,
+				pe.paid_to,
+				pe.paid_amount,
+				pe.paid_amount_after_tax,
+				pe.reference_no,
+				pe.party_type,
+				pe.party,
+			)
+			.where(pe.docstatus == 1)
+			.where(pe.clearance_date.isnull())
+			.where((pe.paid_to == self.gl_account) | (pe.paid_from == self.gl_account))
+			.where(pe.paid_amount > 0.0)
+			.where(pe.reference_no.isin(reference_numbers))
+			.where(filter_by_date)
+			.orderby(pe.reference_date if self.filter_by_reference_date else pe.posting_date)
+		).run(as_dict=True)
+
+		vouchers = []
+		for payment in payment_entries:
+			for direction, account_from_to, payment_type in (
+				("deposit", "paid_to", "Receive"),
+				("withdrawal", "paid_from", "Pay"),
+			):
+				if payment.get(account_from_to) == self.gl_account and payment.payment_type in (
+					payment_type,
+					"Internal Transfer",
+				):
+					vouchers.append(
+						frappe._dict(
+							{
+								"doctype": "Payment Entry",
+								"name": payment.name,
+								"direction": direction,
+								"reference_no": payment.reference_no,
+								"amount": payment.paid_amount,
+								"paid_amount": payment.paid_amount_after_tax,
+								"party_type": payment.party_type,
+								"party": payment.party,
+							}
+						)
+					)
+
+		return vouchers
+
+	def get_journal_entries(self, reference_numbers):
+		je = frappe.qb.DocType("Journal Entry")
+		jea = frappe.qb.DocType("Journal Entry Account")
+
+		filter_by_date = je.posting_date.between(self.from_date, self.to_date)
+		if self.filter_by_reference_date:
+			filter_by_date = je.cheque_date.between(self.from_reference_date, self.to_reference_date)
+
+		journal_entries = (
+			frappe.qb.from_(jea)
+			.join(je)
+			.on(jea.parent == je.name)
+			.select(
+				je.name,
+				je.cheque_no,
+				jea.debit_in_account_currency,
+				jea.credit_in_account_currency,
+			)
+			.where(je.docstatus == 1)
+			.where(je.voucher_type != "Opening Entry")
+			.where(je.clearance_date.isnull())
+			.where(jea.account == self.gl_account)
+			.where(je.cheque_no.isin(reference_numbers))
+			.where(filter_by_date)
+			.orderby(je.cheque_date if self.filter_by_reference_date else je.posting_date)
+		).run(as_dict=True)
+
+		vouchers = []
+		for journal in journal_entries:
+			# a bank deposit is a debit to the bank account, a withdrawal a credit
+			for direction, amount in (
+				("deposit", journal.debit_in_account_currency),
+				("withdrawal", journal.credit_in_account_currency),
+			):
+				if flt(amount) > 0.0:
+					vouchers.append(
+						frappe._dict(
+							{
+								"doctype": "Journal Entry",
+								"name": journal.name,
+								"direction": direction,
+								"reference_no": journal.cheque_no,
+								"amount": amount,
+								"paid_amount": amount,
+							}
+						)
+					)
+
+		return vouchers
+
+	def get_allocated_amounts(self):
+		"""Amounts of candidate vouchers already allocated to Bank Transactions on the bank account"""
+		names = {voucher.name for vouchers in self.index.values() for voucher in vouchers}
+		if not names:
+			return {}
+
+		btp = frappe.qb.DocType("Bank Transaction Payments")
+		bt = frappe.qb.DocType("Bank Transaction")
+		ba = frappe.qb.DocType("Bank Account")
+
+		allocations = (
+			frappe.qb.from_(btp)
+			.join(bt)
+			.on(bt.name == btp.parent)
+			.join(ba)
+			.on(ba.name == bt.bank_account)
+			.select(btp.payment_document, btp.payment_entry, Sum(btp.allocated_amount))
+			.where(btp.payment_document.isin(["Payment Entry", "Journal Entry"]))
+			.where(btp.payment_entry.isin(names))
+			.where(bt.docstatus == 1)
+			.where(ba.account == self.gl_account)
+			.groupby(btp.payment_document, btp.payment_entry)
+		).run()
+
+		return {(doctype, name): flt(amount) for doctype, name, amount in allocations}
+
+	def get_linked_payments(self, transaction):
+		"""Vouchers to reconcile against the transaction, best ranked first"""
+		direction = "deposit" if transaction.deposit > 0.0 else "withdrawal"
+
+		linked_payments = []
+		for voucher in self.index.get((direction, get_reference_key(transaction.reference_number)), []):
+			if (voucher.doctype, voucher.name) in self.cleared:
+				continue
+
+			amount_rank = 1 if flt(voucher.amount) == flt(transaction.unallocated_amount) else 0
+			party_rank = (
+				1
+				if voucher.party
+				and voucher.party_type == transaction.party_type
+				and voucher.party == transaction.party
+				else 0
+			)
+			linked_payments.append(
+				frappe._dict(
+					{
+						# reference number always matches
+						"rank": 1 + amount_rank + party_rank + 1,
+						"doctype": voucher.doctype,
+						"name": voucher.name,
+						"paid_amount": flt(voucher.paid_amount)
+						- self.allocated.get((voucher.doctype, voucher.name), 0.0),
+					}
+				)
+			)
+
+		return sorted(linked_payments, key=lambda x: x["rank"], reverse=True)
+
+	def update_allocations(self, transaction, linked_payments):
+		"""Account for the allocations and clearances made by reconciling the transaction"""
+		allocated = {
+			(row.payment_document, row.payment_entry): row.allocated_amount
+			for row in transaction.payment_entries
+		}
+
+		names_by_doctype = {}
+		for voucher in linked_payments:
+			key = (voucher.doctype, voucher.name)
+			self.allocated[key] = self.allocated.get(key, 0.0) + flt(allocated.get(key))
+			names_by_doctype.setdefault(voucher.doctype, []).append(voucher.name)
+
+		for doctype, names in names_by_doctype.items():
+			self.cleared.update(
+				(doctype, name)
+				for name in frappe.get_all(
+					doctype, filters={"name": ["in", names], "clearance_date": ["is", "set"]}, pluck="name"
+				)
+			)
+
+
+def get_reference_key(reference_no):
+	"""Reference numbers are compared by the database ignoring case and trailing spaces, so is the index."""
+	return cstr(reference_no).rstrip().casefold()
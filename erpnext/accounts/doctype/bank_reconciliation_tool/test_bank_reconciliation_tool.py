@@ -98,3 +98,40 @@ class TestBankReconciliationTool(AccountsTestMixin, FrappeTestCase):
 		# assert API output post reconciliation
 		transactions = get_bank_transactions(self.bank_account, from_date, to_date)
 		self.assertEqual(len(transactions), 0)
+
+	def test_auto_reconcile_ignores_case_of_reference(self):
+		from_date = add_days(today(), -1)
+		to_date = today()
+		payment = create_payment_entry(
+			company=self.company,
+			posting_date=from_date,
+			payment_type="Receive",
+			party_type="Customer",
+			party=self.customer,
+			paid_from=self.debit_to,
+			paid_to=self.bank,
+			paid_amount=100,
+		).save()
+		payment.reference_no = "ref-abc"
+		payment = payment.save().submit()
+
+		# reference numbers are matched like the database compares them
+		frappe.get_doc(
+			{
+				"doctype": "Bank Transaction",
+				"date": to_date,
+				"deposit": 100,
+				"bank_account": self.bank_account,
+				"reference_number": "REF-ABC ",
+				"currency": "INR",
+			}
+		).save().submit()
+
+		auto_reconcile_vouchers(
+			bank_account=self.bank_account,
+			from_date=from_date,
+			to_date=to_date,
+			filter_by_reference_date=False,
+		)
+
+		self.assertEqual(len(get_bank_transactions(self.bank_account, from_date, to_date)), 0)
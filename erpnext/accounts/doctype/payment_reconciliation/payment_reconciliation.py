@@ -419,15 +419,27 @@ class PaymentReconciliation(Document):
 	def allocate_entries(self, args):
 		self.validate_entries()
 
-		invoice_exchange_map = self.get_invoice_exchange_map(args.get("invoices"), args.get("payments"))
+		invoices, payments = args.get("invoices"), args.get("payments")
+		invoice_exchange_map = self.get_invoice_exchange_map(invoices, payments)
 		default_exchange_gain_loss_account = frappe.get_cached_value(
 			"Company", self.company, "exchange_gain_loss_account"
 		)
+		# there is no exchange difference unless the party account is in a foreign currency
+		has_exchange_difference = frappe.get_cached_value(
+			"Account", self.receivable_payable_account, "account_currency"
+		) != frappe.get_cached_value("Company", self.company, "default_currency")
 
+		# Payments and invoices are both walked once, FIFO. Invoices before `invoice_idx`
+		# are fully allocated, so a payment resumes from the first invoice still outstanding.
 		entries = []
-		for pay in args.get("payments"):
+		invoice_idx = 0
+		for pay in payments:
 			pay.update({"unreconciled_amount": pay.get("amount")})
-			for inv in args.get("invoices"):
+			if pay.get("reference_type") in ["Sales Invoice", "Purchase Invoice"]:
+				pay["exchange_rate"] = invoice_exchange_map.get(pay.get("reference_name"))
+
+			while invoice_idx < len(invoices):
+				inv = invoices[invoice_idx]
 				if pay.get("amount") >= inv.get("outstanding_amount"):
 					res = self.get_allocated_entry(pay, inv, inv["outstanding_amount"])
 					pay["amount"] = flt(pay.get("amount")) - flt(inv.get("outstanding_amount"))
@@ -438,29 +450,27 @@ class PaymentReconciliation(Document):
 					pay["amount"] = 0
 
 				inv["exchange_rate"] = invoice_exchange_map.get(inv.get("invoice_number"))
-				if pay.get("reference_type") in ["Sales Invoice", "Purchase Invoice"]:
-					pay["exchange_rate"] = invoice_exchange_map.get(pay.get("reference_name"))
-
-				res.difference_amount = self.get_difference_amount(pay, inv, res["allocated_amount"])
+				res.difference_amount = (
+					self.get_difference_amount(pay, inv, res["allocated_amount"])
+					if has_exchange_difference
+					else 0
+				)
 				res.difference_account = default_exchange_gain_loss_account
 				res.exchange_rate = inv.get("exchange_rate")
 				res.update({"gain_loss_posting_date": pay.get("posting_date")})
+				entries.append(res)
+
+				if inv.get("outstanding_amount") == 0:
+					invoice_idx += 1
 
 				if pay.get("amount") == 0:
-					entries.append(res)
 					break
-				elif inv.get("outstanding_amount") == 0:
-					entries.append(res)
-					continue
 
 			else:
+				# invoices are exhausted before the payment
 				break
 
-		self.set("allocation", [])
-		for entry in entries:
-			if entry["allocated_amount"] != 0:
-				row = self.append("allocation", {})
-				row.update(entry)
+		self.set("allocation", [entry for entry in entries if entry["allocated_amount"] != 0])
 
 	def update_dimension_values_in_allocated_entries(self, res):
 		for x in self.dimensions:
@@ -479,6 +479,30 @@ class TestPaymentReconciliation(FrappeTestCase):
 		self.assertEqual(len(pr.get("payments")), 0)
 		self.assertEqual(pr.get("invoices")[0].get("outstanding_amount"), 165)
 
+	def test_allocation_of_payments_across_invoices(self):
+		si1 = self.create_sales_invoice(qty=1, rate=100)
+		si2 = self.create_sales_invoice(qty=1, rate=50)
+		si3 = self.create_sales_invoice(qty=1, rate=80)
+		pe1 = self.create_payment_entry(amount=120).save().submit()
+		pe2 = self.create_payment_entry(amount=60).save().submit()
+
+		pr = self.create_payment_reconciliation()
+		pr.get_unreconciled_entries()
+		invoices = [x.as_dict() for x in pr.get("invoices")]
+		payments = [x.as_dict() for x in pr.get("payments")]
+		pr.allocate_entries(frappe._dict({"invoices": invoices, "payments": payments}))
+
+		# payments are allocated FIFO, each resuming from the first invoice still outstanding
+		self.assertEqual(
+			[(row.reference_name, row.invoice_number, row.allocated_amount) for row in pr.allocation],
+			[
+				(pe1.name, si1.name, 100),
+				(pe1.name, si2.name, 20),
+				(pe2.name, si2.name, 30),
+				(pe2.name, si3.name, 30),
+			],
+		)
+
 	def test_payment_against_journal(self):
 		transaction_date = nowdate()
 
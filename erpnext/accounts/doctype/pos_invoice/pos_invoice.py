@@ -734,6 +734,58 @@ def get_stock_availability(item_code, warehouse):
 			return 0, is_stock_item
 
 
+def get_stock_availability_of_items(items, warehouse) -> dict:
+	"""`get_stock_availability` of many items, each with `item_code` and `is_stock_item`.
+
+	Stock of all stock items is read in a single query, Product Bundles are
+	looked up individually as in `get_stock_availability`.
+	"""
+	from erpnext.stock.doctype.bin_delta.bin_delta import is_bin_delta_enabled
+
+	stock_items = tuple(item.item_code for item in items if item.is_stock_item)
+	non_stock_items = [item.item_code for item in items if not item.is_stock_item]
+
+	availability = {}
+	if stock_items:
+		pending_bin_deltas = ""
+		if is_bin_delta_enabled():
+			pending_bin_deltas = """
+				union all
+				select item_code, actual_qty as qty from `tabBin Delta`
+				where warehouse = %(warehouse)s and item_code in %(items)s"""
+
+		stock_qty = frappe.db.sql(  # nosemgrep
+			f"""
+			select item_code, sum(qty) as qty
+			from (
+				select item_code, actual_qty as qty from `tabBin`
+				where warehouse = %(warehouse)s and item_code in %(items)s
+				union all
+				select p_item.item_code, -p_item.stock_qty as qty
+				from `tabPOS Invoice` p_inv, `tabPOS Invoice Item` p_item
+				where p_inv.name = p_item.parent
+					and ifnull(p_inv.consolidated_invoice, '') = ''
+					and p_item.docstatus = 1
+					and p_item.warehouse = %(warehouse)s
+					and p_item.item_code in %(items)s
+				{pending_bin_deltas}
+			) stock_qty
+			group by item_code""",
+			{"warehouse": warehouse, "items": stock_items},
+			as_dict=1,
+		)
+
+		availability.update({d.item_code: flt(d.qty) for d in stock_qty})
+
+	if non_stock_items:
+		for bundle_item_code in frappe.get_all(
+			"Product Bundle", filters={"name": ("in", non_stock_items), "disabled": 0}, pluck="name"
+		):
+			availability[bundle_item_code] = get_bundle_availability(bundle_item_code, warehouse)
+
+	return availability
+
+
 def get_bundle_availability(bundle_item_code, warehouse):
 	product_bundle = frappe.get_doc("Product Bundle", bundle_item_code)
 
@@ -754,6 +806,8 @@ def get_bundle_availability(bundle_item_code, warehouse):
 
 
 def get_bin_qty(item_code, warehouse):
+	from erpnext.stock.doctype.bin_delta.bin_delta import get_pending_bin_deltas
+
 	bin_qty = frappe.db.sql(
 		"""select actual_qty from `tabBin`
 		where item_code = %s and warehouse = %s
@@ -762,7 +816,8 @@ def get_bin_qty(item_code, warehouse):
 		as_dict=1,
 	)
 
-	return bin_qty[0].actual_qty or 0 if bin_qty else 0
+	pending_qty = get_pending_bin_deltas(item_code, [warehouse]).actual_qty
+	return (bin_qty[0].actual_qty or 0 if bin_qty else 0) + pending_qty
 
 
 def get_pos_reserved_qty(item_code, warehouse):
@@ -28,6 +28,7 @@ class POSProfile(Document):
 		applicable_for_users: DF.Table[POSProfileUser]
 		apply_discount_on: DF.Literal["Grand Total", "Net Total"]
 		auto_add_item_to_cart: DF.Check
+		cache_item_catalog: DF.Check
 		campaign: DF.Link | None
 		company: DF.Link
 		company_address: DF.Link | None
@@ -167,6 +168,12 @@ class POSProfile(Document):
 
 	def on_update(self):
 		self.set_defaults()
+		self.clear_item_catalog_cache()
+
+	def clear_item_catalog_cache(self):
+		from erpnext.selling.page.point_of_sale.point_of_sale import clear_item_catalog_cache
+
+		clear_item_catalog_cache()
 
 	def on_trash(self):
 		self.set_defaults(include_current_pos=False)
@@ -144,6 +144,16 @@ class PricingRule(Document):
 		if not self.margin_type:
 			self.margin_rate_or_amount = 0.0
 
+	def on_update(self):
+		from erpnext.accounts.doctype.pricing_rule.utils import clear_pricing_rule_index
+
+		clear_pricing_rule_index()
+
+	def on_trash(self):
+		from erpnext.accounts.doctype.pricing_rule.utils import clear_pricing_rule_index
+
+		clear_pricing_rule_index()
+
 	def validate_duplicate_apply_on(self):
 		if self.apply_on != "Transaction":
 			apply_on_table = apply_on_dict.get(self.apply_on)
@@ -340,6 +350,8 @@ def apply_pricing_rule(args, doc=None):
 	}
 	"""
 
+	from erpnext.accounts.doctype.pricing_rule.utils import pricing_rule_batch
+
 	if isinstance(args, str):
 		args = json.loads(args)
 
@@ -357,22 +369,21 @@ def apply_pricing_rule(args, doc=None):
 	item_list = args.get("items")
 	args.pop("items")
 
-	item_code_list = tuple(item.get("item_code") for item in item_list)
-	query_items = frappe.get_all(
-		"Item",
-		fields=["item_code", "has_serial_no"],
-		filters=[["item_code", "in", item_code_list]],
-		as_list=1,
-	)
-	serialized_items = dict()
-	for item_code, val in query_items:
-		serialized_items.setdefault(item_code, val)
+	if isinstance(doc, str):
+		doc = json.loads(doc)
 
-	for item in item_list:
-		args_copy = copy.deepcopy(args)
-		args_copy.update(item)
-		data = get_pricing_rule_for_item(args_copy, doc=doc)
-		out.append(data)
+	if doc:
+		doc = frappe.get_doc(doc)
+
+	# party details, tree ancestors and the rules are the same for every item
+	update_party_args_for_pricing_rule(args)
+
+	with pricing_rule_batch():
+		for item in item_list:
+			args_copy = copy.deepcopy(args)
+			args_copy.update(item)
+			data = get_pricing_rule_for_item(args_copy, doc=doc)
+			out.append(data)
 
 	return out
 
@@ -515,6 +526,10 @@ def update_args_for_pricing_rule(args):
 		if not args.item_group:
 			frappe.throw(_("Item Group not mentioned in item master for item {0}").format(args.item_code))
 
+	update_party_args_for_pricing_rule(args)
+
+
+def update_party_args_for_pricing_rule(args):
 	if args.transaction_type == "selling":
 		if args.customer and not (args.customer_group and args.territory):
 			if args.quotation_to and args.quotation_to != "Customer":
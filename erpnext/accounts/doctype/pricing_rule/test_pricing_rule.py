@@ -476,6 +476,63 @@ class TestPricingRule(FrappeTestCase):
 
 		self.assertTrue(details)
 
+	def test_cumulative_pricing_rule_in_batch(self):
+		from unittest.mock import patch
+
+		from erpnext.accounts.doctype.pricing_rule import utils
+		from erpnext.accounts.doctype.pricing_rule.pricing_rule import apply_pricing_rule
+
+		frappe.delete_doc_if_exists("Pricing Rule", "_Test Cumulative Pricing Rule")
+		frappe.get_doc(
+			{
+				"doctype": "Pricing Rule",
+				"title": "_Test Cumulative Pricing Rule",
+				"apply_on": "Item Group",
+				"item_groups": [{"item_group": "_Test Item Group"}],
+				"is_cumulative": 1,
+				"selling": 1,
+				"rate_or_discount": "Discount Percentage",
+				"min_amt": 500,
+				"discount_percentage": 10,
+				"price_or_product_discount": "Price",
+				"company": "_Test Company",
+				"currency": "INR",
+				"valid_from": frappe.utils.nowdate(),
+				"valid_upto": frappe.utils.nowdate(),
+			}
+		).insert()
+
+		create_sales_invoice(item_code="_Test Item", qty=10, rate=100)
+
+		args = {
+			"company": "_Test Company",
+			"customer": "_Test Customer",
+			"currency": "INR",
+			"price_list": "_Test Price List",
+			"transaction_date": frappe.utils.nowdate(),
+			"doctype": "Sales Invoice",
+			"items": [
+				{
+					"doctype": "Sales Invoice Item",
+					"parenttype": "Sales Invoice",
+					"item_code": item_code,
+					"qty": 1,
+					"stock_qty": 1,
+					"price_list_rate": 100,
+				}
+				for item_code in ("_Test Item", "_Test Item 2", "_Test Item")
+			],
+		}
+
+		with patch.object(
+			utils, "get_cumulative_data", wraps=utils.get_cumulative_data
+		) as get_cumulative_data:
+			details = apply_pricing_rule(args)
+
+		# past sales of the item group are fetched once for all the rows
+		self.assertEqual(get_cumulative_data.call_count, 1)
+		self.assertEqual([d.discount_percentage for d in details], [10, 10, 10])
+
 	def test_pricing_rule_for_condition(self):
 		frappe.delete_doc_if_exists("Pricing Rule", "_Test Pricing Rule")
 
@@ -1377,8 +1434,84 @@ class TestPricingRule(FrappeTestCase):
 		debit_note.delete()
 		pi.cancel()
 
+	def test_pricing_rule_index_matches_query(self):
+		from erpnext.accounts.doctype.pricing_rule.utils import (
+			_get_pricing_rules,
+			_get_pricing_rules_from_index,
+			apply_on_table,
+			get_pricing_rule_index,
+		)
+
+		def make_rule(title, apply_on, value, **kwargs):
+			return frappe.get_doc(
+				{
+					"doctype": "Pricing Rule",
+					"title": title,
+					"apply_on": apply_on,
+					apply_on_table[apply_on]: [{frappe.scrub(apply_on): value}],
+					"company": "_Test Company",
+					"currency": "INR",
+					"selling": 1,
+					"rate_or_discount": "Discount Percentage",
+					"discount_percentage": 10,
+					**kwargs,
+				}
+			).insert()
+
+		make_rule("_Test Index Item", "Item Code", "_Test Item")
+		make_rule("_Test Index Item with Priority", "Item Code", "_Test Item", priority=2)
+		make_rule("_Test Index Item Group", "Item Group", "All Item Groups")
+		make_rule("_Test Index Brand", "Brand", "_Test Brand")
+		make_rule("_Test Index Warehouse", "Item Code", "_Test Item", warehouse="_Test Warehouse - _TC")
+		make_rule("_Test Index Price List", "Item Code", "_Test Item", for_price_list="_Test Price List")
+		make_rule("_Test Index Expired", "Item Code", "_Test Item", valid_upto="2020-01-01")
+		make_rule("_Test Index Buying", "Item Code", "_Test Item", selling=0, buying=1)
+		make_rule(
+			"_Test Index Other Item",
+			"Item Group",
+			"_Test Item Group",
+			apply_rule_on_other="Item Code",
+			other_item_code="_Test Item",
+		)
+		disabled = make_rule("_Test Index Disabled", "Item Code", "_Test Item", disable=1)
+
+		def assert_same_rules():
+			index = get_pricing_rule_index()
+			for warehouse in (None, "_Test Warehouse - _TC"):
+				for price_list in (None, "_Test Price List"):
+					args = {
+						"item_code": "_Test Item",
+						"item_group": "_Test Item Group",
+						"brand": "_Test Brand",
+						"company": "_Test Company",
+						"warehouse": warehouse,
+						"price_list": price_list,
+						"uom": "_Test UOM",
+						"transaction_type": "selling",
+						"transaction_date": frappe.utils.today(),
+						"doctype": "Sales Invoice",
+					}
+
+					for apply_on in apply_on_table:
+						field = frappe.scrub(apply_on)
+						expected = _get_pricing_rules(apply_on, frappe._dict(args), {})
+						rules = _get_pricing_rules_from_index(index, apply_on, frappe._dict(args))
+
+						self.assertTrue(rules)
+						self.assertEqual(
+							[(d.name, d.get(field), d.uom) for d in rules],
+							[(d.name, d.get(field), d.uom) for d in expected],
+						)
+
+		assert_same_rules()
+
+		# changes to Pricing Rules rebuild the index
+		disabled.db_set("disable", 0)
+		self.assertIn(disabled.name, get_pricing_rule_index().rules)
+		assert_same_rules()
+
 
-test_dependencies = ["Campaign"]
+test_dependencies = ["Brand", "Campaign"]
 
 
 def make_pricing_rule(**args):
@@ -5,12 +5,14 @@
 
 
 import copy
+import hashlib
 import json
 import math
+from contextlib import contextmanager
 
 import frappe
 from frappe import _, bold
-from frappe.utils import cint, flt, fmt_money, get_link_to_form, getdate, today
+from frappe.utils import cint, cstr, flt, fmt_money, get_link_to_form, getdate, today
 
 from erpnext.setup.doctype.item_group.item_group import get_child_item_groups
 from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
@@ -23,16 +25,31 @@ class MultiplePricingRuleConflict(frappe.ValidationError):
 
 apply_on_table = {"Item Code": "items", "Item Group": "item_groups", "Brand": "brands"}
 
+selling_doctypes = (
+	"Quotation",
+	"Quotation Item",
+	"Sales Order",
+	"Sales Order Item",
+	"Delivery Note",
+	"Delivery Note Item",
+	"Sales Invoice",
+	"Sales Invoice Item",
+	"POS Invoice",
+	"POS Invoice Item",
+)
+
+PRICING_RULE_INDEX_KEY = "pricing_rule_index"
+
 
 def get_pricing_rules(args, doc=None):
 	pricing_rules = []
-	values = {}
 
-	if not frappe.db.exists("Pricing Rule", {"disable": 0, args.transaction_type: 1}):
+	index = get_pricing_rule_batch().index or get_pricing_rule_index()
+	if not index.transaction_types.get(args.transaction_type):
 		return
 
 	for apply_on in ["Item Code", "Item Group", "Brand"]:
-		pricing_rules.extend(_get_pricing_rules(apply_on, args, values))
+		pricing_rules.extend(_get_pricing_rules_from_index(index, apply_on, args))
 		if pricing_rules and pricing_rules[0].has_priority:
 			continue
 
@@ -173,6 +190,217 @@ def _get_pricing_rules(apply_on, args, values):
 	return pricing_rules
 
 
+def get_pricing_rule_index():
+	"""Enabled Pricing Rules indexed by the item code, item group or brand they apply on.
+
+	The index is cached for the site and rebuilt whenever the Pricing Rules or
+	their rows differ from the ones it was built from, however they were changed.
+	"""
+	fingerprint = get_pricing_rule_fingerprint()
+	index = frappe.cache().get_value(PRICING_RULE_INDEX_KEY)
+	if not index or index.fingerprint != fingerprint:
+		index = build_pricing_rule_index(fingerprint)
+		frappe.cache().set_value(PRICING_RULE_INDEX_KEY, index)
+
+	return index
+
+
+def clear_pricing_rule_index():
+	frappe.cache().delete_value(PRICING_RULE_INDEX_KEY)
+
+
+@contextmanager
+def pricing_rule_batch():
+	"""Resolve Pricing Rules for all the items of a document in one pass.
+
+	The Pricing Rule index is looked up once and the cumulative totals of a
+	rule are fetched once for the batch instead of once per item row.
+	"""
+	if frappe.flags.pricing_rule_batch:
+		# already batched by the caller
+		yield frappe.flags.pricing_rule_batch
+		return
+
+	frappe.flags.pricing_rule_batch = frappe._dict(
+		{"index": get_pricing_rule_index(), "cumulative_totals": {}}
+	)
+	try:
+		yield frappe.flags.pricing_rule_batch
+	finally:
+		frappe.flags.pop("pricing_rule_batch", None)
+
+
+def get_pricing_rule_batch():
+	return frappe.flags.pricing_rule_batch or frappe._dict()
+
+
+def get_pricing_rule_fingerprint():
+	"""Digest of the Pricing Rules and the rows they apply on.
+
+	Hashes the rows themselves rather than `modified`, which raw SQL updates leave as is.
+	"""
+	rows = [frappe.db.sql("select * from `tabPricing Rule` order by name")]
+	for apply_on in apply_on_table:
+		rows.append(
+			frappe.db.sql(
+				f"""select name, parent, idx, {frappe.scrub(apply_on)}, uom
+				from `tabPricing Rule {apply_on}`
+				order by name"""
+			)
+		)
+
+	return hashlib.sha256(frappe.as_json(rows).encode()).hexdigest()
+
+
+def build_pricing_rule_index(fingerprint=None):
+	index = frappe._dict(
+		{
+			"fingerprint": fingerprint or get_pricing_rule_fingerprint(),
+			"rules": {},
+			"transaction_types": {"selling": False, "buying": False},
+			# apply on -> value -> child rows
+			"by_value": {},
+			# apply on -> pricing rule -> child rows
+			"by_rule": {},
+			# apply on -> other item code, item group or brand -> pricing rules
+			"by_other": {},
+		}
+	)
+
+	for rule in frappe.db.sql("select * from `tabPricing Rule` where disable = 0", as_dict=1):
+		index.rules[rule.name] = rule
+		for transaction_type in index.transaction_types:
+			if rule.get(transaction_type):
+				index.transaction_types[transaction_type] = True
+
+	for apply_on in apply_on_table:
+		apply_on_field = frappe.scrub(apply_on)
+		by_value = index.by_value[apply_on] = {}
+		by_rule = index.by_rule[apply_on] = {}
+		by_other = index.by_other[apply_on] = {}
+
+		for row in frappe.db.sql(
+			f"""select name, parent, {apply_on_field}, uom
+			from `tabPricing Rule {apply_on}`
+			order by idx""",
+			as_dict=1,
+		):
+			if row.parent not in index.rules:
+				continue
+
+			by_value.setdefault(casefold(row.get(apply_on_field)), []).append(row)
+			by_rule.setdefault(row.parent, []).append(row)
+
+		for rule in index.rules.values():
+			if rule.apply_rule_on_other is not None and rule.get(f"other_{apply_on_field}"):
+				by_other.setdefault(casefold(rule.get(f"other_{apply_on_field}")), []).append(rule.name)
+
+	return index
+
+
+def _get_pricing_rules_from_index(index, apply_on, args):
+	"""Same as `_get_pricing_rules`, answered from the Pricing Rule index."""
+	apply_on_field = frappe.scrub(apply_on)
+
+	if not args.get(apply_on_field):
+		return []
+
+	by_value = index.by_value[apply_on]
+	uom = casefold(args.get("uom")) if apply_on_field != "brand" else None
+
+	values = [args.get(apply_on_field)]
+	if apply_on_field == "item_group":
+		values = _get_tree_values(args, "Item Group", False)
+
+	rows = {}
+	for value in values:
+		for row in by_value.get(casefold(value), []):
+			if not uom or casefold(row.uom) in (uom, ""):
+				rows[row.name] = row
+
+	if apply_on_field == "item_code":
+		if "variant_of" not in args:
+			args.variant_of = frappe.get_cached_value("Item", args.item_code, "variant_of")
+
+		if args.variant_of:
+			for row in by_value.get(casefold(args.variant_of), []):
+				rows[row.name] = row
+
+	for rule in index.by_other[apply_on].get(casefold(args.get(apply_on_field)), []):
+		for row in index.by_rule[apply_on].get(rule, []):
+			rows[row.name] = row
+
+	if not rows:
+		return []
+
+	if not args.price_list:
+		args.price_list = None
+
+	filters = get_pricing_rule_filters(args)
+
+	pricing_rules = []
+	for row in rows.values():
+		rule = index.rules[row.parent]
+		if is_pricing_rule_applicable(rule, filters):
+			pricing_rules.append(
+				frappe._dict({**rule, apply_on_field: row.get(apply_on_field), "uom": row.uom})
+			)
+
+	# order by priority desc, name desc, NULL priorities last
+	return sorted(
+		pricing_rules,
+		key=lambda d: (d.priority is not None, cstr(d.priority), casefold(d.name)),
+		reverse=True,
+	)
+
+
+def get_pricing_rule_filters(args):
+	"""Values the rule level fields of a Pricing Rule have to match, as in `get_other_conditions`."""
+	filters = frappe._dict(
+		{
+			"transaction_type": args.transaction_type,
+			"selling_or_buying": "selling" if args.get("doctype") in selling_doctypes else "buying",
+			"transaction_date": getdate(args.transaction_date) if args.get("transaction_date") else None,
+			"fields": {},
+		}
+	)
+
+	for field in ["company", "customer", "supplier", "campaign", "sales_partner"]:
+		filters.fields[field] = {casefold(args.get(field)), ""} if args.get(field) else {""}
+
+	for parenttype in ["Customer Group", "Territory", "Supplier Group", "Warehouse"]:
+		tree_values = _get_tree_values(args, parenttype)
+		if tree_values:
+			filters.fields[frappe.scrub(parenttype)] = {casefold(d) for d in tree_values}
+
+	filters.fields["for_price_list"] = {casefold(args.price_list), ""}
+
+	return filters
+
+
+def is_pricing_rule_applicable(rule, filters):
+	if not rule.get(filters.transaction_type) or not rule.get(filters.selling_or_buying):
+		return False
+
+	for field, values in filters.fields.items():
+		if casefold(rule.get(field)) not in values:
+			return False
+
+	if filters.transaction_date and not (
+		getdate(rule.valid_from or "2000-01-01")
+		<= filters.transaction_date
+		<= getdate(rule.valid_upto or "2500-12-31")
+	):
+		return False
+
+	return True
+
+
+def casefold(value):
+	# link values are compared case-insensitively by the database
+	return cstr(value).casefold()
+
+
 def apply_multiple_pricing_rules(pricing_rules):
 	for d in pricing_rules:
 		if not d.apply_multiple_pricing_rules:
@@ -191,33 +419,8 @@ def _get_tree_conditions(args, parenttype, table, allow_blank=True):
 		if key in frappe.flags.tree_conditions:
 			return frappe.flags.tree_conditions[key]
 
-		try:
-			lft, rgt = frappe.db.get_value(parenttype, args.get(field), ["lft", "rgt"])
-		except TypeError:
-			frappe.throw(_("Invalid {0}").format(args.get(field)))
-
-		parent_groups = frappe.db.sql_list(
-			"""select name from `tab{}`
-			where lft<={} and rgt>={}""".format(parenttype, "%s", "%s"),
-			(lft, rgt),
-		)
-
-		if parenttype in ["Customer Group", "Item Group", "Territory"]:
-			parent_field = f"parent_{frappe.scrub(parenttype)}"
-			root_name = frappe.db.get_list(
-				parenttype,
-				{"is_group": 1, parent_field: ("is", "not set")},
-				"name",
-				as_list=1,
-				ignore_permissions=True,
-			)
-
-			if root_name and root_name[0][0]:
-				parent_groups.append(root_name[0][0])
-
+		parent_groups = _get_tree_values(args, parenttype, allow_blank)
 		if parent_groups:
-			if allow_blank:
-				parent_groups.append("")
 			condition = "ifnull({table}.{field}, '') in ({parent_groups})".format(
 				table=table, field=field, parent_groups=", ".join(frappe.db.escape(d) for d in parent_groups)
 			)
@@ -226,6 +429,49 @@ def _get_tree_conditions(args, parenttype, table, allow_blank=True):
 	return condition
 
 
+def _get_tree_values(args, parenttype, allow_blank=True):
+	"""Ancestors of the node set in args for `parenttype`, the values a Pricing Rule may be set to."""
+	field = frappe.scrub(parenttype)
+	if not args.get(field):
+		return []
+
+	if not frappe.flags.tree_values:
+		frappe.flags.tree_values = {}
+	key = (parenttype, args.get(field), allow_blank)
+	if key in frappe.flags.tree_values:
+		return frappe.flags.tree_values[key]
+
+	try:
+		lft, rgt = frappe.db.get_value(parenttype, args.get(field), ["lft", "rgt"])
+	except TypeError:
+		frappe.throw(_("Invalid {0}").format(args.get(field)))
+
+	parent_groups = frappe.db.sql_list(
+		"""select name from `tab{}`
+		where lft<={} and rgt>={}""".format(parenttype, "%s", "%s"),
+		(lft, rgt),
+	)
+
+	if parenttype in ["Customer Group", "Item Group", "Territory"]:
+		parent_field = f"parent_{frappe.scrub(parenttype)}"
+		root_name = frappe.db.get_list(
+			parenttype,
+			{"is_group": 1, parent_field: ("is", "not set")},
+			"name",
+			as_list=1,
+			ignore_permissions=True,
+		)
+
+		if root_name and root_name[0][0]:
+			parent_groups.append(root_name[0][0])
+
+	if parent_groups and allow_blank:
+		parent_groups.append("")
+
+	frappe.flags.tree_values[key] = parent_groups
+	return parent_groups
+
+
 def get_other_conditions(conditions, values, args):
 	for field in ["company", "customer", "supplier", "campaign", "sales_partner"]:
 		if args.get(field):
@@ -244,18 +490,7 @@ def get_other_conditions(conditions, values, args):
 			and ifnull(`tabPricing Rule`.valid_upto, '2500-12-31')"""
 		values["transaction_date"] = args.get("transaction_date")
 
-	if args.get("doctype") in [
-		"Quotation",
-		"Quotation Item",
-		"Sales Order",
-		"Sales Order Item",
-		"Delivery Note",
-		"Delivery Note Item",
-		"Sales Invoice",
-		"Sales Invoice Item",
-		"POS Invoice",
-		"POS Invoice Item",
-	]:
+	if args.get("doctype") in selling_doctypes:
 		conditions += """ and ifnull(`tabPricing Rule`.selling, 0) = 1"""
 	else:
 		conditions += """ and ifnull(`tabPricing Rule`.buying, 0) = 1"""
@@ -500,6 +735,35 @@ def get_qty_amount_data_for_cumulative(pr_doc, doc, items=None):
 	sum_qty, sum_amt = [0, 0]
 	doctype = doc.get("parenttype") or doc.doctype
 
+	batch = get_pricing_rule_batch()
+	if batch.cumulative_totals is not None and items and pr_doc.get("apply_on") in apply_on_table:
+		key = (pr_doc.name, doctype)
+		if key not in batch.cumulative_totals:
+			batch.cumulative_totals[key] = {
+				casefold(d.value): d for d in get_cumulative_data(pr_doc, doctype, group_by_apply_on=True)
+			}
+
+		totals = batch.cumulative_totals[key]
+		for item in {casefold(d) for d in items if d}:
+			if item in totals:
+				sum_qty += flt(totals[item].stock_qty)
+				sum_amt += flt(totals[item].amount)
+
+		return [sum_qty, sum_amt]
+
+	for data in get_cumulative_data(pr_doc, doctype, items):
+		sum_qty += data.get("stock_qty")
+		sum_amt += data.get("amount")
+
+	return [sum_qty, sum_amt]
+
+
+def get_cumulative_data(pr_doc, doctype, items=None, group_by_apply_on=False):
+	"""Submitted qty and amount of `doctype` in the validity of a cumulative Pricing Rule.
+
+	Rows are returned per transaction item, or summed up per item code, item
+	group or brand with `group_by_apply_on`.
+	"""
 	date_field = (
 		"transaction_date" if frappe.get_meta(doctype).has_field("transaction_date") else "posting_date"
 	)
@@ -525,25 +789,27 @@ def get_qty_amount_data_for_cumulative(pr_doc, doc, items=None):
 
 		values.extend(items)
 
-	data_set = frappe.db.sql(
-		f""" SELECT `tab{child_doctype}`.stock_qty,
-			`tab{child_doctype}`.amount
+	if group_by_apply_on:
+		fields = f"""`tab{child_doctype}`.{apply_on} as value,
+			sum(`tab{child_doctype}`.stock_qty) as stock_qty,
+			sum(`tab{child_doctype}`.amount) as amount"""
+		group_by = f"`tab{child_doctype}`.{apply_on}"
+	else:
+		fields = f"`tab{child_doctype}`.stock_qty, `tab{child_doctype}`.amount"
+		group_by = f"`tab{child_doctype}`.name"
+
+	return frappe.db.sql(
+		f""" SELECT {fields}
 		FROM `tab{child_doctype}`, `tab{doctype}`
 		WHERE
 			`tab{child_doctype}`.parent = `tab{doctype}`.name and `tab{doctype}`.{date_field}
 			between %s and %s and `tab{doctype}`.docstatus = 1
-			{condition} group by `tab{child_doctype}`.name
+			{condition} group by {group_by}
 	""",
 		tuple(values),
 		as_dict=1,
 	)
 
-	for data in data_set:
-		sum_qty += data.get("stock_qty")
-		sum_amt += data.get("amount")
-
-	return [sum_qty, sum_amt]
-
 
 def apply_pricing_rule_on_transaction(doc):
 	conditions = "apply_on = 'Transaction'"
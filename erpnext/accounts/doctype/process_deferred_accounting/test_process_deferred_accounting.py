@@ -2,9 +2,12 @@
 # See license.txt
 
 import unittest
+from unittest.mock import patch
 
 import frappe
+from frappe.utils import getdate
 
+from erpnext.accounts import deferred_revenue
 from erpnext.accounts.doctype.account.test_account import create_account
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import (
 	check_gl_entries,
@@ -65,6 +68,155 @@ class TestProcessDeferredAccounting(unittest.TestCase):
 		check_gl_entries(self, si.name, expected_gle, "2023-07-01")
 		change_acc_settings()
 
+	def test_bulk_booking_matches_booking_per_invoice(self):
+		"""test deferred entries booked in bulk are the same as the ones booked per invoice"""
+		item = create_item("_Test Item for Deferred Accounting")
+		item.enable_deferred_revenue = 1
+		item.no_of_months = 12
+		item.save()
+
+		invoices = {}
+		for bulk in (0, 1):
+			deferred_account = create_account(
+				account_name=f"Deferred Revenue for Bulk Booking {bulk}",
+				parent_account="Current Liabilities - _TC",
+				company="_Test Company",
+			)
+
+			si = create_sales_invoice(
+				item=item.name, rate=1000, update_stock=0, posting_date="2023-01-10", do_not_submit=True
+			)
+			si.items[0].enable_deferred_revenue = 1
+			si.items[0].service_start_date = "2023-01-10"
+			si.items[0].service_end_date = "2023-06-20"
+			si.items[0].deferred_revenue_account = deferred_account
+			si.save()
+			si.submit()
+			invoices[bulk] = (si.name, deferred_account)
+
+		change_acc_settings(acc_frozen_upto="2023-02-28", book_deferred_entries_based_on="Months")
+
+		gl_entries = {}
+		for bulk, (invoice, deferred_account) in invoices.items():
+			frappe.db.set_single_value("Accounts Settings", "book_deferred_entries_in_bulk", bulk)
+			process_deferred_accounting = frappe.get_doc(
+				dict(
+					doctype="Process Deferred Accounting",
+					posting_date="2023-07-01",
+					start_date="2023-01-01",
+					end_date="2023-06-30",
+					type="Income",
+					account=deferred_account,
+					company="_Test Company",
+				)
+			)
+			process_deferred_accounting.insert()
+			process_deferred_accounting.submit()
+
+			gl_entries[bulk] = frappe.get_all(
+				"GL Entry",
+				filters={"voucher_no": invoice, "account": deferred_account, "is_cancelled": 0},
+				fields=["posting_date", "debit", "credit"],
+				order_by="posting_date, debit, credit",
+				as_list=True,
+			)
+
+		frappe.db.set_single_value("Accounts Settings", "book_deferred_entries_in_bulk", 0)
+		change_acc_settings()
+
+		# the invoice and a booking per month, January and February frozen into March
+		self.assertEqual(len(gl_entries[0]), 7)
+		self.assertEqual(gl_entries[0], gl_entries[1])
+
+	def test_bulk_booking_falls_back_per_item_and_resumes(self):
+		"""test a group failing to post is booked per item and an interrupted run is continued"""
+		item = create_item("_Test Item for Deferred Accounting")
+		item.enable_deferred_revenue = 1
+		item.no_of_months = 12
+		item.save()
+
+		deferred_account = create_account(
+			account_name="Deferred Revenue for Bulk Booking Resume",
+			parent_account="Current Liabilities - _TC",
+			company="_Test Company",
+		)
+
+		invoices = []
+		for _i in range(3):
+			si = create_sales_invoice(
+				item=item.name, rate=300, update_stock=0, posting_date="2023-01-01", do_not_submit=True
+			)
+			si.items[0].enable_deferred_revenue = 1
+			si.items[0].service_start_date = "2023-01-01"
+			si.items[0].service_end_date = "2023-03-31"
+			si.items[0].deferred_revenue_account = deferred_account
+			si.save()
+			si.submit()
+			invoices.append(si.name)
+
+		change_acc_settings(book_deferred_entries_based_on="Months")
+		frappe.db.set_single_value("Accounts Settings", "book_deferred_entries_in_bulk", 1)
+
+		post_in_bulk = deferred_revenue.post_deferred_gl_entries_in_bulk
+		groups = []
+
+		def fail_january_and_stop_in_march(bookings):
+			groups.append(len(bookings))
+			if len(groups) == 1:
+				return False
+			if len(groups) == 3:
+				raise KeyboardInterrupt
+			return post_in_bulk(bookings)
+
+		def book(end_date):
+			frappe.get_doc(
+				dict(
+					doctype="Process Deferred Accounting",
+					posting_date="2023-04-01",
+					start_date="2023-01-01",
+					end_date=end_date,
+					type="Income",
+					account=deferred_account,
+					company="_Test Company",
+				)
+			).submit()
+
+		with patch.object(
+			deferred_revenue,
+			"post_deferred_gl_entries_in_bulk",
+			side_effect=fail_january_and_stop_in_march,
+		):
+			self.assertRaises(KeyboardInterrupt, book, "2023-03-31")
+
+		# the bookings of all invoices are posted together per month
+		self.assertEqual(groups, [3, 3, 3])
+
+		book("2023-03-31")
+
+		frappe.db.set_single_value("Accounts Settings", "book_deferred_entries_in_bulk", 0)
+		change_acc_settings()
+
+		for invoice in invoices:
+			gl_entries = frappe.get_all(
+				"GL Entry",
+				filters={
+					"voucher_no": invoice,
+					"account": deferred_account,
+					"is_cancelled": 0,
+					"debit": (">", 0),
+				},
+				fields=["posting_date", "debit"],
+				order_by="posting_date",
+			)
+			self.assertEqual(
+				[(d.posting_date, d.debit) for d in gl_entries],
+				[
+					(getdate("2023-01-31"), 100.0),
+					(getdate("2023-02-28"), 100.0),
+					(getdate("2023-03-31"), 100.0),
+				],
+			)
+
 	def test_pda_submission_and_cancellation(self):
 		pda = frappe.get_doc(
 			dict(
@@ -6,7 +6,7 @@ import json
 import frappe
 from frappe import _, qb
 from frappe.model.document import Document
-from frappe.utils import get_link_to_form
+from frappe.utils import cint, get_link_to_form
 from frappe.utils.scheduler import is_scheduler_inactive
 
 
@@ -388,6 +388,32 @@ def fetch_and_allocate(doc: str) -> None:
 					)
 
 
+def reconcile_allocations(doc: str, allocations: list) -> None:
+	"""Reconcile the allocations of a single payment and flag them as reconciled"""
+	pr = get_pr_instance(doc)
+
+	# pass allocation to PR instance
+	for x in allocations:
+		pr.append("allocation", x)
+
+	# reconcile
+	pr.reconcile_allocations(skip_ref_details_update_for_pe=True)
+
+	# If Payment Entry, update details only for newly linked references
+	# This is for performance
+	if allocations[0].reference_type == "Payment Entry":
+		references = [(x.invoice_type, x.invoice_number) for x in allocations]
+		pe = frappe.get_doc(allocations[0].reference_type, allocations[0].reference_name)
+		pe.flags.ignore_validate_update_after_submit = True
+		pe.set_missing_ref_details(update_ref_details_only_for=references)
+		pe.save()
+
+	# Update reconciled flag
+	allocation_names = [x.name for x in allocations]
+	ppa = qb.DocType("Process Payment Reconciliation Log Allocations")
+	qb.update(ppa).set(ppa.reconciled, True).where(ppa.name.isin(allocation_names)).run()
+
+
 def reconcile(doc: None | str = None) -> None:
 	if doc:
 		log = frappe.db.get_value("Process Payment Reconciliation Log", filters={"process_pr": doc})
@@ -403,31 +429,17 @@ def reconcile(doc: None | str = None) -> None:
 			reconciled_entries, total_allocations = res[0]
 			if reconciled_entries != total_allocations:
 				try:
-					# Fetch next allocation
-					allocations = get_next_allocation(log)
-
-					pr = get_pr_instance(doc)
-
-					# pass allocation to PR instance
-					for x in allocations:
-						pr.append("allocation", x)
-
-					# reconcile
-					pr.reconcile_allocations(skip_ref_details_update_for_pe=True)
-
-					# If Payment Entry, update details only for newly linked references
-					# This is for performance
-					if allocations[0].reference_type == "Payment Entry":
-						references = [(x.invoice_type, x.invoice_number) for x in allocations]
-						pe = frappe.get_doc(allocations[0].reference_type, allocations[0].reference_name)
-						pe.flags.ignore_validate_update_after_submit = True
-						pe.set_missing_ref_details(update_ref_details_only_for=references)
-						pe.save()
-
-					# Update reconciled flag
-					allocation_names = [x.name for x in allocations]
-					ppa = qb.DocType("Process Payment Reconciliation Log Allocations")
-					qb.update(ppa).set(ppa.reconciled, True).where(ppa.name.isin(allocation_names)).run()
+					# Reconcile a chunk of payments, committed together at the end of the job
+					chunk_size = (
+						cint(frappe.db.get_single_value("Accounts Settings", "reconciliation_chunk_size"))
+						or 10
+					)
+					for _i in range(chunk_size):
+						allocations = get_next_allocation(log)
+						if not allocations:
+							break
+
+						reconcile_allocations(doc, allocations)
 
 					# Update reconciled count
 					reconciled_count = frappe.db.count(
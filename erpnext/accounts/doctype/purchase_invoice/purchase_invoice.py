@@ -10,6 +10,10 @@ from frappe.utils import cint, cstr, flt, formatdate, get_link_to_form, getdate,
 
 import erpnext
 from erpnext.accounts.deferred_revenue import validate_service_stop_date
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+	is_account_daily_balance_enabled,
+	update_account_daily_balances,
+)
 from erpnext.accounts.doctype.gl_entry.gl_entry import update_outstanding_amt
 from erpnext.accounts.doctype.repost_accounting_ledger.repost_accounting_ledger import (
 	validate_docs_for_deferred_accounting,
@@ -17,6 +21,7 @@ from erpnext.accounts.doctype.repost_accounting_ledger.repost_accounting_ledger
 )
 from erpnext.accounts.doctype.sales_invoice.sales_invoice import (
 	check_if_return_invoice_linked_with_payment_entry,
+	get_submitted_invoice_status,
 	get_total_in_party_account_currency,
 	is_overdue,
 	unlink_inter_company_doc,
@@ -825,15 +830,19 @@ class PurchaseInvoice(BuyingController):
 		if rows:
 			# cancel gl entries
 			gle = qb.DocType("GL Entry")
-			gle_update_query = (
-				qb.update(gle)
-				.set(gle.is_cancelled, 1)
-				.where(
-					(gle.voucher_type == "Purchase Receipt")
-					& (gle.voucher_no.isin(purchase_receipts))
-					& (gle.voucher_detail_no.isin(rows))
-				)
+			conditions = (
+				(gle.voucher_type == "Purchase Receipt")
+				& (gle.voucher_no.isin(purchase_receipts))
+				& (gle.voucher_detail_no.isin(rows))
 			)
+
+			if is_account_daily_balance_enabled():
+				cancelled_gl_entries = (
+					qb.from_(gle).select("*").where(conditions & (gle.is_cancelled == 0))
+				).run(as_dict=1)
+				update_account_daily_balances(cancelled_gl_entries, reverse=True)
+
+			gle_update_query = qb.update(gle).set(gle.is_cancelled, 1).where(conditions)
 			gle_update_query.run()
 
 	def update_supplier_outstanding(self, update_outstanding):
@@ -1801,25 +1810,14 @@ class PurchaseInvoice(BuyingController):
 			if self.docstatus == 2:
 				status = "Cancelled"
 			elif self.docstatus == 1:
-				if self.is_internal_transfer():
-					self.status = "Internal Transfer"
-				elif is_overdue(self, total):
-					self.status = "Overdue"
-				elif 0 < outstanding_amount < total:
-					self.status = "Partly Paid"
-				elif outstanding_amount > 0 and getdate(self.due_date) >= getdate():
-					self.status = "Unpaid"
-				# Check if outstanding amount is 0 due to debit note issued against invoice
-				elif self.is_return == 0 and frappe.db.get_value(
-					"Purchase Invoice", {"is_return": 1, "return_against": self.name, "docstatus": 1}
-				):
-					self.status = "Debit Note Issued"
-				elif self.is_return == 1:
-					self.status = "Return"
-				elif outstanding_amount <= 0:
-					self.status = "Paid"
-				else:
-					self.status = "Submitted"
+				self.status = get_submitted_invoice_status(
+					self.doctype,
+					self,
+					outstanding_amount,
+					total,
+					is_internal_transfer=self.is_internal_transfer(),
+					is_overdue=is_overdue(self, total),
+				)
 			else:
 				self.status = "Draft"
 
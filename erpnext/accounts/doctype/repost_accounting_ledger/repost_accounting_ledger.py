@@ -142,6 +142,13 @@ class RepostAccountingLedger(Document):
 
 @frappe.whitelist()
 def start_repost(account_repost_doc=str) -> None:
+	from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+		remove_voucher_from_account_daily_balances,
+	)
+	from erpnext.selling.doctype.customer_exposure.customer_exposure import (
+		remove_voucher_from_customer_exposures,
+	)
+
 	frappe.flags.through_repost_accounting_ledger = True
 	if account_repost_doc:
 		repost_doc = frappe.get_doc("Repost Accounting Ledger", account_repost_doc)
@@ -154,6 +161,8 @@ def start_repost(account_repost_doc=str) -> None:
 				doc = frappe.get_doc(x.voucher_type, x.voucher_no)
 
 				if repost_doc.delete_cancelled_entries:
+					remove_voucher_from_account_daily_balances(doc.doctype, doc.name)
+					remove_voucher_from_customer_exposures(doc.doctype, doc.name)
 					frappe.db.delete(
 						"GL Entry", filters={"voucher_type": doc.doctype, "voucher_no": doc.name}
 					)
@@ -1890,32 +1890,14 @@ class SalesInvoice(SellingController):
 			if self.docstatus == 2:
 				status = "Cancelled"
 			elif self.docstatus == 1:
-				if self.is_internal_transfer():
-					self.status = "Internal Transfer"
-				elif is_overdue(self, total):
-					self.status = "Overdue"
-				elif 0 < outstanding_amount < total:
-					self.status = "Partly Paid"
-				elif outstanding_amount > 0 and getdate(self.due_date) >= getdate():
-					self.status = "Unpaid"
-				# Check if outstanding amount is 0 due to credit note issued against invoice
-				elif self.is_return == 0 and frappe.db.get_value(
-					"Sales Invoice", {"is_return": 1, "return_against": self.name, "docstatus": 1}
-				):
-					self.status = "Credit Note Issued"
-				elif self.is_return == 1:
-					self.status = "Return"
-				elif outstanding_amount <= 0:
-					self.status = "Paid"
-				else:
-					self.status = "Submitted"
-
-				if (
-					self.status in ("Unpaid", "Partly Paid", "Overdue")
-					and self.is_discounted
-					and get_discounting_status(self.name) == "Disbursed"
-				):
-					self.status += " and Discounted"
+				self.status = get_submitted_invoice_status(
+					self.doctype,
+					self,
+					outstanding_amount,
+					total,
+					is_internal_transfer=self.is_internal_transfer(),
+					is_overdue=is_overdue(self, total),
+				)
 
 			else:
 				self.status = "Draft"
@@ -1934,27 +1916,69 @@ def get_total_in_party_account_currency(doc):
 
 def is_overdue(doc, total):
 	outstanding_amount = flt(doc.outstanding_amount, doc.precision("outstanding_amount"))
+	return is_payment_overdue(doc, outstanding_amount, total, doc.get("payment_schedule"))
+
+
+def is_payment_overdue(invoice, outstanding_amount, total, payment_schedule):
+	"""Whether less than the amount due till today is paid against an invoice with its payment schedule."""
 	if outstanding_amount <= 0:
 		return
 
 	today = getdate()
-	if doc.get("is_pos") or not doc.get("payment_schedule"):
-		return getdate(doc.due_date) < today
+	if invoice.get("is_pos") or not payment_schedule:
+		return getdate(invoice.due_date) < today
 
 	# calculate payable amount till date
 	payment_amount_field = (
-		"base_payment_amount" if doc.party_account_currency != doc.currency else "payment_amount"
+		"base_payment_amount" if invoice.party_account_currency != invoice.currency else "payment_amount"
 	)
 
 	payable_amount = sum(
-		payment.get(payment_amount_field)
-		for payment in doc.payment_schedule
-		if getdate(payment.due_date) < today
+		payment.get(payment_amount_field) for payment in payment_schedule if getdate(payment.due_date) < today
 	)
 
 	return (total - outstanding_amount) < payable_amount
 
 
+def get_submitted_invoice_status(
+	doctype, invoice, outstanding_amount, total, is_internal_transfer, is_overdue, has_return=None
+):
+	"""
+	Status of a submitted Sales or Purchase Invoice, used by `set_status` of both and by bulk outstanding updates.
+	`has_return` tells whether a return was made against the invoice, it is looked up when not given.
+	"""
+	if is_internal_transfer:
+		status = "Internal Transfer"
+	elif is_overdue:
+		status = "Overdue"
+	elif 0 < outstanding_amount < total:
+		status = "Partly Paid"
+	elif outstanding_amount > 0 and getdate(invoice.due_date) >= getdate():
+		status = "Unpaid"
+	# Check if outstanding amount is 0 due to credit/debit note issued against invoice
+	elif invoice.is_return == 0 and (
+		has_return
+		if has_return is not None
+		else frappe.db.get_value(doctype, {"is_return": 1, "return_against": invoice.name, "docstatus": 1})
+	):
+		status = "Credit Note Issued" if doctype == "Sales Invoice" else "Debit Note Issued"
+	elif invoice.is_return == 1:
+		status = "Return"
+	elif outstanding_amount <= 0:
+		status = "Paid"
+	else:
+		status = "Submitted"
+
+	if (
+		status in ("Unpaid", "Partly Paid", "Overdue")
+		and invoice.get("is_discounted")
+		and get_discounting_status(invoice.name) == "Disbursed"
+	):
+		status += " and Discounted"
+
+	return status
+
+
 def get_discounting_status(sales_invoice):
 	status = None
 
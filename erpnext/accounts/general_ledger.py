@@ -10,6 +10,11 @@ from frappe.model.meta import get_field_precision
 from frappe.utils import cint, flt, formatdate, getdate, now
 
 import erpnext
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+	is_account_daily_balance_enabled,
+	remove_voucher_from_account_daily_balances,
+	update_account_daily_balances,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 )
@@ -20,6 +25,11 @@ from erpnext.accounts.doctype.accounting_period.accounting_period import ClosedA
 from erpnext.accounts.doctype.budget.budget import validate_expense_against_budget
 from erpnext.accounts.utils import create_payment_ledger_entry
 from erpnext.exceptions import InvalidAccountDimensionError, MandatoryAccountDimensionError
+from erpnext.selling.doctype.customer_exposure.customer_exposure import (
+	is_customer_exposure_enabled,
+	remove_voucher_from_customer_exposures,
+	update_customer_exposures,
+)
 
 
 def make_gl_entries(
@@ -264,12 +274,14 @@ def merge_similar_entries(gl_map, precision=None):
 
 	# filter zero debit and credit entries
 	merged_gl_map = filter(
-		lambda x: flt(x.debit, precision) != 0
-		or flt(x.credit, precision) != 0
-		or (
-			x.voucher_type == "Journal Entry"
-			and frappe.get_cached_value("Journal Entry", x.voucher_no, "voucher_type")
-			== "Exchange Gain Or Loss"
+		lambda x: (
+			flt(x.debit, precision) != 0
+			or flt(x.credit, precision) != 0
+			or (
+				x.voucher_type == "Journal Entry"
+				and frappe.get_cached_value("Journal Entry", x.voucher_no, "voucher_type")
+				== "Exchange Gain Or Loss"
+			)
 		),
 		merged_gl_map,
 	)
@@ -384,9 +396,13 @@ def save_entries(gl_map, adv_adj, update_outstanding, from_repost=False):
 		if gl_map[0]["voucher_type"] != "Period Closing Voucher":
 			validate_against_pcv(is_opening, gl_map[0]["posting_date"], gl_map[0]["company"])
 
+	gl_entries = []
 	for entry in gl_map:
 		validate_allowed_dimensions(entry, dimension_filter_map)
-		make_entry(entry, adv_adj, update_outstanding, from_repost)
+		gl_entries.append(make_entry(entry, adv_adj, update_outstanding, from_repost))
+
+	update_account_daily_balances(gl_entries)
+	update_customer_exposures(gl_entries)
 
 
 def make_entry(args, adv_adj, update_outstanding, from_repost=False):
@@ -402,6 +418,8 @@ def make_entry(args, adv_adj, update_outstanding, from_repost=False):
 	if not from_repost and gle.voucher_type != "Period Closing Voucher":
 		validate_expense_against_budget(args)
 
+	return gle
+
 
 def validate_cwip_accounts(gl_map):
 	"""Validate that CWIP account are not used in Journal Entry"""
@@ -626,31 +644,44 @@ def make_reverse_gl_entries(
 			# Only cancel GL entries for unlinked reference using `voucher_detail_no`
 			gle = frappe.qb.DocType("GL Entry")
 			for x in gl_entries:
+				conditions = (
+					(gle.company == x.company)
+					& (gle.account == x.account)
+					& (gle.party_type == x.party_type)
+					& (gle.party == x.party)
+					& (gle.voucher_type == x.voucher_type)
+					& (gle.voucher_no == x.voucher_no)
+					& (gle.against_voucher_type == x.against_voucher_type)
+					& (gle.against_voucher == x.against_voucher)
+					& (gle.voucher_detail_no == x.voucher_detail_no)
+				)
 				query = (
 					frappe.qb.update(gle)
 					.set(gle.modified, now())
 					.set(gle.modified_by, frappe.session.user)
-					.where(
-						(gle.company == x.company)
-						& (gle.account == x.account)
-						& (gle.party_type == x.party_type)
-						& (gle.party == x.party)
-						& (gle.voucher_type == x.voucher_type)
-						& (gle.voucher_no == x.voucher_no)
-						& (gle.against_voucher_type == x.against_voucher_type)
-						& (gle.against_voucher == x.against_voucher)
-						& (gle.voucher_detail_no == x.voucher_detail_no)
-					)
+					.where(conditions)
 				)
 
 				if not immutable_ledger_enabled:
 					query = query.set(gle.is_cancelled, True)
 
+					if is_account_daily_balance_enabled() or is_customer_exposure_enabled():
+						# locked before the balances, in the order their rebuilds lock them
+						cancelled_gl_entries = (
+							frappe.qb.from_(gle)
+							.select("*")
+							.where(conditions & (gle.is_cancelled == 0))
+							.for_update()
+						).run(as_dict=1)
+						update_account_daily_balances(cancelled_gl_entries, reverse=True)
+						update_customer_exposures(cancelled_gl_entries, reverse=True)
+
 				query.run()
 		else:
 			if not immutable_ledger_enabled:
 				set_as_cancel(gl_entries[0]["voucher_type"], gl_entries[0]["voucher_no"])
 
+		reverse_gl_entries = []
 		for entry in gl_entries:
 			new_gle = copy.deepcopy(entry)
 			new_gle["name"] = None
@@ -673,7 +704,11 @@ def make_reverse_gl_entries(
 				new_gle["posting_date"] = frappe.form_dict.get("posting_date") or getdate()
 
 			if new_gle["debit"] or new_gle["credit"]:
-				make_entry(new_gle, adv_adj, "Yes")
+				reverse_gl_entries.append(make_entry(new_gle, adv_adj, "Yes"))
+
+		if immutable_ledger_enabled:
+			update_account_daily_balances(reverse_gl_entries)
+			update_customer_exposures(reverse_gl_entries)
 
 
 def check_freezing_date(posting_date, adv_adj=False):
@@ -722,6 +757,8 @@ def set_as_cancel(voucher_type, voucher_no):
 	"""
 	Set is_cancelled=1 in all original gl entries for the voucher
 	"""
+	remove_voucher_from_account_daily_balances(voucher_type, voucher_no)
+	remove_voucher_from_customer_exposures(voucher_type, voucher_no)
 	frappe.db.sql(
 		"""UPDATE `tabGL Entry` SET is_cancelled = 1,
 		modified=%s, modified_by=%s
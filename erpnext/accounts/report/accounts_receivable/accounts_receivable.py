@@ -6,7 +6,7 @@ from collections import OrderedDict
 
 import frappe
 from frappe import _, qb, query_builder, scrub
-from frappe.query_builder import Criterion
+from frappe.query_builder import Case, Criterion
 from frappe.query_builder.functions import Date, Substring, Sum
 from frappe.utils import cint, cstr, flt, getdate, nowdate
 
@@ -30,6 +30,11 @@ from erpnext.accounts.utils import get_currency_precision, get_party_types_from_
 #  8. Invoice details like Sales Persons, Delivery Notes are also fetched comma separated
 #  9. Report amounts are in party currency if in_party_currency is selected, otherwise company currency
 # 10. This report is based on Payment Ledger Entries
+# 11. Ledger entries are loaded and balanced a batch of parties at a time, so memory is bounded by the
+#     largest batch rather than the whole ledger
+
+# parties whose ledger entries are balanced together
+PARTY_BATCH_SIZE = 1000
 
 
 def execute(filters=None):
@@ -41,8 +46,10 @@ def execute(filters=None):
 
 
 class ReceivablePayableReport:
-	def __init__(self, filters=None):
+	def __init__(self, filters=None, row_handler=None):
 		self.filters = frappe._dict(filters or {})
+		# called with each voucher row instead of collecting it in `self.data`
+		self.row_handler = row_handler
 		self.qb_selection_filter = []
 		self.ple = qb.DocType("Payment Ledger Entry")
 		self.filters.report_date = getdate(self.filters.report_date or nowdate())
@@ -90,16 +97,9 @@ class ReceivablePayableReport:
 				self.skip_total_row = 1
 
 	def get_data(self):
-		self.get_ple_entries()
+		self.data = []
+		self.prepare_ple_conditions()
 		self.get_sales_invoices_or_customers_based_on_sales_person()
-		self.voucher_balance = OrderedDict()
-		self.init_voucher_balance()  # invoiced, paid, credit_note, outstanding
-
-		# Build delivery note map against all sales invoices
-		self.build_delivery_note_map()
-
-		# Get invoice details like bill_no, due_date etc for all invoices
-		self.get_invoice_details()
 
 		# fetch future payments against invoices
 		self.get_future_payments()
@@ -110,12 +110,28 @@ class ReceivablePayableReport:
 		# Get Exchange Rate Revaluations
 		self.get_exchange_rate_revaluations()
 
-		self.data = []
+		# a ledger entry only ever updates a voucher of its own party
+		for parties in self.get_party_batches():
+			self.get_ple_entries(parties)
+			self.voucher_balance = OrderedDict()
+			self.invoices = set()
+			self.init_voucher_balance()  # invoiced, paid, credit_note, outstanding
 
-		for ple in self.ple_entries:
-			self.update_voucher_balance(ple)
+			for ple in self.ple_entries:
+				self.update_voucher_balance(ple)
+
+			# Build delivery note map against all sales invoices
+			self.build_delivery_note_map()
+
+			# Get invoice details like bill_no, due_date etc for all invoices
+			self.get_invoice_details()
 
-		self.build_data()
+			self.build_data()
+
+		if self.filters.get("group_by_party"):
+			self.append_subtotal_row(self.previous_party)
+			if self.data:
+				self.data.append(self.total_row_map.get("Total", {}))
 
 	def build_voucher_dict(self, ple):
 		return frappe._dict(
@@ -342,11 +358,6 @@ class ReceivablePayableReport:
 				else:
 					self.append_row(row)
 
-		if self.filters.get("group_by_party"):
-			self.append_subtotal_row(self.previous_party)
-			if self.data:
-				self.data.append(self.total_row_map.get("Total", {}))
-
 	def append_row(self, row):
 		self.allocate_future_payments(row)
 		self.set_invoice_details(row)
@@ -359,7 +370,10 @@ class ReceivablePayableReport:
 				self.append_subtotal_row(self.previous_party)
 			self.previous_party = row.party
 
-		self.data.append(row)
+		if self.row_handler:
+			self.row_handler(row)
+		else:
+			self.data.append(row)
 
 	def set_invoice_details(self, row):
 		invoice_details = self.invoice_details.get(row.voucher_no, {})
@@ -416,14 +430,19 @@ class ReceivablePayableReport:
 
 	def get_invoice_details(self):
 		self.invoice_details = frappe._dict()
+		voucher_nos = list({row.voucher_no for row in self.voucher_balance.values()})
+		if not voucher_nos:
+			return
+
+		args = {"report_date": self.filters.report_date, "voucher_nos": voucher_nos}
 		if self.account_type == "Receivable":
 			si_list = frappe.db.sql(
 				"""
 				select name, due_date, po_no
 				from `tabSales Invoice`
-				where posting_date <= %s
+				where posting_date <= %(report_date)s and name in %(voucher_nos)s
 			""",
-				self.filters.report_date,
+				args,
 				as_dict=1,
 			)
 			for d in si_list:
@@ -435,8 +454,9 @@ class ReceivablePayableReport:
 					"""
 					select parent, sales_person
 					from `tabSales Team`
-					where parenttype = 'Sales Invoice'
+					where parenttype = 'Sales Invoice' and parent in %(voucher_nos)s
 				""",
+					args,
 					as_dict=1,
 				)
 				for d in sales_team:
@@ -449,9 +469,9 @@ class ReceivablePayableReport:
 				"""
 				select name, due_date, bill_no, bill_date
 				from `tabPurchase Invoice`
-				where posting_date <= %s
+				where posting_date <= %(report_date)s and name in %(voucher_nos)s
 			""",
-				self.filters.report_date,
+				args,
 				as_dict=1,
 			):
 				self.invoice_details.setdefault(pi.name, pi)
@@ -461,9 +481,9 @@ class ReceivablePayableReport:
 			"""
 			select name, due_date, bill_no, bill_date
 			from `tabJournal Entry`
-			where posting_date <= %s
+			where posting_date <= %(report_date)s and name in %(voucher_nos)s
 		""",
-			self.filters.report_date,
+			args,
 			as_dict=1,
 		)
 
@@ -756,9 +776,7 @@ class ReceivablePayableReport:
 		)
 		row["range" + str(index + 1)] = row.outstanding
 
-	def get_ple_entries(self):
-		# get all the GL entries filtered by the given filters
-
+	def prepare_ple_conditions(self):
 		self.prepare_conditions()
 
 		if self.filters.show_future_payments:
@@ -772,42 +790,73 @@ class ReceivablePayableReport:
 		else:
 			self.qb_selection_filter.append(self.ple.posting_date.lte(self.filters.report_date))
 
-		ple = qb.DocType("Payment Ledger Entry")
+	def get_party_batches(self):
+		"""Parties with ledger entries in the report, `PARTY_BATCH_SIZE` at a time"""
+		ple = self.ple
+		parties = (
+			qb.from_(ple)
+			.select(ple.party)
+			.distinct()
+			.where(ple.delinked == 0)
+			.where(Criterion.all(self.qb_selection_filter))
+			.where(Criterion.any(self.or_filters))
+			.orderby(ple.party)
+		).run(pluck=True)
+
+		for i in range(0, len(parties), PARTY_BATCH_SIZE):
+			yield parties[i : i + PARTY_BATCH_SIZE]
+
+	def get_ple_entries(self, parties):
+		# get the GL entries of the given parties filtered by the given filters
+		ple = self.ple
+
+		party_condition = ple.party.isin([party for party in parties if party is not None] or [""])
+		if None in parties:
+			party_condition |= ple.party.isnull()
+
+		# entries are summed per voucher and against voucher, debits apart from credits and
+		# grouped on everything else read from them, so that a sum updates the voucher
+		# balance exactly like its entries would one by one
+		group_by = [
+			ple.account,
+			ple.voucher_type,
+			ple.voucher_no,
+			ple.against_voucher_type,
+			ple.against_voucher_no,
+			ple.party_type,
+			ple.cost_center,
+			ple.party,
+			ple.posting_date,
+			ple.due_date,
+			ple.account_currency,
+		]
 		query = (
 			qb.from_(ple)
 			.select(
-				ple.name,
-				ple.account,
-				ple.voucher_type,
-				ple.voucher_no,
-				ple.against_voucher_type,
-				ple.against_voucher_no,
-				ple.party_type,
-				ple.cost_center,
-				ple.party,
-				ple.posting_date,
-				ple.due_date,
-				ple.account_currency,
-				ple.amount,
-				ple.amount_in_account_currency,
+				*group_by,
+				Sum(ple.amount).as_("amount"),
+				Sum(ple.amount_in_account_currency).as_("amount_in_account_currency"),
 			)
 			.where(ple.delinked == 0)
+			.where(party_condition)
 			.where(Criterion.all(self.qb_selection_filter))
 			.where(Criterion.any(self.or_filters))
+			.groupby(*group_by, Case().when(ple.amount > 0, 1).else_(0))
 		)
 
 		if self.filters.get("show_remarks"):
 			if remarks_length := frappe.db.get_single_value(
 				"Accounts Settings", "receivable_payable_remarks_length"
 			):
-				query = query.select(Substring(ple.remarks, 1, remarks_length).as_("remarks"))
+				remarks = Substring(ple.remarks, 1, remarks_length)
 			else:
-				query = query.select(ple.remarks)
+				remarks = ple.remarks
+			query = query.select(remarks.as_("remarks")).groupby(remarks)
 
 		if self.filters.get("group_by_party"):
-			query = query.orderby(self.ple.party, self.ple.posting_date)
+			query = query.orderby(ple.party, ple.posting_date)
 		else:
-			query = query.orderby(self.ple.posting_date, self.ple.party)
+			query = query.orderby(ple.posting_date, ple.party)
 
 		self.ple_entries = query.run(as_dict=True)
 
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import frappe
 from frappe import qb
 from frappe.tests.utils import FrappeTestCase, change_settings
@@ -966,3 +968,26 @@ class TestAccountsReceivable(AccountsTestMixin, FrappeTestCase):
 		self.assertEqual(len(report[1]), 1)
 		row = report[1][0]
 		self.assertEqual(expected_data_after_payment, [row.voucher_no, row.cost_center, row.outstanding])
+
+	def test_party_batches(self):
+		si1 = self.create_sales_invoice(no_payment_schedule=True)
+		self.create_payment_entry(si1.name)
+
+		self.create_customer("_Test Customer 2")
+		si2 = self.create_sales_invoice(no_payment_schedule=True, do_not_submit=True)
+		si2.items[0].rate = 85
+		si2.save().submit()
+
+		filters = {
+			"company": self.company,
+			"report_date": today(),
+			"range": "30, 60, 90, 120",
+		}
+		for group_by_party in (False, True):
+			filters["group_by_party"] = group_by_party
+			report = execute(filters)[1]
+			with patch("erpnext.accounts.report.accounts_receivable.accounts_receivable.PARTY_BATCH_SIZE", 1):
+				self.assertEqual(execute(filters)[1], report)
+
+		outstanding = {row.voucher_no: row.outstanding for row in report if row.get("voucher_no")}
+		self.assertEqual(outstanding, {si1.name: 60.0, si2.name: 85.0})
@@ -31,10 +31,11 @@ class AccountsReceivableSummary(ReceivablePayableReport):
 
 	def get_data(self, args):
 		self.data = []
-		self.receivables = ReceivablePayableReport(self.filters).run(args)[1]
+		self.party_total = frappe._dict()
 		self.currency_precision = get_currency_precision() or 2
 
-		self.get_party_total(args)
+		# receivables are added to their party total as they are built instead of being collected
+		ReceivablePayableReport(self.filters, row_handler=self.add_to_party_total).run(args)
 
 		party = None
 		for party_type in self.party_type:
@@ -89,19 +90,16 @@ class AccountsReceivableSummary(ReceivablePayableReport):
 
 			self.data.append(row)
 
-	def get_party_total(self, args):
-		self.party_total = frappe._dict()
-
-		for d in self.receivables:
-			self.init_party_total(d)
+	def add_to_party_total(self, row):
+		self.init_party_total(row)
 
-			# Add all amount columns
-			for k in list(self.party_total[d.party]):
-				if isinstance(self.party_total[d.party][k], float):
-					self.party_total[d.party][k] += d.get(k) or 0.0
+		# Add all amount columns
+		for k in list(self.party_total[row.party]):
+			if isinstance(self.party_total[row.party][k], float):
+				self.party_total[row.party][k] += row.get(k) or 0.0
 
-			# set territory, customer_group, sales person etc
-			self.set_party_details(d)
+		# set territory, customer_group, sales person etc
+		self.set_party_details(row)
 
 	def init_party_total(self, row):
 		default_dict = {
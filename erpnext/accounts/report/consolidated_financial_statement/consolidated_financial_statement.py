@@ -7,6 +7,7 @@ from collections import defaultdict
 import frappe
 from frappe import _
 from frappe.query_builder import Criterion
+from frappe.query_builder.functions import Max, Sum
 from frappe.utils import flt, getdate
 
 import erpnext
@@ -26,6 +27,7 @@ from erpnext.accounts.report.cash_flow.cash_flow import get_report_summary as ge
 from erpnext.accounts.report.financial_statements import (
 	filter_out_zero_value_rows,
 	get_fiscal_year_data,
+	get_period_bucket,
 	sort_accounts,
 )
 from erpnext.accounts.report.profit_and_loss_statement.profit_and_loss_statement import (
@@ -333,6 +335,7 @@ def get_data(companies, root_type, balance_must_be, fiscal_year, filters=None, i
 		end_date = filters.period_end_date
 
 	filters.end_date = end_date
+	opening_date = get_opening_date(filters, fiscal_year)
 
 	gl_entries_by_account = {}
 	for root in frappe.db.sql(
@@ -352,6 +355,7 @@ def get_data(companies, root_type, balance_must_be, fiscal_year, filters=None, i
 			accounts,
 			ignore_closing_entries=False,
 			root_type=root_type,
+			opening_date=opening_date,
 		)
 
 	calculate_values(accounts_by_name, gl_entries_by_account, companies, filters, fiscal_year)
@@ -375,11 +379,15 @@ def get_company_currency(filters=None):
 	)
 
 
-def calculate_values(accounts_by_name, gl_entries_by_account, companies, filters, fiscal_year):
-	start_date = (
+def get_opening_date(filters, fiscal_year):
+	return (
 		fiscal_year.year_start_date if filters.filter_based_on == "Fiscal Year" else filters.period_start_date
 	)
 
+
+def calculate_values(accounts_by_name, gl_entries_by_account, companies, filters, fiscal_year):
+	start_date = get_opening_date(filters, fiscal_year)
+
 	for entries in gl_entries_by_account.values():
 		for entry in entries:
 			if entry.account_number:
@@ -591,8 +599,11 @@ def set_gl_entries_by_account(
 	accounts,
 	ignore_closing_entries=False,
 	root_type=None,
+	opening_date=None,
 ):
-	"""Returns a dict like { "account": [gl entries], ... }"""
+	"""Returns a dict like { "account": [gl entries], ... }
+
+	Entries are summed per account before and after `opening_date` in the query."""
 
 	company_lft, company_rgt = frappe.get_cached_value("Company", filters.get("company"), ["lft", "rgt"])
 
@@ -618,15 +629,13 @@ def set_gl_entries_by_account(
 			.inner_join(account)
 			.on(account.name == gle.account)
 			.select(
-				gle.posting_date,
+				Max(gle.posting_date).as_("posting_date"),
 				gle.account,
-				gle.debit,
-				gle.credit,
-				gle.is_opening,
+				Sum(gle.debit).as_("debit"),
+				Sum(gle.credit).as_("credit"),
 				gle.company,
-				gle.fiscal_year,
-				gle.debit_in_account_currency,
-				gle.credit_in_account_currency,
+				Sum(gle.debit_in_account_currency).as_("debit_in_account_currency"),
+				Sum(gle.credit_in_account_currency).as_("credit_in_account_currency"),
 				gle.account_currency,
 				account.account_name,
 				account.account_number,
@@ -638,9 +647,19 @@ def set_gl_entries_by_account(
 				& (account.lft >= root_lft)
 				& (account.rgt <= root_rgt)
 			)
-			.orderby(gle.account, gle.posting_date)
+			.groupby(
+				gle.account,
+				gle.company,
+				gle.account_currency,
+				account.account_name,
+				account.account_number,
+			)
+			.orderby(gle.account)
 		)
 
+		if opening_date:
+			query = query.groupby(get_period_bucket(gle.posting_date, [getdate(opening_date)]))
+
 		if root_type:
 			query = query.where(account.root_type == root_type)
 		additional_conditions = get_additional_conditions(from_date, ignore_closing_entries, filters, d)
@@ -8,8 +8,11 @@ import re
 
 import frappe
 from frappe import _
+from frappe.query_builder import Case
+from frappe.query_builder.functions import Max, Sum
 from frappe.utils import add_days, add_months, cint, cstr, flt, formatdate, get_first_day, getdate
 
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import get_gl_balance_doctype
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimension_with_children,
@@ -187,6 +190,7 @@ def get_data(
 			gl_entries_by_account,
 			ignore_closing_entries=ignore_closing_entries,
 			root_type=root_type,
+			period_list=period_list,
 		)
 
 	calculate_values(
@@ -426,8 +430,11 @@ def set_gl_entries_by_account(
 	ignore_closing_entries=False,
 	ignore_opening_entries=False,
 	root_type=None,
+	period_list=None,
 ):
-	"""Returns a dict like { "account": [gl entries], ... }"""
+	"""Returns a dict like { "account": [gl entries], ... }
+
+	With `period_list`, entries are summed per account and period in the query."""
 	gl_entries = []
 
 	account_filters = {
@@ -476,18 +483,20 @@ def set_gl_entries_by_account(
 					filters,
 					ignore_closing_entries,
 					last_period_closing_voucher[0].name,
+					period_list=period_list,
 				)
 				from_date = add_days(last_period_closing_voucher[0].posting_date, 1)
 				ignore_opening_entries = True
 
 		gl_entries += get_accounting_entries(
-			"GL Entry",
+			get_gl_balance_doctype(),
 			from_date,
 			to_date,
 			accounts_list,
 			filters,
 			ignore_closing_entries,
 			ignore_opening_entries=ignore_opening_entries,
+			period_list=period_list,
 		)
 
 		if filters and filters.get("presentation_currency"):
@@ -508,30 +517,51 @@ def get_accounting_entries(
 	ignore_closing_entries,
 	period_closing_voucher=None,
 	ignore_opening_entries=False,
+	period_list=None,
 ):
 	gl_entry = frappe.qb.DocType(doctype)
+	value_fields = [
+		gl_entry.debit,
+		gl_entry.credit,
+		gl_entry.debit_in_account_currency,
+		gl_entry.credit_in_account_currency,
+	]
 	query = (
 		frappe.qb.from_(gl_entry)
-		.select(
+		.select(gl_entry.account, gl_entry.account_currency)
+		.where(gl_entry.company == filters.company)
+	)
+
+	if period_list:
+		# one row per account and period, dated within the period it sums up
+		posting_date = (
+			gl_entry.closing_date if doctype == "Account Closing Balance" else gl_entry.posting_date
+		)
+		query = query.select(
+			Max(posting_date).as_("posting_date"), *[Sum(field).as_(field.name) for field in value_fields]
+		).groupby(
 			gl_entry.account,
-			gl_entry.debit,
-			gl_entry.credit,
-			gl_entry.debit_in_account_currency,
-			gl_entry.credit_in_account_currency,
 			gl_entry.account_currency,
+			get_period_bucket(posting_date, get_period_boundaries(period_list)),
 		)
-		.where(gl_entry.company == filters.company)
-	)
+	else:
+		query = query.select(*value_fields)
 
-	if doctype == "GL Entry":
-		query = query.select(gl_entry.posting_date, gl_entry.is_opening, gl_entry.fiscal_year)
-		query = query.where(gl_entry.is_cancelled == 0)
+	if doctype != "Account Closing Balance":
+		if period_list:
+			query = query.select(gl_entry.fiscal_year).groupby(gl_entry.fiscal_year)
+		else:
+			query = query.select(gl_entry.posting_date, gl_entry.is_opening, gl_entry.fiscal_year)
 		query = query.where(gl_entry.posting_date <= to_date)
 
+		if doctype == "GL Entry":
+			query = query.where(gl_entry.is_cancelled == 0)
+
 		if ignore_opening_entries:
 			query = query.where(gl_entry.is_opening == "No")
 	else:
-		query = query.select(gl_entry.closing_date.as_("posting_date"))
+		if not period_list:
+			query = query.select(gl_entry.closing_date.as_("posting_date"))
 		query = query.where(gl_entry.period_closing_voucher == period_closing_voucher)
 
 	query = apply_additional_conditions(doctype, query, from_date, ignore_closing_entries, filters)
@@ -542,6 +572,29 @@ def get_accounting_entries(
 	return entries
 
 
+def get_period_boundaries(period_list):
+	"""Dates on which an entry starts to be counted in different periods by `calculate_values`."""
+	boundaries = {getdate(period_list[0].year_start_date)}
+	for period in period_list:
+		boundaries.add(getdate(period.from_date))
+		boundaries.add(getdate(add_days(period.to_date, 1)))
+
+	return sorted(boundaries)
+
+
+def get_period_bucket(date_field, boundaries):
+	"""Index of the interval between `boundaries` a date is in.
+
+	All dates in an interval are on the same side of every period boundary, so
+	entries summed per interval are counted exactly like the entries themselves.
+	"""
+	bucket = Case()
+	for idx, boundary in enumerate(boundaries):
+		bucket = bucket.when(date_field < boundary, idx)
+
+	return bucket.else_(len(boundaries))
+
+
 def apply_additional_conditions(doctype, query, from_date, ignore_closing_entries, filters):
 	gl_entry = frappe.qb.DocType(doctype)
 	accounting_dimensions = get_accounting_dimensions(as_list=False)
@@ -552,7 +605,7 @@ def apply_additional_conditions(doctype, query, from_date, ignore_closing_entrie
 		else:
 			query = query.where(gl_entry.is_period_closing_voucher_entry == 0)
 
-	if from_date and doctype == "GL Entry":
+	if from_date and doctype != "Account Closing Balance":
 		query = query.where(gl_entry.posting_date >= from_date)
 
 	if filters:
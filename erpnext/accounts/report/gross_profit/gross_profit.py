@@ -6,7 +6,8 @@ from collections import OrderedDict
 import frappe
 from frappe import _, qb, scrub
 from frappe.query_builder import Order
-from frappe.utils import cint, flt, formatdate
+from frappe.query_builder.functions import Avg
+from frappe.utils import cint, create_batch, flt, formatdate
 
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
@@ -415,6 +416,8 @@ def get_column_names():
 class GrossProfitGenerator:
 	def __init__(self, filters=None):
 		self.sle = {}
+		self.item_warehouses_with_sle = set()
+		self.item_warehouses_without_sle = set()
 		self.data = []
 		self.average_buying_rate = {}
 		self.filters = frappe._dict(filters)
@@ -426,6 +429,8 @@ class GrossProfitGenerator:
 
 		self.load_product_bundle()
 		self.load_non_stock_items()
+		self.load_stock_ledger_entries()
+		self.load_so_dn_incoming_rates()
 		self.get_returned_invoice_items()
 		self.process()
 
@@ -636,40 +641,34 @@ class GrossProfitGenerator:
 
 		return flt(buying_amount, self.currency_precision)
 
-	def calculate_buying_amount_from_sle(self, row, my_sle, parenttype, parent, item_row, item_code):
-		for i, sle in enumerate(my_sle):
-			# find the stock valution rate from stock ledger entry
-			if (
-				sle.voucher_type == parenttype
-				and parent == sle.voucher_no
-				and sle.voucher_detail_no == item_row
-			):
-				previous_stock_value = len(my_sle) > i + 1 and flt(my_sle[i + 1].stock_value) or 0.0
+	def calculate_buying_amount_from_sle(self, row, parenttype, parent, item_row, item_code, warehouse):
+		sle = self.sle.get((item_code, warehouse, parenttype, parent, item_row))
+		if not sle:
+			return 0.0
 
-				if previous_stock_value:
-					return abs(previous_stock_value - flt(sle.stock_value)) * flt(row.qty) / abs(flt(sle.qty))
-				else:
-					return flt(row.qty) * self.get_average_buying_rate(row, item_code)
-		return 0.0
+		# stock value of the item and warehouse before the entry
+		previous_stock_value = flt(sle.stock_value) - flt(sle.stock_value_difference)
+		if previous_stock_value:
+			return abs(previous_stock_value - flt(sle.stock_value)) * flt(row.qty) / abs(flt(sle.qty))
+		else:
+			return flt(row.qty) * self.get_average_buying_rate(row, item_code)
 
 	def get_buying_amount(self, row, item_code):
-		# IMP NOTE
-		# stock_ledger_entries should already be filtered by item_code and warehouse and
-		# sorted by posting_date desc, posting_time desc
 		if item_code in self.non_stock_items and (row.project or row.cost_center):
 			# Issue 6089-Get last purchasing rate for non-stock item
 			item_rate = self.get_last_purchase_rate(item_code, row)
 			return flt(row.qty) * item_rate
 
 		else:
-			my_sle = self.get_stock_ledger_entries(item_code, row.warehouse)
-			if (row.update_stock or row.dn_detail) and my_sle:
+			if (row.update_stock or row.dn_detail) and self.has_stock_ledger_entries(
+				item_code, row.warehouse
+			):
 				parenttype, parent = row.parenttype, row.parent
 				if row.dn_detail:
 					parenttype, parent = "Delivery Note", row.delivery_note
 
 				return self.calculate_buying_amount_from_sle(
-					row, my_sle, parenttype, parent, row.item_row, item_code
+					row, parenttype, parent, row.item_row, item_code, row.warehouse
 				)
 			elif self.delivery_notes.get((row.parent, row.item_code), None):
 				#  check if Invoice has delivery notes
@@ -680,9 +679,8 @@ class GrossProfitGenerator:
 					dn["item_row"],
 					dn["warehouse"],
 				)
-				my_sle = self.get_stock_ledger_entries(item_code, dn_warehouse)
 				return self.calculate_buying_amount_from_sle(
-					row, my_sle, parenttype, parent, item_row, item_code
+					row, parenttype, parent, item_row, item_code, dn_warehouse
 				)
 			elif row.sales_order and row.so_detail:
 				incoming_amount = self.get_buying_amount_from_so_dn(row.sales_order, row.so_detail, item_code)
@@ -694,22 +692,7 @@ class GrossProfitGenerator:
 		return flt(row.qty) * self.get_average_buying_rate(row, item_code)
 
 	def get_buying_amount_from_so_dn(self, sales_order, so_detail, item_code):
-		from frappe.query_builder.functions import Avg
-
-		delivery_note_item = frappe.qb.DocType("Delivery Note Item")
-
-		query = (
-			frappe.qb.from_(delivery_note_item)
-			.select(Avg(delivery_note_item.incoming_rate))
-			.where(delivery_note_item.docstatus == 1)
-			.where(delivery_note_item.item_code == item_code)
-			.where(delivery_note_item.against_sales_order == sales_order)
-			.where(delivery_note_item.so_detail == so_detail)
-			.groupby(delivery_note_item.item_code)
-		)
-
-		incoming_amount = query.run()
-		return flt(incoming_amount[0][0]) if incoming_amount else 0
+		return self.so_dn_incoming_rate.get((sales_order, so_detail, item_code), 0)
 
 	def get_average_buying_rate(self, row, item_code):
 		args = row
@@ -995,36 +978,107 @@ class GrossProfitGenerator:
 	def get_bundle_item_details(self, item_code):
 		return frappe.db.get_value("Item", item_code, ["item_name", "description", "item_group", "brand"])
 
-	def get_stock_ledger_entries(self, item_code, warehouse):
-		if item_code and warehouse:
-			if (item_code, warehouse) not in self.sle:
-				sle = qb.DocType("Stock Ledger Entry")
+	def load_stock_ledger_entries(self):
+		"""Load the stock ledger entries of the vouchers the invoice rows are delivered by,
+		indexed by item, warehouse and voucher row."""
+		vouchers = {"Sales Invoice": set(), "Delivery Note": set()}
+		for row in self.si_list:
+			if row.dn_detail and row.delivery_note:
+				vouchers["Delivery Note"].add(row.delivery_note)
+			elif row.update_stock and row.parenttype:
+				vouchers.setdefault(row.parenttype, set()).add(row.parent)
+
+		for dn in self.delivery_notes.values():
+			vouchers["Delivery Note"].add(dn["delivery_note"])
+
+		sle = qb.DocType("Stock Ledger Entry")
+		for voucher_type, voucher_nos in vouchers.items():
+			for batch in create_batch(sorted(voucher_nos), 1000):
 				res = (
 					qb.from_(sle)
 					.select(
 						sle.item_code,
+						sle.warehouse,
 						sle.voucher_type,
 						sle.voucher_no,
 						sle.voucher_detail_no,
 						sle.stock_value,
-						sle.warehouse,
+						sle.stock_value_difference,
 						sle.actual_qty.as_("qty"),
 					)
 					.where(
 						(sle.company == self.filters.company)
-						& (sle.item_code == item_code)
-						& (sle.warehouse == warehouse)
+						& (sle.voucher_type == voucher_type)
+						& (sle.voucher_no.isin(batch))
 						& (sle.is_cancelled == 0)
 					)
-					.orderby(sle.item_code)
-					.orderby(sle.warehouse, sle.posting_datetime, sle.creation, order=Order.desc)
+					.orderby(sle.posting_datetime, sle.creation, order=Order.desc)
 					.run(as_dict=True)
 				)
 
-				self.sle[(item_code, warehouse)] = res
+				for d in res:
+					self.sle.setdefault(
+						(d.item_code, d.warehouse, d.voucher_type, d.voucher_no, d.voucher_detail_no), d
+					)
+					self.item_warehouses_with_sle.add((d.item_code, d.warehouse))
+
+	def has_stock_ledger_entries(self, item_code, warehouse):
+		if not (item_code and warehouse) or item_code in self.non_stock_items:
+			return False
+
+		key = (item_code, warehouse)
+		if key not in self.item_warehouses_with_sle:
+			if key in self.item_warehouses_without_sle:
+				return False
 
-			return self.sle[(item_code, warehouse)]
-		return []
+			if not frappe.db.exists(
+				"Stock Ledger Entry",
+				{
+					"company": self.filters.company,
+					"item_code": item_code,
+					"warehouse": warehouse,
+					"is_cancelled": 0,
+				},
+			):
+				self.item_warehouses_without_sle.add(key)
+				return False
+
+			self.item_warehouses_with_sle.add(key)
+
+		return True
+
+	def load_so_dn_incoming_rates(self):
+		"""Average incoming rate of the Delivery Note Items of each Sales Order Item"""
+		self.so_dn_incoming_rate = {}
+
+		so_details = {row.so_detail for row in self.si_list if row.sales_order and row.so_detail}
+		if not so_details:
+			return
+
+		delivery_note_item = qb.DocType("Delivery Note Item")
+		for batch in create_batch(sorted(so_details), 1000):
+			res = (
+				qb.from_(delivery_note_item)
+				.select(
+					delivery_note_item.against_sales_order,
+					delivery_note_item.so_detail,
+					delivery_note_item.item_code,
+					Avg(delivery_note_item.incoming_rate).as_("incoming_rate"),
+				)
+				.where(delivery_note_item.docstatus == 1)
+				.where(delivery_note_item.so_detail.isin(batch))
+				.groupby(
+					delivery_note_item.against_sales_order,
+					delivery_note_item.so_detail,
+					delivery_note_item.item_code,
+				)
+				.run(as_dict=True)
+			)
+
+			for d in res:
+				self.so_dn_incoming_rate[(d.against_sales_order, d.so_detail, d.item_code)] = flt(
+					d.incoming_rate
+				)
 
 	def load_product_bundle(self):
 		self.product_bundles = {}
@@ -605,3 +605,37 @@ class TestGrossProfit(FrappeTestCase):
 		item_from_sinv2 = [x for x in data if x.parent_invoice == sinv2.name]
 		self.assertEqual(len(item_from_sinv2), 1)
 		self.assertEqual(1800, item_from_sinv2[0].valuation_rate)
+
+	def test_buying_amount_of_each_invoice_from_its_own_sle(self):
+		"""
+		Test buying amount of invoices updating stock at different valuations
+		"""
+		make_stock_entry(
+			company=self.company, item_code=self.item, target=self.warehouse, qty=2, basic_rate=100
+		)
+
+		invoices = []
+		for basic_rate in (100, 400):
+			sinv = self.create_sales_invoice(qty=1, rate=1000, do_not_submit=True)
+			sinv.update_stock = 1
+			sinv.save().submit()
+			invoices.append(sinv)
+
+			make_stock_entry(
+				company=self.company, item_code=self.item, target=self.warehouse, qty=1, basic_rate=basic_rate
+			)
+
+		filters = frappe._dict(
+			company=self.company, from_date=nowdate(), to_date=nowdate(), group_by="Invoice"
+		)
+		_columns, data = execute(filters=filters)
+
+		for sinv in invoices:
+			stock_value_difference = frappe.db.get_value(
+				"Stock Ledger Entry",
+				{"voucher_type": "Sales Invoice", "voucher_no": sinv.name, "is_cancelled": 0},
+				"stock_value_difference",
+			)
+			gp_entry = [x for x in data if x.parent_invoice == sinv.name]
+			self.assertEqual(len(gp_entry), 1)
+			self.assertEqual(gp_entry[0].buying_amount, abs(stock_value_difference))
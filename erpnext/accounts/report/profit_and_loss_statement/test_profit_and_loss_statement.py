@@ -6,7 +6,13 @@ from frappe.tests.utils import FrappeTestCase
 from frappe.utils import getdate, today
 
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
-from erpnext.accounts.report.financial_statements import get_period_list
+from erpnext.accounts.report.financial_statements import (
+	calculate_values,
+	filter_accounts,
+	get_accounts,
+	get_period_list,
+	set_gl_entries_by_account,
+)
 from erpnext.accounts.report.profit_and_loss_statement.profit_and_loss_statement import execute
 from erpnext.accounts.test.accounts_mixin import AccountsTestMixin
 
@@ -90,3 +96,46 @@ class TestProfitAndLossStatement(AccountsTestMixin, FrappeTestCase):
 				with self.subTest(current_period_key=current_period_key):
 					self.assertEqual(acc[current_period_key], 150)
 					self.assertEqual(acc["total"], 150)
+
+	def test_period_totals_match_gl_entries(self):
+		self.create_sales_invoice(qty=1, rate=150)
+		self.create_sales_invoice(qty=2, rate=100)
+
+		filters = self.get_report_filters()
+		period_list = get_period_list(
+			filters.from_fiscal_year,
+			filters.to_fiscal_year,
+			filters.period_start_date,
+			filters.period_end_date,
+			filters.filter_based_on,
+			filters.periodicity,
+			company=filters.company,
+		)
+		root = frappe.db.get_value(
+			"Account",
+			{"company": self.company, "root_type": "Income", "parent_account": ("is", "not set")},
+			["lft", "rgt"],
+			as_dict=True,
+		)
+
+		def get_values(accumulated_values, aggregate):
+			gl_entries_by_account = {}
+			set_gl_entries_by_account(
+				self.company,
+				period_list[0].year_start_date,
+				period_list[-1].to_date,
+				root.lft,
+				root.rgt,
+				filters,
+				gl_entries_by_account,
+				root_type="Income",
+				period_list=period_list if aggregate else None,
+			)
+
+			accounts, accounts_by_name, _ = filter_accounts(get_accounts(self.company, "Income"))
+			calculate_values(accounts_by_name, gl_entries_by_account, period_list, accumulated_values, False)
+			return {d.name: [d.get(period.key, 0.0) for period in period_list] for d in accounts}
+
+		for accumulated_values in (0, 1):
+			with self.subTest(accumulated_values=accumulated_values):
+				self.assertEqual(get_values(accumulated_values, True), get_values(accumulated_values, False))
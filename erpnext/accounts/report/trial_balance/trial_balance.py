@@ -8,6 +8,7 @@ from frappe.query_builder.functions import Sum
 from frappe.utils import add_days, cstr, flt, formatdate, getdate
 
 import erpnext
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import get_gl_balance_doctype
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimension_with_children,
@@ -157,6 +158,7 @@ def get_rootwise_opening_balances(filters, report_type):
 		)
 
 	accounting_dimensions = get_accounting_dimensions(as_list=False)
+	balance_doctype = get_gl_balance_doctype()
 
 	if last_period_closing_voucher:
 		gle = get_opening_balance(
@@ -171,10 +173,10 @@ def get_rootwise_opening_balances(filters, report_type):
 		if getdate(last_period_closing_voucher[0].posting_date) < getdate(add_days(filters.from_date, -1)):
 			start_date = add_days(last_period_closing_voucher[0].posting_date, 1)
 			gle += get_opening_balance(
-				"GL Entry", filters, report_type, accounting_dimensions, start_date=start_date
+				balance_doctype, filters, report_type, accounting_dimensions, start_date=start_date
 			)
 	else:
-		gle = get_opening_balance("GL Entry", filters, report_type, accounting_dimensions)
+		gle = get_opening_balance(balance_doctype, filters, report_type, accounting_dimensions)
 
 	opening = frappe._dict()
 	for d in gle:
@@ -241,15 +243,15 @@ def get_opening_balance(
 	if (
 		not filters.show_unclosed_fy_pl_balances
 		and report_type == "Profit and Loss"
-		and doctype == "GL Entry"
+		and doctype != "Account Closing Balance"
 	):
 		opening_balance = opening_balance.where(closing_balance.posting_date >= filters.year_start_date)
 
 	if not flt(filters.with_period_closing_entry_for_opening):
-		if doctype == "Account Closing Balance":
-			opening_balance = opening_balance.where(closing_balance.is_period_closing_voucher_entry == 0)
-		else:
+		if doctype == "GL Entry":
 			opening_balance = opening_balance.where(closing_balance.voucher_type != "Period Closing Voucher")
+		else:
+			opening_balance = opening_balance.where(closing_balance.is_period_closing_voucher_entry == 0)
 
 	if filters.cost_center:
 		lft, rgt = frappe.db.get_value("Cost Center", filters.cost_center, ["lft", "rgt"])
@@ -0,0 +1,118 @@
+"""Benchmark of Bank Transaction matching for auto reconciliation.
+
+Not collected by the test runner. Run it against a site with
+
+	bench --site <site> execute erpnext.accounts.test.benchmark_bank_reconciliation.run --kwargs "{'bank_account': '<Bank Account>', 'transactions': 20000}"
+
+A synthetic statement and matching Payment Entries are rolled back at the end.
+Only matching is timed, reconciliations are not applied.
+"""
+
+import random
+import time
+
+import frappe
+from frappe.utils import add_days, cint, today
+
+from erpnext.accounts.doctype.bank_reconciliation_tool.auto_match_vouchers import AutoMatchVouchers
+from erpnext.accounts.doctype.bank_reconciliation_tool.bank_reconciliation_tool import (
+	get_bank_transactions,
+	get_linked_payments,
+)
+
+
+def make_synthetic_statement(bank_account, transactions=20000, matched=0.7, seed=42):
+	"""Bank Transactions over the last 30 days, `matched` of them with a Payment Entry of the same reference"""
+	rng = random.Random(seed)
+	bank = frappe.db.get_value("Bank Account", bank_account, ["account", "company"], as_dict=True)
+	currency = frappe.get_cached_value("Account", bank.account, "account_currency")
+
+	for i in range(transactions):
+		deposit = rng.random() < 0.5
+		amount = rng.randint(1, 10000)
+		date = add_days(today(), -rng.randint(0, 30))
+		reference_number = f"_BENCH-{i}"
+
+		frappe.get_doc(
+			{
+				"doctype": "Bank Transaction",
+				"name": f"_Benchmark Bank Transaction {i}",
+				"date": date,
+				"status": "Unreconciled",
+				"bank_account": bank_account,
+				"company": bank.company,
+				"currency": currency,
+				"deposit": amount if deposit else 0,
+				"withdrawal": 0 if deposit else amount,
+				"unallocated_amount": amount,
+				"reference_number": reference_number,
+				"docstatus": 1,
+			}
+		).db_insert()
+
+		if rng.random() < matched:
+			frappe.get_doc(
+				{
+					"doctype": "Payment Entry",
+					"name": f"_Benchmark Payment Entry {i}",
+					"payment_type": "Receive" if deposit else "Pay",
+					"posting_date": date,
+					"company": bank.company,
+					"paid_from": None if deposit else bank.account,
+					"paid_to": bank.account if deposit else None,
+					"paid_amount": amount,
+					"received_amount": amount,
+					"paid_amount_after_tax": amount,
+					"reference_no": reference_number,
+					"reference_date": date,
+					"docstatus": 1,
+				}
+			).db_insert()
+
+
+def benchmark_matching(bank_account, from_date, to_date, use_matcher=False):
+	"""Transactions matched per second, like `auto_reconcile_vouchers` matches them."""
+	frappe.flags.auto_reconcile_vouchers = True
+	matched = 0
+	start = time.perf_counter()
+
+	transactions = get_bank_transactions(bank_account)
+	if use_matcher:
+		matcher = AutoMatchVouchers(bank_account, from_date, to_date)
+		matcher.load(transactions)
+
+	for transaction in transactions:
+		if use_matcher:
+			linked_payments = matcher.get_linked_payments(transaction)
+		else:
+			linked_payments = get_linked_payments(
+				transaction.name, ["payment_entry", "journal_entry"], from_date, to_date
+			)
+		matched += bool(linked_payments)
+
+	elapsed = time.perf_counter() - start
+	frappe.flags.auto_reconcile_vouchers = False
+	return {
+		"transactions_per_second": round(len(transactions) / elapsed, 1),
+		"transactions_matched": matched,
+		"elapsed_s": round(elapsed, 3),
+	}
+
+
+def run(bank_account, transactions=20000):
+	make_synthetic_statement(bank_account, cint(transactions))
+	from_date, to_date = add_days(today(), -30), today()
+
+	results = {
+		"matcher": benchmark_matching(bank_account, from_date, to_date, use_matcher=True),
+		"query": benchmark_matching(bank_account, from_date, to_date),
+	}
+
+	frappe.db.rollback()
+
+	for name, result in results.items():
+		print(name)
+		for key, value in result.items():
+			print(f"\t{key}: {value}")
+
+	return results
@@ -0,0 +1,128 @@
+"""Benchmark of Pricing Rule lookups.
+
+Not collected by the test runner. Run it against a site with
+
+	bench --site <site> execute erpnext.accounts.test.benchmark_pricing_rule.run --kwargs "{'rules': 5000}"
+
+Synthetic rules are rolled back at the end.
+"""
+
+import random
+import time
+
+import frappe
+from frappe.utils import cint, today
+
+from erpnext.accounts.doctype.pricing_rule.utils import (
+	_get_pricing_rules,
+	_get_pricing_rules_from_index,
+	apply_on_table,
+	clear_pricing_rule_index,
+	get_pricing_rule_index,
+)
+
+
+def make_synthetic_pricing_rules(items, rules=5000, seed=42):
+	rng = random.Random(seed)
+	item_groups = frappe.get_all("Item Group", pluck="name")
+
+	for i in range(rules):
+		apply_on = "Item Group" if rng.random() < 0.1 else "Item Code"
+		value = rng.choice(item_groups) if apply_on == "Item Group" else rng.choice(items).item_code
+
+		rule = frappe.get_doc(
+			{
+				"doctype": "Pricing Rule",
+				"name": f"_Benchmark Pricing Rule {i}",
+				"title": f"_Benchmark Pricing Rule {i}",
+				"apply_on": apply_on,
+				"selling": 1,
+				"rate_or_discount": "Discount Percentage",
+				"discount_percentage": rng.randint(1, 20),
+				"priority": str(rng.randint(1, 20)),
+				"has_priority": 1,
+				"apply_multiple_pricing_rules": 1,
+				"valid_upto": "2020-01-01" if rng.random() < 0.3 else None,
+			}
+		)
+		rule.db_insert()
+
+		frappe.get_doc(
+			{
+				"doctype": f"Pricing Rule {apply_on}",
+				"parent": rule.name,
+				"parenttype": "Pricing Rule",
+				"parentfield": apply_on_table[apply_on],
+				frappe.scrub(apply_on): value,
+			}
+		).db_insert()
+
+
+def benchmark_get_pricing_rules(items, use_index=False):
+	"""Item rows resolved and rules matched per second, like `get_pricing_rules` does for each row."""
+	rows = matched = 0
+	start = time.perf_counter()
+
+	for item in items:
+		args = frappe._dict(
+			{
+				"item_code": item.item_code,
+				"item_group": item.item_group,
+				"brand": item.brand,
+				"transaction_type": "selling",
+				"transaction_date": today(),
+				"doctype": "Sales Order",
+			}
+		)
+
+		index = get_pricing_rule_index() if use_index else None
+		for apply_on in apply_on_table:
+			if use_index:
+				matched += len(_get_pricing_rules_from_index(index, apply_on, args))
+			else:
+				matched += len(_get_pricing_rules(apply_on, args, {}))
+
+		rows += 1
+
+	elapsed = time.perf_counter() - start
+	return {
+		"rows_per_second": round(rows / elapsed, 1),
+		"rules_per_second": round(matched / elapsed, 1),
+		"rules_matched": matched,
+	}
+
+
+def run(rules=5000, rows=200):
+	items = frappe.get_all(
+		"Item",
+		filters={"disabled": 0, "is_sales_item": 1, "has_variants": 0},
+		fields=["item_code", "item_group", "brand"],
+		limit=cint(rows),
+	)
+	if not items:
+		print("No sales items to benchmark with")
+		return
+
+	make_synthetic_pricing_rules(items, cint(rules))
+	clear_pricing_rule_index()
+
+	# build the index before timing lookups against it
+	start = time.perf_counter()
+	get_pricing_rule_index()
+	build_time = time.perf_counter() - start
+
+	results = {
+		"query": benchmark_get_pricing_rules(items),
+		"index": benchmark_get_pricing_rules(items, use_index=True),
+	}
+	results["index"]["build_s"] = round(build_time, 3)
+
+	frappe.db.rollback()
+	clear_pricing_rule_index()
+
+	for name, result in results.items():
+		print(name)
+		for key, value in result.items():
+			print(f"\t{key}: {value}")
+
+	return results
@@ -128,6 +128,39 @@ class TestUtils(unittest.TestCase):
 		self.assertEqual(len(payment_entry.references), 1)
 		self.assertEqual(payment_entry.difference_amount, 0)
 
+	def test_update_voucher_outstandings(self):
+		item = make_item().name
+		invoices = [make_purchase_invoice(item=item, rate=100 * (i + 1)) for i in range(3)]
+
+		payment_entry = get_payment_entry("Purchase Invoice", invoices[0].name)
+		payment_entry.references = []
+		for invoice in invoices:
+			payment_entry.append(
+				"references",
+				{
+					"reference_doctype": invoice.doctype,
+					"reference_name": invoice.name,
+					"allocated_amount": 50,
+				},
+			)
+		payment_entry.paid_amount = payment_entry.received_amount = 150
+		payment_entry.save().submit()
+
+		for invoice in invoices:
+			outstanding_amount, status = frappe.db.get_value(
+				invoice.doctype, invoice.name, ["outstanding_amount", "status"]
+			)
+			self.assertEqual(outstanding_amount, invoice.grand_total - 50)
+			self.assertEqual(status, "Partly Paid")
+
+		payment_entry.cancel()
+		for invoice in invoices:
+			outstanding_amount, status = frappe.db.get_value(
+				invoice.doctype, invoice.name, ["outstanding_amount", "status"]
+			)
+			self.assertEqual(outstanding_amount, invoice.grand_total)
+			self.assertEqual(status, "Unpaid")
+
 	def test_naming_series_variable_parsing(self):
 		"""
 		Tests parsing utility used by Naming Series Variable hook for FY
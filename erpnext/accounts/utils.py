@@ -9,7 +9,7 @@ import frappe
 import frappe.defaults
 from frappe import _, qb, throw
 from frappe.model.meta import get_field_precision
-from frappe.query_builder import AliasedQuery, Criterion, Table
+from frappe.query_builder import AliasedQuery, Case, Criterion, Table
 from frappe.query_builder.functions import Count, Sum
 from frappe.query_builder.utils import DocType
 from frappe.utils import (
@@ -32,9 +32,16 @@ import erpnext
 
 # imported to enable erpnext.accounts.utils.get_account_currency
 from erpnext.accounts.doctype.account.account import get_account_currency
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+	get_gl_balance_doctype,
+	remove_voucher_from_account_daily_balances,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_dimensions
+from erpnext.selling.doctype.customer_exposure.customer_exposure import (
+	remove_voucher_from_customer_exposures,
+)
 from erpnext.stock import get_warehouse_account_map
-from erpnext.stock.utils import get_stock_value_on
+from erpnext.stock.utils import get_combine_datetime, get_stock_value_on
 
 if TYPE_CHECKING:
 	from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import RepostItemValuation
@@ -50,6 +57,9 @@ class PaymentEntryUnlinkError(frappe.ValidationError):
 
 GL_REPOSTING_CHUNK = 100
 
+# vouchers whose outstanding is recomputed and written back together
+OUTSTANDING_UPDATE_BATCH_SIZE = 500
+
 
 @frappe.whitelist()
 def get_fiscal_year(
@@ -194,7 +204,10 @@ def get_balance_on(
 	if not cost_center and frappe.form_dict.get("cost_center"):
 		cost_center = frappe.form_dict.get("cost_center")
 
-	cond = ["is_cancelled=0"]
+	# party balances need the GL, account balances can be read from daily balances
+	balance_doctype = "GL Entry" if party_type and party else get_gl_balance_doctype()
+
+	cond = ["is_cancelled=0"] if balance_doctype == "GL Entry" else []
 	if start_date:
 		cond.append("posting_date >= %s" % frappe.db.escape(cstr(start_date)))
 	if date:
@@ -291,8 +304,8 @@ def get_balance_on(
 		bal = frappe.db.sql(
 			"""
 			SELECT {}
-			FROM `tabGL Entry` gle
-			WHERE {}""".format(select_field, " and ".join(cond)),
+			FROM `tab{}` gle
+			WHERE {}""".format(select_field, balance_doctype, " and ".join(cond)),
 			(precision, precision),
 		)[0][0]
 		# if bal is None, return 0
@@ -532,14 +545,18 @@ def reconcile_against_document(
 			create_payment_ledger_entry(gl_map, update_outstanding="No", cancel=0, adv_adj=1)
 
 		# Only update outstanding for newly linked vouchers
-		for entry in entries:
-			update_voucher_outstanding(
-				entry.against_voucher_type,
-				entry.against_voucher,
-				entry.account,
-				entry.party_type,
-				entry.party,
-			)
+		update_voucher_outstandings(
+			[
+				{
+					"voucher_type": entry.against_voucher_type,
+					"voucher_no": entry.against_voucher,
+					"account": entry.account,
+					"party_type": entry.party_type,
+					"party": entry.party,
+				}
+				for entry in entries
+			]
+		)
 		# update advance paid in Advance Receivable/Payable doctypes
 		if update_advance_paid:
 			for t, n in update_advance_paid:
@@ -1427,6 +1444,9 @@ def _delete_pl_entries(voucher_type, voucher_no):
 
 
 def _delete_gl_entries(voucher_type, voucher_no):
+	remove_voucher_from_account_daily_balances(voucher_type, voucher_no)
+	remove_voucher_from_customer_exposures(voucher_type, voucher_no)
+
 	gle = qb.DocType("GL Entry")
 	qb.from_(gle).delete().where((gle.voucher_type == voucher_type) & (gle.voucher_no == voucher_no)).run()
 
@@ -1479,11 +1499,11 @@ def get_future_stock_vouchers(posting_date, posting_time, for_warehouses=None, f
 		f"""select distinct sle.voucher_type, sle.voucher_no
 		from `tabStock Ledger Entry` sle
 		where
-			timestamp(sle.posting_date, sle.posting_time) >= timestamp(%s, %s)
+			sle.posting_datetime >= %s
 			and is_cancelled = 0
 			{condition}
-		order by timestamp(sle.posting_date, sle.posting_time) asc, creation asc for update""",
-		tuple([posting_date, posting_time, *values]),
+		order by sle.posting_datetime asc, creation asc for update""",
+		tuple([get_combine_datetime(posting_date, posting_time), *values]),
 		as_dict=True,
 	)
 
@@ -1773,6 +1793,7 @@ def create_payment_ledger_entry(
 ):
 	if gl_entries:
 		ple_map = get_payment_ledger_entries(gl_entries, cancel=cancel)
+		outstanding_vouchers = []
 
 		for entry in ple_map:
 			ple = frappe.get_doc(entry)
@@ -1783,9 +1804,29 @@ def create_payment_ledger_entry(
 			ple.flags.ignore_permissions = 1
 			ple.flags.adv_adj = adv_adj
 			ple.flags.from_repost = from_repost
-			ple.flags.update_outstanding = update_outstanding
+			# outstanding of against vouchers is updated once all entries are posted
+			ple.flags.update_outstanding = "No"
 			ple.submit()
 
+			if (
+				ple.against_voucher_type in ["Journal Entry", "Sales Invoice", "Purchase Invoice", "Fees"]
+				and update_outstanding == "Yes"
+				and not frappe.flags.is_reverse_depr_entry
+			):
+				outstanding_vouchers.append(
+					frappe._dict(
+						{
+							"voucher_type": ple.against_voucher_type,
+							"voucher_no": ple.against_voucher_no,
+							"account": ple.account,
+							"party_type": ple.party_type,
+							"party": ple.party,
+						}
+					)
+				)
+
+		update_voucher_outstandings(outstanding_vouchers)
+
 
 def update_voucher_outstanding(voucher_type, voucher_no, account, party_type, party):
 	ple = frappe.qb.DocType("Payment Ledger Entry")
@@ -1826,6 +1867,205 @@ def update_voucher_outstanding(voucher_type, voucher_no, account, party_type, pa
 		ref_doc.notify_update()
 
 
+def update_voucher_outstandings(vouchers):
+	"""
+	Set-based `update_voucher_outstanding` for many vouchers at once
+
+	vouchers - list of dicts with voucher_type, voucher_no, account, party_type and party
+
+	Outstanding of a batch of invoices is read from Payment Ledger with grouped queries and
+	written back, along with the resulting status, with bulk updates.
+	"""
+	vouchers_by_type = {}
+	for voucher in vouchers:
+		voucher = frappe._dict(voucher)
+		if not (voucher.party_type and voucher.party):
+			continue
+
+		if voucher.voucher_type in ["Sales Invoice", "Purchase Invoice"] and voucher.account:
+			key = (voucher.voucher_no, voucher.account, voucher.party_type, voucher.party)
+			vouchers_by_type.setdefault(voucher.voucher_type, {})[key] = None
+		elif voucher.voucher_type in ["Sales Invoice", "Purchase Invoice", "Fees"]:
+			update_voucher_outstanding(
+				voucher.voucher_type, voucher.voucher_no, voucher.account, voucher.party_type, voucher.party
+			)
+
+	for voucher_type, keys in vouchers_by_type.items():
+		for batch in create_batch(list(keys), OUTSTANDING_UPDATE_BATCH_SIZE):
+			ledger_outstanding = get_ledger_outstanding_map(voucher_type, {key[0] for key in batch})
+
+			# on cancellation a voucher can be left without ledger entries
+			outstandings = {key[0]: ledger_outstanding[key] for key in batch if key in ledger_outstanding}
+			if outstandings:
+				set_invoice_outstandings(voucher_type, outstandings)
+
+
+def get_ledger_outstanding_map(voucher_type, voucher_nos):
+	"""
+	Returns outstanding in account currency as per Payment Ledger, keyed on
+	(voucher_no, account, party_type, party) of each voucher that has ledger entries
+	"""
+	ple = qb.DocType("Payment Ledger Entry")
+
+	posted = (
+		qb.from_(ple)
+		.select(ple.voucher_no, ple.account, ple.party_type, ple.party)
+		.where((ple.delinked == 0) & (ple.voucher_type == voucher_type) & (ple.voucher_no.isin(voucher_nos)))
+		.groupby(ple.voucher_no, ple.account, ple.party_type, ple.party)
+		.run()
+	)
+
+	outstanding = (
+		qb.from_(ple)
+		.select(
+			ple.against_voucher_no,
+			ple.account,
+			ple.party_type,
+			ple.party,
+			Sum(ple.amount_in_account_currency),
+		)
+		.where(
+			(ple.delinked == 0)
+			& (ple.against_voucher_type == voucher_type)
+			& (ple.against_voucher_no.isin(voucher_nos))
+		)
+		.groupby(ple.against_voucher_no, ple.account, ple.party_type, ple.party)
+		.run()
+	)
+	outstanding_map = {tuple(row[:4]): row[4] for row in outstanding}
+
+	return {tuple(row): flt(outstanding_map.get(tuple(row))) for row in posted}
+
+
+def set_invoice_outstandings(voucher_type, outstandings):
+	"""
+	Write outstanding amounts ({invoice: outstanding}) of Sales or Purchase Invoices
+	and the status that results from them
+	"""
+	invoice = qb.DocType(voucher_type)
+	names = list(outstandings)
+	modified = now()
+
+	outstanding_amount = Case()
+	for name, amount in outstandings.items():
+		outstanding_amount = outstanding_amount.when(invoice.name == name, amount)
+
+	(
+		qb.update(invoice)
+		.set(invoice.outstanding_amount, outstanding_amount)
+		.set(invoice.modified, modified)
+		.set(invoice.modified_by, frappe.session.user)
+		.where(invoice.name.isin(names))
+		.run()
+	)
+
+	invoices_by_status = {}
+	for name, status in get_invoice_statuses(voucher_type, outstandings).items():
+		invoices_by_status.setdefault(status, []).append(name)
+
+	for status, invoices in invoices_by_status.items():
+		qb.update(invoice).set(invoice.status, status).where(invoice.name.isin(invoices)).run()
+
+	for name in names:
+		frappe.clear_document_cache(voucher_type, name)
+		frappe.publish_realtime(
+			"doc_update",
+			{"modified": modified, "doctype": voucher_type, "name": name},
+			doctype=voucher_type,
+			docname=name,
+			after_commit=True,
+		)
+
+	frappe.publish_realtime(
+		"list_update",
+		{"doctype": voucher_type, "name": names[-1], "user": frappe.session.user},
+		after_commit=True,
+	)
+
+
+def get_invoice_statuses(voucher_type, outstandings):
+	"""
+	Status of submitted Sales or Purchase Invoices for the given outstanding amounts,
+	decided like `set_status` of the invoice does
+	"""
+	from erpnext.accounts.doctype.sales_invoice.sales_invoice import (
+		get_submitted_invoice_status,
+		is_payment_overdue,
+	)
+
+	is_sales = voucher_type == "Sales Invoice"
+	internal_party_field = "is_internal_customer" if is_sales else "is_internal_supplier"
+	fields = [
+		"name",
+		"company",
+		"currency",
+		"party_account_currency",
+		"due_date",
+		"is_return",
+		"disable_rounded_total",
+		"grand_total",
+		"rounded_total",
+		"base_grand_total",
+		"base_rounded_total",
+		"represents_company",
+		internal_party_field,
+	]
+	if is_sales:
+		fields += ["is_pos", "is_discounted"]
+
+	names = list(outstandings)
+	invoices = frappe.get_all(voucher_type, filters={"name": ["in", names], "docstatus": 1}, fields=fields)
+
+	payment_schedules = {}
+	for term in frappe.get_all(
+		"Payment Schedule",
+		filters={"parenttype": voucher_type, "parent": ["in", names]},
+		fields=["parent", "due_date", "payment_amount", "base_payment_amount"],
+	):
+		payment_schedules.setdefault(term.parent, []).append(term)
+
+	with_returns = set(
+		frappe.get_all(
+			voucher_type,
+			filters={"is_return": 1, "return_against": ["in", names], "docstatus": 1},
+			pluck="return_against",
+		)
+	)
+
+	precision = {
+		fieldname: frappe.get_precision(voucher_type, fieldname)
+		for fieldname in [
+			"outstanding_amount",
+			"grand_total",
+			"rounded_total",
+			"base_grand_total",
+			"base_rounded_total",
+		]
+	}
+	statuses = {}
+	for inv in invoices:
+		outstanding_amount = flt(outstandings[inv.name], precision["outstanding_amount"])
+
+		total_fieldname = "grand_total" if inv.disable_rounded_total else "rounded_total"
+		if inv.party_account_currency != inv.currency:
+			total_fieldname = "base_" + total_fieldname
+		total = flt(inv.get(total_fieldname), precision[total_fieldname])
+
+		statuses[inv.name] = get_submitted_invoice_status(
+			voucher_type,
+			inv,
+			outstanding_amount,
+			total,
+			is_internal_transfer=bool(
+				inv.get(internal_party_field) and inv.represents_company == inv.company
+			),
+			is_overdue=is_payment_overdue(inv, outstanding_amount, total, payment_schedules.get(inv.name)),
+			has_return=inv.name in with_returns,
+		)
+
+	return statuses
+
+
 def delink_original_entry(pl_entry, partial_cancel=False):
 	if pl_entry:
 		ple = qb.DocType("Payment Ledger Entry")
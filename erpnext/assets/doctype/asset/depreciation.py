@@ -1,14 +1,16 @@
 # Copyright (c) 2016, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+import time
 
 import frappe
 from frappe import _
-from frappe.query_builder import Order
+from frappe.query_builder import Case, Order
 from frappe.query_builder.functions import Max, Min
 from frappe.utils import (
 	add_months,
 	cint,
+	cstr,
 	flt,
 	get_last_day,
 	get_link_to_form,
@@ -32,6 +34,9 @@ from erpnext.assets.doctype.asset_depreciation_schedule.asset_depreciation_sched
 	make_new_active_asset_depr_schedules_and_cancel_current_ones,
 )
 
+# due schedule rows posted per background job by `post_depreciation_entry_batch`
+DEPRECIATION_BATCH_SIZE = 500
+
 
 def post_depreciation_entries(date=None):
 	# Return if automatic booking of asset depreciation is disabled
@@ -43,11 +48,21 @@ def post_depreciation_entries(date=None):
 	if not date:
 		date = today()
 
+	if cint(frappe.db.get_single_value("Accounts Settings", "book_asset_depreciation_entries_in_batches")):
+		enqueue_depreciation_entry_batches(date)
+		return
+
+	post_depreciation_entries_for_asset_depr_schedules(get_depreciable_asset_depr_schedules_data(date), date)
+
+	frappe.db.commit()
+
+
+def post_depreciation_entries_for_asset_depr_schedules(depreciable_asset_depr_schedules_data, date):
+	"""Post a Journal Entry per due schedule row of each Asset Depreciation Schedule, committing
+	every schedule on its own and notifying about the ones that failed."""
 	failed_asset_names = []
 	error_log_names = []
 
-	depreciable_asset_depr_schedules_data = get_depreciable_asset_depr_schedules_data(date)
-
 	credit_and_debit_accounts_for_asset_category_and_company = {}
 	depreciation_cost_center_and_depreciation_series_for_company = (
 		get_depreciation_cost_center_and_depreciation_series_for_company()
@@ -102,8 +117,6 @@ def post_depreciation_entries(date=None):
 		set_depr_entry_posting_status_for_failed_assets(failed_asset_names)
 		notify_depr_entry_posting_error(failed_asset_names, error_log_names)
 
-	frappe.db.commit()
-
 
 def get_depreciable_asset_depr_schedules_data(date):
 	a = frappe.qb.DocType("Asset")
@@ -279,19 +292,326 @@ def _make_journal_entry_for_depreciation(
 	je.finance_book = asset_depr_schedule_doc.finance_book
 	je.remark = f"Depreciation Entry against {asset.name} worth {depr_schedule.depreciation_amount}"
 
+	for entry in get_depreciation_entry_accounts(
+		asset,
+		asset.name,
+		depr_schedule.depreciation_amount,
+		depreciation_cost_center,
+		credit_account,
+		debit_account,
+		accounting_dimensions,
+	):
+		je.append("accounts", entry)
+
+	je.flags.ignore_permissions = True
+	je.flags.planned_depr_entry = True
+	je.save()
+
+	depr_schedule.db_set("journal_entry", je.name)
+
+	if not je.meta.get_workflow():
+		je.submit()
+		asset.reload()
+		idx = cint(asset_depr_schedule_doc.finance_book_id)
+		row = asset.get("finance_books")[idx - 1]
+		row.value_after_depreciation -= depr_schedule.depreciation_amount
+		row.db_update()
+
+
+def get_asset_dimension_fields(accounting_dimensions):
+	meta = frappe.get_meta("Asset")
+	return list(
+		dict.fromkeys(
+			dimension["fieldname"]
+			for dimension in accounting_dimensions
+			if meta.has_field(dimension["fieldname"])
+		)
+	)
+
+
+def get_due_depreciation_schedules(date, dimension_fields, asset_names=None):
+	"""Due schedule rows without a Journal Entry, with what their Journal Entry is grouped by."""
+	a = frappe.qb.DocType("Asset")
+	ads = frappe.qb.DocType("Asset Depreciation Schedule")
+	ds = frappe.qb.DocType("Depreciation Schedule")
+
+	query = (
+		frappe.qb.from_(ads)
+		.join(a)
+		.on(ads.asset == a.name)
+		.join(ds)
+		.on(ads.name == ds.parent)
+		.select(
+			ds.name,
+			ds.idx,
+			ds.schedule_date,
+			ds.depreciation_amount,
+			ads.name.as_("asset_depr_schedule"),
+			ads.finance_book,
+			ads.finance_book_id,
+			a.name.as_("asset"),
+			a.asset_category,
+			a.company,
+			a.cost_center,
+			*[a[fieldname] for fieldname in dimension_fields],
+		)
+		.where(a.calculate_depreciation == 1)
+		.where(a.docstatus == 1)
+		.where(ads.docstatus == 1)
+		.where(a.status.isin(["Submitted", "Partially Depreciated"]))
+		.where(ds.journal_entry.isnull())
+		.where(ds.schedule_date <= date)
+		.orderby(a.creation, order=Order.desc)
+		.orderby(ds.idx)
+	)
+
+	acc_frozen_upto = get_acc_frozen_upto()
+	if acc_frozen_upto:
+		query = query.where(ds.schedule_date > acc_frozen_upto)
+
+	if asset_names:
+		query = query.where(a.name.isin(asset_names))
+
+	return query.run(as_dict=True)
+
+
+def get_depreciation_entry_group(schedule, dimension_fields):
+	"""Key of the consolidated Journal Entry a due schedule row is posted in."""
+	return (
+		schedule.company,
+		cstr(schedule.finance_book),
+		schedule.asset_category,
+		cstr(schedule.schedule_date),
+		*[cstr(schedule.get(fieldname)) for fieldname in dimension_fields],
+	)
+
+
+def enqueue_depreciation_entry_batches(date):
+	"""Split the due schedule rows over background jobs that post consolidated Journal Entries.
+
+	All the rows of an asset go to the same job, so jobs never update the same asset and can run
+	in parallel. Assets are taken in the order of their Journal Entry group, so the rows of a job
+	mostly end up in few Journal Entries.
+	"""
+	dimension_fields = get_asset_dimension_fields(get_checks_for_pl_and_bs_accounts())
+
+	schedules_per_asset = {}
+	for schedule in sorted(
+		get_due_depreciation_schedules(date, dimension_fields),
+		key=lambda d: get_depreciation_entry_group(d, dimension_fields),
+	):
+		schedules_per_asset[schedule.asset] = schedules_per_asset.get(schedule.asset, 0) + 1
+
+	asset_names, schedule_count = [], 0
+	for asset_name, count in schedules_per_asset.items():
+		asset_names.append(asset_name)
+		schedule_count += count
+
+		if schedule_count >= DEPRECIATION_BATCH_SIZE:
+			enqueue_depreciation_entry_batch(asset_names, date)
+			asset_names, schedule_count = [], 0
+
+	if asset_names:
+		enqueue_depreciation_entry_batch(asset_names, date)
+
+
+def enqueue_depreciation_entry_batch(asset_names, date):
+	frappe.enqueue(
+		post_depreciation_entry_batch,
+		queue="long",
+		timeout=7200,
+		asset_names=asset_names,
+		date=date,
+		enqueue_after_commit=True,
+		now=frappe.flags.in_test,
+	)
+
+
+def post_depreciation_entry_batch(asset_names, date):
+	"""Post the due schedule rows of some assets in consolidated Journal Entries.
+
+	Each Journal Entry is committed on its own, if one fails its schedule rows are posted per
+	asset like `post_depreciation_entries` does, so a single asset can not hold back the others.
+	Rows are read again, so a job can be run again after it was interrupted.
+	"""
+	start = time.monotonic()
+
+	accounting_dimensions = get_checks_for_pl_and_bs_accounts()
+	dimension_fields = get_asset_dimension_fields(accounting_dimensions)
+	depreciation_cost_center_and_depreciation_series_for_company = (
+		get_depreciation_cost_center_and_depreciation_series_for_company()
+	)
+
+	groups = {}
+	for schedule in get_due_depreciation_schedules(date, dimension_fields, asset_names):
+		groups.setdefault(get_depreciation_entry_group(schedule, dimension_fields), []).append(schedule)
+
+	stats = frappe._dict(journal_entries=0, schedules=0, fallback_schedules=0)
+	for schedules in groups.values():
+		company, asset_category = schedules[0].company, schedules[0].asset_category
+
+		try:
+			journal_entry = make_batch_depreciation_entry(
+				schedules,
+				get_credit_and_debit_accounts_for_asset_category_and_company(asset_category, company),
+				depreciation_cost_center_and_depreciation_series_for_company[company],
+				accounting_dimensions,
+			)
+			frappe.db.commit()
+		except Exception:
+			frappe.db.rollback()
+			post_depreciation_entries_for_asset_depr_schedules(get_asset_depr_schedules_data(schedules), date)
+			frappe.db.commit()
+			stats.fallback_schedules += len(schedules)
+		else:
+			if journal_entry:
+				stats.journal_entries += 1
+				stats.schedules += len(schedules)
+
+	log_depreciation_posting_stats(asset_names, stats, time.monotonic() - start)
+
+
+def get_asset_depr_schedules_data(schedules):
+	"""Schedule rows in the shape of `get_depreciable_asset_depr_schedules_data`."""
+	idx_per_asset_depr_schedule = {}
+	for d in schedules:
+		key = (d.asset_depr_schedule, d.asset, d.asset_category, d.company)
+		idx_per_asset_depr_schedule.setdefault(key, []).append(d.idx)
+
+	return [
+		(*asset_depr_schedule, min(idx) - 1, max(idx))
+		for asset_depr_schedule, idx in idx_per_asset_depr_schedule.items()
+	]
+
+
+def make_batch_depreciation_entry(
+	schedules,
+	credit_and_debit_accounts,
+	depreciation_cost_center_and_depreciation_series,
+	accounting_dimensions,
+):
+	"""One Journal Entry for due schedule rows of the same group, with the rows of every asset
+	referencing it. The schedule rows and asset values are updated in bulk."""
+	ds = frappe.qb.DocType("Depreciation Schedule")
+
+	# lock the rows, a run still in flight may have posted them
+	unposted = set(
+		frappe.qb.from_(ds)
+		.select(ds.name)
+		.where(ds.name.isin([d.name for d in schedules]) & ds.journal_entry.isnull())
+		.for_update()
+		.run(pluck=True)
+	)
+	schedules = [d for d in schedules if d.name in unposted]
+	if not schedules:
+		return
+
+	credit_account, debit_account = credit_and_debit_accounts
+	depreciation_cost_center, depreciation_series = depreciation_cost_center_and_depreciation_series
+	asset_names = list(dict.fromkeys(d.asset for d in schedules))
+
+	je = frappe.new_doc("Journal Entry")
+	je.voucher_type = "Depreciation Entry"
+	je.naming_series = depreciation_series
+	je.posting_date = schedules[0].schedule_date
+	je.company = schedules[0].company
+	je.finance_book = schedules[0].finance_book
+	total_depreciation = sum(flt(d.depreciation_amount) for d in schedules)
+	je.remark = f"Depreciation Entry against {len(asset_names)} assets worth {total_depreciation}"
+
+	for d in schedules:
+		for entry in get_depreciation_entry_accounts(
+			d,
+			d.asset,
+			d.depreciation_amount,
+			d.cost_center or depreciation_cost_center,
+			credit_account,
+			debit_account,
+			accounting_dimensions,
+		):
+			je.append("accounts", entry)
+
+	je.flags.ignore_permissions = True
+	je.flags.planned_depr_entry = True
+	je.save()
+
+	frappe.qb.update(ds).set(ds.journal_entry, je.name).where(ds.name.isin([d.name for d in schedules])).run()
+
+	if not je.meta.get_workflow():
+		# `submit` enqueues entries with more than 100 rows, this already runs in a background job
+		je._submit()
+		update_value_after_depreciation(schedules)
+
+	for asset_name in asset_names:
+		frappe.get_doc("Asset", asset_name).set_status()
+
+	asset = frappe.qb.DocType("Asset")
+	frappe.qb.update(asset).set(asset.depr_entry_posting_status, "Successful").where(
+		asset.name.isin(asset_names)
+	).run()
+
+	return je
+
+
+def update_value_after_depreciation(schedules):
+	"""Subtract the depreciation of the schedule rows from the finance books of their assets."""
+	depreciation_amounts = {}
+	for d in schedules:
+		key = (d.asset, cint(d.finance_book_id))
+		depreciation_amounts[key] = depreciation_amounts.get(key, 0.0) + flt(d.depreciation_amount)
+
+	afb = frappe.qb.DocType("Asset Finance Book")
+	value_after_depreciation = Case()
+	for (asset_name, finance_book_id), depreciation_amount in depreciation_amounts.items():
+		value_after_depreciation = value_after_depreciation.when(
+			(afb.parent == asset_name) & (afb.idx == finance_book_id),
+			afb.value_after_depreciation - depreciation_amount,
+		)
+
+	(
+		frappe.qb.update(afb)
+		.set(afb.value_after_depreciation, value_after_depreciation.else_(afb.value_after_depreciation))
+		.where((afb.parenttype == "Asset") & (afb.parent.isin(list({d.asset for d in schedules}))))
+	).run()
+
+
+def log_depreciation_posting_stats(asset_names, stats, elapsed):
+	"""Log throughput of batched depreciation posting."""
+	schedules = stats.schedules + stats.fallback_schedules
+	frappe.logger("depreciation", allow_site=True).info(
+		{
+			"assets": len(asset_names),
+			**stats,
+			"seconds": round(elapsed, 2),
+			"schedules_per_second": round(schedules / elapsed, 1) if elapsed else schedules,
+		}
+	)
+
+
+def get_depreciation_entry_accounts(
+	asset,
+	asset_name,
+	depreciation_amount,
+	depreciation_cost_center,
+	credit_account,
+	debit_account,
+	accounting_dimensions,
+):
+	"""Credit and debit rows of a depreciation Journal Entry for an asset, `asset` is anything
+	with the accounting dimensions of the Asset."""
 	credit_entry = {
 		"account": credit_account,
-		"credit_in_account_currency": depr_schedule.depreciation_amount,
+		"credit_in_account_currency": depreciation_amount,
 		"reference_type": "Asset",
-		"reference_name": asset.name,
+		"reference_name": asset_name,
 		"cost_center": depreciation_cost_center,
 	}
 
 	debit_entry = {
 		"account": debit_account,
-		"debit_in_account_currency": depr_schedule.depreciation_amount,
+		"debit_in_account_currency": depreciation_amount,
 		"reference_type": "Asset",
-		"reference_name": asset.name,
+		"reference_name": asset_name,
 		"cost_center": depreciation_cost_center,
 	}
 
@@ -312,22 +632,7 @@ def _make_journal_entry_for_depreciation(
 				}
 			)
 
-	je.append("accounts", credit_entry)
-	je.append("accounts", debit_entry)
-
-	je.flags.ignore_permissions = True
-	je.flags.planned_depr_entry = True
-	je.save()
-
-	depr_schedule.db_set("journal_entry", je.name)
-
-	if not je.meta.get_workflow():
-		je.submit()
-		asset.reload()
-		idx = cint(asset_depr_schedule_doc.finance_book_id)
-		row = asset.get("finance_books")[idx - 1]
-		row.value_after_depreciation -= depr_schedule.depreciation_amount
-		row.db_update()
+	return credit_entry, debit_entry
 
 
 def get_depreciation_accounts(asset_category, company):
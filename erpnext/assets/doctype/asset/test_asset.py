@@ -4,6 +4,7 @@
 import unittest
 
 import frappe
+from frappe.tests.utils import change_settings
 from frappe.utils import (
 	add_days,
 	add_months,
@@ -1227,6 +1228,54 @@ class TestDepreciationBasics(AssetSetup):
 		self.assertFalse(depr_schedule[1].journal_entry)
 		self.assertFalse(depr_schedule[2].journal_entry)
 
+	@change_settings("Accounts Settings", {"book_asset_depreciation_entries_in_batches": 1})
+	def test_post_depreciation_entries_in_batches(self):
+		"""Tests if due depreciation of assets of the same category is posted in one Journal Entry."""
+
+		assets = [
+			create_asset(
+				item_code="Macbook Pro",
+				calculate_depreciation=1,
+				available_for_use_date="2019-12-31",
+				depreciation_start_date="2020-12-31",
+				frequency_of_depreciation=12,
+				total_number_of_depreciations=3,
+				expected_value_after_useful_life=10000,
+				submit=1,
+			)
+			for _ in range(2)
+		]
+
+		post_depreciation_entries(date="2021-06-01")
+
+		depr_schedules = [get_depr_schedule(asset.name, "Active") for asset in assets]
+		journal_entry = depr_schedules[0][0].journal_entry
+
+		self.assertTrue(journal_entry)
+		self.assertEqual(depr_schedules[1][0].journal_entry, journal_entry)
+		self.assertFalse(depr_schedules[0][1].journal_entry)
+
+		je = frappe.get_doc("Journal Entry", journal_entry)
+		self.assertEqual(je.docstatus, 1)
+		self.assertTrue({asset.name for asset in assets} <= {d.reference_name for d in je.accounts})
+
+		for asset, depr_schedule in zip(assets, depr_schedules, strict=True):
+			asset.load_from_db()
+			self.assertEqual(
+				asset.finance_books[0].value_after_depreciation,
+				asset.gross_purchase_amount - depr_schedule[0].depreciation_amount,
+			)
+			self.assertEqual(asset.finance_books[0].total_number_of_booked_depreciations, 1)
+			self.assertEqual(asset.status, "Partially Depreciated")
+			self.assertEqual(asset.depr_entry_posting_status, "Successful")
+
+		je.cancel()
+
+		for asset in assets:
+			asset.load_from_db()
+			self.assertFalse(get_depr_schedule(asset.name, "Active")[0].journal_entry)
+			self.assertEqual(asset.finance_books[0].value_after_depreciation, asset.gross_purchase_amount)
+
 	def test_depr_entry_posting_when_depr_expense_account_is_an_expense_account(self):
 		"""Tests if the Depreciation Expense Account gets debited and the Accumulated Depreciation Account gets credited when the former's an Expense Account."""
 
@@ -28,6 +28,9 @@ from frappe.utils import (
 )
 
 import erpnext
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+	remove_voucher_from_account_daily_balances,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimensions,
@@ -36,6 +39,7 @@ from erpnext.accounts.doctype.pricing_rule.utils import (
 	apply_pricing_rule_for_free_items,
 	apply_pricing_rule_on_transaction,
 	get_applied_pricing_rules,
+	pricing_rule_batch,
 )
 from erpnext.accounts.general_ledger import get_round_off_account_and_cost_center
 from erpnext.accounts.party import (
@@ -58,6 +62,9 @@ from erpnext.controllers.print_settings import (
 )
 from erpnext.controllers.sales_and_purchase_return import validate_return
 from erpnext.exceptions import InvalidCurrency
+from erpnext.selling.doctype.customer_exposure.customer_exposure import (
+	remove_voucher_from_customer_exposures,
+)
 from erpnext.setup.utils import get_exchange_rate
 from erpnext.stock.doctype.item.item import get_uom_conv_factor
 from erpnext.stock.doctype.packed_item.packed_item import make_packing_list
@@ -367,6 +374,8 @@ class AccountsController(TransactionBase):
 					== 1
 				)
 			).run()
+			remove_voucher_from_account_daily_balances(self.doctype, self.name)
+			remove_voucher_from_customer_exposures(self.doctype, self.name)
 			frappe.db.sql(
 				"delete from `tabGL Entry` where voucher_type=%s and voucher_no=%s", (self.doctype, self.name)
 			)
@@ -704,6 +713,7 @@ class AccountsController(TransactionBase):
 					self.currency, self.company_currency, transaction_date, args
 				)
 
+	@pricing_rule_batch()
 	def set_missing_item_details(self, for_validate=False):
 		"""set missing item values"""
 		from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos
@@ -14,6 +14,10 @@ from frappe.utils import nowdate, today, unique
 from pypika import Order
 
 import erpnext
+from erpnext.stock.doctype.item_search_token.item_search_token import (
+	get_item_search_query,
+	is_item_search_index_ready,
+)
 from erpnext.stock.get_item_details import _get_item_tax_template
 
 
@@ -192,6 +196,35 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 			filters.pop("customer", None)
 			filters.pop("supplier", None)
 
+	if is_item_search_index_ready() and (search_query := get_item_search_query(txt)):
+		return frappe.db.sql(
+			"""select
+				tabItem.name {columns}
+			from tabItem
+				inner join ({search_query}) item_search on item_search.search_item_code = tabItem.name
+			where tabItem.docstatus < 2
+				and tabItem.disabled=0
+				and tabItem.has_variants=0
+				and (tabItem.end_of_life > %(today)s or ifnull(tabItem.end_of_life, '0000-00-00')='0000-00-00')
+				{fcond} {mcond}
+			order by
+				item_search.search_score desc,
+				idx desc,
+				name, item_name
+			limit %(start)s, %(page_len)s """.format(
+				columns=columns,
+				search_query=search_query,
+				fcond=get_filters_cond(doctype, filters, conditions).replace("%", "%%"),
+				mcond=get_match_cond(doctype).replace("%", "%%"),
+			),
+			{
+				"today": nowdate(),
+				"start": start,
+				"page_len": page_len,
+			},
+			as_dict=as_dict,
+		)
+
 	description_cond = ""
 	if frappe.db.count(doctype, cache=True) < 50000:
 		# scan description only if items are less than 50000
@@ -7,6 +7,11 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.utils import comma_or, flt, get_link_to_form, getdate, now, nowdate
 
+from erpnext.selling.doctype.customer_exposure.customer_exposure import (
+	EXPOSURE_VOUCHER_TYPES,
+	update_voucher_exposure,
+)
+
 
 class OverAllowanceError(frappe.ValidationError):
 	pass
@@ -488,6 +493,12 @@ class StatusUpdater(Document):
 				target.set_status(update=True)
 				target.notify_update()
 
+			if (
+				args["target_parent_dt"] in EXPOSURE_VOUCHER_TYPES
+				and args["target_parent_field"] == "per_billed"
+			):
+				update_voucher_exposure(args["target_parent_dt"], args["name"])
+
 	def _update_modified(self, args, update_modified):
 		if not update_modified:
 			args["update_modified"] = ""
@@ -556,6 +567,9 @@ class StatusUpdater(Document):
 
 			ref_doc.set_status(update=True)
 
+			if ref_dt in EXPOSURE_VOUCHER_TYPES:
+				update_voucher_exposure(ref_dt, ref_dn)
+
 
 @frappe.request_cache
 def get_allowance_for(
@@ -29,6 +29,7 @@ from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle impor
 	get_type_of_transaction,
 )
 from erpnext.stock.stock_ledger import get_items_to_be_repost
+from erpnext.stock.utils import get_combine_datetime
 
 
 class QualityInspectionRequiredError(frappe.ValidationError):
@@ -1567,14 +1568,13 @@ def future_sle_exists(args, sl_entries=None, allow_force_reposting=True):
 		from `tabStock Ledger Entry` force index (item_warehouse)
 		where
 			({})
-			and timestamp(posting_date, posting_time)
-				>= timestamp(%(posting_date)s, %(posting_time)s)
+			and posting_datetime >= %(posting_datetime)s
 			and voucher_no != %(voucher_no)s
 			and is_cancelled = 0
 		GROUP BY
 			item_code, warehouse
 		""".format(" or ".join(or_conditions)),
-		args,
+		{**args, "posting_datetime": get_combine_datetime(args["posting_date"], args["posting_time"])},
 		as_dict=1,
 	)
 
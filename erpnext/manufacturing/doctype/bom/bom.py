@@ -20,6 +20,11 @@ from erpnext.stock.get_item_details import get_conversion_factor, get_price_list
 
 form_grid_templates = {"items": "templates/form_grid/item_grid.html"}
 
+BOM_EXPLOSION_CACHE_KEY = "bom_explosion"
+
+# bump when the shape of cached explosions changes
+BOM_EXPLOSION_VERSION = 1
+
 
 class BOMRecursionError(frappe.ValidationError):
 	pass
@@ -45,20 +50,26 @@ class BOMTree:
 			self.__create_tree()
 
 	def __create_tree(self):
-		bom = frappe.get_cached_doc("BOM", self.name)
-		self.item_code = bom.item
-		self.bom_qty = bom.quantity
-
-		for item in bom.get("items", []):
-			qty = item.stock_qty / bom.quantity  # quantity per unit
-			exploded_qty = self.exploded_qty * qty
-			if item.bom_no:
-				child = BOMTree(item.bom_no, exploded_qty=exploded_qty, qty=qty)
-				self.child_items.append(child)
-			else:
-				self.child_items.append(
-					BOMTree(item.item_code, is_bom=False, exploded_qty=exploded_qty, qty=qty)
-				)
+		explosion = get_bom_explosion(self.name)
+		self.item_code = explosion.item
+		self.bom_qty = explosion.quantity
+
+		# nodes are in depth-first order, the parent of a node is the last BOM one level up
+		parents = [self]
+		for node in explosion.nodes:
+			del parents[node.indent + 1 :]
+			parent = parents[-1]
+
+			qty = node.qty_per_unit
+			child = BOMTree(node.item_code, is_bom=False, exploded_qty=parent.exploded_qty * qty, qty=qty)
+			if node.bom_no:
+				child.name = node.bom_no
+				child.is_bom = True
+				child.item_code = node.bom_item
+				child.bom_qty = node.bom_quantity
+				parents.append(child)
+
+			parent.child_items.append(child)
 
 	def level_order_traversal(self) -> list["BOMTree"]:
 		"""Get level order traversal of tree.
@@ -271,6 +282,7 @@ class BOM(WebsiteGenerator):
 	def on_submit(self):
 		self.manage_default_bom()
 		self.update_bom_creator_status()
+		clear_bom_explosion_cache()
 
 	def on_cancel(self):
 		self.db_set("is_active", 0)
@@ -280,6 +292,7 @@ class BOM(WebsiteGenerator):
 		self.validate_bom_links()
 		self.manage_default_bom()
 		self.update_bom_creator_status()
+		clear_bom_explosion_cache()
 
 	def update_bom_creator_status(self):
 		if not self.bom_creator:
@@ -300,6 +313,7 @@ class BOM(WebsiteGenerator):
 	def on_update_after_submit(self):
 		self.validate_bom_links()
 		self.manage_default_bom()
+		clear_bom_explosion_cache()
 
 	def get_item_det(self, item_code):
 		item = get_item_details(item_code)
@@ -1256,6 +1270,115 @@ def get_children(parent=None, is_root=False, **filters):
 		return bom_items
 
 
+def get_bom_explosion(bom_no: str) -> frappe._dict:
+	"""Items of all levels of a BOM with the qty needed per unit of the BOM.
+
+	`nodes` are the BOM Items in depth-first order with their `indent`,
+	`leaf_qty` is the qty of each item without a BOM per unit. Explosions of
+	submitted BOMs are cached until any BOM is submitted, cancelled or replaced.
+	"""
+	explosion = frappe.cache().hget(BOM_EXPLOSION_CACHE_KEY, bom_no)
+	if explosion and explosion.version == BOM_EXPLOSION_VERSION:
+		return explosion
+
+	explosion = build_bom_explosion(bom_no)
+	if explosion.docstatus == 1:
+		frappe.cache().hset(BOM_EXPLOSION_CACHE_KEY, bom_no, explosion)
+
+	return explosion
+
+
+def clear_bom_explosion_cache():
+	# explosions include child BOMs, so every cached explosion may be affected
+	frappe.cache().delete_key(BOM_EXPLOSION_CACHE_KEY)
+
+
+def build_bom_explosion(bom_no: str) -> frappe._dict:
+	boms, bom_items = {}, {}
+
+	# fetch a level of child BOMs at a time
+	to_fetch = {bom_no}
+	while to_fetch:
+		for bom in frappe.get_all(
+			"BOM",
+			filters={"name": ("in", list(to_fetch))},
+			fields=["name", "item", "quantity", "docstatus"],
+		):
+			boms[bom.name] = bom
+
+		children = set()
+		for row in frappe.get_all(
+			"BOM Item",
+			filters={"parent": ("in", list(to_fetch)), "parenttype": "BOM"},
+			fields=[
+				"parent",
+				"item_code",
+				"item_name",
+				"description",
+				"bom_no",
+				"qty",
+				"uom",
+				"stock_qty",
+				"stock_uom",
+			],
+			order_by="idx",
+		):
+			bom_items.setdefault(row.parent, []).append(row)
+			if row.bom_no:
+				children.add(row.bom_no)
+
+		to_fetch = children - set(boms) - to_fetch
+
+	def get_bom(name):
+		if name not in boms:
+			frappe.throw(_("BOM {0} does not exist").format(name), frappe.DoesNotExistError)
+
+		return boms[name]
+
+	root = get_bom(bom_no)
+	explosion = frappe._dict(
+		{
+			"version": BOM_EXPLOSION_VERSION,
+			"name": root.name,
+			"item": root.item,
+			"quantity": root.quantity,
+			"docstatus": root.docstatus,
+			"nodes": [],
+			"leaf_qty": {},
+		}
+	)
+
+	def add_nodes(bom_name, indent, exploded_qty, parent_qty):
+		bom = get_bom(bom_name)
+		for row in bom_items.get(bom_name, []):
+			node = frappe._dict(row)
+			node.update(
+				{
+					"indent": indent,
+					"parent_bom": bom.name,
+					"parent_item_code": bom.item,
+					"parent_bom_qty": bom.quantity,
+					"parent_qty": parent_qty,
+					"qty_per_unit": row.stock_qty / bom.quantity,
+				}
+			)
+			node.exploded_qty = exploded_qty * node.qty_per_unit
+			explosion.nodes.append(node)
+
+			if row.bom_no:
+				node.bom_item = get_bom(row.bom_no).item
+				node.bom_quantity = get_bom(row.bom_no).quantity
+				add_nodes(row.bom_no, indent + 1, node.exploded_qty, row.qty)
+			else:
+				explosion.leaf_qty[row.item_code] = (
+					explosion.leaf_qty.get(row.item_code, 0.0) + node.exploded_qty
+				)
+
+	add_nodes(bom_no, 0, 1.0, 1.0)
+
+	return explosion
+
+
 def add_additional_cost(stock_entry, work_order):
 	# Add non stock items cost in the additional cost
 	stock_entry.additional_costs = []
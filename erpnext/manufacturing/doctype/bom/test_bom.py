@@ -12,7 +12,12 @@ from frappe.utils import cstr, flt
 from erpnext.controllers.tests.test_subcontracting_controller import (
 	set_backflush_based_on,
 )
-from erpnext.manufacturing.doctype.bom.bom import BOMRecursionError, item_query, make_variant_bom
+from erpnext.manufacturing.doctype.bom.bom import (
+	BOMRecursionError,
+	get_bom_explosion,
+	item_query,
+	make_variant_bom,
+)
 from erpnext.manufacturing.doctype.bom_update_log.test_bom_update_log import (
 	update_cost_in_all_boms_in_test,
 )
@@ -344,6 +349,36 @@ class TestBOM(FrappeTestCase):
 		for reqd_item, created_item in zip(reqd_order, created_order, strict=False):
 			self.assertEqual(reqd_item, created_item.item_code)
 
+	def test_bom_explosion_cache(self):
+		bom_tree = {
+			"Assembly": {
+				"SubAssembly1": {"ChildPart1": {}, "ChildPart2": {}},
+				"ChildPart3": {},
+			}
+		}
+		prefix = "_Test explosion "
+		parent_bom = create_nested_bom(bom_tree, prefix=prefix)
+
+		explosion = get_bom_explosion(parent_bom.name)
+		self.assertEqual(
+			[(d.item_code, d.indent) for d in explosion.nodes],
+			[
+				(prefix + "SubAssembly1", 0),
+				(prefix + "ChildPart1", 1),
+				(prefix + "ChildPart2", 1),
+				(prefix + "ChildPart3", 0),
+			],
+		)
+		self.assertEqual(
+			explosion.leaf_qty,
+			{prefix + "ChildPart1": 1, prefix + "ChildPart2": 1, prefix + "ChildPart3": 1},
+		)
+		self.assertEqual(frappe.cache().hget("bom_explosion", parent_bom.name), explosion)
+
+		# cached explosions are cleared when a BOM is cancelled
+		parent_bom.cancel()
+		self.assertIsNone(frappe.cache().hget("bom_explosion", parent_bom.name))
+
 	@timeout
 	def test_generated_variant_bom(self):
 		from erpnext.controllers.item_variant import create_variant
@@ -12,6 +12,8 @@ if TYPE_CHECKING:
 import frappe
 from frappe import _
 
+from erpnext.manufacturing.doctype.bom.bom import clear_bom_explosion_cache
+
 
 def replace_bom(boms: dict, log_name: str) -> None:
 	"Replace current BOM with new BOM in parent BOMs."
@@ -23,6 +25,7 @@ def replace_bom(boms: dict, log_name: str) -> None:
 	update_new_bom_in_bom_items(unit_cost, current_bom, new_bom)
 
 	frappe.cache().delete_key("bom_children")
+	clear_bom_explosion_cache()
 	parent_boms = get_ancestor_boms(new_bom)
 
 	for bom in parent_boms:
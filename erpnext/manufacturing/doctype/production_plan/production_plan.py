@@ -23,8 +23,7 @@ from frappe.utils import (
 from frappe.utils.csvutils import build_csv_response
 from pypika.terms import ExistsCriterion
 
-from erpnext.manufacturing.doctype.bom.bom import get_children as get_bom_children
-from erpnext.manufacturing.doctype.bom.bom import validate_bom_no
+from erpnext.manufacturing.doctype.bom.bom import get_bom_explosion, validate_bom_no
 from erpnext.manufacturing.doctype.work_order.work_order import get_item_details
 from erpnext.setup.doctype.item_group.item_group import get_item_group_defaults
 from erpnext.stock.get_item_details import get_conversion_factor
@@ -927,6 +926,9 @@ class ProductionPlan(Document):
 		self.sub_assembly_items = []
 		sub_assembly_items_store = []  # temporary store to process all subassembly items
 
+		# items and bins shared by the sub assemblies of all rows
+		prefetched = {}
+
 		for row in self.po_items:
 			if self.skip_available_sub_assembly_item and not self.sub_assembly_warehouse:
 				frappe.throw(_("Row #{0}: Please select the Sub Assembly Warehouse").format(row.idx))
@@ -940,7 +942,14 @@ class ProductionPlan(Document):
 			bom_data = []
 
 			warehouse = (self.sub_assembly_warehouse) if self.skip_available_sub_assembly_item else None
-			get_sub_assembly_items(row.bom_no, bom_data, row.planned_qty, self.company, warehouse=warehouse)
+			get_sub_assembly_items(
+				row.bom_no,
+				bom_data,
+				row.planned_qty,
+				self.company,
+				warehouse=warehouse,
+				prefetched=prefetched,
+			)
 			self.set_sub_assembly_items_based_on_level(row, bom_data, manufacturing_type)
 			sub_assembly_items_store.extend(bom_data)
 
@@ -1722,47 +1731,114 @@ def get_item_data(item_code):
 	}
 
 
-def get_sub_assembly_items(bom_no, bom_data, to_produce_qty, company, warehouse=None, indent=0):
-	data = get_bom_children(parent=bom_no)
-	for d in data:
-		if d.expandable:
-			parent_item_code = frappe.get_cached_value("BOM", bom_no, "item")
-			stock_qty = (d.stock_qty / d.parent_bom_qty) * flt(to_produce_qty)
-
-			if warehouse:
-				bin_details = get_bin_details(d, company, for_warehouse=warehouse)
-
-				for _bin_dict in bin_details:
-					if _bin_dict.projected_qty > 0:
-						if _bin_dict.projected_qty > stock_qty:
-							stock_qty = 0
-							continue
-						else:
-							stock_qty = stock_qty - _bin_dict.projected_qty
-
-			if stock_qty > 0:
-				bom_data.append(
-					frappe._dict(
-						{
-							"parent_item_code": parent_item_code,
-							"description": d.description,
-							"production_item": d.item_code,
-							"item_name": d.item_name,
-							"stock_uom": d.stock_uom,
-							"uom": d.stock_uom,
-							"bom_no": d.value,
-							"is_sub_contracted_item": d.is_sub_contracted_item,
-							"bom_level": indent,
-							"indent": indent,
-							"stock_qty": stock_qty,
-						}
-					)
+def get_sub_assembly_items(
+	bom_no, bom_data, to_produce_qty, company, warehouse=None, indent=0, prefetched=None
+):
+	"""Add the sub assemblies of all levels of a BOM that have to be produced to `bom_data`.
+
+	Items and bins are looked up once per item, pass the same `prefetched` dict
+	to share them between calls.
+	"""
+	explosion = get_bom_explosion(bom_no)
+	sub_assemblies = [node for node in explosion.nodes if node.bom_no]
+	if not sub_assemblies:
+		return
+
+	if prefetched is None:
+		prefetched = {}
+
+	prefetch_sub_assembly_details(sub_assemblies, company, warehouse, prefetched)
+
+	# qty to produce of the BOM at each level, sub assemblies of BOMs that are not produced are skipped
+	qty_to_produce = [flt(to_produce_qty)]
+	for node in explosion.nodes:
+		if node.indent >= len(qty_to_produce) or not node.bom_no:
+			continue
+
+		del qty_to_produce[node.indent + 1 :]
+		stock_qty = node.qty_per_unit * qty_to_produce[node.indent]
+
+		if warehouse:
+			for _bin_dict in prefetched["bins"].get(node.item_code, []):
+				if _bin_dict.projected_qty > 0:
+					if _bin_dict.projected_qty > stock_qty:
+						stock_qty = 0
+						continue
+					else:
+						stock_qty = stock_qty - _bin_dict.projected_qty
+
+		if stock_qty > 0:
+			item = prefetched["items"].get(node.item_code) or frappe._dict()
+			bom_data.append(
+				frappe._dict(
+					{
+						"parent_item_code": node.parent_item_code,
+						"description": item.description,
+						"production_item": node.item_code,
+						"item_name": item.item_name,
+						"stock_uom": item.stock_uom,
+						"uom": item.stock_uom,
+						"bom_no": node.bom_no,
+						"is_sub_contracted_item": item.is_sub_contracted_item,
+						"bom_level": indent + node.indent,
+						"indent": indent + node.indent,
+						"stock_qty": stock_qty,
+					}
 				)
+			)
 
-				if d.value:
-					get_sub_assembly_items(
-						d.value, bom_data, stock_qty, company, warehouse, indent=indent + 1
-					)
+			qty_to_produce.append(stock_qty)
+
+
+def prefetch_sub_assembly_details(sub_assemblies, company, warehouse, prefetched):
+	prefetched.setdefault("items", {})
+	prefetched.setdefault("bins", {})
+
+	item_codes = list({node.item_code for node in sub_assemblies} - set(prefetched["items"]))
+	if not item_codes:
+		return
+
+	for item in frappe.get_all(
+		"Item",
+		filters={"name": ("in", item_codes)},
+		fields=["name", "item_name", "description", "stock_uom", "is_sub_contracted_item"],
+	):
+		prefetched["items"][item.name] = item
+
+	if warehouse:
+		for item_code in item_codes:
+			prefetched["bins"].setdefault(item_code, [])
+
+		for bin_dict in get_bin_details_for_items(item_codes, company, warehouse):
+			prefetched["bins"][bin_dict.item_code].append(bin_dict)
+
+
+def get_bin_details_for_items(item_codes, company, warehouse):
+	"""`get_bin_details` of several items in a warehouse and its children."""
+	bin = frappe.qb.DocType("Bin")
+	wh = frappe.qb.DocType("Warehouse")
+
+	lft, rgt = frappe.db.get_value("Warehouse", warehouse, ["lft", "rgt"])
+	subquery = (
+		frappe.qb.from_(wh)
+		.select(wh.name)
+		.where((wh.company == company) & (wh.lft >= lft) & (wh.rgt <= rgt) & (wh.name == bin.warehouse))
+	)
+
+	return (
+		frappe.qb.from_(bin)
+		.select(
+			bin.item_code,
+			bin.warehouse,
+			IfNull(Sum(bin.projected_qty), 0).as_("projected_qty"),
+			IfNull(Sum(bin.actual_qty), 0).as_("actual_qty"),
+			IfNull(Sum(bin.ordered_qty), 0).as_("ordered_qty"),
+			IfNull(Sum(bin.reserved_qty_for_production), 0).as_("reserved_qty_for_production"),
+			IfNull(Sum(bin.planned_qty), 0).as_("planned_qty"),
+		)
+		.where((bin.item_code.isin(item_codes)) & (bin.warehouse.isin(subquery)))
+		.groupby(bin.item_code, bin.warehouse)
+	).run(as_dict=True)
 
 
 def set_default_warehouses(row, default_warehouses):
@@ -2,9 +2,10 @@
 # For license information, please see license.txt
 
 
-import frappe
 from frappe import _
 
+from erpnext.manufacturing.doctype.bom.bom import get_bom_explosion
+
 
 def execute(filters=None):
 	data = []
@@ -18,30 +19,19 @@ def get_data(filters, data):
 
 
 def get_exploded_items(bom, data, indent=0, qty=1):
-	exploded_items = frappe.get_all(
-		"BOM Item",
-		filters={"parent": bom},
-		fields=["qty", "bom_no", "qty", "item_code", "item_name", "description", "uom", "idx"],
-		order_by="idx ASC",
-	)
-
-	for item in exploded_items:
-		print(item.bom_no, indent)
-		item["indent"] = indent
+	for item in get_bom_explosion(bom).nodes:
 		data.append(
 			{
 				"item_code": item.item_code,
 				"item_name": item.item_name,
-				"indent": indent,
-				"bom_level": indent,
+				"indent": indent + item.indent,
+				"bom_level": indent + item.indent,
 				"bom": item.bom_no,
-				"qty": item.qty * qty,
+				"qty": item.qty * (item.parent_qty if item.indent else qty),
 				"uom": item.uom,
 				"description": item.description,
 			}
 		)
-		if item.bom_no:
-			get_exploded_items(item.bom_no, data, indent=indent + 1, qty=item.qty)
 
 
 def get_columns():
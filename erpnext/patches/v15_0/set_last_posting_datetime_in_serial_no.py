@@ -0,0 +1,33 @@
+import frappe
+from frappe.query_builder.functions import Max
+
+
+def execute():
+	stock_ledger_entry = frappe.qb.DocType("Stock Ledger Entry")
+	batch_ledger = frappe.qb.DocType("Serial and Batch Entry")
+
+	data = (
+		frappe.qb.from_(stock_ledger_entry)
+		.inner_join(batch_ledger)
+		.on(stock_ledger_entry.serial_and_batch_bundle == batch_ledger.parent)
+		.select(batch_ledger.serial_no, Max(stock_ledger_entry.posting_datetime))
+		.where(
+			(stock_ledger_entry.is_cancelled == 0)
+			& (batch_ledger.serial_no.isnotnull())
+			& (batch_ledger.serial_no != "")
+		)
+		.groupby(batch_ledger.serial_no)
+	).run()
+
+	serial_nos_by_posting_datetime = {}
+	for serial_no, posting_datetime in data:
+		serial_nos_by_posting_datetime.setdefault(posting_datetime, []).append(serial_no)
+
+	serial_no_table = frappe.qb.DocType("Serial No")
+	for posting_datetime, serial_nos in serial_nos_by_posting_datetime.items():
+		for i in range(0, len(serial_nos), 1000):
+			(
+				frappe.qb.update(serial_no_table)
+				.set(serial_no_table.last_posting_datetime, posting_datetime)
+				.where(serial_no_table.name.isin(serial_nos[i : i + 1000]))
+			).run()
@@ -0,0 +1,7 @@
+import frappe
+from frappe.utils import cint
+
+
+def execute():
+	if not cint(frappe.db.get_single_value("Accounts Settings", "reconciliation_chunk_size")):
+		frappe.db.set_single_value("Accounts Settings", "reconciliation_chunk_size", 10)
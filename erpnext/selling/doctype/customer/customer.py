@@ -20,6 +20,10 @@ from frappe.utils.user import get_users_with_role
 
 from erpnext.accounts.party import get_dashboard_info, validate_party_accounts
 from erpnext.controllers.website_list_for_contact import add_role_for_portal_user
+from erpnext.selling.doctype.customer_exposure.customer_exposure import (
+	get_customer_exposure,
+	is_customer_exposure_ready,
+)
 from erpnext.utilities.transaction_base import TransactionBase
 
 
@@ -593,6 +597,17 @@ def send_emails(args):
 
 
 def get_customer_outstanding(customer, company, ignore_outstanding_sales_order=False, cost_center=None):
+	if is_customer_exposure_ready():
+		return get_customer_exposure(customer, company, ignore_outstanding_sales_order, cost_center)
+
+	return get_customer_outstanding_from_transactions(
+		customer, company, ignore_outstanding_sales_order, cost_center
+	)
+
+
+def get_customer_outstanding_from_transactions(
+	customer, company, ignore_outstanding_sales_order=False, cost_center=None
+):
 	# Outstanding based on GL Entries
 	cond = ""
 	if cost_center:
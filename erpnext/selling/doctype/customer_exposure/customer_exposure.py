@@ -0,0 +1,498 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import IfNull, Sum
+from frappe.utils import cint, create_batch, cstr, flt, now
+
+# vouchers whose unbilled amount counts towards the exposure of a customer
+EXPOSURE_VOUCHER_TYPES = ("Sales Order", "Delivery Note")
+
+# rows written per statement by `rebuild_customer_exposures`
+REBUILD_BATCH_SIZE = 5000
+
+
+class CustomerExposure(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		amount: DF.Currency
+		company: DF.Link | None
+		cost_center: DF.Link | None
+		customer: DF.Link | None
+		voucher_no: DF.DynamicLink | None
+		voucher_type: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Customer Exposure", ["customer", "company"])
+	frappe.db.add_index("Customer Exposure", ["voucher_type", "voucher_no"])
+
+
+def is_customer_exposure_enabled() -> bool:
+	return bool(cint(frappe.db.get_single_value("Accounts Settings", "use_customer_exposure", cache=True)))
+
+
+def is_customer_exposure_ready() -> bool:
+	"""Credit limits are checked against exposures once they are enabled and built, until then against
+	transactions."""
+	return is_customer_exposure_enabled() and bool(
+		cint(frappe.db.get_single_value("Accounts Settings", "customer_exposure_ready", cache=True))
+	)
+
+
+def get_customer_exposure_name(customer, company, cost_center=None, voucher_type=None, voucher_no=None):
+	key = (customer, company, cost_center, voucher_type, voucher_no)
+	return hashlib.sha256("\x1f".join(cstr(value) for value in key).encode()).hexdigest()
+
+
+def get_customer_exposure(customer, company, ignore_outstanding_sales_order=False, cost_center=None):
+	"""Outstanding of a customer like `get_customer_outstanding` computes it from transactions."""
+	exposure = frappe.qb.DocType("Customer Exposure")
+	query = (
+		frappe.qb.from_(exposure)
+		.select(Sum(exposure.amount))
+		.where((exposure.customer == customer) & (exposure.company == company))
+	)
+
+	if ignore_outstanding_sales_order:
+		query = query.where(exposure.voucher_type.isnull() | (exposure.voucher_type != "Sales Order"))
+
+	if cost_center:
+		# only the ledger balance is split by cost center
+		lft, rgt = frappe.get_cached_value("Cost Center", cost_center, ["lft", "rgt"])
+		cost_center_table = frappe.qb.DocType("Cost Center")
+		cost_centers = (
+			frappe.qb.from_(cost_center_table)
+			.select(cost_center_table.name)
+			.where((cost_center_table.lft >= lft) & (cost_center_table.rgt <= rgt))
+		)
+		query = query.where(exposure.voucher_type.isnotnull() | exposure.cost_center.isin(cost_centers))
+
+	result = query.run()
+	return flt(result[0][0]) if result else 0.0
+
+
+def update_customer_exposures(gl_entries, reverse=False):
+	"""Add customer GL entries to the exposure of their customers, or subtract them if `reverse` is set."""
+	if not gl_entries or not is_customer_exposure_enabled():
+		return
+
+	sign = -1 if reverse else 1
+	exposures = {}
+	for entry in gl_entries:
+		if entry.get("party_type") != "Customer" or not entry.get("party"):
+			continue
+
+		name = get_customer_exposure_name(entry.get("party"), entry.get("company"), entry.get("cost_center"))
+		if name not in exposures:
+			exposures[name] = frappe._dict(
+				{
+					"customer": entry.get("party"),
+					"company": entry.get("company"),
+					"cost_center": entry.get("cost_center"),
+					"amount": 0.0,
+				}
+			)
+
+		exposures[name].amount += sign * (flt(entry.get("debit")) - flt(entry.get("credit")))
+
+	if not exposures:
+		return
+
+	existing = set(
+		frappe.get_all("Customer Exposure", filters={"name": ("in", list(exposures))}, pluck="name")
+	)
+	for name, exposure in exposures.items():
+		if name in existing:
+			add_to_customer_exposure(name, exposure.amount)
+		else:
+			insert_customer_exposure(name, exposure)
+
+
+def remove_voucher_from_customer_exposures(voucher_type, voucher_no):
+	"""Subtract the customer GL entries of a voucher that are about to be deleted without being cancelled."""
+	if not is_customer_exposure_enabled():
+		return
+
+	gl_entries = frappe.get_all(
+		"GL Entry",
+		filters={
+			"voucher_type": voucher_type,
+			"voucher_no": voucher_no,
+			"party_type": "Customer",
+			"is_cancelled": 0,
+		},
+		fields=["party_type", "party", "company", "cost_center", "debit", "credit"],
+	)
+	update_customer_exposures(gl_entries, reverse=True)
+
+
+def update_voucher_exposure(voucher_type, voucher_no):
+	"""Set the unbilled amount of a Sales Order or Delivery Note, or remove it once the voucher
+	is billed, closed or cancelled."""
+	if not is_customer_exposure_enabled():
+		return
+
+	exposures = get_voucher_exposures(voucher_type, voucher_no=voucher_no)
+	if not exposures:
+		frappe.db.delete("Customer Exposure", {"voucher_type": voucher_type, "voucher_no": voucher_no})
+		return
+
+	exposure = exposures[0]
+	name = get_customer_exposure_name(exposure.customer, exposure.company, None, voucher_type, voucher_no)
+	if frappe.db.exists("Customer Exposure", name):
+		set_customer_exposure(name, exposure.amount)
+	else:
+		insert_customer_exposure(name, exposure)
+
+
+def add_to_customer_exposure(name, amount):
+	exposure = frappe.qb.DocType("Customer Exposure")
+	(
+		frappe.qb.update(exposure)
+		.set(exposure.amount, exposure.amount + flt(amount))
+		.set(exposure.modified, now())
+		.where(exposure.name == name)
+	).run()
+
+
+def set_customer_exposure(name, amount):
+	exposure = frappe.qb.DocType("Customer Exposure")
+	(
+		frappe.qb.update(exposure)
+		.set(exposure.amount, flt(amount))
+		.set(exposure.modified, now())
+		.where(exposure.name == name)
+	).run()
+
+
+def insert_customer_exposure(name, exposure):
+	"""Insert a new exposure and take care of concurrent inserts of the same one."""
+	savepoint = "insert_customer_exposure"
+	try:
+		frappe.db.savepoint(savepoint)
+		frappe.get_doc({"doctype": "Customer Exposure", "name": name, **exposure}).db_insert()
+	except frappe.DuplicateEntryError:
+		frappe.db.rollback(save_point=savepoint)  # preserve transaction in postgres
+		if exposure.get("voucher_no"):
+			set_customer_exposure(name, exposure.amount)
+		else:
+			add_to_customer_exposure(name, exposure.amount)
+
+
+def get_voucher_exposures(voucher_type, voucher_no=None, company=None, customer=None):
+	"""Unbilled amounts of submitted Sales Orders or Delivery Notes that are still open."""
+	filters = {"name": voucher_no, "company": company, "customer": customer}
+	filters = {field: value for field, value in filters.items() if value}
+
+	if voucher_type == "Sales Order":
+		return get_sales_order_exposures(filters)
+
+	return get_delivery_note_exposures(filters)
+
+
+def get_sales_order_exposures(filters):
+	sales_order = frappe.qb.DocType("Sales Order")
+	query = (
+		frappe.qb.from_(sales_order)
+		.select(
+			sales_order.customer,
+			sales_order.company,
+			sales_order.name.as_("voucher_no"),
+			(sales_order.base_grand_total * (100 - sales_order.per_billed) / 100).as_("amount"),
+		)
+		.where(
+			(sales_order.docstatus == 1) & (sales_order.per_billed < 100) & (sales_order.status != "Closed")
+		)
+	)
+
+	for field, value in filters.items():
+		query = query.where(sales_order[field] == value)
+
+	exposures = query.run(as_dict=True)
+	for exposure in exposures:
+		exposure.update({"voucher_type": "Sales Order", "cost_center": None, "amount": flt(exposure.amount)})
+
+	return exposures
+
+
+def get_delivery_note_exposures(filters):
+	"""Unbilled amounts of Delivery Note Items made without a Sales Order or Sales Invoice."""
+	delivery_note = frappe.qb.DocType("Delivery Note")
+	delivery_note_item = frappe.qb.DocType("Delivery Note Item")
+
+	query = (
+		frappe.qb.from_(delivery_note)
+		.inner_join(delivery_note_item)
+		.on(delivery_note.name == delivery_note_item.parent)
+		.select(
+			delivery_note.customer,
+			delivery_note.company,
+			delivery_note.name.as_("voucher_no"),
+			delivery_note.base_net_total,
+			delivery_note.base_grand_total,
+			delivery_note_item.name.as_("dn_detail"),
+			delivery_note_item.amount,
+		)
+		.where(
+			(delivery_note.docstatus == 1)
+			& (delivery_note.status.notin(["Closed", "Stopped"]))
+			& (IfNull(delivery_note_item.against_sales_order, "") == "")
+			& (IfNull(delivery_note_item.against_sales_invoice, "") == "")
+		)
+	)
+
+	for field, value in filters.items():
+		query = query.where(delivery_note[field] == value)
+
+	items = query.run(as_dict=True)
+	if not items:
+		return []
+
+	billed_amounts = {}
+	sales_invoice_item = frappe.qb.DocType("Sales Invoice Item")
+	for batch in create_batch([d.dn_detail for d in items], 1000):
+		billed_amounts.update(
+			(
+				frappe.qb.from_(sales_invoice_item)
+				.select(sales_invoice_item.dn_detail, Sum(sales_invoice_item.amount))
+				.where((sales_invoice_item.docstatus == 1) & (sales_invoice_item.dn_detail.isin(batch)))
+				.groupby(sales_invoice_item.dn_detail)
+			).run()
+		)
+
+	exposures = {}
+	for d in items:
+		dn_amount = flt(d.amount)
+		si_amount = flt(billed_amounts.get(d.dn_detail))
+		if dn_amount <= si_amount or not d.base_net_total:
+			continue
+
+		if d.voucher_no not in exposures:
+			exposures[d.voucher_no] = frappe._dict(
+				{
+					"customer": d.customer,
+					"company": d.company,
+					"cost_center": None,
+					"voucher_type": "Delivery Note",
+					"voucher_no": d.voucher_no,
+					"amount": 0.0,
+				}
+			)
+
+		exposures[d.voucher_no].amount += ((dn_amount - si_amount) / d.base_net_total) * d.base_grand_total
+
+	return list(exposures.values())
+
+
+def get_gl_exposures(company=None, customer=None):
+	gl_entry = frappe.qb.DocType("GL Entry")
+	query = (
+		frappe.qb.from_(gl_entry)
+		.select(
+			gl_entry.party.as_("customer"),
+			gl_entry.company,
+			gl_entry.cost_center,
+			Sum(gl_entry.debit - gl_entry.credit).as_("amount"),
+		)
+		.where((gl_entry.party_type == "Customer") & (gl_entry.is_cancelled == 0))
+		.groupby(gl_entry.party, gl_entry.company, gl_entry.cost_center)
+	)
+
+	if company:
+		query = query.where(gl_entry.company == company)
+	if customer:
+		query = query.where(gl_entry.party == customer)
+
+	return query.run(as_dict=True)
+
+
+def rebuild_customer_exposures(company=None, customer=None):
+	"""Recompute exposures from the GL, Sales Orders and Delivery Notes, one transaction per company.
+
+	Enabling Use Customer Exposure runs it in the background, credit limits are checked against
+	exposures once all companies are done. To repair exposures run
+
+		bench --site <site> execute erpnext.selling.doctype.customer_exposure.customer_exposure.rebuild_customer_exposures
+
+	Customer GL Entries of a company are locked before its exposures are deleted, so GL postings of
+	the company wait until they are rebuilt. Voucher exposures set meanwhile are kept.
+	"""
+	companies = [company] if company else frappe.get_all("Company", pluck="name")
+
+	for name in companies:
+		lock_customer_gl_entries(name, customer)
+		filters = {"company": name, "customer": customer}
+		frappe.db.delete("Customer Exposure", {field: value for field, value in filters.items() if value})
+		insert_customer_exposures(get_exposures_from_transactions(name, customer))
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+	if not (company or customer):
+		frappe.db.set_single_value("Accounts Settings", "customer_exposure_ready", 1)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+
+def lock_customer_gl_entries(company, customer=None):
+	gl_entry = frappe.qb.DocType("GL Entry")
+	query = (
+		frappe.qb.from_(gl_entry)
+		.select(gl_entry.name)
+		.where(
+			(gl_entry.company == company) & (gl_entry.party_type == "Customer") & (gl_entry.is_cancelled == 0)
+		)
+		.for_update()
+	)
+
+	if customer:
+		query = query.where(gl_entry.party == customer)
+
+	query.run()
+
+
+def get_exposures_from_transactions(company, customer=None):
+	exposures = {}
+	for d in get_gl_exposures(company, customer):
+		if flt(d.amount):
+			d.update({"voucher_type": None, "voucher_no": None})
+			exposures[get_customer_exposure_name(d.customer, d.company, d.cost_center)] = d
+
+	for voucher_type in EXPOSURE_VOUCHER_TYPES:
+		for d in get_voucher_exposures(voucher_type, company=company, customer=customer):
+			exposures[get_customer_exposure_name(d.customer, d.company, None, voucher_type, d.voucher_no)] = d
+
+	return exposures
+
+
+def insert_customer_exposures(exposures):
+	timestamp, user = now(), frappe.session.user
+	frappe.db.bulk_insert(
+		"Customer Exposure",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"customer",
+			"company",
+			"cost_center",
+			"voucher_type",
+			"voucher_no",
+			"amount",
+		],
+		values=(
+			[
+				name,
+				timestamp,
+				timestamp,
+				user,
+				user,
+				d.customer,
+				d.company,
+				d.cost_center,
+				d.voucher_type,
+				d.voucher_no,
+				flt(d.amount),
+			]
+			for name, d in exposures.items()
+		),
+		# set by a Sales Order or Delivery Note updated since it was read
+		ignore_duplicates=True,
+		chunk_size=REBUILD_BATCH_SIZE,
+	)
+
+
+def reconcile_customer_exposures():
+	"""Compare exposures with the outstanding computed from transactions and rebuild the ones
+	that differ. Runs daily while exposures are maintained.
+
+	Both sides are summed per customer in a few grouped queries per company."""
+	if not is_customer_exposure_ready():
+		return []
+
+	precision = cint(frappe.db.get_default("currency_precision")) or 2
+	mismatched = []
+	for company in frappe.get_all("Company", order_by="name", pluck="name"):
+		expected = get_outstanding_from_transactions_by_customer(company)
+		exposures = get_exposures_by_customer(company)
+
+		for customer in sorted(set(expected) | set(exposures)):
+			if flt(expected.get(customer, 0.0) - exposures.get(customer, 0.0), precision):
+				mismatched.append(
+					f"{customer} ({company}): {exposures.get(customer, 0.0)} / {expected.get(customer, 0.0)}"
+				)
+				rebuild_customer_exposures(company, customer)
+
+	if mismatched:
+		frappe.log_error(
+			title="Customer Exposure rebuilt",
+			message="Exposure / outstanding from transactions\n\n" + "\n".join(mismatched),
+		)
+
+	return mismatched
+
+
+def get_outstanding_from_transactions_by_customer(company):
+	"""Outstanding of every customer of a company like `get_customer_outstanding_from_transactions`
+	computes it for one."""
+	gl_entry = frappe.qb.DocType("GL Entry")
+	sales_order = frappe.qb.DocType("Sales Order")
+
+	outstanding = {}
+	for customer, amount in (
+		frappe.qb.from_(gl_entry)
+		.select(gl_entry.party, Sum(gl_entry.debit - gl_entry.credit))
+		.where(
+			(gl_entry.company == company) & (gl_entry.party_type == "Customer") & (gl_entry.is_cancelled == 0)
+		)
+		.groupby(gl_entry.party)
+	).run():
+		outstanding[customer] = outstanding.get(customer, 0.0) + flt(amount)
+
+	for customer, amount in (
+		frappe.qb.from_(sales_order)
+		.select(
+			sales_order.customer, Sum(sales_order.base_grand_total * (100 - sales_order.per_billed) / 100)
+		)
+		.where(
+			(sales_order.company == company)
+			& (sales_order.docstatus == 1)
+			& (sales_order.per_billed < 100)
+			& (sales_order.status != "Closed")
+		)
+		.groupby(sales_order.customer)
+	).run():
+		outstanding[customer] = outstanding.get(customer, 0.0) + flt(amount)
+
+	for d in get_delivery_note_exposures({"company": company}):
+		outstanding[d.customer] = outstanding.get(d.customer, 0.0) + d.amount
+
+	return outstanding
+
+
+def get_exposures_by_customer(company):
+	exposure = frappe.qb.DocType("Customer Exposure")
+	return {
+		customer: flt(amount)
+		for customer, amount in (
+			frappe.qb.from_(exposure)
+			.select(exposure.customer, Sum(exposure.amount))
+			.where(exposure.company == company)
+			.groupby(exposure.customer)
+		).run()
+	}
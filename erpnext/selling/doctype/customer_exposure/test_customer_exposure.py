@@ -0,0 +1,99 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+
+from erpnext.selling.doctype.customer.customer import (
+	get_customer_outstanding,
+	get_customer_outstanding_from_transactions,
+)
+from erpnext.selling.doctype.customer_exposure.customer_exposure import (
+	is_customer_exposure_ready,
+	rebuild_customer_exposures,
+	reconcile_customer_exposures,
+)
+from erpnext.selling.doctype.sales_order.sales_order import make_sales_invoice
+from erpnext.selling.doctype.sales_order.test_sales_order import make_sales_order
+from erpnext.stock.doctype.delivery_note.test_delivery_note import create_delivery_note
+
+
+class TestCustomerExposure(FrappeTestCase):
+	def setUp(self):
+		self.customer = "_Test Customer"
+		self.company = "_Test Company"
+		rebuild_customer_exposures(self.company, self.customer)
+
+	def assertExposureMatchesTransactions(self):
+		for ignore_outstanding_sales_order in (False, True):
+			self.assertAlmostEqual(
+				get_customer_outstanding(self.customer, self.company, ignore_outstanding_sales_order),
+				get_customer_outstanding_from_transactions(
+					self.customer, self.company, ignore_outstanding_sales_order
+				),
+			)
+
+	@change_settings("Accounts Settings", {"use_customer_exposure": 1})
+	def test_exposure_follows_transactions(self):
+		outstanding = get_customer_outstanding(self.customer, self.company)
+
+		so = make_sales_order(qty=2, rate=100)
+		self.assertExposureMatchesTransactions()
+		self.assertAlmostEqual(
+			get_customer_outstanding(self.customer, self.company), outstanding + so.base_grand_total
+		)
+
+		si = make_sales_invoice(so.name)
+		si.get("items")[0].qty = 1
+		si.insert()
+		si.submit()
+		self.assertExposureMatchesTransactions()
+
+		dn = create_delivery_note(qty=1, rate=100)
+		self.assertExposureMatchesTransactions()
+
+		so.update_status("Closed")
+		self.assertExposureMatchesTransactions()
+
+		si.cancel()
+		dn.cancel()
+		self.assertExposureMatchesTransactions()
+		self.assertEqual(reconcile_customer_exposures(), [])
+
+	@change_settings("Accounts Settings", {"use_customer_exposure": 1})
+	def test_rebuild_matches_incremental_updates(self):
+		make_sales_order(qty=1, rate=100)
+		create_delivery_note(qty=1, rate=100)
+
+		incremental = get_customer_outstanding(self.customer, self.company)
+		rebuild_customer_exposures(self.company, self.customer)
+
+		self.assertAlmostEqual(get_customer_outstanding(self.customer, self.company), incremental)
+		self.assertExposureMatchesTransactions()
+
+	@change_settings("Accounts Settings", {"use_customer_exposure": 1})
+	def test_reconcile_rebuilds_mismatched_exposures(self):
+		make_sales_order(qty=1, rate=100)
+		self.assertEqual(reconcile_customer_exposures(), [])
+
+		frappe.db.delete("Customer Exposure", {"customer": self.customer, "voucher_type": "Sales Order"})
+		mismatched = reconcile_customer_exposures()
+		self.assertEqual(len(mismatched), 1)
+		self.assertTrue(mismatched[0].startswith(f"{self.customer} ({self.company})"))
+		self.assertExposureMatchesTransactions()
+
+	@change_settings("Accounts Settings", {"use_customer_exposure": 1})
+	def test_exposures_are_read_once_built(self):
+		make_sales_order(qty=1, rate=100)
+		self.assertTrue(is_customer_exposure_ready())
+
+		# a rebuild in progress
+		frappe.db.set_single_value("Accounts Settings", "customer_exposure_ready", 0)
+		frappe.db.delete("Customer Exposure", {"customer": self.customer})
+		self.assertFalse(is_customer_exposure_ready())
+		self.assertExposureMatchesTransactions()
+		self.assertEqual(reconcile_customer_exposures(), [])
+
+		rebuild_customer_exposures()
+		self.assertTrue(is_customer_exposure_ready())
+		self.assertExposureMatchesTransactions()
@@ -29,6 +29,7 @@ from erpnext.manufacturing.doctype.production_plan.production_plan import (
 	get_items_for_material_requests,
 )
 from erpnext.selling.doctype.customer.customer import check_credit_limit
+from erpnext.selling.doctype.customer_exposure.customer_exposure import update_voucher_exposure
 from erpnext.setup.doctype.item_group.item_group import get_item_group_defaults
 from erpnext.stock.doctype.item.item import get_item_defaults
 from erpnext.stock.doctype.stock_reservation_entry.stock_reservation_entry import (
@@ -402,6 +403,7 @@ class SalesOrder(SellingController):
 				frappe.throw(_("Row #{0}: Set Supplier for item {1}").format(d.idx, d.item_code))
 
 	def on_submit(self):
+		update_voucher_exposure(self.doctype, self.name)
 		self.check_credit_limit()
 		self.update_reserved_qty()
 
@@ -442,6 +444,7 @@ class SalesOrder(SellingController):
 		self.update_prevdoc_status("cancel")
 
 		self.db_set("status", "Cancelled")
+		update_voucher_exposure(self.doctype, self.name)
 
 		self.update_blanket_order()
 		self.cancel_stock_reservation_entries()
@@ -498,6 +501,7 @@ class SalesOrder(SellingController):
 	def update_status(self, status):
 		self.check_modified_date()
 		self.set_status(update=True, status=status)
+		update_voucher_exposure(self.doctype, self.name)
 		# Upon Sales Order Re-open, check for credit limit.
 		# Limit should be checked after the 'Hold/Closed' status is reset.
 		if status == "Draft" and self.docstatus == 1:
@@ -537,6 +541,7 @@ class SalesOrder(SellingController):
 	def on_update_after_submit(self):
 		self.calculate_commission()
 		self.calculate_contribution()
+		update_voucher_exposure(self.doctype, self.name)
 		self.check_credit_limit()
 
 	def before_update_after_submit(self):
@@ -5,13 +5,26 @@
 import json
 
 import frappe
-from frappe.utils import cint
+from frappe.utils import cint, cstr
 from frappe.utils.nestedset import get_root_of
 
-from erpnext.accounts.doctype.pos_invoice.pos_invoice import get_stock_availability
+from erpnext.accounts.doctype.pos_invoice.pos_invoice import (
+	get_stock_availability,
+	get_stock_availability_of_items,
+)
 from erpnext.accounts.doctype.pos_profile.pos_profile import get_child_nodes, get_item_groups
+from erpnext.stock.doctype.item_search_token.item_search_token import (
+	get_item_search_query,
+	is_item_search_index_ready,
+)
 from erpnext.stock.utils import scan_barcode
 
+# redis hash of cached item catalog pages, keyed by POS Profile and page
+ITEM_CATALOG_CACHE_KEY = "pos_item_catalog"
+
+# seconds a cached catalog page is kept, changes not clearing the cache show up after it
+ITEM_CATALOG_CACHE_TTL = 15 * 60
+
 
 def search_by_term(search_term, warehouse, price_list):
 	result = search_for_serial_or_batch_or_barcode_number(search_term) or {}
@@ -94,8 +107,8 @@ def search_by_term(search_term, warehouse, price_list):
 
 @frappe.whitelist()
 def get_items(start, page_length, price_list, item_group, pos_profile, search_term=""):
-	warehouse, hide_unavailable_items = frappe.db.get_value(
-		"POS Profile", pos_profile, ["warehouse", "hide_unavailable_items"]
+	warehouse, hide_unavailable_items, cache_item_catalog = frappe.db.get_value(
+		"POS Profile", pos_profile, ["warehouse", "hide_unavailable_items", "cache_item_catalog"]
 	)
 
 	result = []
@@ -105,10 +118,26 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 		if result:
 			return result
 
+	# pages of profiles hiding unavailable items depend on stock, searches are rarely repeated
+	cache_key = None
+	if cache_item_catalog and not hide_unavailable_items and not search_term:
+		cache_key = get_item_catalog_cache_key(pos_profile, start, page_length, price_list, item_group)
+		if catalog_page := frappe.cache().get_value(cache_key):
+			return {"items": get_item_catalog(catalog_page, warehouse)}
+
 	if not frappe.db.exists("Item Group", item_group):
 		item_group = get_root_of("Item Group")
 
-	condition = get_conditions(search_term)
+	search_join, order_by = "", "item.name asc"
+	search_query = search_term and is_item_search_index_ready() and get_item_search_query(search_term)
+	if search_query:
+		# items matching the search term best first
+		search_join = f"INNER JOIN ({search_query}) item_search ON item_search.search_item_code = item.name"
+		order_by = "item_search.search_score desc, item.name asc"
+		condition = "(1=1)"
+	else:
+		condition = get_conditions(search_term)
+
 	condition += get_item_group_condition(pos_profile)
 
 	lft, rgt = frappe.db.get_value("Item Group", item_group, ["lft", "rgt"])
@@ -130,7 +159,7 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 			item.image AS item_image,
 			item.is_stock_item
 		FROM
-			`tabItem` item {bin_join_selection}
+			`tabItem` item {search_join} {bin_join_selection}
 		WHERE
 			item.disabled = 0
 			AND item.has_variants = 0
@@ -140,7 +169,7 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 			AND {condition}
 			{bin_join_condition}
 		ORDER BY
-			item.name asc
+			{order_by}
 		LIMIT
 			{page_length} offset {start}""".format(
 			start=cint(start),
@@ -148,6 +177,8 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 			lft=cint(lft),
 			rgt=cint(rgt),
 			condition=condition,
+			search_join=search_join,
+			order_by=order_by,
 			bin_join_selection=bin_join_selection,
 			bin_join_condition=bin_join_condition,
 		),
@@ -159,27 +190,46 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 	if not items_data:
 		return result
 
+	catalog_page = get_item_catalog_page(items_data, price_list)
+	if cache_key:
+		frappe.cache().set_value(cache_key, catalog_page, expires_in_sec=ITEM_CATALOG_CACHE_TTL)
+
+	return {"items": get_item_catalog(catalog_page, warehouse)}
+
+
+def get_item_catalog_page(items_data, price_list):
+	"""UOMs and prices of a page of items, with one query each for the whole page."""
+	item_codes = [item.item_code for item in items_data]
+
+	return frappe._dict(
+		{
+			"items": items_data,
+			"uoms": get_item_uoms(item_codes),
+			"item_prices": get_selling_item_prices(item_codes, price_list),
+		}
+	)
+
+
+def get_item_catalog(catalog_page, warehouse):
+	"""Items of a catalog page with their prices and the stock available now."""
+	items_data = catalog_page["items"]
+	uoms, item_prices = catalog_page["uoms"], catalog_page["item_prices"]
+	available_qty = get_stock_availability_of_items(items_data, warehouse)
+
+	result = []
 	for item in items_data:
-		uoms = frappe.get_doc("Item", item.item_code).get("uoms", [])
+		uoms_of_item = uoms.get(item.item_code, [])
 
-		item.actual_qty, _ = get_stock_availability(item.item_code, warehouse)
+		item.actual_qty = available_qty.get(item.item_code, 0)
 		item.uom = item.stock_uom
 
-		item_price = frappe.get_all(
-			"Item Price",
-			fields=["price_list_rate", "currency", "uom", "batch_no"],
-			filters={
-				"price_list": price_list,
-				"item_code": item.item_code,
-				"selling": True,
-			},
-		)
+		item_price = item_prices.get(item.item_code, [])
 
 		if not item_price:
 			result.append(item)
 
 		for price in item_price:
-			uom = next(filter(lambda x: x.uom == price.uom, uoms), {})
+			uom = next(filter(lambda x: x.uom == price.uom, uoms_of_item), {})
 
 			if price.uom != item.stock_uom and uom and uom.conversion_factor:
 				item.actual_qty = item.actual_qty // uom.conversion_factor
@@ -193,7 +243,61 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 					"batch_no": price.batch_no,
 				}
 			)
-	return {"items": result}
+
+	return result
+
+
+def get_item_uoms(item_codes):
+	uom_detail = frappe.qb.DocType("UOM Conversion Detail")
+	uoms = (
+		frappe.qb.from_(uom_detail)
+		.select(uom_detail.parent, uom_detail.uom, uom_detail.conversion_factor)
+		.where((uom_detail.parenttype == "Item") & (uom_detail.parent.isin(item_codes)))
+		.orderby(uom_detail.idx)
+	).run(as_dict=True)
+
+	item_uoms = {}
+	for uom in uoms:
+		item_uoms.setdefault(uom.parent, []).append(uom)
+
+	return item_uoms
+
+
+def get_selling_item_prices(item_codes, price_list):
+	item_prices = {}
+	for price in frappe.get_all(
+		"Item Price",
+		fields=["item_code", "price_list_rate", "currency", "uom", "batch_no"],
+		filters={
+			"price_list": price_list,
+			"item_code": ("in", item_codes),
+			"selling": True,
+		},
+	):
+		item_prices.setdefault(price.pop("item_code"), []).append(price)
+
+	return item_prices
+
+
+def get_item_catalog_cache_key(pos_profile, start, page_length, price_list, item_group):
+	return "::".join(
+		cstr(value)
+		for value in (
+			ITEM_CATALOG_CACHE_KEY,
+			pos_profile,
+			cint(start),
+			cint(page_length),
+			price_list,
+			item_group,
+		)
+	)
+
+
+def clear_item_catalog_cache():
+	"""Cached item catalogs of all POS Profiles hold items and prices, stock is always read live.
+
+	Cleared as Items, Item Groups, Item Prices and POS Profiles change."""
+	frappe.cache().delete_keys(ITEM_CATALOG_CACHE_KEY)
 
 
 @frappe.whitelist()
@@ -57,10 +57,21 @@ class ItemGroup(NestedSet):
 		NestedSet.on_update(self)
 		self.validate_one_root()
 		self.delete_child_item_groups_key()
+		self.clear_pos_item_catalog()
 
 	def on_trash(self):
 		NestedSet.on_trash(self, allow_root_deletion=True)
 		self.delete_child_item_groups_key()
+		self.clear_pos_item_catalog()
+
+	def after_rename(self, old_name, new_name, merge=False):
+		super().after_rename(old_name, new_name, merge)
+		self.clear_pos_item_catalog()
+
+	def clear_pos_item_catalog(self):
+		from erpnext.selling.page.point_of_sale.point_of_sale import clear_item_catalog_cache
+
+		clear_item_catalog_cache()
 
 	def delete_child_item_groups_key(self):
 		frappe.cache().hdel("child_item_groups", self.name)
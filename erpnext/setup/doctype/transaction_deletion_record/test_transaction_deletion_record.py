@@ -39,6 +39,27 @@ class TestTransactionDeletionRecord(FrappeTestCase):
 		tasks_containing_company = frappe.get_all("Task", filters={"company": "Dunder Mifflin Paper Co"})
 		self.assertEqual(tasks_containing_company, [])
 
+	def test_transactions_blocked_while_deletion_is_running(self):
+		from erpnext.setup.doctype.transaction_deletion_record.transaction_deletion_record import (
+			clear_running_deletion_job_cache,
+		)
+
+		company = "Dunder Mifflin Paper Co"
+		create_task(company)
+
+		tdr = frappe.get_doc({"doctype": "Transaction Deletion Record", "company": company}).insert()
+		tdr.submit()
+		clear_running_deletion_job_cache(company)
+
+		# a queued record may be started any moment, no deletion job is cached meanwhile
+		create_task(company)
+		tdr.db_set("status", "Running")
+		self.assertRaises(frappe.ValidationError, create_task, company)
+
+		tdr.db_set("status", "Completed")
+		clear_running_deletion_job_cache(company)
+		create_task(company)
+
 	def test_company_transaction_deletion_request(self):
 		from erpnext.setup.doctype.company.company import create_transaction_deletion_request
 
@@ -10,6 +10,10 @@ from frappe.model.document import Document
 from frappe.utils import cint, comma_and, create_batch, get_link_to_form
 from frappe.utils.background_jobs import get_job, is_job_enqueued
 
+# seconds for which the running deletion job of a company is cached for document validation
+RUNNING_DELETION_JOB_CACHE_TTL = 30
+RUNNING_DELETION_JOB_CACHE_KEY = "erpnext:running_deletion_job"
+
 
 class TransactionDeletionRecord(Document):
 	# begin: auto-generated types
@@ -127,6 +131,7 @@ class TransactionDeletionRecord(Document):
 
 	def on_cancel(self):
 		self.db_set("status", "Cancelled")
+		clear_running_deletion_job_cache(self.company)
 
 	def enqueue_task(self, task: str | None = None):
 		if task and task in self.task_to_internal_method_map:
@@ -164,6 +169,7 @@ class TransactionDeletionRecord(Document):
 						message = "Traceback: <br>" + traceback
 						frappe.db.set_value(self.doctype, self.name, "error_log", message)
 					frappe.db.set_value(self.doctype, self.name, "status", "Failed")
+					clear_running_deletion_job_cache(self.company)
 
 	def delete_notifications(self):
 		self.validate_doc_status()
@@ -203,6 +209,8 @@ class TransactionDeletionRecord(Document):
 	def start_deletion_tasks(self):
 		# This method is the entry point for the chain of events that follow
 		self.db_set("status", "Running")
+		# block transactions right away rather than once the cached state expires
+		clear_running_deletion_job_cache(self.company)
 		self.enqueue_task(task="Delete Bins")
 
 	def delete_bins(self):
@@ -213,6 +221,11 @@ class TransactionDeletionRecord(Document):
 					(select name from tabWarehouse where company=%s)""",
 				self.company,
 			)
+			frappe.db.sql(
+				"""delete from `tabBatch Balance` where warehouse in
+					(select name from tabWarehouse where company=%s)""",
+				self.company,
+			)
 			self.db_set("delete_bin_data", 1)
 		self.enqueue_task(task="Delete Leads and Addresses")
 
@@ -328,6 +341,7 @@ class TransactionDeletionRecord(Document):
 				self.enqueue_task(task="Delete Transactions")
 			else:
 				self.db_set("status", "Completed")
+				clear_running_deletion_job_cache(self.company)
 				self.db_set("delete_transactions", 1)
 				self.db_set("error_log", None)
 
@@ -473,26 +487,57 @@ def is_deletion_doc_running(company: str | None = None, err_msg: str | None = No
 			"Transaction Deletion Record",
 			filters={"docstatus": 1, "company": company, "status": "Running"},
 		):
-			if not err_msg:
-				err_msg = ""
-			frappe.throw(
-				title=_("Deletion in Progress!"),
-				msg=_("Transaction Deletion Document: {0} is running for this Company. {1}").format(
-					get_link_to_form("Transaction Deletion Record", running_deletion_jobs[0].name), err_msg
-				),
-			)
+			throw_deletion_in_progress(running_deletion_jobs[0].name, err_msg)
+
+
+def throw_deletion_in_progress(deletion_record: str, err_msg: str | None = None):
+	frappe.throw(
+		title=_("Deletion in Progress!"),
+		msg=_("Transaction Deletion Document: {0} is running for this Company. {1}").format(
+			get_link_to_form("Transaction Deletion Record", deletion_record), err_msg or ""
+		),
+	)
+
+
+def get_running_deletion_job(company: str) -> str:
+	"""
+	Name of the Transaction Deletion Record running for the company, cached for a short while.
+
+	A queued record may be getting started by a transaction that is not committed yet, so the
+	absence of a running one is only cached when none is queued either.
+	"""
+	key = f"{RUNNING_DELETION_JOB_CACHE_KEY}:{company}"
+	deletion_record = frappe.cache().get_value(key)
+	if deletion_record is not None:
+		return deletion_record
+
+	deletion_records = frappe.get_all(
+		"Transaction Deletion Record",
+		filters={"docstatus": 1, "company": company, "status": ("in", ["Queued", "Running"])},
+		fields=["name", "status"],
+	)
+
+	deletion_record = next((d.name for d in deletion_records if d.status == "Running"), "")
+	if deletion_record or not deletion_records:
+		frappe.cache().set_value(key, deletion_record, expires_in_sec=RUNNING_DELETION_JOB_CACHE_TTL)
+
+	return deletion_record
+
+
+def clear_running_deletion_job_cache(company: str):
+	key = f"{RUNNING_DELETION_JOB_CACHE_KEY}:{company}"
+	frappe.cache().delete_value(key)
+	# cleared again after commit, in case it was refilled with the state being replaced
+	frappe.db.after_commit.add(lambda: frappe.cache().delete_value(key))
 
 
 def check_for_running_deletion_job(doc, method=None):
-	# Check if DocType has 'company' field
-	if doc.doctype not in ("GL Entry", "Payment Ledger Entry", "Stock Ledger Entry"):
-		df = qb.DocType("DocField")
-		if (
-			qb.from_(df)
-			.select(df.parent)
-			.where((df.fieldname == "company") & (df.parent == doc.doctype))
-			.run()
-		):
-			is_deletion_doc_running(
-				doc.company, _("Cannot make any transactions until the deletion job is completed")
+	# Check if DocType has 'company' field, meta is cached and reloaded on DocType changes
+	if doc.doctype in ("GL Entry", "Payment Ledger Entry", "Stock Ledger Entry"):
+		return
+
+	if doc.get("company") and doc.meta.has_field("company"):
+		if deletion_record := get_running_deletion_job(doc.company):
+			throw_deletion_in_progress(
+				deletion_record, _("Cannot make any transactions until the deletion job is completed")
 			)
@@ -0,0 +1,348 @@
+# Copyright (c) 2024, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+"""Batched reposting of future Stock Ledger Entries.
+
+`update_entries_after` fetches the previous SLE and the future SLEs of one
+item-warehouse at a time and writes every replayed SLE back individually.
+`BatchedRepost` prefetches both for a whole window of item-warehouses in a
+couple of range queries, replays valuation in memory and writes the results
+back with bulk UPDATEs.
+
+FIFO/LIFO queues are kept as array backed valuation objects per warehouse for
+the whole replay instead of being rebuilt from the previous state on every SLE.
+
+SLEs whose replay has to look up the ledger (dynamic rates, serial/batch
+valuation, stock reconciliation, fallback rates) flush pending writes first,
+so the outcome is identical to the unbatched path.
+
+The SLEs of a window are read with `FOR UPDATE` and the window is reposted in
+a single transaction. A commit in the middle of it (a reposting checkpoint)
+releases the locks, so the rest of the window is prefetched again.
+"""
+
+import time
+
+import frappe
+from frappe.query_builder import Case
+from frappe.utils import cint, create_batch, flt
+
+from erpnext.stock.stock_ledger import update_entries_after
+from erpnext.stock.utils import get_combine_datetime
+from erpnext.stock.valuation import ArrayFIFOValuation, ArrayLIFOValuation
+
+# number of item-warehouses prefetched together
+REPOST_BATCH_SIZE = 100
+
+# rows per bulk UPDATE statement
+SLE_UPDATE_BATCH_SIZE = 200
+
+SLE_FIELDS_TO_UPDATE = (
+	"actual_qty",
+	"incoming_rate",
+	"outgoing_rate",
+	"qty_after_transaction",
+	"valuation_rate",
+	"stock_value",
+	"stock_value_difference",
+	"stock_queue",
+)
+
+
+class BatchedRepost:
+	"""Reposts the item-warehouses queued in `repost_future_sle` in windows of `batch_size`."""
+
+	def __init__(self, allow_negative_stock=None, via_landed_cost_voucher=False, batch_size=None):
+		self.allow_negative_stock = allow_negative_stock
+		self.via_landed_cost_voucher = via_landed_cost_voucher
+		self.batch_size = cint(batch_size) or REPOST_BATCH_SIZE
+
+		# (item_code, warehouse) -> {"posting_datetime", "previous_sle", "entries"}
+		self.prefetched = {}
+		self.prefetched_upto = -1
+
+	def update_entries_after(
+		self, args, current_index, distinct_item_warehouses, resume_from=None, checkpoint=None
+	):
+		if current_index > self.prefetched_upto:
+			self.prefetch(args, current_index)
+
+		row = args[current_index]
+		key = (row.get("item_code"), row.get("warehouse"))
+
+		# prefetched data is consumed once, a second pass over the same
+		# item-warehouse must see the SLEs as updated by the first one
+		prefetched = self.prefetched.pop(key, None)
+		if prefetched and (resume_from or prefetched.posting_datetime != get_posting_datetime(row)):
+			prefetched = None
+
+		return update_entries_after_in_batch(
+			{
+				"item_code": row.get("item_code"),
+				"warehouse": row.get("warehouse"),
+				"posting_date": row.get("posting_date"),
+				"posting_time": row.get("posting_time"),
+				"creation": row.get("creation"),
+				"distinct_item_warehouses": distinct_item_warehouses,
+				"items_to_be_repost": args,
+				"current_index": current_index,
+				"resume_from": resume_from,
+			},
+			prefetched=prefetched,
+			checkpoint=checkpoint,
+			allow_negative_stock=self.allow_negative_stock,
+			via_landed_cost_voucher=self.via_landed_cost_voucher,
+		)
+
+	def in_window(self, index) -> bool:
+		"""Whether the row at `index` is part of the window prefetched in the current transaction."""
+		return index <= self.prefetched_upto
+
+	def discard_prefetched(self):
+		self.prefetched = {}
+		self.prefetched_upto = -1
+
+	def prefetch(self, args, current_index):
+		self.prefetched = {}
+		self.prefetched_upto = current_index + self.batch_size - 1
+
+		# locks of the prefetched SLEs end with the transaction
+		frappe.db.after_commit.add(self.discard_prefetched)
+		frappe.db.after_rollback.add(self.discard_prefetched)
+
+		window = {}
+		for row in args[current_index : current_index + self.batch_size]:
+			key = (row.get("item_code"), row.get("warehouse"))
+			if key not in window:
+				window[key] = frappe._dict(
+					{
+						"posting_datetime": get_posting_datetime(row),
+						"previous_sle": frappe._dict(),
+						"entries": [],
+					}
+				)
+
+		if not window:
+			return
+
+		# item codes and warehouses are matched case-insensitively on MariaDB
+		lookup = {
+			(item_code.casefold(), warehouse.casefold()): data
+			for (item_code, warehouse), data in window.items()
+		}
+
+		for sle in get_previous_sles(window):
+			lookup[(sle.item_code.casefold(), sle.warehouse.casefold())].previous_sle = sle
+
+		for sle in get_future_sles(window):
+			lookup[(sle.item_code.casefold(), sle.warehouse.casefold())].entries.append(sle)
+
+		self.prefetched = window
+
+
+class update_entries_after_in_batch(update_entries_after):
+	"""`update_entries_after` that reads prefetched SLEs and defers SLE writes to bulk UPDATEs."""
+
+	def __init__(self, args, prefetched=None, **kwargs):
+		self.prefetched = prefetched
+		self.pending_sles = []
+		self.last_sle_for_bin = None
+		super().__init__(args, **kwargs)
+
+	def get_previous_sle_for_warehouse(self, args):
+		if self.prefetched and args is self.args:
+			args["posting_datetime"] = self.prefetched.posting_datetime
+			return self.prefetched.previous_sle
+
+		return super().get_previous_sle_for_warehouse(args)
+
+	def get_sle_after_datetime(self, args):
+		if self.prefetched and args.get("warehouse") == self.args.warehouse:
+			entries, self.prefetched = self.prefetched.entries, None
+			return entries
+
+		return super().get_sle_after_datetime(args)
+
+	def build(self):
+		super().build()
+
+		self.flush_sles()
+		if self.last_sle_for_bin:
+			super().update_bin_data(self.last_sle_for_bin)
+
+	def process_sle(self, sle):
+		if needs_ledger_lookup(sle):
+			self.flush_sles()
+
+		super().process_sle(sle)
+
+	def update_sle(self, sle):
+		self.pending_sles.append(sle)
+
+	def before_checkpoint(self):
+		self.flush_sles()
+		if self.last_sle_for_bin:
+			super().update_bin_data(self.last_sle_for_bin)
+			self.last_sle_for_bin = None
+
+	def get_stock_queue(self):
+		# reuse the queue object of the last SLE as long as the
+		# stock queue of the warehouse is the one it produced
+		stock_queue, state = self.wh_data.get("array_stock_queue") or (None, None)
+		if stock_queue is None or state is not self.wh_data.stock_queue or len(stock_queue) != len(state):
+			valuation = ArrayLIFOValuation if self.valuation_method == "LIFO" else ArrayFIFOValuation
+			stock_queue = valuation(self.wh_data.stock_queue)
+
+		self.current_stock_queue = stock_queue
+		return stock_queue
+
+	def update_queue_values(self, sle):
+		super().update_queue_values(sle)
+		self.wh_data.array_stock_queue = (self.current_stock_queue, self.wh_data.stock_queue)
+
+	def update_bin_data(self, sle):
+		self.last_sle_for_bin = sle
+
+	def flush_sles(self):
+		if not self.pending_sles:
+			return
+
+		bulk_update_sles(self.pending_sles)
+		self.pending_sles = []
+
+	def get_fallback_rate(self, sle) -> float:
+		self.flush_sles()
+		return super().get_fallback_rate(sle)
+
+	def recalculate_amounts_in_stock_entry(self, voucher_no):
+		self.flush_sles()
+		super().recalculate_amounts_in_stock_entry(voucher_no)
+
+	def update_rate_on_purchase_receipt(self, sle, outgoing_rate):
+		self.flush_sles()
+		super().update_rate_on_purchase_receipt(sle, outgoing_rate)
+
+	def update_rate_on_subcontracting_receipt(self, sle, outgoing_rate):
+		self.flush_sles()
+		super().update_rate_on_subcontracting_receipt(sle, outgoing_rate)
+
+	def update_rate_on_stock_reconciliation(self, sle):
+		self.flush_sles()
+		super().update_rate_on_stock_reconciliation(sle)
+
+
+def needs_ledger_lookup(sle) -> bool:
+	"""SLEs whose valuation depends on values read back from the ledger."""
+	return bool(
+		sle.recalculate_rate
+		or sle.serial_no
+		or sle.batch_no
+		or sle.serial_and_batch_bundle
+		or sle.voucher_type == "Stock Reconciliation"
+	)
+
+
+def get_posting_datetime(row):
+	if not row.get("posting_date"):
+		return get_combine_datetime("1900-01-01", "00:00:00")
+
+	return get_combine_datetime(row.get("posting_date"), row.get("posting_time") or "00:00:00")
+
+
+def get_previous_sles(window):
+	"""Last SLE before the reposting datetime of each item-warehouse, in a single UNION query."""
+	subqueries, values = [], []
+	for (item_code, warehouse), data in window.items():
+		subqueries.append(
+			"""(
+				select *, posting_datetime as "timestamp"
+				from `tabStock Ledger Entry`
+				where item_code = %s
+					and warehouse = %s
+					and is_cancelled = 0
+					and posting_datetime < %s
+				order by posting_date desc, posting_time desc, creation desc
+				limit 1
+			)"""
+		)
+		values.extend([item_code, warehouse, data.posting_datetime])
+
+	return frappe.db.sql(" union all ".join(subqueries), values, as_dict=1)  # nosemgrep
+
+
+def get_future_sles(window):
+	"""SLEs after the previous SLE of each item-warehouse, ordered for replay."""
+	conditions, values = [], []
+	for (item_code, warehouse), data in window.items():
+		previous_sle = data.previous_sle
+		if previous_sle:
+			conditions.append("(item_code = %s and warehouse = %s and posting_datetime > %s and name != %s)")
+			values.extend(
+				[
+					item_code,
+					warehouse,
+					get_combine_datetime(previous_sle.posting_date, previous_sle.posting_time or "00:00:00"),
+					previous_sle.name,
+				]
+			)
+		else:
+			conditions.append("(item_code = %s and warehouse = %s)")
+			values.extend([item_code, warehouse])
+
+	return frappe.db.sql(  # nosemgrep
+		"""
+		select *, posting_datetime as "timestamp"
+		from `tabStock Ledger Entry`
+		where is_cancelled = 0
+			and ({conditions})
+		order by item_code, warehouse, posting_date, posting_time, creation
+		for update""".format(conditions=" or ".join(conditions)),
+		values,
+		as_dict=1,
+	)
+
+
+def bulk_update_sles(sles):
+	table = frappe.qb.DocType("Stock Ledger Entry")
+
+	for batch in create_batch(sles, SLE_UPDATE_BATCH_SIZE):
+		query = frappe.qb.update(table)
+		for field in SLE_FIELDS_TO_UPDATE:
+			case = Case()
+			for sle in batch:
+				case = case.when(table.name == sle.name, sle.get(field))
+			query = query.set(table[field], case)
+
+		query.where(table.name.isin([sle.name for sle in batch])).run()
+
+	# a stock reconciliation left without a qty difference is cancelled by the replay, `is_cancelled` is
+	# not part of the bulk UPDATE so a stale value never reverts an SLE cancelled in the meantime
+	if cancelled := [sle.name for sle in sles if sle.is_cancelled]:
+		frappe.qb.update(table).set(table.is_cancelled, 1).where(table.name.isin(cancelled)).run()
+
+
+class RepostStats:
+	"""Throughput of a single `repost_future_sle` run."""
+
+	def __init__(self, batched=False):
+		self.batched = batched
+		self.item_warehouses = 0
+		self.sles = 0
+		self.start = time.monotonic()
+
+	def add(self, obj):
+		self.item_warehouses += 1
+		self.sles += obj.processed_sles
+
+	def as_dict(self):
+		elapsed = time.monotonic() - self.start
+
+		return frappe._dict(
+			{
+				"batched": self.batched,
+				"item_warehouses": self.item_warehouses,
+				"sles": self.sles,
+				"elapsed": flt(elapsed, 3),
+				"sles_per_second": flt(self.sles / elapsed, 2) if elapsed else 0.0,
+			}
+		)
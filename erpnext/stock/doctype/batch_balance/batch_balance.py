@@ -0,0 +1,312 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Case
+from frappe.query_builder.functions import Max, Sum
+from frappe.utils import cint, create_batch, flt, get_datetime, now, nowtime, today
+
+from erpnext.stock.utils import get_combine_datetime
+
+# rows written per statement by `rebuild_batch_balances`
+REBUILD_BATCH_SIZE = 5000
+
+# items rebuilt per transaction by `rebuild_batch_balances`
+REBUILD_ITEMS_PER_TRANSACTION = 500
+
+
+class BatchBalance(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		batch_no: DF.Link
+		item_code: DF.Link
+		posting_datetime: DF.Datetime | None
+		qty: DF.Float
+		warehouse: DF.Link
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Batch Balance", ["item_code", "warehouse"])
+
+
+def is_batch_balance_enabled() -> bool:
+	return bool(cint(frappe.db.get_single_value("Stock Settings", "use_batch_balance", cache=True)))
+
+
+def is_batch_balance_ready() -> bool:
+	"""Batch balances are read once they are enabled and built, until then batches are summed from the ledger."""
+	return is_batch_balance_enabled() and bool(
+		cint(frappe.db.get_single_value("Stock Settings", "batch_balance_ready", cache=True))
+	)
+
+
+def get_batch_balance_name(item_code, warehouse, batch_no):
+	return hashlib.sha256("\x1f".join((item_code, warehouse, batch_no)).encode()).hexdigest()
+
+
+def update_batch_balances(sle):
+	"""Add the batches of the bundle of a stock ledger entry to their balances,
+	or subtract them if the entry is a cancellation."""
+	if not sle.serial_and_batch_bundle or not is_batch_balance_enabled():
+		return
+
+	batch_ledger = frappe.qb.DocType("Serial and Batch Entry")
+	batches = (
+		frappe.qb.from_(batch_ledger)
+		.select(batch_ledger.batch_no, Sum(batch_ledger.qty).as_("qty"))
+		.where(
+			(batch_ledger.parent == sle.serial_and_batch_bundle)
+			& (batch_ledger.batch_no.isnotnull())
+			& (batch_ledger.batch_no != "")
+		)
+		.groupby(batch_ledger.batch_no)
+	).run(as_dict=True)
+
+	if not batches:
+		return
+
+	sign, posting_datetime = -1, None
+	if not sle.is_cancelled:
+		sign = 1
+		posting_datetime = sle.get("posting_datetime") or get_combine_datetime(
+			sle.posting_date, sle.posting_time
+		)
+
+	names = {d.batch_no: get_batch_balance_name(sle.item_code, sle.warehouse, d.batch_no) for d in batches}
+	existing = set(
+		frappe.get_all("Batch Balance", filters={"name": ("in", list(names.values()))}, pluck="name")
+	)
+
+	for d in batches:
+		name = names[d.batch_no]
+		qty = sign * flt(d.qty)
+		if name in existing:
+			add_to_batch_balance(name, qty, posting_datetime)
+		else:
+			insert_batch_balance(name, sle.item_code, sle.warehouse, d.batch_no, qty, posting_datetime)
+
+
+def adjust_batch_balance(item_code, warehouse, batch_no, qty):
+	"""Add `qty` to a batch balance, for bundle quantities changed in place while reposting."""
+	if not flt(qty) or not is_batch_balance_enabled():
+		return
+
+	name = get_batch_balance_name(item_code, warehouse, batch_no)
+	if frappe.db.exists("Batch Balance", name):
+		add_to_batch_balance(name, qty)
+	else:
+		insert_batch_balance(name, item_code, warehouse, batch_no, qty)
+
+
+def add_to_batch_balance(name, qty, posting_datetime=None):
+	batch_balance = frappe.qb.DocType("Batch Balance")
+	query = (
+		frappe.qb.update(batch_balance)
+		.set(batch_balance.qty, batch_balance.qty + flt(qty))
+		.set(batch_balance.modified, now())
+		.where(batch_balance.name == name)
+	)
+
+	if posting_datetime:
+		query = query.set(
+			batch_balance.posting_datetime,
+			Case()
+			.when(
+				batch_balance.posting_datetime.isnull() | (batch_balance.posting_datetime < posting_datetime),
+				posting_datetime,
+			)
+			.else_(batch_balance.posting_datetime),
+		)
+
+	query.run()
+
+
+def insert_batch_balance(name, item_code, warehouse, batch_no, qty, posting_datetime=None):
+	"""Insert a new batch balance and take care of concurrent inserts of the same one."""
+	savepoint = "insert_batch_balance"
+	try:
+		frappe.db.savepoint(savepoint)
+		frappe.get_doc(
+			{
+				"doctype": "Batch Balance",
+				"name": name,
+				"item_code": item_code,
+				"warehouse": warehouse,
+				"batch_no": batch_no,
+				"qty": flt(qty),
+				"posting_datetime": posting_datetime,
+			}
+		).db_insert()
+	except frappe.DuplicateEntryError:
+		frappe.db.rollback(save_point=savepoint)  # preserve transaction in postgres
+		add_to_batch_balance(name, qty, posting_datetime)
+
+
+def get_available_batches_from_batch_balance(kwargs):
+	"""Batch quantities like `get_available_batches` sums them from the ledger.
+
+	Returns None if there are ledger entries after the posting date and time in kwargs for any of
+	the batches, those have to be replayed from the ledger.
+	"""
+	batch_balance = frappe.qb.DocType("Batch Balance")
+	batch_table = frappe.qb.DocType("Batch")
+
+	query = (
+		frappe.qb.from_(batch_balance)
+		.inner_join(batch_table)
+		.on(batch_balance.batch_no == batch_table.name)
+		.select(
+			batch_balance.batch_no,
+			batch_balance.warehouse,
+			batch_balance.qty,
+			batch_balance.posting_datetime,
+		)
+		.where(batch_table.disabled == 0)
+	)
+
+	if not kwargs.get("for_stock_levels"):
+		query = query.where((batch_table.expiry_date >= today()) | (batch_table.expiry_date.isnull()))
+
+	for field in ["warehouse", "item_code", "batch_no"]:
+		if not kwargs.get(field):
+			continue
+
+		if isinstance(kwargs.get(field), list):
+			query = query.where(batch_balance[field].isin(kwargs.get(field)))
+		else:
+			query = query.where(batch_balance[field] == kwargs.get(field))
+
+	if kwargs.based_on == "LIFO":
+		query = query.orderby(batch_table.creation, order=frappe.qb.desc)
+	elif kwargs.based_on == "Expiry":
+		query = query.orderby(batch_table.expiry_date)
+	else:
+		query = query.orderby(batch_table.creation)
+
+	data = query.run(as_dict=True)
+
+	if kwargs.get("posting_date"):
+		posting_datetime = get_combine_datetime(kwargs.posting_date, kwargs.get("posting_time") or nowtime())
+		if any(d.posting_datetime and get_datetime(d.posting_datetime) > posting_datetime for d in data):
+			return None
+
+	for d in data:
+		del d["posting_datetime"]
+
+	return data
+
+
+def rebuild_batch_balances(item_code=None):
+	"""Recompute batch balances from the Stock Ledger, a few hundred items per transaction.
+
+	Enabling Use Batch Balance runs it in the background, batches are read from the balances once all
+	items are done. To repair them run
+
+		bench --site <site> execute erpnext.stock.doctype.batch_balance.batch_balance.rebuild_batch_balances
+
+	Ledger entries of the items are read with a lock before their balances are deleted, so postings of
+	the items wait until they are rebuilt and are neither missed nor counted twice.
+	"""
+	if item_code:
+		item_codes = [item_code]
+	else:
+		item_codes = sorted(
+			set(frappe.get_all("Item", filters={"has_batch_no": 1}, pluck="name"))
+			| set(frappe.get_all("Batch Balance", fields=["item_code"], distinct=True, pluck="item_code"))
+		)
+
+	for items in create_batch(item_codes, REBUILD_ITEMS_PER_TRANSACTION):
+		lock_stock_ledger_entries(items)
+		balances = get_batch_balances_from_ledger(items)
+		frappe.db.delete("Batch Balance", {"item_code": ("in", items)})
+		insert_batch_balances(balances)
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+	if not item_code:
+		frappe.db.set_single_value("Stock Settings", "batch_balance_ready", 1)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+
+def lock_stock_ledger_entries(item_codes):
+	stock_ledger_entry = frappe.qb.DocType("Stock Ledger Entry")
+	(
+		frappe.qb.from_(stock_ledger_entry)
+		.select(stock_ledger_entry.name)
+		.where((stock_ledger_entry.item_code.isin(item_codes)) & (stock_ledger_entry.is_cancelled == 0))
+		.for_update()
+	).run()
+
+
+def get_batch_balances_from_ledger(item_codes):
+	stock_ledger_entry = frappe.qb.DocType("Stock Ledger Entry")
+	batch_ledger = frappe.qb.DocType("Serial and Batch Entry")
+
+	return (
+		frappe.qb.from_(stock_ledger_entry)
+		.inner_join(batch_ledger)
+		.on(stock_ledger_entry.serial_and_batch_bundle == batch_ledger.parent)
+		.select(
+			stock_ledger_entry.item_code,
+			stock_ledger_entry.warehouse,
+			batch_ledger.batch_no,
+			Sum(batch_ledger.qty).as_("qty"),
+			Max(stock_ledger_entry.posting_datetime).as_("posting_datetime"),
+		)
+		.where(
+			(stock_ledger_entry.item_code.isin(item_codes))
+			& (stock_ledger_entry.is_cancelled == 0)
+			& (batch_ledger.batch_no.isnotnull())
+			& (batch_ledger.batch_no != "")
+		)
+		.groupby(stock_ledger_entry.item_code, stock_ledger_entry.warehouse, batch_ledger.batch_no)
+	).run(as_dict=True)
+
+
+def insert_batch_balances(balances):
+	timestamp, user = now(), frappe.session.user
+	frappe.db.bulk_insert(
+		"Batch Balance",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"item_code",
+			"warehouse",
+			"batch_no",
+			"qty",
+			"posting_datetime",
+		],
+		values=(
+			[
+				get_batch_balance_name(d.item_code, d.warehouse, d.batch_no),
+				timestamp,
+				timestamp,
+				user,
+				user,
+				d.item_code,
+				d.warehouse,
+				d.batch_no,
+				flt(d.qty),
+				d.posting_datetime,
+			]
+			for d in balances
+		),
+		chunk_size=REBUILD_BATCH_SIZE,
+	)
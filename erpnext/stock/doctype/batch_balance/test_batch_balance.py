@@ -0,0 +1,103 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+from frappe.utils import add_days, nowtime, today
+
+from erpnext.stock.doctype.batch.batch import get_batch_qty
+from erpnext.stock.doctype.batch_balance.batch_balance import (
+	is_batch_balance_ready,
+	rebuild_batch_balances,
+)
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.serial_and_batch_bundle.test_serial_and_batch_bundle import (
+	get_batch_from_bundle,
+)
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+
+
+class TestBatchBalance(FrappeTestCase):
+	def setUp(self):
+		self.item_code = make_item(
+			"_Test Batch Balance Item", {"has_batch_no": 1, "create_new_batch": 1, "is_stock_item": 1}
+		).name
+		self.warehouse = "_Test Warehouse - _TC"
+
+	def get_balances(self):
+		return {
+			(d.warehouse, d.batch_no): d.qty
+			for d in frappe.get_all(
+				"Batch Balance",
+				filters={"item_code": self.item_code},
+				fields=["warehouse", "batch_no", "qty"],
+			)
+		}
+
+	def get_ledger_balances(self):
+		stock_ledger_entry = frappe.qb.DocType("Stock Ledger Entry")
+		batch_ledger = frappe.qb.DocType("Serial and Batch Entry")
+
+		data = (
+			frappe.qb.from_(stock_ledger_entry)
+			.inner_join(batch_ledger)
+			.on(stock_ledger_entry.serial_and_batch_bundle == batch_ledger.parent)
+			.select(stock_ledger_entry.warehouse, batch_ledger.batch_no, batch_ledger.qty)
+			.where((stock_ledger_entry.is_cancelled == 0) & (stock_ledger_entry.item_code == self.item_code))
+		).run(as_dict=True)
+
+		balances = {}
+		for d in data:
+			balances[(d.warehouse, d.batch_no)] = balances.get((d.warehouse, d.batch_no), 0.0) + d.qty
+
+		return balances
+
+	@change_settings("Stock Settings", {"use_batch_balance": 1})
+	def test_batch_balances_follow_ledger(self):
+		receipt = make_stock_entry(item_code=self.item_code, qty=10, rate=100, target=self.warehouse)
+		batch_no = get_batch_from_bundle(receipt.items[0].serial_and_batch_bundle)
+
+		issue = make_stock_entry(item_code=self.item_code, qty=4, source=self.warehouse, batch_no=batch_no)
+		self.assertEqual(self.get_balances(), self.get_ledger_balances())
+		self.assertEqual(self.get_balances()[(self.warehouse, batch_no)], 6)
+		self.assertEqual(get_batch_qty(batch_no, self.warehouse, self.item_code), 6)
+
+		issue.cancel()
+		self.assertEqual(self.get_balances(), self.get_ledger_balances())
+		self.assertEqual(get_batch_qty(batch_no, self.warehouse, self.item_code), 10)
+
+		incremental = self.get_balances()
+		rebuild_batch_balances(self.item_code)
+		self.assertEqual(self.get_balances(), incremental)
+
+	@change_settings("Stock Settings", {"use_batch_balance": 1})
+	def test_backdated_batch_qty_is_read_from_ledger(self):
+		receipt = make_stock_entry(item_code=self.item_code, qty=10, rate=100, target=self.warehouse)
+		batch_no = get_batch_from_bundle(receipt.items[0].serial_and_batch_bundle)
+		make_stock_entry(item_code=self.item_code, qty=4, source=self.warehouse, batch_no=batch_no)
+
+		backdated_qty = get_batch_qty(
+			batch_no,
+			self.warehouse,
+			self.item_code,
+			posting_date=add_days(today(), -1),
+			posting_time=nowtime(),
+		)
+		self.assertEqual(backdated_qty, 0)
+		self.assertEqual(get_batch_qty(batch_no, self.warehouse, self.item_code), 6)
+
+	@change_settings("Stock Settings", {"use_batch_balance": 1})
+	def test_batches_are_read_once_built(self):
+		self.assertTrue(is_batch_balance_ready())
+
+		# a rebuild in progress
+		frappe.db.set_single_value("Stock Settings", "batch_balance_ready", 0)
+		self.assertFalse(is_batch_balance_ready())
+
+		receipt = make_stock_entry(item_code=self.item_code, qty=10, rate=100, target=self.warehouse)
+		batch_no = get_batch_from_bundle(receipt.items[0].serial_and_batch_bundle)
+		self.assertEqual(get_batch_qty(batch_no, self.warehouse, self.item_code), 10)
+
+		rebuild_batch_balances()
+		self.assertTrue(is_batch_balance_ready())
+		self.assertEqual(self.get_balances(), self.get_ledger_balances())
@@ -5,7 +5,7 @@
 import frappe
 from frappe.model.document import Document
 from frappe.query_builder import Case, Order
-from frappe.query_builder.functions import Coalesce, CombineDatetime, Sum
+from frappe.query_builder.functions import Coalesce, Sum
 from frappe.utils import flt
 
 
@@ -231,6 +231,27 @@ def get_bin_details(bin_name):
 
 def update_qty(bin_name, args):
 	from erpnext.controllers.stock_controller import future_sle_exists
+	from erpnext.stock.doctype.bin_delta.bin_delta import (
+		BIN_DELTA_FIELDS,
+		add_bin_delta,
+		fold_bin_deltas,
+		is_bin_delta_enabled,
+	)
+
+	is_backdated = future_sle_exists(args, allow_force_reposting=False)
+
+	if is_bin_delta_enabled():
+		if not is_backdated:
+			# actual qty is already recorded as a delta by processing current voucher
+			add_bin_delta(
+				args.get("item_code"),
+				args.get("warehouse"),
+				**{field: args.get(field) for field in BIN_DELTA_FIELDS if field != "actual_qty"},
+			)
+			return
+
+		# actual qty is set from the ledger below
+		fold_bin_deltas(args.get("item_code"), args.get("warehouse"))
 
 	bin_details = get_bin_details(bin_name)
 	# actual qty is already updated by processing current voucher
@@ -238,7 +259,7 @@ def update_qty(bin_name, args):
 	sle = frappe.qb.DocType("Stock Ledger Entry")
 
 	# actual qty is not up to date in case of backdated transaction
-	if future_sle_exists(args, allow_force_reposting=False):
+	if is_backdated:
 		last_sle_qty = (
 			frappe.qb.from_(sle)
 			.select(sle.qty_after_transaction)
@@ -247,7 +268,7 @@ def update_qty(bin_name, args):
 				& (sle.warehouse == args.get("warehouse"))
 				& (sle.is_cancelled == 0)
 			)
-			.orderby(CombineDatetime(sle.posting_date, sle.posting_time), order=Order.desc)
+			.orderby(sle.posting_datetime, order=Order.desc)
 			.orderby(sle.creation, order=Order.desc)
 			.limit(1)
 			.run()
@@ -0,0 +1,252 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, cstr, flt
+
+from erpnext.stock.utils import get_or_make_bin
+
+BIN_DELTA_FIELDS = ("actual_qty", "reserved_qty", "ordered_qty", "indented_qty", "planned_qty")
+
+# deltas folded into Bin per transaction by the scheduled job
+FOLD_BATCH_SIZE = 5000
+
+
+class BinDelta(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		absolute_qty_fields: DF.Data | None
+		actual_qty: DF.Float
+		indented_qty: DF.Float
+		item_code: DF.Link
+		ordered_qty: DF.Float
+		planned_qty: DF.Float
+		reserved_qty: DF.Float
+		stock_value_difference: DF.Float
+		valuation_rate: DF.Float
+		voucher_no: DF.DynamicLink | None
+		voucher_type: DF.Link | None
+		warehouse: DF.Link
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Bin Delta", ["item_code", "warehouse", "creation"])
+
+
+def is_bin_delta_enabled() -> bool:
+	return bool(cint(frappe.db.get_single_value("Stock Settings", "defer_bin_updates", cache=True)))
+
+
+def add_bin_delta(
+	item_code,
+	warehouse,
+	voucher_type=None,
+	voucher_no=None,
+	stock_value_difference=0.0,
+	valuation_rate=0.0,
+	absolute_qty_fields=None,
+	**qty,
+):
+	"""Record a change in Bin quantities without locking the Bin.
+
+	Deltas of stock transactions carry the voucher, the valuation rate of the
+	last such delta becomes the valuation rate of the Bin when it is folded.
+	Quantities in `absolute_qty_fields` are the new value of the Bin instead of
+	a difference to it.
+	"""
+	values = {field: flt(qty.get(field)) for field in BIN_DELTA_FIELDS}
+	if not voucher_no and not absolute_qty_fields and not any(values.values()):
+		return
+
+	frappe.get_doc(
+		{
+			"doctype": "Bin Delta",
+			"item_code": item_code,
+			"warehouse": warehouse,
+			"voucher_type": voucher_type,
+			"voucher_no": voucher_no,
+			"stock_value_difference": flt(stock_value_difference),
+			"valuation_rate": flt(valuation_rate),
+			"absolute_qty_fields": ",".join(absolute_qty_fields or []),
+			**values,
+		}
+	).db_insert()
+
+
+def combine_bin_deltas(deltas) -> dict:
+	"""Deltas per item and warehouse combined in the order they were added.
+
+	An absolute quantity replaces what was combined before it, its field is in
+	`absolute` of the combined delta."""
+	combined = {}
+	for delta in deltas:
+		key = (delta.item_code, delta.warehouse)
+		if key not in combined:
+			combined[key] = frappe._dict(
+				{field: 0.0 for field in (*BIN_DELTA_FIELDS, "stock_value_difference")}, absolute=set()
+			)
+
+		total = combined[key]
+		absolute_fields = set(cstr(delta.absolute_qty_fields).split(","))
+		for field in BIN_DELTA_FIELDS:
+			if field in absolute_fields:
+				total[field] = flt(delta.get(field))
+				total.absolute.add(field)
+			else:
+				total[field] += flt(delta.get(field))
+
+		total.stock_value_difference += flt(delta.stock_value_difference)
+		if delta.voucher_no:
+			total.valuation_rate = delta.valuation_rate
+
+	return combined
+
+
+def get_pending_bin_deltas(item_code, warehouses) -> frappe._dict:
+	"""Difference to Bin of the deltas of an item in the given warehouses that are not folded into Bin yet."""
+	pending = frappe._dict({field: 0.0 for field in (*BIN_DELTA_FIELDS, "projected_qty")})
+	if not warehouses or not is_bin_delta_enabled():
+		return pending
+
+	bin_delta = frappe.qb.DocType("Bin Delta")
+	deltas = combine_bin_deltas(
+		(
+			frappe.qb.from_(bin_delta)
+			.select(
+				bin_delta.item_code,
+				bin_delta.warehouse,
+				bin_delta.absolute_qty_fields,
+				*[bin_delta[field] for field in BIN_DELTA_FIELDS],
+			)
+			.where((bin_delta.item_code == item_code) & (bin_delta.warehouse.isin(list(warehouses))))
+			.orderby(bin_delta.creation)
+		).run(as_dict=True)
+	)
+
+	bins = {}
+	if absolute_warehouses := [warehouse for (_item, warehouse), delta in deltas.items() if delta.absolute]:
+		bins = {
+			d.warehouse: d
+			for d in frappe.get_all(
+				"Bin",
+				filters={"item_code": item_code, "warehouse": ("in", absolute_warehouses)},
+				fields=["warehouse", *BIN_DELTA_FIELDS],
+			)
+		}
+
+	for (_item, warehouse), delta in deltas.items():
+		for field in BIN_DELTA_FIELDS:
+			pending[field] += flt(delta[field])
+			if field in delta.absolute:
+				pending[field] -= flt(bins.get(warehouse, {}).get(field))
+
+	pending.projected_qty = get_projected_qty_delta(pending)
+	return pending
+
+
+def get_projected_qty_delta(delta) -> float:
+	return (
+		flt(delta.get("actual_qty"))
+		+ flt(delta.get("ordered_qty"))
+		+ flt(delta.get("indented_qty"))
+		+ flt(delta.get("planned_qty"))
+		- flt(delta.get("reserved_qty"))
+	)
+
+
+def fold_bin_deltas(item_code=None, warehouse=None, limit=None) -> int:
+	"""Add pending deltas to their Bins and delete them, returns the number of deltas folded."""
+	bin_delta = frappe.qb.DocType("Bin Delta")
+	query = frappe.qb.from_(bin_delta).select(bin_delta.name).orderby(bin_delta.creation)
+
+	if item_code:
+		query = query.where(bin_delta.item_code == item_code)
+	if warehouse:
+		query = query.where(bin_delta.warehouse == warehouse)
+	if limit:
+		query = query.limit(limit)
+
+	names = query.run(pluck=True)
+	if not names:
+		return 0
+
+	# lock only the selected deltas by name, deltas added meanwhile are not blocked
+	deltas = (
+		frappe.qb.from_(bin_delta)
+		.select(
+			bin_delta.name,
+			bin_delta.item_code,
+			bin_delta.warehouse,
+			bin_delta.voucher_no,
+			bin_delta.stock_value_difference,
+			bin_delta.valuation_rate,
+			bin_delta.absolute_qty_fields,
+			*[bin_delta[field] for field in BIN_DELTA_FIELDS],
+		)
+		.where(bin_delta.name.isin(names))
+		.orderby(bin_delta.creation)
+		.for_update()
+	).run(as_dict=True)
+
+	# folded by a concurrent job in the meantime
+	if not deltas:
+		return 0
+
+	for (item_code, warehouse), delta in combine_bin_deltas(deltas).items():
+		apply_delta_to_bin(get_or_make_bin(item_code, warehouse), delta)
+
+	frappe.qb.from_(bin_delta).delete().where(bin_delta.name.isin([d.name for d in deltas])).run()
+
+	return len(deltas)
+
+
+def apply_delta_to_bin(bin_name, delta):
+	bin = frappe.qb.DocType("Bin")
+	difference = {
+		field: flt(delta.get(field)) - bin[field] if field in delta.absolute else flt(delta.get(field))
+		for field in BIN_DELTA_FIELDS
+	}
+
+	# projected qty is set first, so it is computed from the quantities before the update
+	query = (
+		frappe.qb.update(bin)
+		.set(
+			bin.projected_qty,
+			bin.projected_qty
+			+ difference["actual_qty"]
+			+ difference["ordered_qty"]
+			+ difference["indented_qty"]
+			+ difference["planned_qty"]
+			- difference["reserved_qty"],
+		)
+		.set(bin.stock_value, bin.stock_value + flt(delta.stock_value_difference))
+		.where(bin.name == bin_name)
+	)
+
+	for field in BIN_DELTA_FIELDS:
+		if field in delta.absolute:
+			query = query.set(bin[field], flt(delta.get(field)))
+		else:
+			query = query.set(bin[field], bin[field] + flt(delta.get(field)))
+
+	if delta.valuation_rate is not None:
+		query = query.set(bin.valuation_rate, flt(delta.valuation_rate))
+
+	query.run()
+
+
+def fold_pending_bin_deltas():
+	"""Scheduled job, folds deltas into Bin in batches of `FOLD_BATCH_SIZE`."""
+	while fold_bin_deltas(limit=FOLD_BATCH_SIZE):
+		if not frappe.flags.in_test:
+			frappe.db.commit()
@@ -0,0 +1,99 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+from frappe.utils import add_days, today
+
+from erpnext.accounts.doctype.pos_invoice.pos_invoice import get_stock_availability
+from erpnext.stock.doctype.bin_delta.bin_delta import add_bin_delta, fold_pending_bin_deltas
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.get_item_details import get_bin_details
+from erpnext.stock.stock_balance import update_bin_qty
+
+
+class TestBinDelta(FrappeTestCase):
+	def setUp(self):
+		self.item_code = make_item(properties={"is_stock_item": 1}).name
+		self.warehouse = "_Test Warehouse - _TC"
+
+	def get_bin(self):
+		return frappe.db.get_value(
+			"Bin",
+			{"item_code": self.item_code, "warehouse": self.warehouse},
+			["actual_qty", "reserved_qty", "projected_qty", "stock_value", "valuation_rate"],
+			as_dict=True,
+		)
+
+	@change_settings("Stock Settings", {"defer_bin_updates": 1})
+	def test_stock_transactions_add_deltas(self):
+		make_stock_entry(item_code=self.item_code, qty=10, rate=100, to_warehouse=self.warehouse)
+		make_stock_entry(item_code=self.item_code, qty=4, from_warehouse=self.warehouse)
+
+		self.assertEqual(frappe.db.count("Bin Delta", {"item_code": self.item_code}), 2)
+		self.assertEqual(self.get_bin().actual_qty, 0)
+
+		# readers see Bin and pending deltas
+		self.assertEqual(get_bin_details(self.item_code, self.warehouse)["actual_qty"], 6)
+		self.assertEqual(get_stock_availability(self.item_code, self.warehouse)[0], 6)
+
+		fold_pending_bin_deltas()
+
+		self.assertFalse(frappe.db.count("Bin Delta", {"item_code": self.item_code}))
+		bin = self.get_bin()
+		self.assertEqual(bin.actual_qty, 6)
+		self.assertEqual(bin.projected_qty, 6)
+		self.assertEqual(bin.stock_value, 600)
+		self.assertEqual(bin.valuation_rate, 100)
+
+	@change_settings("Stock Settings", {"defer_bin_updates": 1})
+	def test_absolute_quantities_are_recorded_as_difference(self):
+		make_stock_entry(item_code=self.item_code, qty=10, rate=100, to_warehouse=self.warehouse)
+
+		update_bin_qty(self.item_code, self.warehouse, {"reserved_qty": 3})
+		update_bin_qty(self.item_code, self.warehouse, {"reserved_qty": 5})
+
+		bin_details = get_bin_details(self.item_code, self.warehouse)
+		self.assertEqual(bin_details["reserved_qty"], 5)
+		self.assertEqual(bin_details["projected_qty"], 5)
+
+		fold_pending_bin_deltas()
+
+		bin = self.get_bin()
+		self.assertEqual(bin.reserved_qty, 5)
+		self.assertEqual(bin.projected_qty, 5)
+
+	@change_settings("Stock Settings", {"defer_bin_updates": 1})
+	def test_absolute_quantities_replace_earlier_deltas(self):
+		update_bin_qty(self.item_code, self.warehouse, {"reserved_qty": 4})
+		fold_pending_bin_deltas()
+
+		add_bin_delta(self.item_code, self.warehouse, reserved_qty=2)
+		update_bin_qty(self.item_code, self.warehouse, {"reserved_qty": 5})
+		add_bin_delta(self.item_code, self.warehouse, reserved_qty=1)
+
+		bin_details = get_bin_details(self.item_code, self.warehouse)
+		self.assertEqual(bin_details["reserved_qty"], 6)
+		self.assertEqual(bin_details["projected_qty"], -6)
+
+		fold_pending_bin_deltas()
+
+		bin = self.get_bin()
+		self.assertEqual(bin.reserved_qty, 6)
+		self.assertEqual(bin.projected_qty, -6)
+
+	@change_settings("Stock Settings", {"defer_bin_updates": 1})
+	def test_backdated_entry_folds_deltas(self):
+		make_stock_entry(item_code=self.item_code, qty=10, rate=100, to_warehouse=self.warehouse)
+		make_stock_entry(
+			item_code=self.item_code,
+			qty=5,
+			rate=100,
+			to_warehouse=self.warehouse,
+			posting_date=add_days(today(), -1),
+		)
+
+		# actual qty of a backdated entry comes from the ledger
+		self.assertFalse(frappe.db.count("Bin Delta", {"item_code": self.item_code, "actual_qty": ("!=", 0)}))
+		self.assertEqual(self.get_bin().actual_qty, 15)
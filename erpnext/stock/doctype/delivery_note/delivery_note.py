@@ -12,6 +12,7 @@ from frappe.utils import cint, flt
 
 from erpnext.controllers.accounts_controller import get_taxes_and_charges, merge_taxes
 from erpnext.controllers.selling_controller import SellingController
+from erpnext.selling.doctype.customer_exposure.customer_exposure import update_voucher_exposure
 from erpnext.stock.doctype.serial_no.serial_no import get_delivery_note_serial_no
 
 form_grid_templates = {"items": "templates/form_grid/item_grid.html"}
@@ -768,6 +769,7 @@ class DeliveryNote(SellingController):
 
 	def update_status(self, status):
 		self.set_status(update=True, status=status)
+		update_voucher_exposure(self.doctype, self.name)
 		self.notify_update()
 		clear_doctype_notifications(self)
 
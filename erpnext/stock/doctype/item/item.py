@@ -33,6 +33,10 @@ from erpnext.controllers.item_variant import (
 	validate_item_variant_attributes,
 )
 from erpnext.stock.doctype.item_default.item_default import ItemDefault
+from erpnext.stock.doctype.item_search_token.item_search_token import (
+	delete_item_search_tokens,
+	update_item_search_tokens,
+)
 
 
 class DuplicateReorderRows(frappe.ValidationError):
@@ -221,6 +225,8 @@ class Item(Document):
 	def on_update(self):
 		self.update_variants()
 		self.update_item_price()
+		update_item_search_tokens(self)
+		self.clear_pos_item_catalog()
 
 	def validate_description(self):
 		"""Clean HTML description if set"""
@@ -544,6 +550,8 @@ class Item(Document):
 	def on_trash(self):
 		frappe.db.sql("""delete from tabBin where item_code=%s""", self.name)
 		frappe.db.sql("delete from `tabItem Price` where item_code=%s", self.name)
+		delete_item_search_tokens(self.name)
+		self.clear_pos_item_catalog()
 		for variant_of in frappe.get_all("Item", filters={"variant_of": self.name}):
 			frappe.delete_doc("Item", variant_of.name)
 
@@ -590,6 +598,14 @@ class Item(Document):
 						update_modified=False,
 					)
 
+		update_item_search_tokens(frappe.get_doc("Item", new_name))
+		self.clear_pos_item_catalog()
+
+	def clear_pos_item_catalog(self):
+		from erpnext.selling.page.point_of_sale.point_of_sale import clear_item_catalog_cache
+
+		clear_item_catalog_cache()
+
 	def delete_old_bins(self, old_name):
 		frappe.db.delete("Bin", {"item_code": old_name})
 
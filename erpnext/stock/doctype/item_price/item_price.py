@@ -138,6 +138,17 @@ class ItemPrice(Document):
 				ItemPriceDuplicateItem,
 			)
 
+	def on_update(self):
+		self.clear_pos_item_catalog()
+
+	def on_trash(self):
+		self.clear_pos_item_catalog()
+
+	def clear_pos_item_catalog(self):
+		from erpnext.selling.page.point_of_sale.point_of_sale import clear_item_catalog_cache
+
+		clear_item_catalog_cache()
+
 	def before_save(self):
 		if self.selling:
 			self.reference = self.customer
@@ -0,0 +1,270 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import hashlib
+import re
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Count
+from frappe.utils import cint, create_batch, cstr, now, strip_html
+
+# weight of a word by the field it is found in, doubled when the search word is the whole word
+FIELD_WEIGHTS = {
+	"item_code": 8,
+	"barcode": 8,
+	"item_name": 4,
+	"supplier_part_no": 4,
+	"search_field": 2,
+	"item_group": 1,
+}
+
+# search fields indexed with a weight of their own, or too long to be split into words
+SKIPPED_SEARCH_FIELDS = ("name", "item_code", "item_name", "item_group", "description")
+
+# words of a search term matched against the index, the rest is ignored
+MAX_SEARCH_WORDS = 5
+
+# length of the token column
+MAX_TOKEN_LENGTH = 140
+
+# items indexed per batch by `rebuild_item_search_tokens`
+REBUILD_BATCH_SIZE = 5000
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+class ItemSearchToken(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		item_code: DF.Link
+		token: DF.Data
+		weight: DF.Int
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Item Search Token", ["token", "item_code"])
+
+
+def is_item_search_index_enabled() -> bool:
+	return bool(cint(frappe.db.get_single_value("Stock Settings", "use_item_search_index", cache=True)))
+
+
+def is_item_search_index_ready() -> bool:
+	"""Items are searched through the index once it is enabled and built, until then Item is scanned."""
+	return is_item_search_index_enabled() and bool(
+		cint(frappe.db.get_single_value("Stock Settings", "item_search_index_ready", cache=True))
+	)
+
+
+def get_search_words(text):
+	"""Lowercase words of letters and digits in a text, without HTML."""
+	text = cstr(text)
+	if "<" in text:
+		text = strip_html(text)
+
+	return [word[:MAX_TOKEN_LENGTH] for word in WORD_PATTERN.findall(text.lower())]
+
+
+def get_item_search_fields():
+	"""Item fields searched by `item_query` and the Point of Sale besides code, name and group."""
+	meta = frappe.get_meta("Item", cached=True)
+	search_fields = meta.get_search_fields() + frappe.get_all("POS Search Fields", pluck="fieldname")
+
+	return [
+		fieldname
+		for fieldname in dict.fromkeys(search_fields)
+		if fieldname not in SKIPPED_SEARCH_FIELDS and meta.has_field(fieldname)
+	]
+
+
+def get_item_search_tokens(item, barcodes=(), supplier_part_nos=(), search_fields=()):
+	"""Tokens of an item with the weight of the most relevant field they are found in."""
+	values = [
+		("item_code", item.get("name")),
+		("item_name", item.get("item_name")),
+		("item_group", item.get("item_group")),
+		*[("search_field", item.get(fieldname)) for fieldname in search_fields],
+		*[("barcode", barcode) for barcode in barcodes],
+		*[("supplier_part_no", supplier_part_no) for supplier_part_no in supplier_part_nos],
+	]
+
+	tokens = {}
+	for field, value in values:
+		for word in get_search_words(value):
+			tokens[word] = max(tokens.get(word, 0), FIELD_WEIGHTS[field])
+
+	return tokens
+
+
+def get_item_search_token_name(item_code, token):
+	return hashlib.sha256("\x1f".join((item_code, token)).encode()).hexdigest()
+
+
+def update_item_search_tokens(item):
+	"""Index an Item with its barcodes and supplier part numbers as it is saved."""
+	if not is_item_search_index_enabled():
+		return
+
+	frappe.db.delete("Item Search Token", {"item_code": item.name})
+
+	tokens = get_item_search_tokens(
+		item,
+		barcodes=[d.barcode for d in item.get("barcodes", [])],
+		supplier_part_nos=[d.supplier_part_no for d in item.get("supplier_items", [])],
+		search_fields=get_item_search_fields(),
+	)
+	insert_item_search_tokens({item.name: tokens})
+
+
+def delete_item_search_tokens(item_code):
+	if is_item_search_index_enabled():
+		frappe.db.delete("Item Search Token", {"item_code": item_code})
+
+
+def insert_item_search_tokens(tokens_by_item):
+	timestamp, user = now(), frappe.session.user
+	frappe.db.bulk_insert(
+		"Item Search Token",
+		fields=["name", "creation", "modified", "owner", "modified_by", "item_code", "token", "weight"],
+		values=(
+			[
+				get_item_search_token_name(item_code, token),
+				timestamp,
+				timestamp,
+				user,
+				user,
+				item_code,
+				token,
+				weight,
+			]
+			for item_code, tokens in tokens_by_item.items()
+			for token, weight in tokens.items()
+		),
+		chunk_size=REBUILD_BATCH_SIZE,
+	)
+
+
+def rebuild_item_search_tokens():
+	"""Index all Items, a batch of items per transaction.
+
+	Enabling Use Item Search Index runs it in the background, items are searched through the index once
+	all of them are done. To repair the index or after changing the search fields of Item or the POS
+	Search Fields run
+
+		bench --site <site> execute erpnext.stock.doctype.item_search_token.item_search_token.rebuild_item_search_tokens
+
+	Items of a batch are read with a lock before their tokens are replaced, so items saved meanwhile
+	wait until they are indexed and are indexed as saved.
+	"""
+	frappe.db.set_single_value("Stock Settings", "item_search_index_ready", 0)
+	frappe.db.delete("Item Search Token")
+	if not frappe.flags.in_test:
+		frappe.db.commit()
+
+	search_fields = get_item_search_fields()
+	for item_codes in create_batch(frappe.get_all("Item", order_by="name", pluck="name"), REBUILD_BATCH_SIZE):
+		items = frappe.get_all(
+			"Item",
+			filters={"name": ("in", item_codes)},
+			fields=["name", "item_name", "item_group", *search_fields],
+			for_update=True,
+		)
+
+		barcodes, supplier_part_nos = {}, {}
+		for d in frappe.get_all(
+			"Item Barcode",
+			filters={"parent": ("in", item_codes), "parenttype": "Item"},
+			fields=["parent", "barcode"],
+		):
+			barcodes.setdefault(d.parent, []).append(d.barcode)
+
+		for d in frappe.get_all(
+			"Item Supplier",
+			filters={"parent": ("in", item_codes), "parenttype": "Item"},
+			fields=["parent", "supplier_part_no"],
+		):
+			supplier_part_nos.setdefault(d.parent, []).append(d.supplier_part_no)
+
+		# items saved since the rebuild started are indexed already
+		frappe.db.delete("Item Search Token", {"item_code": ("in", item_codes)})
+		insert_item_search_tokens(
+			{
+				item.name: get_item_search_tokens(
+					item,
+					barcodes=barcodes.get(item.name, []),
+					supplier_part_nos=supplier_part_nos.get(item.name, []),
+					search_fields=search_fields,
+				)
+				for item in items
+			}
+		)
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+	frappe.db.set_single_value("Stock Settings", "item_search_index_ready", 1)
+	if not frappe.flags.in_test:
+		frappe.db.commit()
+
+
+def get_item_code_by_barcode(barcode):
+	"""Item of a barcode, looked up on the words of the barcode in the index.
+
+	None if the barcode is not found or has no words to look up."""
+	words = list(dict.fromkeys(get_search_words(barcode)))
+	if not words:
+		return None
+
+	token = frappe.qb.DocType("Item Search Token")
+	item_barcode = frappe.qb.DocType("Item Barcode")
+	result = (
+		frappe.qb.from_(token)
+		.inner_join(item_barcode)
+		.on(item_barcode.parent == token.item_code)
+		.select(token.item_code)
+		.where(
+			(token.token.isin(words))
+			& (token.weight == FIELD_WEIGHTS["barcode"])
+			& (item_barcode.parenttype == "Item")
+			& (item_barcode.barcode == barcode)
+		)
+		.groupby(token.item_code)
+		.having(Count(token.token) == len(words))
+		.limit(1)
+	).run()
+
+	return result[0][0] if result else None
+
+
+def get_item_search_query(txt):
+	"""SQL of the items with a word starting with every word of `txt`, as `search_item_code`
+	ranked by `search_score`. None if `txt` has no words to search for.
+
+	Each word of `txt` is an index range scan on the tokens, items are never scanned."""
+	words = list(dict.fromkeys(get_search_words(txt)))[:MAX_SEARCH_WORDS]
+	if not words:
+		return None
+
+	subqueries = [
+		"""select item_code,
+				max(case when token = {word} then 2 * weight else weight end) as score
+			from `tabItem Search Token`
+			where token like {prefix}
+			group by item_code""".format(word=frappe.db.escape(word), prefix=frappe.db.escape(word + "%"))
+		for word in words
+	]
+
+	return """select item_code as search_item_code, sum(score) as search_score
+		from ({subqueries}) search_words
+		group by item_code
+		having count(*) = {words}""".format(subqueries=" union all ".join(subqueries), words=len(words))
@@ -0,0 +1,89 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase, change_settings
+
+from erpnext.controllers.queries import item_query
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.item_search_token.item_search_token import (
+	get_item_search_tokens,
+	is_item_search_index_ready,
+	rebuild_item_search_tokens,
+)
+from erpnext.stock.get_item_details import get_item_code
+
+
+class TestItemSearchToken(FrappeTestCase):
+	def search(self, txt):
+		return [d[0] for d in item_query("Item", txt, "name", 0, 20, {})]
+
+	def get_tokens(self, item_code):
+		return {
+			d.token: d.weight
+			for d in frappe.get_all(
+				"Item Search Token", filters={"item_code": item_code}, fields=["token", "weight"]
+			)
+		}
+
+	def test_search_words(self):
+		tokens = get_item_search_tokens(
+			frappe._dict(name="SKU-001", item_name="<b>Steel</b> Bolt M12", item_group="Products"),
+			barcodes=["4006381333931"],
+		)
+
+		self.assertEqual(
+			tokens, {"sku": 8, "001": 8, "steel": 4, "bolt": 4, "m12": 4, "products": 1, "4006381333931": 8}
+		)
+
+	@change_settings("Stock Settings", {"use_item_search_index": 1})
+	def test_items_are_ranked_by_match(self):
+		bolt = make_item("_Test Search Steel Bolt", {"item_name": "_Test Search Steel Bolt"}).name
+		bolts = make_item("_Test Search Steel Bolts Box", {"item_name": "_Test Search Steel Bolts Box"}).name
+
+		# whole words rank above prefixes of longer words
+		results = self.search("steel bolt")
+		self.assertIn(bolts, results)
+		self.assertLess(results.index(bolt), results.index(bolts))
+
+		# every word of the search term has to match
+		self.assertNotIn(bolt, self.search("steel bolt box"))
+
+	@change_settings("Stock Settings", {"use_item_search_index": 1})
+	def test_index_follows_items(self):
+		item = make_item("_Test Search Indexed Item", {"item_name": "_Test Search Indexed Item"})
+		item.append("barcodes", {"barcode": "8901234567893"})
+		item.save()
+		self.assertIn(item.name, self.search("89012345"))
+
+		incremental = self.get_tokens(item.name)
+		rebuild_item_search_tokens()
+		self.assertEqual(self.get_tokens(item.name), incremental)
+
+		item.item_name = "_Test Search Renamed Item"
+		item.save()
+		self.assertIn("renamed", self.get_tokens(item.name))
+		self.assertIn(item.name, self.search("renamed"))
+
+		item.delete()
+		self.assertEqual(self.get_tokens(item.name), {})
+
+	@change_settings("Stock Settings", {"use_item_search_index": 1})
+	def test_items_are_searched_once_indexed(self):
+		item = make_item("_Test Search Pending Item", {"item_name": "_Test Search Pending Item"})
+		item.append("barcodes", {"barcode": "ABC-5901234123457"})
+		item.save()
+		self.assertTrue(is_item_search_index_ready())
+		self.assertEqual(get_item_code(barcode="ABC-5901234123457"), item.name)
+
+		# a rebuild in progress
+		frappe.db.set_single_value("Stock Settings", "item_search_index_ready", 0)
+		self.assertFalse(is_item_search_index_ready())
+		frappe.db.delete("Item Search Token", {"item_code": item.name})
+		self.assertIn(item.name, self.search("pending"))
+		self.assertEqual(get_item_code(barcode="ABC-5901234123457"), item.name)
+
+		rebuild_item_search_tokens()
+		self.assertTrue(is_item_search_index_ready())
+		self.assertIn(item.name, self.search("pending"))
+		self.assertEqual(get_item_code(barcode="ABC-5901234123457"), item.name)
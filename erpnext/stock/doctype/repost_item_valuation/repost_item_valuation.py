@@ -7,8 +7,19 @@ from frappe.desk.form.load import get_attachments
 from frappe.exceptions import QueryDeadlockError, QueryTimeoutError
 from frappe.model.document import Document
 from frappe.query_builder import DocType, Interval
-from frappe.query_builder.functions import Max, Now
-from frappe.utils import cint, get_link_to_form, get_weekday, getdate, now, nowtime
+from frappe.query_builder.functions import Count, IfNull, Max, Min, Now
+from frappe.utils import (
+	add_to_date,
+	cint,
+	get_link_to_form,
+	get_weekday,
+	getdate,
+	now,
+	now_datetime,
+	nowtime,
+	time_diff_in_seconds,
+)
+from frappe.utils.background_jobs import is_job_enqueued
 from frappe.utils.user import get_users_with_role
 from rq.timeouts import JobTimeoutException
 
@@ -17,6 +28,7 @@ from erpnext.accounts.general_ledger import validate_accounting_period
 from erpnext.accounts.utils import get_future_stock_vouchers, repost_gle_for_stock_vouchers
 from erpnext.stock.stock_ledger import (
 	get_affected_transactions,
+	get_distinct_item_warehouse,
 	get_items_to_be_repost,
 	repost_future_sle,
 )
@@ -38,6 +50,10 @@ class RepostItemValuation(Document):
 		allow_zero_rate: DF.Check
 		amended_from: DF.Link | None
 		based_on: DF.Literal["Transaction", "Item and Warehouse"]
+		checkpoint_creation: DF.Datetime | None
+		checkpoint_item_code: DF.Link | None
+		checkpoint_posting_datetime: DF.Datetime | None
+		checkpoint_warehouse: DF.Link | None
 		company: DF.Link | None
 		current_index: DF.Int
 		distinct_item_and_warehouse: DF.Code | None
@@ -216,6 +232,10 @@ class RepostItemValuation(Document):
 	def restart_reposting(self):
 		self.set_status("Queued", write=False)
 		self.current_index = 0
+		self.checkpoint_item_code = None
+		self.checkpoint_warehouse = None
+		self.checkpoint_posting_datetime = None
+		self.checkpoint_creation = None
 		self.distinct_item_and_warehouse = None
 		self.items_to_be_repost = None
 		self.gl_reposting_index = 0
@@ -268,7 +288,8 @@ def repost(doc):
 		if not frappe.flags.in_test:
 			frappe.db.commit()
 
-		repost_sl_entries(doc)
+		stats = repost_sl_entries(doc)
+		log_reposting_stats(doc, stats)
 		repost_gl_entries(doc)
 
 		doc.set_status("Completed")
@@ -325,9 +346,17 @@ def remove_attached_file(docname):
 		frappe.delete_doc("File", file_name, ignore_permissions=True, delete_permanently=True)
 
 
+def log_reposting_stats(doc, stats):
+	"""Log throughput of the stock ledger repost to compare batched and unbatched reposting."""
+	if not stats:
+		return
+
+	frappe.logger("stock_reposting", allow_site=True).info({"repost_item_valuation": doc.name, **stats})
+
+
 def repost_sl_entries(doc):
 	if doc.based_on == "Transaction":
-		repost_future_sle(
+		return repost_future_sle(
 			voucher_type=doc.voucher_type,
 			voucher_no=doc.voucher_no,
 			allow_negative_stock=doc.allow_negative_stock,
@@ -335,7 +364,7 @@ def repost_sl_entries(doc):
 			doc=doc,
 		)
 	else:
-		repost_future_sle(
+		return repost_future_sle(
 			args=[
 				frappe._dict(
 					{
@@ -438,16 +467,227 @@ def repost_entries():
 
 	riv_entries = get_repost_item_valuation_entries()
 
-	for row in riv_entries:
-		doc = frappe.get_doc("Repost Item Valuation", row.name)
+	workers = cint(frappe.db.get_single_value("Stock Reposting Settings", "reposting_workers"))
+	if workers > 1 and len(riv_entries) > 1:
+		enqueue_repost_workers(riv_entries, workers)
+		return
+
+	repost_group([row.name for row in riv_entries])
+
+	riv_entries = get_repost_item_valuation_entries()
+	if riv_entries:
+		return
+
+
+def repost_group(riv_names):
+	"""Repost the given 'Repost Item Valuation' entries one after another."""
+	for name in riv_names:
+		doc = frappe.get_doc("Repost Item Valuation", name)
 		if doc.status in ("Queued", "In Progress"):
 			repost(doc)
 			doc.deduplicate_similar_repost()
 
-	riv_entries = get_repost_item_valuation_entries()
-	if riv_entries:
+
+def get_repost_worker_job_id(worker):
+	return f"repost_item_valuation::worker::{worker}"
+
+
+def enqueue_repost_workers(riv_entries, workers):
+	"""Distribute independent groups of reposts over parallel background jobs.
+
+	Groups never share an item, so they can be reposted concurrently, while
+	entries inside a group keep the order of `get_repost_item_valuation_entries`.
+	"""
+	job_ids = [get_repost_worker_job_id(worker) for worker in range(workers)]
+
+	# previous run still in flight, don't pick the same entries twice
+	if any(is_job_enqueued(job_id) for job_id in job_ids):
 		return
 
+	worker_groups = [[] for _ in range(workers)]
+	for group in sorted(get_repost_groups(riv_entries), key=len, reverse=True):
+		min(worker_groups, key=lambda x: sum(len(g) for g in x)).append(group)
+
+	for job_id, groups in zip(job_ids, worker_groups, strict=True):
+		if not groups:
+			continue
+
+		frappe.enqueue(
+			repost_worker,
+			queue="long",
+			timeout=36000,
+			job_id=job_id,
+			groups=groups,
+			now=frappe.flags.in_test,
+		)
+
+
+def repost_worker(groups):
+	for group in groups:
+		repost_group(group)
+
+
+def get_repost_groups(riv_entries) -> list[list[str]]:
+	"""Partition reposts into groups which share no item.
+
+	Reposting an item cascades to other warehouses through transfers and to
+	finished goods through manufacture/repack entries, so groups are built
+	over item codes including the items that depend on them. The GL Entries of
+	the future vouchers are reposted as a whole, so the other items of those
+	vouchers are included too and no voucher is reposted by two groups.
+	"""
+	parent = {}
+
+	def find(item):
+		parent.setdefault(item, item)
+		while parent[item] != item:
+			parent[item] = parent[parent[item]]
+			item = parent[item]
+		return item
+
+	riv_items = {}
+	for row in riv_entries:
+		doc = frappe.get_doc("Repost Item Valuation", row.name)
+		items = sorted(get_items_affected_by_repost(doc))
+		riv_items[row.name] = items
+
+		for item in items[1:]:
+			parent[find(item)] = find(items[0])
+
+	groups = {}
+	for row in riv_entries:
+		items = riv_items[row.name]
+		key = find(items[0]) if items else row.name
+		groups.setdefault(key, []).append(row.name)
+
+	return list(groups.values())
+
+
+def get_items_affected_by_repost(doc) -> set[str]:
+	if doc.based_on == "Transaction":
+		items = {
+			row.get("item_code") for row in get_items_to_be_repost(doc.voucher_type, doc.voucher_no, doc)
+		}
+	else:
+		items = {doc.item_code}
+
+	# progress of a partially completed repost
+	if doc.distinct_item_and_warehouse or doc.reposting_data_file:
+		items.update(item_code for item_code, _warehouse in get_distinct_item_warehouse([], doc))
+
+	if affected_transactions := get_affected_transactions(doc):
+		items.update(get_items_of_vouchers(affected_transactions))
+
+	items.discard(None)
+	items |= get_dependent_items(items, doc.posting_date)
+
+	return items | get_items_of_future_vouchers(items, doc.posting_date)
+
+
+def get_items_of_vouchers(vouchers) -> set[str]:
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	voucher_nos = list({voucher_no for _voucher_type, voucher_no in vouchers})
+
+	items = (
+		frappe.qb.from_(sle)
+		.select(sle.item_code)
+		.distinct()
+		.where((sle.voucher_no.isin(voucher_nos)) & (sle.is_cancelled == 0))
+	).run(pluck=True)
+
+	return set(items)
+
+
+def get_items_of_future_vouchers(items, posting_date) -> set[str]:
+	"""Items of the vouchers with an SLE of `items` on or after `posting_date`."""
+	if not items:
+		return set()
+
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	voucher_sle = frappe.qb.DocType("Stock Ledger Entry").as_("voucher_sle")
+
+	found = (
+		frappe.qb.from_(sle)
+		.inner_join(voucher_sle)
+		.on((voucher_sle.voucher_no == sle.voucher_no) & (voucher_sle.voucher_type == sle.voucher_type))
+		.select(voucher_sle.item_code)
+		.distinct()
+		.where(
+			(sle.item_code.isin(list(items)))
+			& (sle.posting_date >= posting_date)
+			& (sle.is_cancelled == 0)
+			& (voucher_sle.is_cancelled == 0)
+		)
+	).run(pluck=True)
+
+	return set(found)
+
+
+def get_dependent_items(items, posting_date, max_depth=10) -> set[str]:
+	"""Finished goods produced from `items` on or after `posting_date`, recursively."""
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	dependent_sle = frappe.qb.DocType("Stock Ledger Entry").as_("dependent_sle")
+
+	dependent_items = set()
+	to_check = set(items)
+	for _depth in range(max_depth):
+		if not to_check:
+			break
+
+		found = (
+			frappe.qb.from_(sle)
+			.inner_join(dependent_sle)
+			.on(dependent_sle.voucher_detail_no == sle.dependant_sle_voucher_detail_no)
+			.select(dependent_sle.item_code)
+			.distinct()
+			.where(
+				(sle.item_code.isin(list(to_check)))
+				& (sle.posting_date >= posting_date)
+				& (sle.is_cancelled == 0)
+				& (dependent_sle.is_cancelled == 0)
+				& (IfNull(sle.dependant_sle_voucher_detail_no, "") != "")
+			)
+		).run(pluck=True)
+
+		to_check = set(found) - dependent_items - set(items)
+		dependent_items.update(to_check)
+
+	return dependent_items
+
+
+@frappe.whitelist()
+def get_reposting_metrics():
+	"""Lag and throughput of the reposting queue."""
+	frappe.has_permission("Repost Item Valuation", throw=True)
+
+	table = frappe.qb.DocType("Repost Item Valuation")
+	pending = (
+		frappe.qb.from_(table)
+		.select(table.status, Count(table.name).as_("count"), Min(table.creation).as_("oldest"))
+		.where((table.docstatus == 1) & (table.status.isin(["Queued", "In Progress"])))
+		.groupby(table.status)
+	).run(as_dict=True)
+
+	completed_last_hour = frappe.db.count(
+		"Repost Item Valuation",
+		{"docstatus": 1, "status": "Completed", "modified": (">=", add_to_date(now_datetime(), hours=-1))},
+	)
+
+	oldest = min((row.oldest for row in pending), default=None)
+	workers = cint(frappe.db.get_single_value("Stock Reposting Settings", "reposting_workers")) or 1
+
+	return frappe._dict(
+		{
+			"queued": sum(row["count"] for row in pending if row.status == "Queued"),
+			"in_progress": sum(row["count"] for row in pending if row.status == "In Progress"),
+			"lag_seconds": time_diff_in_seconds(now_datetime(), oldest) if oldest else 0,
+			"completed_last_hour": completed_last_hour,
+			"running_workers": sum(
+				1 for worker in range(workers) if is_job_enqueued(get_repost_worker_job_id(worker))
+			),
+		}
+	)
+
 
 def get_repost_item_valuation_entries():
 	return frappe.db.sql(
@@ -14,6 +14,7 @@ from erpnext.controllers.stock_controller import create_item_wise_repost_entries
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.purchase_receipt.test_purchase_receipt import make_purchase_receipt
 from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import (
+	get_repost_groups,
 	in_configured_timeslot,
 )
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
@@ -458,3 +459,229 @@ class TestRepostItemValuation(FrappeTestCase, StockTestMixin):
 						"name",
 					)
 				)
+
+	def test_batched_reposting(self):
+		from erpnext.stock.stock_ledger import repost_future_sle
+
+		warehouse = "_Test Warehouse - _TC"
+		fields = ["name", "qty_after_transaction", "valuation_rate", "stock_value", "stock_value_difference"]
+
+		items = []
+		for valuation_method in ("FIFO", "Moving Average", "LIFO"):
+			item = make_item(properties={"is_stock_item": 1, "valuation_method": valuation_method}).name
+			items.append(item)
+
+			for days, qty, rate in ((-5, 10, 100), (-3, -4, 0), (-2, 6, 150), (-1, -8, 0)):
+				make_stock_entry(
+					item_code=item,
+					qty=abs(qty),
+					rate=rate or None,
+					to_warehouse=warehouse if qty > 0 else None,
+					from_warehouse=warehouse if qty < 0 else None,
+					posting_date=add_days(today(), days),
+				)
+
+		def get_sles():
+			return frappe.get_all(
+				"Stock Ledger Entry",
+				filters={"item_code": ("in", items), "is_cancelled": 0},
+				fields=fields,
+				order_by="item_code, posting_datetime, creation",
+			)
+
+		expected_sles = get_sles()
+
+		# corrupt valuation and let batched reposting rebuild it
+		sle = frappe.qb.DocType("Stock Ledger Entry")
+		frappe.qb.update(sle).set(sle.valuation_rate, 0).set(sle.stock_value, 0).set(
+			sle.stock_value_difference, 0
+		).where(sle.item_code.isin(items)).run()
+
+		stats = repost_future_sle(
+			args=[
+				frappe._dict(
+					item_code=item,
+					warehouse=warehouse,
+					posting_date=add_days(today(), -10),
+					posting_time="00:00:00",
+				)
+				for item in items
+			],
+			allow_negative_stock=True,
+			batched=True,
+		)
+
+		self.assertEqual(get_sles(), expected_sles)
+		self.assertTrue(stats.batched)
+		self.assertEqual(stats.item_warehouses, len(items))
+		self.assertEqual(stats.sles, len(expected_sles))
+
+	def test_batched_repost_prefetch_ends_with_transaction(self):
+		from erpnext.stock.batched_reposting import BatchedRepost
+
+		batched_repost = BatchedRepost(batch_size=10)
+		batched_repost.prefetch(
+			[
+				frappe._dict(
+					item_code="_Test Item",
+					warehouse="_Test Warehouse - _TC",
+					posting_date=today(),
+					posting_time="00:00:00",
+				)
+			],
+			0,
+		)
+		self.assertTrue(batched_repost.in_window(0))
+
+		# a checkpoint commit releases the row locks, the window is prefetched again
+		frappe.db.after_commit.run()
+		self.assertFalse(batched_repost.in_window(0))
+		self.assertEqual(batched_repost.prefetched, {})
+
+	def test_repost_groups(self):
+		item1 = make_item(properties={"is_stock_item": 1}).name
+		item2 = make_item(properties={"is_stock_item": 1}).name
+
+		reposts = []
+		for item_code, warehouse in (
+			(item1, "_Test Warehouse - _TC"),
+			(item2, "_Test Warehouse - _TC"),
+			(item1, "Stores - _TC"),
+		):
+			riv = frappe.get_doc(
+				doctype="Repost Item Valuation",
+				based_on="Item and Warehouse",
+				item_code=item_code,
+				warehouse=warehouse,
+				posting_date=today(),
+				posting_time="00:01:00",
+			)
+			riv.flags.dont_run_in_test = True
+			riv.submit()
+			reposts.append(riv)
+
+		groups = get_repost_groups([frappe._dict(name=riv.name) for riv in reposts])
+
+		# same item stays in one group and in the original order
+		self.assertEqual(groups, [[reposts[0].name, reposts[2].name], [reposts[1].name]])
+
+		for riv in reposts:
+			riv.set_status("Skipped")
+
+	def test_repost_groups_share_vouchers(self):
+		item1 = make_item(properties={"is_stock_item": 1}).name
+		item2 = make_item(properties={"is_stock_item": 1}).name
+		warehouse = "_Test Warehouse - _TC"
+
+		# a single voucher with both items
+		se = make_stock_entry(item_code=item1, qty=1, rate=100, to_warehouse=warehouse, do_not_save=True)
+		se.append(
+			"items",
+			{
+				"item_code": item2,
+				"qty": 1,
+				"basic_rate": 100,
+				"t_warehouse": warehouse,
+				"conversion_factor": 1,
+			},
+		)
+		se.insert()
+		se.submit()
+
+		reposts = []
+		for item_code in (item1, item2):
+			riv = frappe.get_doc(
+				doctype="Repost Item Valuation",
+				based_on="Item and Warehouse",
+				item_code=item_code,
+				warehouse=warehouse,
+				posting_date=add_days(se.posting_date, -1),
+				posting_time="00:01:00",
+			)
+			riv.flags.dont_run_in_test = True
+			riv.submit()
+			reposts.append(riv)
+
+		groups = get_repost_groups([frappe._dict(name=riv.name) for riv in reposts])
+
+		# the GL Entries of the stock entry are reposted by a single worker
+		self.assertEqual(groups, [[reposts[0].name, reposts[1].name]])
+
+		for riv in reposts:
+			riv.set_status("Skipped")
+
+	def test_resume_reposting_from_checkpoint(self):
+		from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import repost_sl_entries
+
+		item = make_item(properties={"is_stock_item": 1, "valuation_method": "FIFO"}).name
+		warehouse = "_Test Warehouse - _TC"
+
+		for days, qty, rate in ((-5, 10, 100), (-4, 5, 120), (-3, -8, 0), (-2, 6, 150), (-1, -9, 0)):
+			make_stock_entry(
+				item_code=item,
+				qty=abs(qty),
+				rate=rate or None,
+				to_warehouse=warehouse if qty > 0 else None,
+				from_warehouse=warehouse if qty < 0 else None,
+				posting_date=add_days(today(), days),
+			)
+
+		def get_sles():
+			return frappe.get_all(
+				"Stock Ledger Entry",
+				filters={"item_code": item, "is_cancelled": 0},
+				fields=[
+					"name",
+					"posting_datetime",
+					"creation",
+					"qty_after_transaction",
+					"stock_value",
+					"stock_value_difference",
+				],
+				order_by="posting_datetime, creation",
+			)
+
+		expected_sles = get_sles()
+		checkpoint_sle = expected_sles[1]
+
+		# SLEs up to the checkpoint were reposted and committed before the job was killed
+		sle = frappe.qb.DocType("Stock Ledger Entry")
+		frappe.qb.update(sle).set(sle.stock_value, 0).set(sle.stock_value_difference, 0).where(
+			sle.name.isin([d.name for d in expected_sles if d.name != checkpoint_sle.name])
+		).run()
+
+		riv = frappe.get_doc(
+			doctype="Repost Item Valuation",
+			based_on="Item and Warehouse",
+			item_code=item,
+			warehouse=warehouse,
+			posting_date=add_days(today(), -5),
+			posting_time="00:00:00",
+		)
+		riv.flags.dont_run_in_test = True
+		riv.submit()
+
+		riv.db_set(
+			{
+				"status": "In Progress",
+				"checkpoint_item_code": item,
+				"checkpoint_warehouse": warehouse,
+				"checkpoint_posting_datetime": checkpoint_sle.posting_datetime,
+				"checkpoint_creation": checkpoint_sle.creation,
+			}
+		)
+
+		with change_settings("Stock Reposting Settings", {"checkpoint_interval": 2}):
+			stats = repost_sl_entries(riv)
+
+		sles = get_sles()
+		# SLE before the checkpoint is not replayed
+		self.assertEqual(sles[0].stock_value, 0)
+		self.assertEqual(sles[1:], expected_sles[1:])
+		self.assertEqual(stats.sles, 3)
+
+		riv.reload()
+		self.assertEqual(riv.current_index, 1)
+		self.assertFalse(riv.checkpoint_item_code)
+
+		riv.set_status("Skipped")
@@ -136,7 +136,7 @@ class SerialandBatchBundle(Document):
 			return
 
 		serial_nos = [d.serial_no for d in self.entries if d.serial_no]
-		kwargs = {"item_code": self.item_code, "warehouse": self.warehouse}
+		kwargs = {"item_code": self.item_code, "warehouse": self.warehouse, "serial_nos": serial_nos}
 		if self.voucher_type == "POS Invoice":
 			kwargs["ignore_voucher_nos"] = [self.voucher_no]
 
@@ -1547,14 +1547,26 @@ def get_available_serial_nos(kwargs):
 		if kwargs.get("posting_time") is None:
 			kwargs.posting_time = nowtime()
 
+	if kwargs.get("posting_date") and not is_serial_no_state_current(kwargs):
 		time_based_serial_nos = get_serial_nos_based_on_posting_date(kwargs, ignore_serial_nos)
 
 		if not time_based_serial_nos:
 			return []
 
 		filters["name"] = ("in", time_based_serial_nos)
-	elif ignore_serial_nos:
-		filters["name"] = ("not in", ignore_serial_nos)
+	else:
+		if kwargs.get("posting_date"):
+			# no serial no moved after the posting date, their warehouse then is the current one
+			filters["warehouse"] = kwargs.warehouse or ("is", "set")
+
+		if kwargs.get("serial_nos"):
+			serial_nos = set(kwargs.serial_nos).difference(ignore_serial_nos)
+			if not serial_nos:
+				return []
+
+			filters["name"] = ("in", list(serial_nos))
+		elif ignore_serial_nos:
+			filters["name"] = ("not in", ignore_serial_nos)
 
 	if kwargs.get("batches"):
 		batches = get_non_expired_batches(kwargs.get("batches"))
@@ -1572,6 +1584,20 @@ def get_available_serial_nos(kwargs):
 	)
 
 
+def is_serial_no_state_current(kwargs):
+	"""Whether the warehouse of the Serial Nos of the item is also their warehouse at the posting
+	date and time in kwargs, i.e. none of them moved later."""
+	from erpnext.stock.utils import get_combine_datetime
+
+	if kwargs.get("voucher_no"):
+		return False
+
+	posting_datetime = get_combine_datetime(kwargs.posting_date, kwargs.posting_time)
+	return not frappe.db.exists(
+		"Serial No", {"item_code": kwargs.item_code, "last_posting_datetime": (">", posting_datetime)}
+	)
+
+
 def get_non_expired_batches(batches):
 	filters = {}
 	if isinstance(batches, list):
@@ -1595,7 +1621,7 @@ def get_serial_nos_based_on_posting_date(kwargs, ignore_serial_nos):
 	serial_nos = set()
 	data = get_stock_ledgers_for_serial_nos(kwargs)
 
-	bundle_wise_serial_nos = get_bundle_wise_serial_nos(data)
+	bundle_wise_serial_nos = get_bundle_wise_serial_nos(data, kwargs.get("serial_nos"))
 	for d in data:
 		if d.serial_and_batch_bundle:
 			if sns := bundle_wise_serial_nos.get(d.serial_and_batch_bundle):
@@ -1619,16 +1645,20 @@ def get_serial_nos_based_on_posting_date(kwargs, ignore_serial_nos):
 	return serial_nos
 
 
-def get_bundle_wise_serial_nos(data):
+def get_bundle_wise_serial_nos(data, serial_nos=None):
 	bundle_wise_serial_nos = defaultdict(list)
 	bundles = [d.serial_and_batch_bundle for d in data if d.serial_and_batch_bundle]
 	if not bundles:
 		return bundle_wise_serial_nos
 
+	filters = {"parent": ("in", bundles), "docstatus": 1, "serial_no": ("is", "set")}
+	if serial_nos:
+		filters["serial_no"] = ("in", serial_nos)
+
 	bundle_data = frappe.get_all(
 		"Serial and Batch Entry",
 		fields=["serial_no", "parent"],
-		filters={"parent": ("in", bundles), "docstatus": 1, "serial_no": ("is", "set")},
+		filters=filters,
 	)
 
 	for d in bundle_data:
@@ -1942,6 +1972,17 @@ def update_available_batches(available_batches, *reserved_batches) -> None:
 
 
 def get_available_batches(kwargs):
+	from erpnext.stock.doctype.batch_balance.batch_balance import (
+		get_available_batches_from_batch_balance,
+		is_batch_balance_ready,
+	)
+	from erpnext.stock.utils import get_posting_datetime_condition
+
+	if is_batch_balance_ready() and not kwargs.get("ignore_voucher_nos"):
+		data = get_available_batches_from_batch_balance(kwargs)
+		if data is not None:
+			return data
+
 	stock_ledger_entry = frappe.qb.DocType("Stock Ledger Entry")
 	batch_ledger = frappe.qb.DocType("Serial and Batch Entry")
 	batch_table = frappe.qb.DocType("Batch")
@@ -1969,9 +2010,9 @@ def get_available_batches(kwargs):
 		if kwargs.get("posting_time") is None:
 			kwargs.posting_time = nowtime()
 
-		timestamp_condition = CombineDatetime(
-			stock_ledger_entry.posting_date, stock_ledger_entry.posting_time
-		) <= CombineDatetime(kwargs.posting_date, kwargs.posting_time)
+		timestamp_condition = get_posting_datetime_condition(
+			stock_ledger_entry, "<=", kwargs.posting_date, kwargs.posting_time
+		)
 
 		query = query.where(timestamp_condition)
 
@@ -2189,6 +2230,8 @@ def get_ledgers_from_serial_batch_bundle(**kwargs) -> list[frappe._dict]:
 
 
 def get_stock_ledgers_for_serial_nos(kwargs):
+	from erpnext.stock.utils import get_posting_datetime_condition
+
 	stock_ledger_entry = frappe.qb.DocType("Stock Ledger Entry")
 
 	query = (
@@ -2205,9 +2248,9 @@ def get_stock_ledgers_for_serial_nos(kwargs):
 		if kwargs.get("posting_time") is None:
 			kwargs.posting_time = nowtime()
 
-		timestamp_condition = CombineDatetime(
-			stock_ledger_entry.posting_date, stock_ledger_entry.posting_time
-		) <= CombineDatetime(kwargs.posting_date, kwargs.posting_time)
+		timestamp_condition = get_posting_datetime_condition(
+			stock_ledger_entry, "<=", kwargs.posting_date, kwargs.posting_time
+		)
 
 		query = query.where(timestamp_condition)
 
@@ -2227,7 +2270,7 @@ def get_stock_ledgers_for_serial_nos(kwargs):
 
 
 def get_stock_ledgers_batches(kwargs):
-	from erpnext.stock.utils import get_combine_datetime
+	from erpnext.stock.utils import get_posting_datetime_condition
 
 	stock_ledger_entry = frappe.qb.DocType("Stock Ledger Entry")
 	batch_table = frappe.qb.DocType("Batch")
@@ -2259,8 +2302,8 @@ def get_stock_ledgers_batches(kwargs):
 		if kwargs.get("posting_time") is None:
 			kwargs.posting_time = nowtime()
 
-		timestamp_condition = stock_ledger_entry.posting_datetime <= get_combine_datetime(
-			kwargs.posting_date, kwargs.posting_time
+		timestamp_condition = get_posting_datetime_condition(
+			stock_ledger_entry, "<=", kwargs.posting_date, kwargs.posting_time
 		)
 
 		query = query.where(timestamp_condition)
@@ -7,7 +7,7 @@ import json
 import frappe
 from frappe import ValidationError, _
 from frappe.model.naming import make_autoname
-from frappe.query_builder.functions import Coalesce
+from frappe.query_builder.functions import Coalesce, Sum
 from frappe.utils import cint, cstr, getdate, nowdate, safe_json_loads
 
 from erpnext.controllers.stock_controller import StockController
@@ -45,6 +45,9 @@ class SerialNo(StockController):
 		item_code: DF.Link
 		item_group: DF.Link | None
 		item_name: DF.Data | None
+		last_posting_datetime: DF.Datetime | None
+		last_voucher_no: DF.DynamicLink | None
+		last_voucher_type: DF.Link | None
 		location: DF.Link | None
 		maintenance_status: DF.Literal["", "Under Warranty", "Out of Warranty", "Under AMC", "Out of AMC"]
 		purchase_document_no: DF.Data | None
@@ -118,6 +121,11 @@ class SerialNo(StockController):
 			)
 
 
+def on_doctype_update():
+	frappe.db.add_index("Serial No", ["item_code", "warehouse", "creation"])
+	frappe.db.add_index("Serial No", ["item_code", "last_posting_datetime"])
+
+
 def get_available_serial_nos(serial_no_series, qty) -> list[str]:
 	serial_nos = []
 	for _i in range(cint(qty)):
@@ -308,3 +316,50 @@ def get_serial_nos_for_outward(kwargs):
 		return []
 
 	return [d.serial_no for d in serial_nos]
+
+
+def check_serial_no_state(item_code=None):
+	"""Serial Nos whose warehouse differs from the one their stock ledger entries leave them in.
+
+	Run it with
+
+		bench --site <site> execute erpnext.stock.doctype.serial_no.serial_no.check_serial_no_state --kwargs "{'item_code': '<Item>'}"
+	"""
+	stock_ledger_entry = frappe.qb.DocType("Stock Ledger Entry")
+	batch_ledger = frappe.qb.DocType("Serial and Batch Entry")
+
+	query = (
+		frappe.qb.from_(stock_ledger_entry)
+		.inner_join(batch_ledger)
+		.on(stock_ledger_entry.serial_and_batch_bundle == batch_ledger.parent)
+		.select(batch_ledger.serial_no, stock_ledger_entry.warehouse)
+		.where(
+			(stock_ledger_entry.is_cancelled == 0)
+			& (batch_ledger.serial_no.isnotnull())
+			& (batch_ledger.serial_no != "")
+		)
+		.groupby(batch_ledger.serial_no, stock_ledger_entry.warehouse)
+		.having(Sum(batch_ledger.qty) > 0)
+	)
+
+	filters = {}
+	if item_code:
+		query = query.where(stock_ledger_entry.item_code == item_code)
+		filters["item_code"] = item_code
+
+	ledger_warehouse = dict(query.run())
+
+	mismatches = []
+	for serial_no in frappe.get_all("Serial No", filters=filters, fields=["name", "warehouse"]):
+		if (serial_no.warehouse or None) != ledger_warehouse.get(serial_no.name):
+			mismatches.append(
+				frappe._dict(
+					{
+						"serial_no": serial_no.name,
+						"warehouse": serial_no.warehouse,
+						"ledger_warehouse": ledger_warehouse.get(serial_no.name),
+					}
+				)
+			)
+
+	return mismatches
@@ -8,6 +8,7 @@
 import frappe
 from frappe import _dict
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, nowdate
 
 from erpnext.stock.doctype.delivery_note.test_delivery_note import create_delivery_note
 from erpnext.stock.doctype.item.test_item import make_item
@@ -325,6 +326,31 @@ class TestSerialNo(FrappeTestCase):
 
 		self.assertEqual(non_expired_serials, [])
 
+	def test_serial_no_state_as_of_posting_date(self):
+		item_code = make_item(
+			"_Test Serial No State Item",
+			{"has_serial_no": 1, "serial_no_series": "TSNS-.#####", "is_stock_item": 1},
+		).name
+		warehouse = "_Test Warehouse - _TC"
+
+		receipt = make_stock_entry(item_code=item_code, target=warehouse, qty=3, rate=100)
+		serial_nos = get_serial_nos_from_bundle(receipt.items[0].serial_and_batch_bundle)
+
+		serial_no = frappe.get_doc("Serial No", serial_nos[0])
+		self.assertEqual(serial_no.last_voucher_no, receipt.name)
+		self.assertTrue(serial_no.last_posting_datetime)
+
+		kwargs = {"qty": 3, "item_code": item_code, "warehouse": warehouse, "posting_date": nowdate()}
+		self.assertEqual(get_auto_serial_nos(_dict(kwargs)), sorted(serial_nos))
+
+		# before the receipt the ledger is replayed, nothing was in the warehouse
+		kwargs["posting_date"] = add_days(nowdate(), -1)
+		self.assertEqual(get_auto_serial_nos(_dict(kwargs)), [])
+
+		self.assertFalse(check_serial_no_state(item_code))
+		frappe.db.set_value("Serial No", serial_nos[0], "warehouse", None)
+		self.assertEqual([d.serial_no for d in check_serial_no_state(item_code)], [serial_nos[0]])
+
 
 def get_auto_serial_nos(kwargs):
 	from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle import (
@@ -4,19 +4,20 @@
 
 import frappe
 from frappe import _, bold, json, msgprint
-from frappe.query_builder.functions import CombineDatetime, Sum
+from frappe.query_builder.functions import Sum
 from frappe.utils import add_to_date, cint, cstr, flt
 
 import erpnext
 from erpnext.accounts.utils import get_company_default
 from erpnext.controllers.stock_controller import StockController
 from erpnext.stock.doctype.batch.batch import get_available_batches, get_batch_qty
+from erpnext.stock.doctype.batch_balance.batch_balance import adjust_batch_balance
 from erpnext.stock.doctype.inventory_dimension.inventory_dimension import get_inventory_dimensions
 from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle import (
 	get_available_serial_nos,
 )
 from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos
-from erpnext.stock.utils import get_incoming_rate, get_stock_balance
+from erpnext.stock.utils import get_incoming_rate, get_posting_datetime_condition, get_stock_balance
 
 
 class OpeningEntryAccountError(frappe.ValidationError):
@@ -1062,6 +1063,7 @@ class StockReconciliation(StockController):
 			) * -1
 
 			if flt(d.qty, precision) != flt(qty, precision):
+				adjust_batch_balance(doc.item_code, doc.warehouse, d.batch_no, qty - flt(d.qty))
 				d.db_set("qty", qty)
 
 			current_qty += qty
@@ -1083,11 +1085,7 @@ def get_batch_qty_for_stock_reco(item_code, warehouse, batch_no, posting_date, p
 			& (ledger.docstatus == 1)
 			& (ledger.is_cancelled == 0)
 			& (ledger.batch_no == batch_no)
-			& (ledger.posting_date <= posting_date)
-			& (
-				CombineDatetime(ledger.posting_date, ledger.posting_time)
-				<= CombineDatetime(posting_date, posting_time)
-			)
+			& (get_posting_datetime_condition(ledger, "<=", posting_date, posting_time))
 			& (ledger.voucher_no != voucher_no)
 		)
 		.groupby(ledger.batch_no)
@@ -16,6 +16,7 @@ class StockRepostingSettings(Document):
 	if TYPE_CHECKING:
 		from frappe.types import DF
 
+		checkpoint_interval: DF.Int
 		do_reposting_for_each_stock_transaction: DF.Check
 		end_time: DF.Time | None
 		item_based_reposting: DF.Check
@@ -24,7 +25,9 @@ class StockRepostingSettings(Document):
 			"", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
 		]
 		notify_reposting_error_to_role: DF.Link | None
+		reposting_workers: DF.Int
 		start_time: DF.Time | None
+		use_batched_reposting: DF.Check
 	# end: auto-generated types
 
 	def validate(self):
@@ -37,14 +37,18 @@ class StockSettings(Document):
 		auto_insert_price_list_rate_if_missing: DF.Check
 		auto_reserve_serial_and_batch: DF.Check
 		auto_reserve_stock_for_sales_order_on_purchase: DF.Check
+		batch_balance_ready: DF.Check
 		clean_description_html: DF.Check
+		compact_stock_queue: DF.Check
 		default_warehouse: DF.Link | None
+		defer_bin_updates: DF.Check
 		disable_serial_no_and_batch_selector: DF.Check
 		do_not_update_serial_batch_on_creation_of_auto_bundle: DF.Check
 		do_not_use_batchwise_valuation: DF.Check
 		enable_stock_reservation: DF.Check
 		item_group: DF.Link | None
 		item_naming_by: DF.Literal["Item Code", "Naming Series"]
+		item_search_index_ready: DF.Check
 		mr_qty_allowance: DF.Float
 		naming_series_prefix: DF.Data | None
 		over_delivery_receipt_allowance: DF.Float
@@ -60,6 +64,8 @@ class StockSettings(Document):
 		stock_frozen_upto_days: DF.Int
 		stock_uom: DF.Link | None
 		update_existing_price_list_rate: DF.Check
+		use_batch_balance: DF.Check
+		use_item_search_index: DF.Check
 		use_naming_series: DF.Check
 		use_serial_batch_fields: DF.Check
 		valuation_method: DF.Literal["FIFO", "Moving Average", "LIFO"]
@@ -102,6 +108,7 @@ class StockSettings(Document):
 		self.change_precision_for_for_sales()
 		self.change_precision_for_purchase()
 		self.validate_use_batch_wise_valuation()
+		self.validate_ready_flags()
 
 	def validate_use_batch_wise_valuation(self):
 		if not self.do_not_use_batchwise_valuation:
@@ -118,6 +125,18 @@ class StockSettings(Document):
 		if frappe.get_all("Batch", filters={"use_batchwise_valuation": 1}, limit=1):
 			frappe.throw(_("Can't disable batch wise valuation for active batches."))
 
+	def validate_ready_flags(self):
+		doc_before_save = self.get_doc_before_save()
+		for use_field, ready_field in (
+			("use_batch_balance", "batch_balance_ready"),
+			("use_item_search_index", "item_search_index_ready"),
+		):
+			if doc_before_save and cint(self.get(use_field)) == cint(doc_before_save.get(use_field)):
+				self.set(ready_field, doc_before_save.get(ready_field))
+			else:
+				# the tables are not read from until their rebuild is done
+				self.set(ready_field, 0)
+
 	def validate_warehouses(self):
 		warehouse_fields = ["default_warehouse", "sample_retention_warehouse"]
 		for field in warehouse_fields:
@@ -227,6 +246,47 @@ class StockSettings(Document):
 
 	def on_update(self):
 		self.toggle_warehouse_field_for_inter_warehouse_transfer()
+		self.fold_pending_bin_deltas()
+		self.rebuild_batch_balances()
+		self.rebuild_item_search_tokens()
+
+	def fold_pending_bin_deltas(self):
+		doc_before_save = self.get_doc_before_save()
+		if self.defer_bin_updates or not (doc_before_save and doc_before_save.defer_bin_updates):
+			return
+
+		from erpnext.stock.doctype.bin_delta.bin_delta import fold_bin_deltas
+
+		# Bin is read without deltas from now on
+		fold_bin_deltas()
+
+	def rebuild_batch_balances(self):
+		doc_before_save = self.get_doc_before_save()
+		if not self.use_batch_balance or (doc_before_save and doc_before_save.use_batch_balance):
+			return
+
+		frappe.enqueue(
+			"erpnext.stock.doctype.batch_balance.batch_balance.rebuild_batch_balances",
+			queue="long",
+			timeout=7200,
+			enqueue_after_commit=True,
+			now=frappe.flags.in_test,
+		)
+		frappe.msgprint(_("Batch Balances will be built from the Stock Ledger in the background"))
+
+	def rebuild_item_search_tokens(self):
+		doc_before_save = self.get_doc_before_save()
+		if not self.use_item_search_index or (doc_before_save and doc_before_save.use_item_search_index):
+			return
+
+		frappe.enqueue(
+			"erpnext.stock.doctype.item_search_token.item_search_token.rebuild_item_search_tokens",
+			queue="long",
+			timeout=7200,
+			enqueue_after_commit=True,
+			now=frappe.flags.in_test,
+		)
+		frappe.msgprint(_("The Item Search Index will be built in the background"))
 
 	def change_precision_for_for_sales(self):
 		doc_before_save = self.get_doc_before_save()
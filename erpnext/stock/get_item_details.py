@@ -22,6 +22,10 @@ from erpnext.setup.doctype.item_group.item_group import get_item_group_defaults
 from erpnext.setup.utils import get_exchange_rate
 from erpnext.stock.doctype.item.item import get_item_defaults, get_uom_conv_factor
 from erpnext.stock.doctype.item_manufacturer.item_manufacturer import get_item_manufacturer_part_no
+from erpnext.stock.doctype.item_search_token.item_search_token import (
+	get_item_code_by_barcode,
+	is_item_search_index_ready,
+)
 from erpnext.stock.doctype.price_list.price_list import get_price_list_details
 
 sales_doctypes = ["Quotation", "Sales Order", "Delivery Note", "Sales Invoice", "POS Invoice"]
@@ -194,7 +198,10 @@ def process_string_args(args):
 
 def get_item_code(barcode=None, serial_no=None):
 	if barcode:
-		item_code = frappe.db.get_value("Item Barcode", {"barcode": barcode}, fieldname=["parent"])
+		# barcodes without letters or digits are not in the index
+		item_code = (
+			is_item_search_index_ready() and get_item_code_by_barcode(barcode)
+		) or frappe.db.get_value("Item Barcode", {"barcode": barcode}, fieldname=["parent"])
 		if not item_code:
 			frappe.throw(_("No Item with Barcode {0}").format(barcode))
 	elif serial_no:
@@ -1176,6 +1183,7 @@ def get_bin_details(item_code, warehouse, company=None, include_child_warehouses
 	if warehouse:
 		from frappe.query_builder.functions import Coalesce, Sum
 
+		from erpnext.stock.doctype.bin_delta.bin_delta import get_pending_bin_deltas
 		from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
 
 		warehouses = get_child_warehouses(warehouse) if include_child_warehouses else [warehouse]
@@ -1191,6 +1199,10 @@ def get_bin_details(item_code, warehouse, company=None, include_child_warehouses
 			.where((bin.item_code == item_code) & (bin.warehouse.isin(warehouses)))
 		).run(as_dict=True)[0]
 
+		pending = get_pending_bin_deltas(item_code, warehouses)
+		for field in ("projected_qty", "actual_qty", "reserved_qty"):
+			bin_details[field] = flt(bin_details[field]) + pending[field]
+
 	if company:
 		bin_details["company_total_stock"] = get_company_total_stock(item_code, company)
 
@@ -4,7 +4,6 @@ import datetime
 
 import frappe
 from frappe import _, scrub
-from frappe.query_builder.functions import CombineDatetime
 from frappe.utils import get_first_day as get_first_day_of_month
 from frappe.utils import get_first_day_of_week, get_quarter_start, getdate
 from frappe.utils.nestedset import get_descendants_of
@@ -294,7 +293,7 @@ def get_stock_ledger_entries(filters, items):
 			sle.batch_no,
 		)
 		.where((sle.docstatus < 2) & (sle.is_cancelled == 0))
-		.orderby(CombineDatetime(sle.posting_date, sle.posting_time))
+		.orderby(sle.posting_datetime)
 		.orderby(sle.creation)
 		.orderby(sle.actual_qty)
 	)
@@ -3,6 +3,7 @@ from collections import defaultdict
 import frappe
 from frappe import _, bold
 from frappe.model.naming import make_autoname
+from frappe.query_builder import Case
 from frappe.query_builder.functions import CombineDatetime, Sum, Timestamp
 from frappe.utils import add_days, cint, cstr, flt, get_link_to_form, now, nowtime, today
 from pypika import Order
@@ -21,6 +22,7 @@ class SerialBatchBundle:
 
 		self.set_item_details()
 		self.process_serial_and_batch_bundle()
+		self.update_batch_balance()
 		if self.sle.is_cancelled:
 			self.delink_serial_and_batch_bundle()
 
@@ -32,6 +34,12 @@ class SerialBatchBundle:
 		elif self.item_details.has_batch_no:
 			self.process_batch_no()
 
+	def update_batch_balance(self):
+		from erpnext.stock.doctype.batch_balance.batch_balance import update_batch_balances
+
+		if self.item_details.has_batch_no:
+			update_batch_balances(self.sle)
+
 	def set_item_details(self):
 		fields = [
 			"has_batch_no",
@@ -293,6 +301,7 @@ class SerialBatchBundle:
 
 		if self.item_details.has_serial_no == 1:
 			self.set_warehouse_and_status_in_serial_nos()
+			self.set_last_stock_movement_in_serial_nos()
 
 		if (
 			self.sle.actual_qty > 0
@@ -379,6 +388,39 @@ class SerialBatchBundle:
 
 		query.run()
 
+	def set_last_stock_movement_in_serial_nos(self):
+		from erpnext.stock.utils import get_combine_datetime
+
+		# cancelling keeps the later posting datetime, serial nos only ever look moved too recently
+		if self.sle.is_cancelled or not self.sle.serial_and_batch_bundle:
+			return
+
+		serial_nos = get_serial_nos(self.sle.serial_and_batch_bundle)
+		if not serial_nos:
+			return
+
+		posting_datetime = self.sle.get("posting_datetime") or get_combine_datetime(
+			self.sle.posting_date, self.sle.posting_time
+		)
+
+		sn_table = frappe.qb.DocType("Serial No")
+		(
+			frappe.qb.update(sn_table)
+			.set(sn_table.last_voucher_type, self.sle.voucher_type)
+			.set(sn_table.last_voucher_no, self.sle.voucher_no)
+			.set(
+				sn_table.last_posting_datetime,
+				Case()
+				.when(
+					sn_table.last_posting_datetime.isnull()
+					| (sn_table.last_posting_datetime < posting_datetime),
+					posting_datetime,
+				)
+				.else_(sn_table.last_posting_datetime),
+			)
+			.where(sn_table.name.isin(serial_nos))
+		).run()
+
 	def set_batch_no_in_serial_nos(self):
 		entries = frappe.get_all(
 			"Serial and Batch Entry",
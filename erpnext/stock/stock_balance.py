@@ -209,8 +209,23 @@ def get_planned_qty(item_code, warehouse):
 
 
 def update_bin_qty(item_code, warehouse, qty_dict=None):
+	from erpnext.stock.doctype.bin_delta.bin_delta import (
+		BIN_DELTA_FIELDS,
+		add_bin_delta,
+		is_bin_delta_enabled,
+	)
 	from erpnext.stock.utils import get_bin
 
+	if is_bin_delta_enabled():
+		qty_dict = dict(qty_dict)
+		deltas = {field: qty_dict.pop(field) for field in BIN_DELTA_FIELDS if field in qty_dict}
+		if deltas:
+			# recorded as the new quantities, neither the Bin nor its pending deltas are locked
+			add_bin_delta(item_code, warehouse, absolute_qty_fields=list(deltas), **deltas)
+
+		if not qty_dict:
+			return
+
 	bin = get_bin(item_code, warehouse)
 	mismatch = False
 	for field, value in qty_dict.items():
@@ -24,6 +24,7 @@ from frappe.utils import (
 
 import erpnext
 from erpnext.stock.doctype.bin.bin import update_qty as update_bin_qty
+from erpnext.stock.doctype.bin_delta.bin_delta import add_bin_delta, fold_bin_deltas, is_bin_delta_enabled
 from erpnext.stock.doctype.inventory_dimension.inventory_dimension import get_inventory_dimensions
 from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle import (
 	get_available_batches,
@@ -37,11 +38,18 @@ from erpnext.stock.utils import (
 	get_incoming_outgoing_rate_for_cancel,
 	get_incoming_rate,
 	get_or_make_bin,
+	get_posting_datetime_condition,
 	get_serial_nos_data,
 	get_stock_balance,
 	get_valuation_method,
 )
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation, round_off_if_near_zero
+from erpnext.stock.valuation import (
+	FIFOValuation,
+	LIFOValuation,
+	decode_stock_queue,
+	encode_stock_queue,
+	round_off_if_near_zero,
+)
 
 
 class NegativeStockError(frappe.ValidationError):
@@ -239,10 +247,16 @@ def repost_future_sle(
 	allow_negative_stock=None,
 	via_landed_cost_voucher=False,
 	doc=None,
+	batched=None,
 ):
+	from erpnext.stock.batched_reposting import BatchedRepost, RepostStats
+
 	if not args:
 		args = []  # set args to empty list if None to avoid enumerate error
 
+	if batched is None:
+		batched = cint(frappe.db.get_single_value("Stock Reposting Settings", "use_batched_reposting"))
+
 	reposting_data = {}
 	if doc and doc.reposting_data_file:
 		reposting_data = get_reposting_data(doc.reposting_data_file)
@@ -256,31 +270,63 @@ def repost_future_sle(
 	distinct_item_warehouses = get_distinct_item_warehouse(args, doc, reposting_data=reposting_data)
 	affected_transactions = get_affected_transactions(doc, reposting_data=reposting_data)
 
+	batched_repost = None
+	if batched:
+		batched_repost = BatchedRepost(
+			allow_negative_stock=allow_negative_stock, via_landed_cost_voucher=via_landed_cost_voucher
+		)
+
+	stats = RepostStats(batched=bool(batched))
+
+	checkpoint = None
+	if doc:
+		checkpoint = RepostCheckpoint(doc, args, distinct_item_warehouses, affected_transactions)
+
 	i = get_current_index(doc) or 0
+
+	# resume an item-warehouse which was interrupted after its last checkpoint
+	resume_from, resume_index = get_resume_checkpoint(doc), None
+	if resume_from and i < len(args) and is_checkpoint_of_row(resume_from, args[i]):
+		resume_index = i
+
 	while i < len(args):
 		validate_item_warehouse(args[i])
 
-		obj = update_entries_after(
-			{
-				"item_code": args[i].get("item_code"),
-				"warehouse": args[i].get("warehouse"),
-				"posting_date": args[i].get("posting_date"),
-				"posting_time": args[i].get("posting_time"),
-				"creation": args[i].get("creation"),
-				"distinct_item_warehouses": distinct_item_warehouses,
-				"items_to_be_repost": args,
-				"current_index": i,
-			},
-			allow_negative_stock=allow_negative_stock,
-			via_landed_cost_voucher=via_landed_cost_voucher,
-		)
+		if checkpoint:
+			checkpoint.index = i
+
+		row_resume_from = resume_from if i == resume_index else None
+		if batched_repost:
+			obj = batched_repost.update_entries_after(
+				args, i, distinct_item_warehouses, resume_from=row_resume_from, checkpoint=checkpoint
+			)
+		else:
+			obj = update_entries_after(
+				{
+					"item_code": args[i].get("item_code"),
+					"warehouse": args[i].get("warehouse"),
+					"posting_date": args[i].get("posting_date"),
+					"posting_time": args[i].get("posting_time"),
+					"creation": args[i].get("creation"),
+					"distinct_item_warehouses": distinct_item_warehouses,
+					"items_to_be_repost": args,
+					"current_index": i,
+					"resume_from": row_resume_from,
+				},
+				allow_negative_stock=allow_negative_stock,
+				via_landed_cost_voucher=via_landed_cost_voucher,
+				checkpoint=checkpoint,
+			)
+
+		stats.add(obj)
 		affected_transactions.update(obj.affected_transactions)
 
 		key = (args[i].get("item_code"), args[i].get("warehouse"))
 		if distinct_item_warehouses.get(key):
 			distinct_item_warehouses[key].reposting_status = True
 
-		if obj.new_items_found:
+		# items found before the checkpoint are only recorded in distinct_item_warehouses
+		if obj.new_items_found or i == resume_index:
 			for _item_wh, data in distinct_item_warehouses.items():
 				if ("args_idx" not in data and not data.reposting_status) or (
 					data.sle_changed and data.reposting_status
@@ -293,11 +339,85 @@ def repost_future_sle(
 				data.sle_changed = False
 		i += 1
 
-		if doc:
-			update_args_in_repost_item_valuation(
-				doc, i, args, distinct_item_warehouses, affected_transactions
+		if checkpoint:
+			# the rest of a prefetched window is reposted in the same transaction
+			checkpoint.item_warehouse_processed(
+				i, keep_transaction=bool(batched_repost and batched_repost.in_window(i))
 			)
 
+	return stats.as_dict()
+
+
+class RepostCheckpoint:
+	"""Saves the progress of a Repost Item Valuation and commits it.
+
+	With `checkpoint_interval` set in Stock Reposting Settings, progress is
+	saved once that many SLEs are reposted, also in the middle of an
+	item-warehouse. The last reposted SLE is recorded, so an interrupted repost
+	resumes right after it. Otherwise progress is saved after every item-warehouse,
+	or after every window of item-warehouses when reposting in batches.
+	"""
+
+	def __init__(self, doc, args, distinct_item_warehouses, affected_transactions, interval=None):
+		self.doc = doc
+		self.args = args
+		self.distinct_item_warehouses = distinct_item_warehouses
+		self.affected_transactions = affected_transactions
+		if interval is None:
+			interval = frappe.db.get_single_value("Stock Reposting Settings", "checkpoint_interval")
+
+		self.interval = cint(interval)
+		self.index = 0
+		self.pending_sles = 0
+
+	def sle_processed(self, obj, sle):
+		self.pending_sles += 1
+		if not self.interval or self.pending_sles < self.interval:
+			return
+
+		# the repost of the current item-warehouse is not finished yet
+		obj.before_checkpoint()
+		self.affected_transactions.update(obj.affected_transactions)
+		self.save(self.index, sle)
+
+	def item_warehouse_processed(self, index, keep_transaction=False):
+		self.index = index
+		if index < len(self.args) and (
+			keep_transaction or (self.interval and self.pending_sles < self.interval)
+		):
+			return
+
+		self.save(index)
+
+	def save(self, index, sle=None):
+		update_args_in_repost_item_valuation(
+			self.doc,
+			index,
+			self.args,
+			self.distinct_item_warehouses,
+			self.affected_transactions,
+			checkpoint_sle=sle,
+		)
+		self.pending_sles = 0
+
+
+def get_resume_checkpoint(doc=None):
+	if not doc or not doc.get("checkpoint_item_code"):
+		return
+
+	return frappe._dict(
+		{
+			"item_code": doc.checkpoint_item_code,
+			"warehouse": doc.checkpoint_warehouse,
+			"posting_datetime": doc.checkpoint_posting_datetime,
+			"creation": doc.checkpoint_creation,
+		}
+	)
+
+
+def is_checkpoint_of_row(checkpoint, row) -> bool:
+	return checkpoint.item_code == row.get("item_code") and checkpoint.warehouse == row.get("warehouse")
+
 
 def get_reposting_data(file_path) -> dict:
 	file_name = frappe.db.get_value(
@@ -336,7 +456,16 @@ def validate_item_warehouse(args):
 			frappe.throw(_(validation_msg))
 
 
-def update_args_in_repost_item_valuation(doc, index, args, distinct_item_warehouses, affected_transactions):
+def update_args_in_repost_item_valuation(
+	doc, index, args, distinct_item_warehouses, affected_transactions, checkpoint_sle=None
+):
+	checkpoint = {
+		"checkpoint_item_code": checkpoint_sle.item_code if checkpoint_sle else None,
+		"checkpoint_warehouse": checkpoint_sle.warehouse if checkpoint_sle else None,
+		"checkpoint_posting_datetime": checkpoint_sle.posting_datetime if checkpoint_sle else None,
+		"checkpoint_creation": checkpoint_sle.creation if checkpoint_sle else None,
+	}
+
 	if not doc.items_to_be_repost:
 		file_name = ""
 		if doc.reposting_data_file:
@@ -358,6 +487,7 @@ def update_args_in_repost_item_valuation(doc, index, args, distinct_item_warehou
 				"current_index": index,
 				"total_reposting_count": len(args),
 				"reposting_data_file": doc.reposting_data_file,
+				**checkpoint,
 			}
 		)
 
@@ -370,6 +500,7 @@ def update_args_in_repost_item_valuation(doc, index, args, distinct_item_warehou
 				),
 				"current_index": index,
 				"affected_transactions": frappe.as_json(affected_transactions),
+				**checkpoint,
 			}
 		)
 
@@ -529,6 +660,7 @@ class update_entries_after:
 		allow_negative_stock=None,
 		via_landed_cost_voucher=False,
 		verbose=1,
+		checkpoint=None,
 	):
 		self.exceptions = {}
 		self.verbose = verbose
@@ -538,6 +670,11 @@ class update_entries_after:
 		self.use_moving_avg_for_batch = frappe.db.get_single_value(
 			"Stock Settings", "do_not_use_batchwise_valuation"
 		)
+		self.compact_stock_queue = cint(
+			frappe.db.get_single_value("Stock Settings", "compact_stock_queue", cache=True)
+		)
+		self.defer_bin_updates = is_bin_delta_enabled()
+		self.folded_bins = set()
 
 		self.allow_negative_stock = allow_negative_stock or is_negative_stock_allowed(
 			item_code=self.item_code
@@ -547,11 +684,15 @@ class update_entries_after:
 		if self.args.sle_id:
 			self.args["name"] = self.args.sle_id
 
+		self.checkpoint = checkpoint
+		self.resume_from = self.args.resume_from
+
 		self.company = frappe.get_cached_value("Warehouse", self.args.warehouse, "company")
 		self.set_precision()
 		self.valuation_method = get_valuation_method(self.item_code)
 
 		self.new_items_found = False
+		self.processed_sles = 0
 		self.distinct_item_warehouses = args.get("distinct_item_warehouses", frappe._dict())
 		self.affected_transactions: set[tuple[str, str]] = set()
 		self.reserved_stock = flt(self.args.reserved_stock)
@@ -588,7 +729,7 @@ class update_entries_after:
 		"""
 		self.data.setdefault(args.warehouse, frappe._dict())
 		warehouse_dict = self.data[args.warehouse]
-		previous_sle = get_previous_sle_of_current_voucher(args)
+		previous_sle = self.get_previous_sle_for_warehouse(args)
 		warehouse_dict.previous_sle = previous_sle
 
 		for key in ("qty_after_transaction", "valuation_rate", "stock_value"):
@@ -597,11 +738,21 @@ class update_entries_after:
 		warehouse_dict.update(
 			{
 				"prev_stock_value": previous_sle.stock_value or 0.0,
-				"stock_queue": json.loads(previous_sle.stock_queue or "[]"),
+				"stock_queue": decode_stock_queue(previous_sle.stock_queue),
 				"stock_value_difference": 0.0,
 			}
 		)
 
+	def get_previous_sle_for_warehouse(self, args):
+		if self.resume_from and args is self.args:
+			if checkpoint_sle := get_checkpoint_sle(self.resume_from):
+				return checkpoint_sle
+
+			# checkpoint SLE got cancelled, repost the whole item-warehouse
+			self.resume_from = None
+
+		return get_previous_sle_of_current_voucher(args)
+
 	def build(self):
 		from erpnext.controllers.stock_controller import future_sle_exists
 
@@ -623,6 +774,9 @@ class update_entries_after:
 				if sle.dependant_sle_voucher_detail_no:
 					entries_to_fix = self.get_dependent_entries_to_fix(entries_to_fix, sle)
 
+				if self.checkpoint:
+					self.checkpoint.sle_processed(self, sle)
+
 		if self.exceptions:
 			self.raise_exceptions()
 
@@ -656,7 +810,14 @@ class update_entries_after:
 			as_dict=1,
 		)
 
+	def before_checkpoint(self):
+		"""Write back anything the SLEs reposted so far depend on before progress is committed."""
+		pass
+
 	def get_future_entries_to_fix(self):
+		if self.resume_from:
+			return get_sle_after_checkpoint(self.resume_from)
+
 		# includes current entry!
 		args = self.data[self.args.warehouse].previous_sle or frappe._dict(
 			{"item_code": self.item_code, "warehouse": self.args.warehouse}
@@ -766,6 +927,7 @@ class update_entries_after:
 	def process_sle(self, sle):
 		# previous sle data for this warehouse
 		self.wh_data = self.data[sle.warehouse]
+		self.processed_sles += 1
 
 		self.validate_previous_sle_qty(sle)
 		self.affected_transactions.add((sle.voucher_type, sle.voucher_no))
@@ -863,13 +1025,13 @@ class update_entries_after:
 		sle.qty_after_transaction = self.wh_data.qty_after_transaction
 		sle.valuation_rate = self.wh_data.valuation_rate
 		sle.stock_value = self.wh_data.stock_value
-		sle.stock_queue = json.dumps(self.wh_data.stock_queue)
+		sle.stock_queue = encode_stock_queue(self.wh_data.stock_queue, compact=self.compact_stock_queue)
 
 		if not sle.is_adjustment_entry:
 			sle.stock_value_difference = stock_value_difference
 
 		sle.doctype = "Stock Ledger Entry"
-		frappe.get_doc(sle).db_update()
+		self.update_sle(sle)
 
 		if (
 			sle.serial_and_batch_bundle
@@ -885,6 +1047,9 @@ class update_entries_after:
 		):
 			self.update_outgoing_rate_on_transaction(sle)
 
+	def update_sle(self, sle):
+		frappe.get_doc(sle).db_update()
+
 	def get_serialized_values(self, sle):
 		from erpnext.stock.serial_batch_bundle import SerialNoValuation
 
@@ -1322,6 +1487,12 @@ class update_entries_after:
 				if not allow_zero_valuation_rate:
 					self.wh_data.valuation_rate = self.get_fallback_rate(sle)
 
+	def get_stock_queue(self):
+		if self.valuation_method == "LIFO":
+			return LIFOValuation(self.wh_data.stock_queue)
+
+		return FIFOValuation(self.wh_data.stock_queue)
+
 	def update_queue_values(self, sle):
 		incoming_rate = flt(sle.incoming_rate)
 		actual_qty = flt(sle.actual_qty)
@@ -1331,11 +1502,7 @@ class update_entries_after:
 			self.wh_data.qty_after_transaction + actual_qty
 		)
 
-		if self.valuation_method == "LIFO":
-			stock_queue = LIFOValuation(self.wh_data.stock_queue)
-		else:
-			stock_queue = FIFOValuation(self.wh_data.stock_queue)
-
+		stock_queue = self.get_stock_queue()
 		_prev_qty, prev_stock_value = stock_queue.get_total_stock_and_value()
 
 		if actual_qty > 0:
@@ -1492,6 +1659,7 @@ class update_entries_after:
 
 	def update_bin_data(self, sle):
 		bin_name = get_or_make_bin(sle.item_code, sle.warehouse)
+		self.fold_bin_deltas(sle.item_code, sle.warehouse)
 		values_to_update = {
 			"actual_qty": sle.qty_after_transaction,
 			"stock_value": sle.stock_value,
@@ -1502,7 +1670,19 @@ class update_entries_after:
 
 		frappe.db.set_value("Bin", bin_name, values_to_update)
 
+	def fold_bin_deltas(self, item_code, warehouse):
+		# values from the ledger replace the Bin, pending deltas are already part of them
+		if not self.defer_bin_updates or (item_code, warehouse) in self.folded_bins:
+			return
+
+		fold_bin_deltas(item_code, warehouse)
+		self.folded_bins.add((item_code, warehouse))
+
 	def update_bin(self):
+		if self.defer_bin_updates:
+			self.add_bin_deltas()
+			return
+
 		# update bin for each warehouse
 		for warehouse, data in self.data.items():
 			bin_name = get_or_make_bin(self.item_code, warehouse)
@@ -1512,6 +1692,20 @@ class update_entries_after:
 				updated_values["valuation_rate"] = data.valuation_rate
 			frappe.db.set_value("Bin", bin_name, updated_values, update_modified=True)
 
+	def add_bin_deltas(self):
+		# no future SLEs, the Bin holds the balance after the previous SLE
+		for warehouse, data in self.data.items():
+			previous_sle = data.previous_sle or frappe._dict()
+			add_bin_delta(
+				self.item_code,
+				warehouse,
+				voucher_type=self.args.voucher_type,
+				voucher_no=self.args.voucher_no,
+				actual_qty=flt(data.qty_after_transaction) - flt(previous_sle.qty_after_transaction),
+				stock_value_difference=flt(data.stock_value) - flt(previous_sle.stock_value),
+				valuation_rate=data.valuation_rate,
+			)
+
 
 def get_previous_sle_of_current_voucher(args, operator="<", exclude_current_voucher=False):
 	"""get stock ledger entries filtered by specific posting datetime conditions"""
@@ -1578,6 +1772,46 @@ def get_previous_sle(args, for_update=False, extra_cond=None):
 	return sle and sle[0] or {}
 
 
+def get_checkpoint_sle(checkpoint):
+	"""SLE recorded as the last reposted one in a reposting checkpoint."""
+	sle = frappe.db.sql(
+		"""
+		select *, posting_datetime as "timestamp"
+		from `tabStock Ledger Entry`
+		where item_code = %(item_code)s
+			and warehouse = %(warehouse)s
+			and is_cancelled = 0
+			and posting_datetime = %(posting_datetime)s
+			and creation = %(creation)s
+		limit 1
+		for update""",
+		checkpoint,
+		as_dict=1,
+	)
+
+	return sle[0] if sle else frappe._dict()
+
+
+def get_sle_after_checkpoint(checkpoint):
+	"""SLEs still to be reposted after the SLE recorded in a reposting checkpoint."""
+	return frappe.db.sql(
+		"""
+		select *, posting_datetime as "timestamp"
+		from `tabStock Ledger Entry`
+		where item_code = %(item_code)s
+			and warehouse = %(warehouse)s
+			and is_cancelled = 0
+			and (
+				posting_datetime > %(posting_datetime)s
+				or (posting_datetime = %(posting_datetime)s and creation > %(creation)s)
+			)
+		order by posting_date asc, posting_time asc, creation asc
+		for update""",
+		checkpoint,
+		as_dict=1,
+	)
+
+
 def get_stock_ledger_entries(
 	previous_sle,
 	operator=None,
@@ -1671,11 +1905,7 @@ def get_sle_by_voucher_detail_no(voucher_detail_no, excluded_sle=None):
 def get_batch_incoming_rate(item_code, warehouse, batch_no, posting_date, posting_time, creation=None):
 	sle = frappe.qb.DocType("Stock Ledger Entry")
 
-	timestamp_condition = sle.posting_datetime < get_combine_datetime(posting_date, posting_time)
-	if creation:
-		timestamp_condition |= (sle.posting_datetime == get_combine_datetime(posting_date, posting_time)) & (
-			sle.creation < creation
-		)
+	timestamp_condition = get_posting_datetime_condition(sle, "<", posting_date, posting_time, creation)
 
 	batch_details = (
 		frappe.qb.from_(sle)
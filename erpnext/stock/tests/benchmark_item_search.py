@@ -0,0 +1,129 @@
+"""Benchmark of item search in link fields.
+
+Not collected by the test runner. Run it against a site with
+
+	bench --site <site> execute erpnext.stock.tests.benchmark_item_search.run --kwargs "{'items': 1000000}"
+
+Synthetic items are inserted and rolled back at the end.
+"""
+
+import random
+import time
+from unittest.mock import patch
+
+import frappe
+from frappe.utils import cint, now
+from frappe.utils.nestedset import get_root_of
+
+from erpnext.controllers.queries import item_query
+from erpnext.stock.doctype.item_search_token.item_search_token import rebuild_item_search_tokens
+
+WORDS = (
+	"steel",
+	"copper",
+	"brass",
+	"bolt",
+	"nut",
+	"washer",
+	"screw",
+	"hinge",
+	"bracket",
+	"valve",
+	"pipe",
+	"flange",
+	"bearing",
+	"gasket",
+	"spring",
+	"cable",
+	"sensor",
+	"motor",
+	"pump",
+	"filter",
+)
+
+
+def insert_synthetic_items(items, seed=42):
+	"""Insert Items named from a small vocabulary, like the catalog of a parts distributor."""
+	rng = random.Random(seed)
+	timestamp, user = now(), frappe.session.user
+	item_group, stock_uom = get_root_of("Item Group"), "Nos"
+
+	frappe.db.bulk_insert(
+		"Item",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"item_code",
+			"item_name",
+			"item_group",
+			"stock_uom",
+		],
+		values=(
+			[
+				f"BENCH-{i:07d}",
+				timestamp,
+				timestamp,
+				user,
+				user,
+				f"BENCH-{i:07d}",
+				" ".join(rng.sample(WORDS, 3)) + f" M{rng.randint(2, 48)}",
+				item_group,
+				stock_uom,
+			]
+			for i in range(items)
+		),
+		chunk_size=10000,
+	)
+
+
+def benchmark_item_query(terms, use_index, repeat=5):
+	"""Latency of `item_query` for a link field search of each term."""
+	result = {}
+	with patch("erpnext.controllers.queries.is_item_search_index_ready", return_value=use_index):
+		for term in terms:
+			start = time.perf_counter()
+			for _ in range(repeat):
+				rows = item_query("Item", term, "name", 0, 20, {})
+			elapsed = time.perf_counter() - start
+
+			result[term] = {
+				"rows": len(rows),
+				"ms_per_search": round(elapsed / repeat * 1000, 2),
+			}
+
+	return result
+
+
+def run(items=1_000_000, terms=("bolt", "steel bolt", "BENCH-0500000", "m12 hinge", "zzz")):
+	items = cint(items)
+
+	insert_synthetic_items(items)
+
+	start = time.perf_counter()
+	# the rebuild commits per batch of items, keep it in one transaction to roll it back
+	with patch.object(frappe.db, "commit"):
+		rebuild_item_search_tokens()
+	rebuild_s = time.perf_counter() - start
+
+	results = {
+		"legacy": benchmark_item_query(terms, use_index=False),
+		"index": benchmark_item_query(terms, use_index=True),
+		"rebuild": {
+			"items": items,
+			"tokens": frappe.db.count("Item Search Token"),
+			"total_s": round(rebuild_s, 2),
+		},
+	}
+
+	# keep the site as it was
+	frappe.db.rollback()
+
+	for name, result in results.items():
+		print(name)
+		for key, value in result.items():
+			print(f"\t{key}: {value}")
+
+	return results
@@ -0,0 +1,139 @@
+"""Micro-benchmarks for stock valuation.
+
+These are not collected by the test runner. Run them with
+
+	bench --site <site> execute erpnext.stock.tests.benchmark_valuation.run
+
+or without a site as
+
+	python -m erpnext.stock.tests.benchmark_valuation
+"""
+
+import random
+import time
+
+from erpnext.stock.valuation import (
+	ArrayFIFOValuation,
+	ArrayLIFOValuation,
+	FIFOValuation,
+	LIFOValuation,
+	decode_stock_queue,
+	encode_stock_queue,
+)
+
+
+def synthetic_ledger(sles=1_000_000, items=2_000, seed=42):
+	"""Yield the FIFO queue after every SLE of a synthetic ledger.
+
+	A few items are high-volume with many receipts at distinct rates, so their
+	queues grow to thousands of bins like they do on busy sites.
+	"""
+	rng = random.Random(seed)
+	queues = [FIFOValuation([]) for _ in range(items)]
+	hot_items = max(items // 100, 1)
+
+	for _ in range(sles):
+		idx = rng.randrange(hot_items) if rng.random() < 0.3 else rng.randrange(items)
+		queue = queues[idx]
+
+		if rng.random() < 0.6:
+			queue.add_stock(qty=rng.randint(1, 100), rate=round(rng.uniform(10, 1000), 2))
+		else:
+			queue.remove_stock(qty=rng.randint(1, 80))
+
+		yield queue.state
+
+
+def benchmark_stock_queue_codec(sles=1_000_000, items=2_000):
+	"""Compare encode/decode cost and storage of JSON and compact stock queues."""
+	result = {}
+	for fmt, compact in (("json", False), ("compact", True)):
+		size = encode_time = decode_time = 0.0
+		for state in synthetic_ledger(sles, items):
+			start = time.perf_counter()
+			encoded = encode_stock_queue(state, compact=compact)
+			encode_time += time.perf_counter() - start
+
+			start = time.perf_counter()
+			decode_stock_queue(encoded)
+			decode_time += time.perf_counter() - start
+
+			size += len(encoded)
+
+		result[fmt] = {
+			"total_mb": round(size / 1024 / 1024, 2),
+			"avg_bytes": round(size / sles, 1),
+			"encode_us": round(encode_time / sles * 1e6, 2),
+			"decode_us": round(decode_time / sles * 1e6, 2),
+		}
+
+	result["storage_saved_pct"] = round(
+		100 * (1 - result["compact"]["total_mb"] / result["json"]["total_mb"]), 2
+	)
+	return result
+
+
+def synthetic_movements(movements, seed=42):
+	"""Movements of a single busy item-warehouse, receipts at distinct rates build up a long queue."""
+	rng = random.Random(seed)
+	balance = 0
+	for _ in range(movements):
+		if balance < 1000 or rng.random() < 0.5:
+			qty = rng.randint(1, 100)
+			balance += qty
+			yield qty, round(rng.uniform(10, 1000), 2), 0.0
+		else:
+			qty = rng.randint(1, 100)
+			balance -= qty
+			# every tenth issue is at a specific rate, like returns against a receipt
+			outgoing_rate = round(rng.uniform(10, 1000), 2) if rng.random() < 0.1 else 0.0
+			yield -qty, 0.0, outgoing_rate
+
+
+def benchmark_valuation_queues(sizes=(10_000, 100_000, 1_000_000)):
+	"""Compare list and array backed queues replaying movements like `update_queue_values` does."""
+	result = {}
+	for movements in sizes:
+		ledger = list(synthetic_movements(movements))
+		for name, valuation in (
+			("fifo", FIFOValuation),
+			("array_fifo", ArrayFIFOValuation),
+			("lifo", LIFOValuation),
+			("array_lifo", ArrayLIFOValuation),
+		):
+			queue = valuation([])
+			start = time.perf_counter()
+			for qty, rate, outgoing_rate in ledger:
+				queue.get_total_stock_and_value()
+				if qty > 0:
+					queue.add_stock(qty=qty, rate=rate)
+				else:
+					queue.remove_stock(qty=-qty, outgoing_rate=outgoing_rate)
+				queue.get_total_stock_and_value()
+			elapsed = time.perf_counter() - start
+
+			result[f"{name}_{movements}"] = {
+				"bins": len(queue.state),
+				"total_s": round(elapsed, 3),
+				"per_movement_us": round(elapsed / movements * 1e6, 2),
+			}
+
+	return result
+
+
+def run(sles=1_000_000):
+	results = {
+		"stock_queue_codec": benchmark_stock_queue_codec(sles=int(sles)),
+		"valuation_queues": benchmark_valuation_queues(),
+	}
+
+	for name, result in results.items():
+		print(name)
+		for key, value in result.items():
+			print(f"\t{key}: {value}")
+
+	return results
+
+
+if __name__ == "__main__":
+	run()
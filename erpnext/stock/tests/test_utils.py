@@ -1,9 +1,10 @@
-import json
-
 import frappe
+from frappe.query_builder import Order
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, getdate, now_datetime
 
-from erpnext.stock.utils import scan_barcode
+from erpnext.stock.utils import get_combine_datetime, get_posting_datetime_condition, scan_barcode
+from erpnext.stock.valuation import decode_stock_queue
 
 
 class StockTestMixin:
@@ -32,7 +33,7 @@ class StockTestMixin:
 			for k, v in exp_sle.items():
 				act_value = act_sle[k]
 				if k == "stock_queue":
-					act_value = json.loads(act_value)
+					act_value = decode_stock_queue(act_value)
 					if act_value and act_value[0][0] == 0:
 						# ignore empty fifo bins
 						continue
@@ -81,3 +82,82 @@ class TestStockUtilities(FrappeTestCase, StockTestMixin):
 		self.assertEqual(serial_scan["serial_no"], serial.name)
 		self.assertEqual(serial_scan["has_batch_no"], 0)
 		self.assertEqual(serial_scan["has_serial_no"], 1)
+
+	def test_posting_datetime_condition(self):
+		items = [self.make_item().name for _ in range(2)]
+		warehouses = ["_Test Warehouse - _TC", "_Test Warehouse 1 - _TC"]
+		# a few weeks of entries per item and warehouse, well before and after any other test data
+		dates = [add_days("1901-01-01", i) for i in range(40)] + [
+			add_days("2199-01-01", i) for i in range(40)
+		]
+		creation = now_datetime()
+
+		fields = [
+			"name",
+			"creation",
+			"modified",
+			"docstatus",
+			"company",
+			"item_code",
+			"warehouse",
+			"posting_date",
+			"posting_time",
+			"posting_datetime",
+			"voucher_type",
+			"voucher_no",
+			"actual_qty",
+			"is_cancelled",
+		]
+		values = [
+			(
+				frappe.generate_hash(),
+				creation,
+				creation,
+				1,
+				"_Test Company",
+				item,
+				warehouse,
+				date,
+				"10:00:00",
+				get_combine_datetime(date, "10:00:00"),
+				"Stock Entry",
+				frappe.generate_hash(),
+				1,
+				0,
+			)
+			for item in items
+			for warehouse in warehouses
+			for date in dates
+		]
+		frappe.db.bulk_insert("Stock Ledger Entry", fields, values)
+
+		sle = frappe.qb.DocType("Stock Ledger Entry")
+		previous_sle = (
+			frappe.qb.from_(sle)
+			.select(sle.posting_date)
+			.where(get_posting_datetime_condition(sle, "<", "1901-01-03", "10:00:00", creation))
+			.where((sle.item_code == items[0]) & (sle.warehouse == warehouses[0]) & (sle.is_cancelled == 0))
+			.orderby(sle.posting_datetime, order=Order.desc)
+			.orderby(sle.creation, order=Order.desc)
+			.limit(1)
+		)
+		future_sles = (
+			frappe.qb.from_(sle)
+			.select(sle.posting_date)
+			.where(get_posting_datetime_condition(sle, ">", "2199-02-08", "10:00:00", creation))
+			.where(sle.item_code.isin(items) & sle.warehouse.isin(warehouses) & (sle.is_cancelled == 0))
+			.orderby(sle.posting_datetime)
+			.orderby(sle.creation)
+		)
+
+		self.assertEqual([getdate("1901-01-02")], [d.posting_date for d in previous_sle.run(as_dict=True)])
+		self.assertEqual([getdate("2199-02-09")] * 4, [d.posting_date for d in future_sles.run(as_dict=True)])
+
+		for query in (previous_sle, future_sles):
+			sql = query.get_sql()
+			self.assertIn("posting_datetime", sql)
+			self.assertNotIn("TIMESTAMP", sql.upper())
+
+			if frappe.db.db_type == "mariadb":
+				plan = frappe.db.sql(f"explain {sql}", as_dict=True)
+				self.assertEqual(plan[0].key, "posting_datetime_creation_index", msg=plan)
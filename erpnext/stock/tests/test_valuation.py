@@ -8,7 +8,17 @@ from hypothesis import strategies as st
 
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation, round_off_if_near_zero
+from erpnext.stock.valuation import (
+	PACKED_STOCK_QUEUE_MIN_BINS,
+	PACKED_STOCK_QUEUE_PREFIX,
+	ArrayFIFOValuation,
+	ArrayLIFOValuation,
+	FIFOValuation,
+	LIFOValuation,
+	decode_stock_queue,
+	encode_stock_queue,
+	round_off_if_near_zero,
+)
 
 qty_gen = st.floats(min_value=-1e6, max_value=1e6)
 value_gen = st.floats(min_value=1, max_value=1e6)
@@ -16,8 +26,10 @@ stock_queue_generator = st.lists(st.tuples(qty_gen, value_gen), min_size=10)
 
 
 class TestFIFOValuation(unittest.TestCase):
+	valuation = FIFOValuation
+
 	def setUp(self):
-		self.queue = FIFOValuation([])
+		self.queue = self.valuation([])
 
 	def tearDown(self):
 		qty, value = self.queue.get_total_stock_and_value()
@@ -45,12 +57,12 @@ class TestFIFOValuation(unittest.TestCase):
 		self.assertEqual(self.queue, [[2, 10]])
 
 	def test_adding_negative_stock_keeps_rate(self):
-		self.queue = FIFOValuation([[-5.0, 100]])
+		self.queue = self.valuation([[-5.0, 100]])
 		self.queue.add_stock(1, 10)
 		self.assertEqual(self.queue, [[-4, 100]])
 
 	def test_adding_negative_stock_updates_rate(self):
-		self.queue = FIFOValuation([[-5.0, 100]])
+		self.queue = self.valuation([[-5.0, 100]])
 		self.queue.add_stock(6, 10)
 		self.assertEqual(self.queue, [[1, 10]])
 
@@ -126,7 +138,7 @@ class TestFIFOValuation(unittest.TestCase):
 
 	@given(stock_queue_generator)
 	def test_fifo_qty_hypothesis(self, stock_queue):
-		self.queue = FIFOValuation([])
+		self.queue = self.valuation([])
 		total_qty = 0
 
 		for qty, rate in stock_queue:
@@ -146,7 +158,7 @@ class TestFIFOValuation(unittest.TestCase):
 
 	@given(stock_queue_generator)
 	def test_fifo_qty_value_nonneg_hypothesis(self, stock_queue):
-		self.queue = FIFOValuation([])
+		self.queue = self.valuation([])
 		total_qty = 0.0
 		total_value = 0.0
 
@@ -171,7 +183,7 @@ class TestFIFOValuation(unittest.TestCase):
 
 	@given(stock_queue_generator, st.floats(min_value=0.1, max_value=1e6))
 	def test_fifo_qty_value_nonneg_hypothesis_with_outgoing_rate(self, stock_queue, outgoing_rate):
-		self.queue = FIFOValuation([])
+		self.queue = self.valuation([])
 		total_qty = 0.0
 		total_value = 0.0
 
@@ -196,8 +208,10 @@ class TestFIFOValuation(unittest.TestCase):
 
 
 class TestLIFOValuation(unittest.TestCase):
+	valuation = LIFOValuation
+
 	def setUp(self):
-		self.stack = LIFOValuation([])
+		self.stack = self.valuation([])
 
 	def tearDown(self):
 		qty, value = self.stack.get_total_stock_and_value()
@@ -225,12 +239,12 @@ class TestLIFOValuation(unittest.TestCase):
 		self.assertTotalQty(0)
 
 	def test_adding_negative_stock_keeps_rate(self):
-		self.stack = LIFOValuation([[-5.0, 100]])
+		self.stack = self.valuation([[-5.0, 100]])
 		self.stack.add_stock(1, 10)
 		self.assertEqual(self.stack, [[-4, 100]])
 
 	def test_adding_negative_stock_updates_rate(self):
-		self.stack = LIFOValuation([[-5.0, 100]])
+		self.stack = self.valuation([[-5.0, 100]])
 		self.stack.add_stock(6, 10)
 		self.assertEqual(self.stack, [[1, 10]])
 
@@ -273,7 +287,7 @@ class TestLIFOValuation(unittest.TestCase):
 
 	@given(stock_queue_generator)
 	def test_lifo_qty_hypothesis(self, stock_stack):
-		self.stack = LIFOValuation([])
+		self.stack = self.valuation([])
 		total_qty = 0
 
 		for qty, rate in stock_stack:
@@ -293,7 +307,7 @@ class TestLIFOValuation(unittest.TestCase):
 
 	@given(stock_queue_generator)
 	def test_lifo_qty_value_nonneg_hypothesis(self, stock_stack):
-		self.stack = LIFOValuation([])
+		self.stack = self.valuation([])
 		total_qty = 0.0
 		total_value = 0.0
 
@@ -317,6 +331,89 @@ class TestLIFOValuation(unittest.TestCase):
 			self.assertTotalValue(total_value)
 
 
+class TestArrayFIFOValuation(TestFIFOValuation):
+	valuation = ArrayFIFOValuation
+
+	# hypothesis tests can't be shared across test classes,
+	# these are covered by comparing with the list based valuation
+	test_fifo_qty_hypothesis = None
+	test_fifo_qty_value_nonneg_hypothesis = None
+	test_fifo_qty_value_nonneg_hypothesis_with_outgoing_rate = None
+
+	@given(stock_queue_generator, st.floats(min_value=0.1, max_value=1e6))
+	def test_same_as_fifo_valuation(self, stock_queue, outgoing_rate):
+		assert_same_as_list_valuation(self, FIFOValuation, stock_queue, outgoing_rate)
+
+	def test_consume_rate_matched_bin(self):
+		self.queue.add_stock(10, 10)
+		self.queue.add_stock(10, 20)
+		self.queue.add_stock(10, 30)
+
+		self.assertEqual(self.queue.remove_stock(15, outgoing_rate=20), [[10, 20], [5, 10]])
+		self.assertEqual(self.queue, [[5, 10], [10, 30]])
+		self.assertEqual(self.queue.get_total_stock_and_value(), (15, 350))
+
+
+class TestArrayLIFOValuation(TestLIFOValuation):
+	valuation = ArrayLIFOValuation
+
+	# hypothesis tests can't be shared across test classes,
+	# these are covered by comparing with the list based valuation
+	test_lifo_qty_hypothesis = None
+	test_lifo_qty_value_nonneg_hypothesis = None
+
+	@given(stock_queue_generator, st.floats(min_value=0.1, max_value=1e6))
+	def test_same_as_lifo_valuation(self, stock_queue, outgoing_rate):
+		assert_same_as_list_valuation(self, LIFOValuation, stock_queue, outgoing_rate)
+
+
+def assert_same_as_list_valuation(test_case, list_valuation, stock_queue, outgoing_rate):
+	expected, actual = list_valuation([]), test_case.valuation([])
+
+	for qty, rate in stock_queue:
+		if round_off_if_near_zero(qty) == 0:
+			continue
+		if qty > 0:
+			expected.add_stock(qty, rate)
+			actual.add_stock(qty, rate)
+		else:
+			test_case.assertEqual(
+				expected.remove_stock(abs(qty), outgoing_rate), actual.remove_stock(abs(qty), outgoing_rate)
+			)
+		test_case.assertEqual(expected.state, actual.state)
+
+	test_case.assertEqual(test_case.valuation(expected.state).state, actual.state)
+	test_case.queue = test_case.stack = actual
+
+
+class TestStockQueueCodec(unittest.TestCase):
+	def test_legacy_json(self):
+		self.assertEqual(decode_stock_queue("[[10, 100], [5, 20.5]]"), [[10, 100], [5, 20.5]])
+		self.assertEqual(decode_stock_queue(None), [])
+		self.assertEqual(decode_stock_queue(""), [])
+		self.assertEqual(encode_stock_queue([[10, 100]]), json.dumps([[10, 100]]))
+
+	def test_short_queue_is_compact_json(self):
+		encoded = encode_stock_queue([[10, 100], [5, 20.5]], compact=True)
+		self.assertEqual(encoded, "[[10,100],[5,20.5]]")
+		self.assertEqual(encode_stock_queue([], compact=True), "[]")
+
+	@given(stock_queue_generator)
+	def test_roundtrip_hypothesis(self, stock_queue):
+		queue = [[qty, rate] for qty, rate in stock_queue]
+		for compact in (False, True):
+			self.assertEqual(decode_stock_queue(encode_stock_queue(queue, compact=compact)), queue)
+
+	def test_long_queue_is_packed(self):
+		queue = [[float(i), 10.0 + i / 3] for i in range(1, PACKED_STOCK_QUEUE_MIN_BINS * 5)]
+		encoded = encode_stock_queue(queue, compact=True)
+
+		self.assertTrue(encoded.startswith(PACKED_STOCK_QUEUE_PREFIX))
+		self.assertLess(len(encoded), len(json.dumps(queue)))
+		self.assertEqual(FIFOValuation.from_stock_queue(encoded).state, queue)
+		self.assertEqual(LIFOValuation(queue).to_stock_queue(compact=True), encoded)
+
+
 class TestLIFOValuationSLE(FrappeTestCase):
 	ITEM_CODE = "_Test LIFO item"
 	WAREHOUSE = "_Test Warehouse - _TC"
@@ -341,7 +438,7 @@ class TestLIFOValuationSLE(FrappeTestCase):
 		)
 		sle = frappe.get_doc("Stock Ledger Entry", sle_name)
 
-		stock_queue = json.loads(sle.stock_queue)
+		stock_queue = decode_stock_queue(sle.stock_queue)
 
 		total_qty, total_value = LIFOValuation(stock_queue).get_total_stock_and_value()
 		self.assertEqual(sle.qty_after_transaction, total_qty)
@@ -6,7 +6,7 @@ import json
 
 import frappe
 from frappe import _
-from frappe.query_builder.functions import CombineDatetime, IfNull, Sum
+from frappe.query_builder.functions import IfNull, Sum
 from frappe.utils import cstr, flt, get_link_to_form, get_time, getdate, nowdate, nowtime
 
 import erpnext
@@ -15,7 +15,7 @@ from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle impor
 )
 from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
 from erpnext.stock.serial_batch_bundle import BatchNoValuation, SerialNoValuation
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation
+from erpnext.stock.valuation import FIFOValuation, LIFOValuation, decode_stock_queue
 
 BarcodeScanResult = dict[str, str | None]
 
@@ -297,7 +297,7 @@ def get_incoming_rate(args, raise_error_if_no_rate=True):
 		previous_sle = get_previous_sle(args)
 		if valuation_method in ("FIFO", "LIFO"):
 			if previous_sle:
-				previous_stock_queue = json.loads(previous_sle.get("stock_queue", "[]") or "[]")
+				previous_stock_queue = decode_stock_queue(previous_sle.get("stock_queue"))
 				in_rate = (
 					_get_fifo_lifo_rate(previous_stock_queue, args.get("qty") or 0, valuation_method)
 					if previous_stock_queue
@@ -325,13 +325,7 @@ def get_incoming_rate(args, raise_error_if_no_rate=True):
 def get_batch_incoming_rate(item_code, warehouse, batch_no, posting_date, posting_time, creation=None):
 	sle = frappe.qb.DocType("Stock Ledger Entry")
 
-	timestamp_condition = CombineDatetime(sle.posting_date, sle.posting_time) < CombineDatetime(
-		posting_date, posting_time
-	)
-	if creation:
-		timestamp_condition |= (
-			CombineDatetime(sle.posting_date, sle.posting_time) == CombineDatetime(posting_date, posting_time)
-		) & (sle.creation < creation)
+	timestamp_condition = get_posting_datetime_condition(sle, "<", posting_date, posting_time, creation)
 
 	batch_details = (
 		frappe.qb.from_(sle)
@@ -658,3 +652,30 @@ def get_combine_datetime(posting_date, posting_time):
 		posting_time = (datetime.datetime.min + posting_time).time()
 
 	return datetime.datetime.combine(posting_date, posting_time).replace(microsecond=0)
+
+
+def get_posting_datetime_condition(sle, operator, posting_date, posting_time, creation=None):
+	"""
+	Condition comparing the indexed `posting_datetime` of Stock Ledger Entries with the given
+	posting date and time. Unlike `timestamp(posting_date, posting_time)` or `CombineDatetime`,
+	it can be answered from the (posting_datetime, creation) index.
+
+	operator - one of "<", "<=", ">", ">=", "="
+	creation - for "<" and ">", entries at the same posting datetime created before (or after) it
+	"""
+	posting_datetime = get_combine_datetime(posting_date, posting_time)
+	column = sle.posting_datetime
+
+	condition = {
+		"<": column < posting_datetime,
+		"<=": column <= posting_datetime,
+		">": column > posting_datetime,
+		">=": column >= posting_datetime,
+		"=": column == posting_datetime,
+	}[operator]
+
+	if creation and operator in ("<", ">"):
+		created = sle.creation < creation if operator == "<" else sle.creation > creation
+		condition |= (column == posting_datetime) & created
+
+	return condition
@@ -1,4 +1,10 @@
+import base64
+import json
+import math
+import struct
+import zlib
 from abc import ABC, abstractmethod, abstractproperty
+from collections import deque
 from collections.abc import Callable
 from typing import NewType
 
@@ -10,6 +16,11 @@ StockBin = NewType("StockBin", list[float])  # [[qty, rate], ...]
 QTY = 0
 RATE = 1
 
+# Compact stock queues with at least these many bins are stored as deflated
+# packed doubles, smaller ones as JSON without whitespace.
+PACKED_STOCK_QUEUE_MIN_BINS = 20
+PACKED_STOCK_QUEUE_PREFIX = "z:"
+
 
 class BinWiseValuation(ABC):
 	@abstractmethod
@@ -26,6 +37,14 @@ class BinWiseValuation(ABC):
 	def state(self) -> list[StockBin]:
 		pass
 
+	@classmethod
+	def from_stock_queue(cls, stock_queue: str | None) -> "BinWiseValuation":
+		"""Create valuation object from `stock_queue` as stored in Stock Ledger Entry."""
+		return cls(decode_stock_queue(stock_queue))
+
+	def to_stock_queue(self, compact: bool = False) -> str:
+		return encode_stock_queue(self.state, compact=compact)
+
 	def get_total_stock_and_value(self) -> tuple[float, float]:
 		total_qty = 0.0
 		total_value = 0.0
@@ -245,6 +264,228 @@ class LIFOValuation(BinWiseValuation):
 		return consumed_bins
 
 
+class RunningSum:
+	"""Exact running sum of floats, values can be added and subtracted in any order.
+
+	Keeps non-overlapping partials (Shewchuk's algorithm, as used by `math.fsum`)
+	so the total does not drift when large values are added and removed again.
+	"""
+
+	__slots__ = ["partials"]
+
+	def __init__(self):
+		self.partials: list[float] = []
+
+	def add(self, value: float) -> None:
+		i = 0
+		for partial in self.partials:
+			if abs(value) < abs(partial):
+				value, partial = partial, value
+			hi = value + partial
+			lo = partial - (hi - value)
+			if lo:
+				self.partials[i] = lo
+				i += 1
+			value = hi
+		self.partials[i:] = [value]
+
+	@property
+	def value(self) -> float:
+		return math.fsum(self.partials)
+
+
+class ArrayBinWiseValuation(BinWiseValuation):
+	"""Bin-wise valuation on parallel qty/rate arrays.
+
+	Bins are consumed from the front by moving `head` instead of popping from
+	a list, bins consumed out of order are tombstoned and compacted lazily.
+	Totals are kept as running sums, so `get_total_stock_and_value` is O(1).
+
+	Behaviour is same as the list based `FIFOValuation`/`LIFOValuation`.
+	"""
+
+	__slots__ = ["head", "live", "qtys", "rate_index", "rates", "tail", "total_qty", "total_value"]
+
+	def __init__(self, state: list[StockBin] | None):
+		self.reset()
+		for qty, rate in state or []:
+			self.append_bin(qty, rate)
+
+	def reset(self) -> None:
+		self.qtys: list[float | None] = []
+		self.rates: list[float] = []
+		self.head = 0
+		self.tail = -1
+		self.live = 0
+		# rate -> positions of bins with that rate, in queue order
+		self.rate_index: dict[float, deque[int]] = {}
+		self.total_qty = RunningSum()
+		self.total_value = RunningSum()
+
+	@property
+	def state(self) -> list[StockBin]:
+		return [
+			[self.qtys[idx], self.rates[idx]]
+			for idx in range(self.head, self.tail + 1)
+			if self.qtys[idx] is not None
+		]
+
+	def __len__(self):
+		return self.live
+
+	def get_total_stock_and_value(self) -> tuple[float, float]:
+		return round_off_if_near_zero(self.total_qty.value), round_off_if_near_zero(self.total_value.value)
+
+	def append_bin(self, qty: float, rate: float) -> None:
+		self.qtys.append(qty)
+		self.rates.append(rate)
+		self.tail = len(self.qtys) - 1
+		self.live += 1
+		self.rate_index.setdefault(rate, deque()).append(self.tail)
+
+		self.total_qty.add(flt(qty))
+		self.total_value.add(flt(qty) * flt(rate))
+
+	def update_bin(self, idx: int, qty: float, rate: float) -> None:
+		old_qty, old_rate = self.qtys[idx], self.rates[idx]
+		self.total_qty.add(flt(qty) - flt(old_qty))
+		self.total_value.add(-flt(old_qty) * flt(old_rate))
+		self.total_value.add(flt(qty) * flt(rate))
+
+		self.qtys[idx] = qty
+		if rate != old_rate:
+			self.rates[idx] = rate
+			# only the last bin changes rate, so positions stay in queue order
+			self.rate_index.setdefault(rate, deque()).append(idx)
+
+	def remove_bin(self, idx: int) -> StockBin:
+		qty, rate = self.qtys[idx], self.rates[idx]
+		self.qtys[idx] = None
+		self.live -= 1
+
+		if not self.live:
+			self.reset()
+			return [qty, rate]
+
+		self.total_qty.add(-flt(qty))
+		self.total_value.add(-flt(qty) * flt(rate))
+
+		while self.qtys[self.head] is None:
+			self.head += 1
+		while self.qtys[self.tail] is None:
+			self.tail -= 1
+
+		if len(self.qtys) > 2 * self.live + 64:
+			self.compact()
+
+		return [qty, rate]
+
+	def compact(self) -> None:
+		state = self.state
+		self.reset()
+		for qty, rate in state:
+			self.append_bin(qty, rate)
+
+	def first_bin(self) -> int:
+		return self.head
+
+	def last_bin(self) -> int:
+		return self.tail
+
+	def find_bin_with_rate(self, rate: float) -> int | None:
+		positions = self.rate_index.get(rate)
+		while positions:
+			idx = positions[0]
+			if self.qtys[idx] is not None and self.rates[idx] == rate:
+				return idx
+			positions.popleft()
+
+	@abstractmethod
+	def get_bin_to_consume(self, outgoing_rate: float) -> int:
+		pass
+
+	def add_stock(self, qty: float, rate: float) -> None:
+		"""Update queue with new stock, same as `FIFOValuation.add_stock`."""
+		if not self.live:
+			self.append_bin(0, 0)
+
+		last = self.last_bin()
+		last_qty, last_rate = self.qtys[last], self.rates[last]
+
+		# last row has the same rate, merge new bin.
+		if last_rate == rate:
+			self.update_bin(last, last_qty + qty, last_rate)
+		else:
+			# Item has a positive balance qty, add new entry
+			if last_qty > 0:
+				self.append_bin(qty, rate)
+			else:  # negative balance qty
+				qty = last_qty + qty
+				if qty > 0:  # new balance qty is positive
+					self.update_bin(last, qty, rate)
+				else:  # new balance qty is still negative, maintain same rate
+					self.update_bin(last, qty, last_rate)
+
+	def remove_stock(
+		self, qty: float, outgoing_rate: float = 0.0, rate_generator: Callable[[], float] | None = None
+	) -> list[StockBin]:
+		"""Remove stock from the queue and return popped bins, same as `FIFOValuation.remove_stock`."""
+		if not rate_generator:
+			rate_generator = lambda: 0.0  # noqa
+
+		consumed_bins = []
+		while qty:
+			if not self.live:
+				# rely on rate generator.
+				self.append_bin(0, rate_generator())
+
+			index = self.get_bin_to_consume(outgoing_rate)
+			bin_qty, bin_rate = self.qtys[index], self.rates[index]
+
+			if qty >= bin_qty:
+				# consume current bin
+				qty = round_off_if_near_zero(qty - bin_qty)
+				consumed_bins.append(self.remove_bin(index))
+
+				if not self.live and qty:
+					# stock finished, qty still remains to be withdrawn
+					# negative stock, keep in as a negative bin
+					self.append_bin(-qty, outgoing_rate or bin_rate)
+					consumed_bins.append([qty, outgoing_rate or bin_rate])
+					break
+			else:
+				# qty found in current bin consume it and exit
+				self.update_bin(index, round_off_if_near_zero(bin_qty - qty), bin_rate)
+				consumed_bins.append([qty, bin_rate])
+				qty = 0
+
+		return consumed_bins
+
+
+class ArrayFIFOValuation(ArrayBinWiseValuation):
+	"""Array backed `FIFOValuation` with amortized O(1) consumption."""
+
+	__slots__ = []
+
+	def get_bin_to_consume(self, outgoing_rate: float) -> int:
+		index = None
+		if outgoing_rate > 0:
+			# Find the entry where rate matched with outgoing rate
+			index = self.find_bin_with_rate(outgoing_rate)
+
+		# If no entry found with outgoing rate, consume as per FIFO
+		return self.first_bin() if index is None else index
+
+
+class ArrayLIFOValuation(ArrayBinWiseValuation):
+	"""Array backed `LIFOValuation`, outgoing rate is ignored like in `LIFOValuation`."""
+
+	__slots__ = []
+
+	def get_bin_to_consume(self, outgoing_rate: float) -> int:
+		return self.last_bin()
+
+
 def round_off_if_near_zero(number: float, precision: int = 7) -> float:
 	"""Rounds off the number to zero only if number is close to zero for decimal
 	specified in precision. Precision defaults to 7.
@@ -253,3 +494,38 @@ def round_off_if_near_zero(number: float, precision: int = 7) -> float:
 		return 0.0
 
 	return flt(number)
+
+
+def encode_stock_queue(queue: list[StockBin], compact: bool = False) -> str:
+	"""Serialize stock queue for Stock Ledger Entry.
+
+	args:
+	        queue: list of [qty, rate] bins
+	        compact: use compact representation instead of JSON
+	"""
+	if not compact:
+		return json.dumps(queue)
+
+	if len(queue) < PACKED_STOCK_QUEUE_MIN_BINS:
+		return json.dumps(queue, separators=(",", ":"))
+
+	values = [flt(value) for stock_bin in queue for value in stock_bin]
+	packed = zlib.compress(struct.pack(f"<{len(values)}d", *values))
+
+	return PACKED_STOCK_QUEUE_PREFIX + base64.b64encode(packed).decode()
+
+
+def decode_stock_queue(stock_queue: str | list | None) -> list[StockBin]:
+	"""Deserialize stock queue stored by `encode_stock_queue`, JSON rows are read as is."""
+	if not stock_queue:
+		return []
+
+	if isinstance(stock_queue, list):
+		return stock_queue
+
+	if stock_queue.startswith(PACKED_STOCK_QUEUE_PREFIX):
+		packed = zlib.decompress(base64.b64decode(stock_queue[len(PACKED_STOCK_QUEUE_PREFIX) :]))
+		values = struct.unpack(f"<{len(packed) // 8}d", packed)
+		return [[values[i], values[i + 1]] for i in range(0, len(values), 2)]
+
+	return json.loads(stock_queue)
@@ -0,0 +1,49 @@
+"""Benchmark of the document hooks that run on every validate.
+
+Not collected by the test runner. Run it against a site with
+
+	bench --site <site> execute erpnext.tests.benchmark_document_hooks.run --kwargs "{'doctype': 'Task', 'saves': 10000}"
+
+Reports the time each `doc_events["*"]["validate"]` hook adds to a save of the doctype.
+Nothing is written to the database.
+"""
+
+import time
+
+import frappe
+from frappe.utils import cint
+
+
+def benchmark_validate_hooks(doc, saves=10000):
+	"""Average time in microseconds each global validate hook takes per save of `doc`."""
+	hooks = frappe.get_hooks("doc_events").get("*", {}).get("validate", [])
+	results = {}
+
+	for hook in hooks:
+		method = frappe.get_attr(hook)
+		# first call fills the caches, like the first save of an import does
+		method(doc, "validate")
+
+		start = time.perf_counter()
+		for _ in range(saves):
+			method(doc, "validate")
+		elapsed = time.perf_counter() - start
+
+		results[hook] = round(elapsed / saves * 1e6, 2)
+
+	return results
+
+
+def run(doctype="Task", saves=10000):
+	doc = frappe.new_doc(doctype)
+	if doc.meta.has_field("company"):
+		doc.company = frappe.defaults.get_user_default("Company") or frappe.db.get_value("Company", {})
+
+	results = benchmark_validate_hooks(doc, cint(saves))
+
+	print(f"{doctype}: microseconds per save")
+	for hook, per_save in results.items():
+		print(f"\t{hook}: {per_save}")
+	print(f"\ttotal: {round(sum(results.values()), 2)}")
+
+	return results
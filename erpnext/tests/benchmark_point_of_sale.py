@@ -0,0 +1,57 @@
+"""Benchmark of the Point of Sale item catalog.
+
+Not collected by the test runner. Run it against a site with
+
+	bench --site <site> execute erpnext.tests.benchmark_point_of_sale.run --kwargs "{'pos_profile': '<profile>'}"
+"""
+
+import time
+from unittest.mock import patch
+
+import frappe
+from frappe.utils import cint
+from frappe.utils.nestedset import get_root_of
+
+from erpnext.selling.page.point_of_sale.point_of_sale import clear_item_catalog_cache, get_items
+
+
+def benchmark_get_items(pos_profile, pages=10, page_length=40, cached=False):
+	"""Query count and latency of `get_items` per page of the item catalog."""
+	price_list = frappe.db.get_value("POS Profile", pos_profile, "selling_price_list")
+	item_group = get_root_of("Item Group")
+
+	clear_item_catalog_cache()
+	frappe.db.set_value("POS Profile", pos_profile, "cache_item_catalog", cint(cached))
+
+	# warm up the cache when benchmarking cached pages
+	for _ in range(2 if cached else 1):
+		queries = elapsed = 0.0
+		for page in range(pages):
+			with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql:
+				start = time.perf_counter()
+				get_items(page * page_length, page_length, price_list, item_group, pos_profile)
+				elapsed += time.perf_counter() - start
+				queries += sql.call_count
+
+	return {
+		"queries_per_page": round(queries / pages, 1),
+		"ms_per_page": round(elapsed / pages * 1000, 2),
+	}
+
+
+def run(pos_profile, pages=10, page_length=40):
+	results = {
+		"uncached": benchmark_get_items(pos_profile, cint(pages), cint(page_length)),
+		"cached": benchmark_get_items(pos_profile, cint(pages), cint(page_length), cached=True),
+	}
+
+	# keep the POS Profile as it was
+	frappe.db.rollback()
+	clear_item_catalog_cache()
+
+	for name, result in results.items():
+		print(name)
+		for key, value in result.items():
+			print(f"\t{key}: {value}")
+
+	return results
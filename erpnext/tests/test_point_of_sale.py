@@ -61,3 +61,75 @@ class TestPointOfSale(unittest.TestCase):
 
 		self.assertEqual(len(filtered_items), 1)
 		self.assertEqual(filtered_items[0]["item_code"], item2.item_code)
+
+	def test_item_catalog_queries_do_not_grow_with_page(self):
+		from unittest.mock import patch
+
+		pos_profile = make_pos_profile(name="Test POS Profile for Catalog")
+		item_group = make_item_group_with_items("_Test POS Catalog Group", 4)
+
+		def get_page(page_length):
+			with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql:
+				items = get_items(
+					start=0,
+					page_length=page_length,
+					price_list=pos_profile.selling_price_list,
+					item_group=item_group,
+					pos_profile=pos_profile.name,
+				)["items"]
+
+			return items, sql.call_count
+
+		items, single_item_queries = get_page(1)
+		self.assertEqual(len(items), 1)
+
+		items, page_queries = get_page(4)
+		self.assertEqual(len(items), 4)
+		self.assertEqual(page_queries, single_item_queries)
+		self.assertEqual([item["actual_qty"] for item in items], [5, 5, 5, 5])
+		self.assertEqual([item["price_list_rate"] for item in items], [100, 100, 100, 100])
+
+	def test_cached_item_catalog(self):
+		pos_profile = make_pos_profile(name="Test POS Profile for Catalog Cache")
+		pos_profile.db_set("cache_item_catalog", 1)
+		item_group = make_item_group_with_items("_Test POS Catalog Cache Group", 1)
+
+		def get_catalog():
+			return get_items(
+				start=0,
+				page_length=20,
+				price_list=pos_profile.selling_price_list,
+				item_group=item_group,
+				pos_profile=pos_profile.name,
+			)["items"]
+
+		item = get_catalog()[0]
+		self.assertEqual(item["actual_qty"], 5)
+
+		# stock of a cached catalog page is read live
+		make_stock_entry(item_code=item["item_code"], qty=2, to_warehouse=pos_profile.warehouse, rate=100)
+		self.assertEqual(get_catalog()[0]["actual_qty"], 7)
+
+		# items added or disabled clear the cached pages
+		new_item = make_item(properties={"is_stock_item": 1, "item_group": item_group, "is_sales_item": 1})
+		self.assertIn(new_item.name, [d["item_code"] for d in get_catalog()])
+
+		new_item.disabled = 1
+		new_item.save()
+		self.assertNotIn(new_item.name, [d["item_code"] for d in get_catalog()])
+
+
+def make_item_group_with_items(item_group, count):
+	from erpnext.stock.doctype.item.item import make_item_price
+
+	if not frappe.db.exists("Item Group", item_group):
+		frappe.get_doc(
+			{"doctype": "Item Group", "item_group_name": item_group, "parent_item_group": "All Item Groups"}
+		).insert()
+
+	for _ in range(count):
+		item = make_item(properties={"is_stock_item": 1, "item_group": item_group, "is_sales_item": 1})
+		make_stock_entry(item_code=item.name, qty=5, to_warehouse="_Test Warehouse - _TC", rate=100)
+		make_item_price(item.name, "_Test Price List", 100)
+
+	return item_group